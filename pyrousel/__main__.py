@@ -1,2 +1,4 @@
 from .app import Main
-Main()
\ No newline at end of file
+
+if __name__ == '__main__':
+    Main()
\ No newline at end of file
@@ -1,6 +1,11 @@
 import argparse
 from dataclasses import dataclass
-from .appwindow import AppWindow
+from .meshcache import MeshCache, DEFAULT_MAX_SIZE
+from .model import ModelLoader
+from .lod import DEFAULT_LOD_RATIOS
+from .batchrender import BatchRenderer, TurntableSettings
+from .resolution import DEFAULT_TARGET_GPU_TIME
+from .benchmark import BenchmarkSuite, BENCHMARK_GROUPS, DEFAULT_TRIANGLE_COUNTS, DEFAULT_THRESHOLD
 
 @dataclass
 class ApplicationSettings:
@@ -8,29 +13,114 @@ class ApplicationSettings:
     window_height: int = 1024
     startup_model: str = None
     enable_gui: bool = True
+    enable_mesh_cache: bool = True
+    mesh_cache_dir: str = None
+    mesh_cache_size: int = DEFAULT_MAX_SIZE
+    packed_vertices: bool = True
+    optimize_meshes: bool = False
+    lod_ratios: tuple = None
+    num_instances: int = 1
+    enable_profiling: bool = False
+    reverse_z: bool = False
+    on_demand: bool = False
+    max_fps: float = 0.0
+    track_memory: bool = False
+    preserve_scenes: bool = False
+    enable_picking: bool = True
+    dynamic_resolution: bool = False
+    target_gpu_time: float = DEFAULT_TARGET_GPU_TIME
 
 def Main() -> None:
     args = ParseArgs()
     if args is None:
         exit(1)
+
+    if args.command == 'render':
+        RenderTurntables(args)
+        exit(0)
+    if args.command == 'benchmark':
+        RunBenchmarks(args)
+        exit(0)
+    if args.command == 'compare':
+        exit(CompareBenchmarks(args))
     
     app_settings = ApplicationSettings()
     app_settings.window_width = args.width
     app_settings.window_height = args.height
     app_settings.startup_model = args.model
     app_settings.enable_gui = not args.nogui
+    app_settings.enable_mesh_cache = not args.nocache
+    app_settings.mesh_cache_dir = args.cache_dir
+    app_settings.mesh_cache_size = args.cache_size * 1024 * 1024
+    app_settings.packed_vertices = not args.nopacking
+    app_settings.optimize_meshes = args.optimize
+    if args.lod is not None:
+        app_settings.lod_ratios = tuple(args.lod) if len(args.lod) > 0 else DEFAULT_LOD_RATIOS
+    app_settings.num_instances = max(args.instances, 1)
+    app_settings.enable_profiling = args.profile
+    app_settings.reverse_z = args.reverse_z
+    app_settings.on_demand = args.on_demand
+    app_settings.max_fps = args.max_fps
+    app_settings.track_memory = args.trace_memory
+    app_settings.preserve_scenes = args.preserve_scenes
+    app_settings.enable_picking = not args.nopicking
+    app_settings.dynamic_resolution = args.dynamic_resolution
+    app_settings.target_gpu_time = args.target_gpu_time
+
+    if args.warm_cache is not None:
+        WarmCache(args.warm_cache, app_settings)
+        exit(0)
 
     Run(app_settings)
     exit(0)
 
 def Run(settings: ApplicationSettings = ApplicationSettings()) -> None:
+    # Windowing & GUI libraries are only required by the interactive viewer
+    from .appwindow import AppWindow
+
     print('Running Pyrousel...')
     print(f'--Window size: {settings.window_width}x{settings.window_height}')
     print(f'--gui: {settings.enable_gui}')
     print(f'--Startup model: {settings.startup_model}')
+    print(f'--Mesh cache: {settings.enable_mesh_cache}')
+    print(f'--Packed vertices: {settings.packed_vertices}')
+    print(f'--Optimize meshes: {settings.optimize_meshes}')
+    print(f'--LOD ratios: {settings.lod_ratios}')
+    print(f'--Instances: {settings.num_instances}')
+    print(f'--Profiling: {settings.enable_profiling}')
+    print(f'--Reverse-Z: {settings.reverse_z}')
+    print(f'--On demand: {settings.on_demand}')
+    print(f'--Max FPS: {settings.max_fps}')
+    print(f'--Trace memory: {settings.track_memory}')
+    print(f'--Preserve scenes: {settings.preserve_scenes}')
+    print(f'--Picking: {settings.enable_picking}')
+    print(f'--Dynamic resolution: {settings.dynamic_resolution}')
+    print(f'--Target GPU time: {settings.target_gpu_time}')
     print('\n')
-    
-    app_window = AppWindow(settings.window_width, settings.window_height, settings.enable_gui)
+
+    mesh_cache = None
+    if settings.enable_mesh_cache:
+        mesh_cache = MeshCache(settings.mesh_cache_dir, settings.mesh_cache_size)
+
+    app_window = AppWindow(
+        settings.window_width,
+        settings.window_height,
+        settings.enable_gui,
+        mesh_cache=mesh_cache,
+        packed_vertices=settings.packed_vertices,
+        optimize_meshes=settings.optimize_meshes,
+        lod_ratios=settings.lod_ratios,
+        num_instances=settings.num_instances,
+        enable_profiling=settings.enable_profiling,
+        reverse_z=settings.reverse_z,
+        on_demand=settings.on_demand,
+        max_fps=settings.max_fps,
+        track_memory=settings.track_memory,
+        preserve_scenes=settings.preserve_scenes,
+        enable_picking=settings.enable_picking,
+        dynamic_resolution=settings.dynamic_resolution,
+        target_gpu_time=settings.target_gpu_time
+    )
     app_window.Init()
 
     if settings.startup_model is not None:
@@ -39,6 +129,61 @@ def Run(settings: ApplicationSettings = ApplicationSettings()) -> None:
     app_window.Run()
     print('Quitting Pyrousel')
 
+def WarmCache(directory: str, settings: ApplicationSettings = ApplicationSettings()) -> None:
+    mesh_cache = MeshCache(settings.mesh_cache_dir, settings.mesh_cache_size)
+    print(f'Warming mesh cache: {mesh_cache.cache_dir}')
+    num_added = ModelLoader.WarmCache(directory, mesh_cache, settings.optimize_meshes, settings.lod_ratios)
+    print(f'Added {num_added} models, cache size: {mesh_cache.GetSize() / (1024 * 1024):.2f} MB')
+
+def RenderTurntables(args) -> None:
+    settings = TurntableSettings()
+    settings.width, settings.height = args.resolution
+    settings.num_frames = args.frames
+    settings.samples = args.samples
+    settings.packed_vertices = not args.nopacking
+    settings.overwrite = args.overwrite
+
+    models = []
+    for path in args.paths:
+        models += BatchRenderer.FindModels(path)
+
+    renderer = BatchRenderer(settings, args.workers)
+    print(f'Rendering {len(models)} models, {settings.num_frames} frames each, using {renderer.num_workers} workers')
+    stats = renderer.Run(models, args.output)
+    print(f'Done: {stats}')
+
+def RunBenchmarks(args) -> None:
+    triangle_counts = [count for count in DEFAULT_TRIANGLE_COUNTS if count <= args.max_triangles]
+    suite = BenchmarkSuite(
+        triangle_counts=triangle_counts,
+        groups=args.groups,
+        repeat=args.repeat,
+        budget=args.budget,
+        num_frames=args.frames
+    )
+    print(f'Running benchmarks: {", ".join(suite.groups)}, synthetic meshes: {triangle_counts}')
+    report = suite.Run()
+    BenchmarkSuite.Save(report, args.output)
+    print(f'Results written: {args.output}')
+
+def CompareBenchmarks(args) -> int:
+    baseline = BenchmarkSuite.Load(args.baseline)
+    current = BenchmarkSuite.Load(args.current)
+    comparisons = BenchmarkSuite.Compare(baseline, current)
+
+    num_regressions = 0
+    for comparison in comparisons:
+        regressed = comparison.IsRegression(args.threshold)
+        num_regressions += regressed
+        marker = 'REGRESSION' if regressed else ''
+        print(
+            f'{comparison.name:<60} {comparison.baseline * 1000.0:>10.3f}ms '
+            f'{comparison.current * 1000.0:>10.3f}ms {comparison.change * 100.0:>+8.1f}% {marker}'
+        )
+
+    print(f'Compared {len(comparisons)} results, {num_regressions} regressed more than {args.threshold * 100.0:.0f}%')
+    return 1 if num_regressions > 0 else 0
+
 def ParseArgs():
     arg_parser = argparse.ArgumentParser()
     arg_parser.add_argument(
@@ -69,6 +214,260 @@ def ParseArgs():
         required=False,
         help='disable interactive property panel'
     )
+    arg_parser.add_argument(
+        '--nocache',
+        action='store_true',
+        default=False,
+        required=False,
+        help='disable on-disk mesh cache'
+    )
+    arg_parser.add_argument(
+        '--nopacking',
+        action='store_true',
+        default=False,
+        required=False,
+        help='use separate float32 vertex buffers instead of packed vertex layout'
+    )
+    arg_parser.add_argument(
+        '--optimize',
+        action='store_true',
+        default=False,
+        required=False,
+        help='weld and reorder loaded meshes for vertex cache and overdraw efficiency'
+    )
+    arg_parser.add_argument(
+        '--lod',
+        type=float,
+        nargs='*',
+        default=None,
+        required=False,
+        help='generate simplified detail levels at given triangle ratios (default: 0.5 0.25 0.125 0.0625)'
+    )
+    arg_parser.add_argument(
+        '--instances',
+        type=int,
+        default=1,
+        required=False,
+        help='draw loaded model this many times in a grid using hardware instancing'
+    )
+    arg_parser.add_argument(
+        '--profile',
+        action='store_true',
+        default=False,
+        required=False,
+        help='start with CPU scope & GPU pass profiling enabled'
+    )
+    arg_parser.add_argument(
+        '--reverse-z',
+        action='store_true',
+        default=False,
+        required=False,
+        help='use reversed float depth with infinite far plane for better depth precision'
+    )
+    arg_parser.add_argument(
+        '--on-demand',
+        action='store_true',
+        default=False,
+        required=False,
+        help='redraw only on input, GUI changes, animation or loading instead of continuously'
+    )
+    arg_parser.add_argument(
+        '--max-fps',
+        type=float,
+        default=0.0,
+        required=False,
+        help='frame rate cap, 0 for uncapped'
+    )
+    arg_parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        default=False,
+        required=False,
+        help='report peak memory of each model load stage, slows loading down'
+    )
+    arg_parser.add_argument(
+        '--preserve-scenes',
+        action='store_true',
+        default=False,
+        required=False,
+        help='keep scene nodes and materials of model files as separate models instead of merging them, bypasses the mesh cache'
+    )
+    arg_parser.add_argument(
+        '--nopicking',
+        action='store_true',
+        default=False,
+        required=False,
+        help='disable building triangle hierarchies and picking the model under the mouse cursor'
+    )
+    arg_parser.add_argument(
+        '--dynamic-resolution',
+        action='store_true',
+        default=False,
+        required=False,
+        help='render the scene at reduced resolution scaled to hold the target GPU frame time'
+    )
+    arg_parser.add_argument(
+        '--target-gpu-time',
+        type=float,
+        default=DEFAULT_TARGET_GPU_TIME,
+        required=False,
+        help='GPU frame time in milliseconds held by dynamic resolution'
+    )
+    arg_parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        required=False,
+        help='mesh cache directory'
+    )
+    arg_parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=DEFAULT_MAX_SIZE // (1024 * 1024),
+        required=False,
+        help='maximum mesh cache size in megabytes'
+    )
+    arg_parser.add_argument(
+        '--warm-cache',
+        type=str,
+        default=None,
+        required=False,
+        help='load all models within given directory into the mesh cache and exit'
+    )
+
+    subparsers = arg_parser.add_subparsers(dest='command')
+    render_parser = subparsers.add_parser(
+        'render',
+        help='render turntable images of models headlessly and exit'
+    )
+    render_parser.add_argument(
+        'paths',
+        type=str,
+        nargs='+',
+        help='model directories or manifest files listing one model filepath per line'
+    )
+    render_parser.add_argument(
+        '--output',
+        type=str,
+        default='turntables',
+        required=False,
+        help='output directory, frames of each model are written into its own subdirectory'
+    )
+    render_parser.add_argument(
+        '--frames',
+        type=int,
+        default=8,
+        required=False,
+        help='number of evenly spaced carousel angles per model'
+    )
+    render_parser.add_argument(
+        '--resolution',
+        type=int,
+        nargs=2,
+        default=(512, 512),
+        metavar=('WIDTH', 'HEIGHT'),
+        required=False,
+        help='frame size in pixels'
+    )
+    render_parser.add_argument(
+        '--samples',
+        type=int,
+        default=0,
+        required=False,
+        help='multisample anti-aliasing samples'
+    )
+    render_parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        required=False,
+        help='number of worker processes (default: number of cores)'
+    )
+    render_parser.add_argument(
+        '--overwrite',
+        action='store_true',
+        default=False,
+        required=False,
+        help='render models whose frames already exist'
+    )
+    render_parser.add_argument(
+        '--nopacking',
+        action='store_true',
+        default=False,
+        required=False,
+        help='use separate float32 vertex buffers instead of packed vertex layout'
+    )
+
+    benchmark_parser = subparsers.add_parser(
+        'benchmark',
+        help='run offscreen loading, upload & rendering benchmarks, write results as JSON and exit'
+    )
+    benchmark_parser.add_argument(
+        '--output',
+        type=str,
+        default='benchmark.json',
+        required=False,
+        help='filepath of the JSON results'
+    )
+    benchmark_parser.add_argument(
+        '--groups',
+        type=str,
+        nargs='+',
+        choices=BENCHMARK_GROUPS,
+        default=BENCHMARK_GROUPS,
+        required=False,
+        help='benchmark groups to run (default: all)'
+    )
+    benchmark_parser.add_argument(
+        '--max-triangles',
+        type=int,
+        default=DEFAULT_TRIANGLE_COUNTS[-1],
+        required=False,
+        help='largest synthetic mesh triangle count'
+    )
+    benchmark_parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        required=False,
+        help='measured runs per benchmark, after one warmup run'
+    )
+    benchmark_parser.add_argument(
+        '--budget',
+        type=float,
+        default=10.0,
+        required=False,
+        help='seconds after which benchmark stops repeating'
+    )
+    benchmark_parser.add_argument(
+        '--frames',
+        type=int,
+        default=60,
+        required=False,
+        help='measured frames per render mode'
+    )
+
+    compare_parser = subparsers.add_parser(
+        'compare',
+        help='compare two benchmark results, exit with status 1 on regressions'
+    )
+    compare_parser.add_argument(
+        'baseline',
+        type=str,
+        help='baseline benchmark JSON'
+    )
+    compare_parser.add_argument(
+        'current',
+        type=str,
+        help='benchmark JSON to check against the baseline'
+    )
+    compare_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        required=False,
+        help='relative median slowdown reported as regression'
+    )
 
     args = None
     try:
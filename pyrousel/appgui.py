@@ -7,6 +7,7 @@ from glfw import _GLFWwindow
 from blinker import Signal
 
 from .gfx import VisualiserMode, WireframeMode
+from .binding import TrackedPanel
 
 class AppGUI(object):
     def __init__(self, win_handle: _GLFWwindow):
@@ -19,6 +20,8 @@ class AppGUI(object):
         self.material_settings = MaterialSettingsPanel()
         self.light_settings = LightSettingsPanel()
         self.transforms = TransformsPanel()
+        self.picking = PickingPanel()
+        self.__mouse_over_gui = False
 
     def ProcessInputs(self) -> None:
         imgui.capture_mouse_from_app(True)
@@ -35,7 +38,14 @@ class AppGUI(object):
         self.camera_settings.Update()
         self.light_settings.Update()
         self.transforms.Update()
+        self.picking.Update()
+        self.__mouse_over_gui = imgui.is_window_hovered(imgui.HOVERED_ANY_WINDOW) or imgui.is_any_item_active()
         imgui.end()
+        self.picking.UpdateTooltip()
+
+    def IsMouseCaptured(self) -> bool:
+        """Returns whether the mouse was over or interacting with the GUI during the last frame"""
+        return self.__mouse_over_gui
 
     def __Draw(self) -> None:
         """Draw GUI to the screen"""
@@ -51,27 +61,54 @@ class AppGUI(object):
         """Free up any resources and terminate IMGui renderer"""
         self.__impl.shutdown()
 
-class SceneStatsPanel(object):
+class SceneStatsPanel(TrackedPanel):
     def __init__(self):
+        super().__init__()
         self.fps = 0
         self.frame_time = 0.0
         self.frames = 0
         self.num_vertex: int = 0
         self.num_triangles: int = 0
+        self.lod_level: int = 0
+        self.lod_triangles: int = 0
+        self.enable_lod = True
+        self.drawn_objects: int = 0
+        self.culled_objects: int = 0
+        self.drawn_triangles: int = 0
+        self.culled_triangles: int = 0
+        self.draw_calls: int = 0
+        self.state_changes: int = 0
+        self.frustum_culling = True
+        self.occlusion_culling = False
+        self.profiling = False
+        # Profiler ScopeStats shown as per scope breakdown, see Profiler.GetStats
+        self.profile_scopes = []
+        self.TraceExportRequested = Signal()
         self.min_ext = [0.0, 0.0, 0.0]
         self.max_ext = [0.0, 0.0, 0.0]
         self.vsync = False
+        # Smoothed GPU frame time in milliseconds and scene resolution scale held at the target
+        self.gpu_time = 0.0
+        self.dynamic_resolution = False
+        self.resolution_scale = 1.0
+        self.min_scale = 0.5
+        self.max_scale = 1.0
+        self.target_gpu_time = 0.0
+        self.upscale_sharpness = 0.0
 
     def Update(self) -> None:
         """Builds IMGui widgest that make this panel"""
         if imgui.collapsing_header("Scene Settings")[0]:
-            imgui.begin_child("#Scene Settings Panel", width=0, height=200, border=True)
+            imgui.begin_child("#Scene Settings Panel", width=0, height=520, border=True)
             imgui.text('FPS: ')
             imgui.same_line(position=200)
             imgui.input_int('##FPS', self.fps, flags=imgui.INPUT_TEXT_READ_ONLY)
             imgui.text('Frame Time (ms): ')
             imgui.same_line(position=200)
             imgui.input_float('##Frame Time', self.frame_time, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('GPU Time (ms): ')
+            imgui.same_line(position=200)
+            imgui.input_float('##GPU Time', self.gpu_time, flags=imgui.INPUT_TEXT_READ_ONLY)
             imgui.text('Frames: ')
             imgui.same_line(position=200)
             imgui.input_int('##Frame', self.frames, flags=imgui.INPUT_TEXT_READ_ONLY)
@@ -81,6 +118,30 @@ class SceneStatsPanel(object):
             imgui.text('Triangles: ')
             imgui.same_line(position=200)
             imgui.input_int('##Triangle Count', self.num_triangles, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('LOD Level: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##LOD Level', self.lod_level, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('LOD Triangles: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##LOD Triangle Count', self.lod_triangles, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Drawn Objects: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Drawn Objects', self.drawn_objects, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Culled Objects: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Culled Objects', self.culled_objects, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Drawn Triangles: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Drawn Triangles', self.drawn_triangles, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Culled Triangles: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Culled Triangles', self.culled_triangles, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Draw Calls: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Draw Calls', self.draw_calls, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('State Changes: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##State Changes', self.state_changes, flags=imgui.INPUT_TEXT_READ_ONLY)
             imgui.text('Min Extends: ')
             imgui.same_line(position=200)
             imgui.input_float3(
@@ -103,12 +164,71 @@ class SceneStatsPanel(object):
 
             imgui.text('VSync Enabled:')
             imgui.same_line(position=200)
-            _, self.vsync = imgui.checkbox('##VSync Enabled', self.vsync)
+            self.vsync = self.Track('vsync', imgui.checkbox('##VSync Enabled', self.vsync))
+
+            imgui.text('LOD Enabled:')
+            imgui.same_line(position=200)
+            self.enable_lod = self.Track('enable_lod', imgui.checkbox('##LOD Enabled', self.enable_lod))
+
+            imgui.text('Frustum Culling:')
+            imgui.same_line(position=200)
+            self.frustum_culling = self.Track('frustum_culling', imgui.checkbox('##Frustum Culling', self.frustum_culling))
+
+            imgui.text('Occlusion Culling:')
+            imgui.same_line(position=200)
+            self.occlusion_culling = self.Track('occlusion_culling', imgui.checkbox('##Occlusion Culling', self.occlusion_culling))
+
+            imgui.text('Profiling:')
+            imgui.same_line(position=200)
+            self.profiling = self.Track('profiling', imgui.checkbox('##Profiling', self.profiling))
+
+            imgui.text('Dynamic Resolution:')
+            imgui.same_line(position=200)
+            self.dynamic_resolution = self.Track('dynamic_resolution', imgui.checkbox('##Dynamic Resolution', self.dynamic_resolution))
+
+            imgui.text('Target GPU Time (ms):')
+            imgui.same_line(position=200)
+            self.target_gpu_time = self.Track('target_gpu_time', imgui.input_float('##Target GPU Time', self.target_gpu_time, step=0.5, format='%.2f'))
+            self.target_gpu_time = max(self.target_gpu_time, 0.1)
+
+            imgui.text('Resolution Scale:')
+            imgui.same_line(position=200)
+            self.resolution_scale = self.Track('resolution_scale', imgui.slider_float('##Resolution Scale', self.resolution_scale, self.min_scale, self.max_scale))
+
+            imgui.text('Upscale Sharpness:')
+            imgui.same_line(position=200)
+            self.upscale_sharpness = self.Track('upscale_sharpness', imgui.slider_float('##Upscale Sharpness', self.upscale_sharpness, 0.0, 1.0))
             
             imgui.end_child()
 
-class OverlaysPanel(object):
+            if self.profiling:
+                self.__UpdateProfiler()
+
+    def __UpdateProfiler(self) -> None:
+        """Builds per scope timing breakdown table"""
+        max_width = imgui.get_content_region_available_width()
+        height = 60 + 18 * len(self.profile_scopes)
+        imgui.begin_child("#Profiler Panel", width=0, height=height, border=True)
+        imgui.columns(4, 'Profiler Scopes')
+        for header in ['Scope', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)']:
+            imgui.text(header)
+            imgui.next_column()
+        imgui.separator()
+        for scope in self.profile_scopes:
+            imgui.text(f'{"  " * scope.depth}{scope.category}:{scope.name}')
+            imgui.next_column()
+            for value in [scope.p50, scope.p95, scope.p99]:
+                imgui.text(f'{value:.3f}')
+                imgui.next_column()
+        imgui.columns(1)
+        if imgui.button('Export Trace', width=max_width):
+            filepath = easygui.filesavebox(default='pyrousel_trace.json')
+            self.TraceExportRequested.send(filepath)
+        imgui.end_child()
+
+class OverlaysPanel(TrackedPanel):
     def __init__(self):
+        super().__init__()
         self.visualiser_mode = VisualiserMode.ShowDefault
         self.wireframe_mode = WireframeMode.WireframeOff
         self.wireframe_color = [1.0, 1.0, 1.0, 1.0]
@@ -123,25 +243,25 @@ class OverlaysPanel(object):
             imgui.text('Wireframe Off:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Wireframe Off", self.wireframe_mode == WireframeMode.WireframeOff):
-                self.wireframe_mode = WireframeMode.WireframeOff
+                self.Set('wireframe_mode', WireframeMode.WireframeOff)
             imgui.text('Wireframe Only:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Wireframe Only", self.wireframe_mode == WireframeMode.WireframeOnly):
-                self.wireframe_mode = WireframeMode.WireframeOnly
+                self.Set('wireframe_mode', WireframeMode.WireframeOnly)
             imgui.text('Wireframe Shaded:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Wireframe Shaded", self.wireframe_mode == WireframeMode.WireframeShaded):
-                self.wireframe_mode = WireframeMode.WireframeShaded
+                self.Set('wireframe_mode', WireframeMode.WireframeShaded)
             
             imgui.text('Wireframe Color:')
             imgui.same_line(position=200)
-            _, self.wireframe_color = imgui.input_float4(
+            self.wireframe_color = self.Track('wireframe_color', imgui.input_float4(
                 '##Wireframe color',
                 self.wireframe_color[0],
                 self.wireframe_color[1],
                 self.wireframe_color[2],
                 self.wireframe_color[3]
-            )
+            ))
             imgui.dummy(0, 5)
             imgui.text('Visualisers:')
             imgui.separator()
@@ -149,31 +269,34 @@ class OverlaysPanel(object):
             imgui.text('Show Default:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Show Default", self.visualiser_mode == VisualiserMode.ShowDefault):
-                self.visualiser_mode = VisualiserMode.ShowDefault
+                self.Set('visualiser_mode', VisualiserMode.ShowDefault)
             imgui.text('Show Normals:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Show Normals", self.visualiser_mode == VisualiserMode.ShowNormals):
-                self.visualiser_mode = VisualiserMode.ShowNormals
+                self.Set('visualiser_mode', VisualiserMode.ShowNormals)
             imgui.text('Show Texcoords:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Show Texcoords", self.visualiser_mode == VisualiserMode.ShowTexcoords):
-                self.visualiser_mode = VisualiserMode.ShowTexcoords
+                self.Set('visualiser_mode', VisualiserMode.ShowTexcoords)
             imgui.text('Show Color:')
             imgui.same_line(position=200)
             if imgui.radio_button("##Show Color", self.visualiser_mode == VisualiserMode.ShowColor):
-                self.visualiser_mode = VisualiserMode.ShowColor
+                self.Set('visualiser_mode', VisualiserMode.ShowColor)
             imgui.end_child()
 
 class ImportSettingsPanel(object):
     def __init__(self):
         self.model_filepath = None
+        self.loading_requests = []
         self.ModelRequestSignal = Signal()
         self.ModelReloadSignal = Signal()
+        self.ModelCancelSignal = Signal()
 
     def Update(self):
         if imgui.collapsing_header("Import Settings")[0]:
             max_width = imgui.get_content_region_available_width()
-            imgui.begin_child("#Import Settings Panel", width=0, height=75, border=True)
+            height = 75 + 45 * len(self.loading_requests)
+            imgui.begin_child("#Import Settings Panel", width=0, height=height, border=True)
             imgui.text(str(os.path.basename(self.model_filepath)))
             if imgui.button('Load Model', width=max_width):
                 dir = importlib.resources.files('pyrousel.resources.models.obj').joinpath('monkey.obj')
@@ -183,10 +306,15 @@ class ImportSettingsPanel(object):
                 self.ModelRequestSignal.send(self.model_filepath)
             if imgui.button('Reload', width=max_width):
                 self.ModelReloadSignal.send(None)
+            for filepath, progress in self.loading_requests:
+                imgui.progress_bar(progress, (max_width, 0), f'Loading {os.path.basename(filepath)}')
+                if imgui.button(f'Cancel##{filepath}', width=max_width):
+                    self.ModelCancelSignal.send(filepath)
             imgui.end_child()
 
-class TransformsPanel(object):
+class TransformsPanel(TrackedPanel):
     def __init__(self):
+        super().__init__()
         self.spin_model = True
         self.translation = [0.0, 0.0, 0.0]
         self.rotation = [0.0, 0.0, 0.0]
@@ -198,71 +326,79 @@ class TransformsPanel(object):
             imgui.begin_child("#Transform Settings Panel", width=0, height=320, border=True)
             imgui.text('Enable Carousel:')
             imgui.same_line(position=200)
-            _, self.spin_model = imgui.checkbox('##Spin Model', self.spin_model)
+            self.spin_model = self.Track('spin_model', imgui.checkbox('##Spin Model', self.spin_model))
             
             imgui.separator()
             imgui.text('Translation:')
             imgui.text('x:')
             imgui.same_line(position=50)
-            _, self.translation[0] = imgui.input_float('##Translation x', self.translation[0])
+            self.translation[0] = self.Track('translation', imgui.input_float('##Translation x', self.translation[0]))
             imgui.text('y:')
             imgui.same_line(position=50)
-            _, self.translation[1] = imgui.input_float('##Translation y', self.translation[1])
+            self.translation[1] = self.Track('translation', imgui.input_float('##Translation y', self.translation[1]))
             imgui.text('z:')
             imgui.same_line(position=50)
-            _, self.translation[2] = imgui.input_float('##Translation z', self.translation[2])
+            self.translation[2] = self.Track('translation', imgui.input_float('##Translation z', self.translation[2]))
             
             imgui.separator()
             imgui.text('Rotation:')
             imgui.text('x:')
             imgui.same_line(position=50)
-            _, self.rotation[0] = imgui.input_float('##rotation x', self.rotation[0])
+            self.rotation[0] = self.Track('rotation', imgui.input_float('##rotation x', self.rotation[0]))
             imgui.text('y:')
             imgui.same_line(position=50)
-            _, self.rotation[1] = imgui.input_float('##rotation y', self.rotation[1])
+            self.rotation[1] = self.Track('rotation', imgui.input_float('##rotation y', self.rotation[1]))
             imgui.text('z:')
             imgui.same_line(position=50)
-            _, self.rotation[2] = imgui.input_float('##rotation z', self.rotation[2])
+            self.rotation[2] = self.Track('rotation', imgui.input_float('##rotation z', self.rotation[2]))
             
             imgui.separator()
             imgui.text('Scale:')
             imgui.text('x:')
             imgui.same_line(position=50)
-            _, self.scale[0] = imgui.input_float('##scale x', self.scale[0])
+            self.scale[0] = self.Track('scale', imgui.input_float('##scale x', self.scale[0]))
             imgui.text('y:')
             imgui.same_line(position=50)
-            _, self.scale[1] = imgui.input_float('##scale y', self.scale[1])
+            self.scale[1] = self.Track('scale', imgui.input_float('##scale y', self.scale[1]))
             imgui.text('z:')
             imgui.same_line(position=50)
-            _, self.scale[2] = imgui.input_float('##scale z', self.scale[2])
+            self.scale[2] = self.Track('scale', imgui.input_float('##scale z', self.scale[2]))
             imgui.end_child()
 
-class CameraSettingsPanel(object):
+class CameraSettingsPanel(TrackedPanel):
     def __init__(self):
+        super().__init__()
         self.fov = 0.0
         self.near_plane = 0.0
         self.far_plane = 0.0
+        self.reverse_z = False
+        self.reverse_z_supported = True
         self.CameraFocusRequested = Signal()
 
     def Update(self):
         """Builds IMGui widgest that make this panel"""
         if imgui.collapsing_header("Camera Settings")[0]:
-            imgui.begin_child("#Camera Settings Panel", width=0, height=120, border=True)
+            imgui.begin_child("#Camera Settings Panel", width=0, height=145, border=True)
             imgui.text('FOV: ')
             imgui.same_line(position=150)
-            _, self.fov = imgui.input_float('##fov', self.fov)
+            self.fov = self.Track('fov', imgui.input_float('##fov', self.fov))
             imgui.text('Near Plane: ')
             imgui.same_line(position=150)
-            _, self.near_plane = imgui.input_float('##near plane', self.near_plane)
+            self.near_plane = self.Track('near_plane', imgui.input_float('##near plane', self.near_plane))
             imgui.text('Far Plane: ')
             imgui.same_line(position=150)
-            _, self.far_plane = imgui.input_float('##far plane', self.far_plane)
+            self.far_plane = self.Track('far_plane', imgui.input_float('##far plane', self.far_plane))
+            if self.reverse_z_supported:
+                imgui.text('Reverse-Z: ')
+                imgui.same_line(position=150)
+                self.reverse_z = self.Track('reverse_z', imgui.checkbox('##reverse z', self.reverse_z))
             if imgui.button('Focus Camera', width=imgui.get_content_region_available_width()):
                 self.CameraFocusRequested.send(None)
             imgui.end_child()
 
-class LightSettingsPanel(object):
+class LightSettingsPanel(TrackedPanel):
     def __init__(self):
+        super().__init__()
         self.light_color = [1, 1, 1]
         self.light_intensity = 1.0
 
@@ -272,14 +408,15 @@ class LightSettingsPanel(object):
             imgui.begin_child("##Light Settings Panel", width=0, height=120, border=True)
             imgui.text('Color')
             imgui.same_line(position=150)
-            _, self.light_color = imgui.color_edit3('##Light Color', *self.light_color)
+            self.light_color = self.Track('light_color', imgui.color_edit3('##Light Color', *self.light_color))
             imgui.text('Intensity')
             imgui.same_line(position=150)
-            _, self.light_intensity = imgui.slider_float('##Light Intenisty', self.light_intensity, 0.0, 10.0)
+            self.light_intensity = self.Track('light_intensity', imgui.slider_float('##Light Intenisty', self.light_intensity, 0.0, 10.0))
             imgui.end_child()
 
-class MaterialSettingsPanel(object):
+class MaterialSettingsPanel(TrackedPanel):
     def __init__(self):
+        super().__init__()
         self.color = [1.0, 1.0, 1.0]
         self.rougness = 0.0
         self.specular = 1.0
@@ -291,14 +428,84 @@ class MaterialSettingsPanel(object):
             imgui.begin_child("##Material Settings Panel", width=0, height=120, border=True)
             imgui.text('Base Color')
             imgui.same_line(position=150)
-            _, self.color = imgui.color_edit3('##Base Color', *self.color)
+            self.color = self.Track('color', imgui.color_edit3('##Base Color', *self.color))
             imgui.text('Rougness')
             imgui.same_line(position=150)
-            _, self.rougness = imgui.slider_float('##Roughness', self.rougness, 0.0, 1.0)
+            self.rougness = self.Track('rougness', imgui.slider_float('##Roughness', self.rougness, 0.0, 1.0))
             imgui.text('F0')
             imgui.same_line(position=150)
-            _, self.F0 = imgui.slider_float('##F0', self.F0, 0.0, 1.0)
+            self.F0 = self.Track('F0', imgui.slider_float('##F0', self.F0, 0.0, 1.0))
             imgui.text('Specular')
             imgui.same_line(position=150)
-            _, self.specular = imgui.slider_float('##Specular', self.specular, 0.0, 1.0)
-            imgui.end_child()
\ No newline at end of file
+            self.specular = self.Track('specular', imgui.slider_float('##Specular', self.specular, 0.0, 1.0))
+            imgui.end_child()
+
+class PickingPanel(TrackedPanel):
+    def __init__(self):
+        super().__init__()
+        self.enable_picking = True
+        self.show_tooltip = True
+        # Number of models with built hierarchy out of all models
+        self.ready_models: int = 0
+        self.num_models: int = 0
+        # Hit triangle under the cursor, -1 when nothing is hit
+        self.triangle: int = -1
+        self.instance: int = 0
+        self.distance: float = 0.0
+        self.barycentrics = [0.0, 0.0, 0.0]
+        self.point = [0.0, 0.0, 0.0]
+        self.query_time: float = 0.0
+
+    def Update(self) -> None:
+        """Builds IMGui widgest that make this panel"""
+        if imgui.collapsing_header("Picking")[0]:
+            imgui.begin_child("#Picking Panel", width=0, height=240, border=True)
+            imgui.text('Enable Picking:')
+            imgui.same_line(position=200)
+            self.enable_picking = self.Track('enable_picking', imgui.checkbox('##Enable Picking', self.enable_picking))
+            imgui.text('Show Tooltip:')
+            imgui.same_line(position=200)
+            self.show_tooltip = imgui.checkbox('##Show Tooltip', self.show_tooltip)[1]
+            imgui.text('BVH Ready: ')
+            imgui.same_line(position=200)
+            imgui.text(f'{self.ready_models} / {self.num_models}')
+            imgui.text('Query Time (ms): ')
+            imgui.same_line(position=200)
+            imgui.input_float('##Query Time', self.query_time, format='%.3f', flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Triangle: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Picked Triangle', self.triangle, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Instance: ')
+            imgui.same_line(position=200)
+            imgui.input_int('##Picked Instance', self.instance, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Distance: ')
+            imgui.same_line(position=200)
+            imgui.input_float('##Picked Distance', self.distance, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.text('Barycentrics: ')
+            imgui.same_line(position=200)
+            imgui.input_float3(
+                '##Picked Barycentrics',
+                self.barycentrics[0],
+                self.barycentrics[1],
+                self.barycentrics[2],
+                flags=imgui.INPUT_TEXT_READ_ONLY
+            )
+            imgui.text('Hit Point: ')
+            imgui.same_line(position=200)
+            imgui.input_float3(
+                '##Picked Point',
+                self.point[0],
+                self.point[1],
+                self.point[2],
+                flags=imgui.INPUT_TEXT_READ_ONLY
+            )
+            imgui.end_child()
+
+    def UpdateTooltip(self) -> None:
+        """Shows picked triangle next to the mouse cursor"""
+        if self.show_tooltip and self.triangle >= 0:
+            imgui.set_tooltip(
+                f'Triangle: {self.triangle}\n'
+                f'Barycentrics: {self.barycentrics[0]:.3f} {self.barycentrics[1]:.3f} {self.barycentrics[2]:.3f}\n'
+                f'Point: {self.point[0]:.3f} {self.point[1]:.3f} {self.point[2]:.3f}'
+            )
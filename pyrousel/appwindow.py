@@ -1,5 +1,6 @@
 import time
 import importlib.resources
+from concurrent.futures import ThreadPoolExecutor
 import glfw
 import moderngl as mgl
 import numpy as np
@@ -7,12 +8,33 @@ import math
 from pyrr import vector3, Vector3, Vector4
 
 from .appgui import AppGUI
-from .gfx import GFX, RenderHints, MaterialSettings
-from .model import ModelLoader
-from .camera import Camera
+from .binding import BindingSet
+from .gfx import GFX, RenderHints, MaterialSettings, VertexLayout
+from .meshcache import MeshCache
+from .asyncloader import AsyncModelLoader, LoadRequest
+from .camera import Camera, ProjectionMode
+from .model import ModelGroup, RenderModel
+from .profiler import GPUTimer
+from .resolution import ResolutionScaler, DEFAULT_TARGET_GPU_TIME
+from .scene import Scene, PickResult
+
+# Longest frame delta fed to animations, longer stalls (loading, window drags) do not make the carousel jump
+DEFAULT_MAX_FRAME_DELTA = 0.1
+# Weight of the latest frame within the smoothed frame delta
+DEFAULT_DELTA_SMOOTHING = 0.2
+# Time before the frame deadline the pacer stops sleeping and spins, covers OS sleep granularity
+DEFAULT_SPIN_TIME = 0.002
+# Longest time on-demand rendering waits for events before polling background loading again
+DEFAULT_IDLE_TIMEOUT = 0.25
+# Frames drawn after input in on-demand mode, the GUI needs a few frames to settle hover & click state
+REDRAW_FRAMES_AFTER_INPUT = 3
+# Sharpening applied when upscaling reduced resolution scene, 0.0 upscales bilinearly
+DEFAULT_UPSCALE_SHARPNESS = 0.25
+# Loader channel of models requested for display, newer request cancels the stale one still loading
+DISPLAY_CHANNEL = 'display'
 
 class AppWindow(object):
-    def __init__(self, width: int = 1280, height: int = 720, enable_gui: bool = True, vsync: bool = False):
+    def __init__(self, width: int = 1280, height: int = 720, enable_gui: bool = True, vsync: bool = False, mesh_cache: MeshCache = None, packed_vertices: bool = True, optimize_meshes: bool = False, lod_ratios: tuple = None, num_instances: int = 1, enable_profiling: bool = False, reverse_z: bool = False, on_demand: bool = False, max_fps: float = 0.0, track_memory: bool = False, preserve_scenes: bool = False, enable_picking: bool = True, dynamic_resolution: bool = False, target_gpu_time: float = DEFAULT_TARGET_GPU_TIME):
         self.__width = width
         self.__height = height
         self.__aspec_ratio = self.__width / self.__height
@@ -28,8 +50,42 @@ class AppWindow(object):
         self.frame_interpolator.RegisterFrame()
         self.frame_counter = FrameCounter()
         self.frame_counter.Start()
+        self.frame_pacer = FramePacer(max_fps)
+        # Redraw only when input, GUI changes, animation or loading require it
+        self.on_demand = on_demand
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.__redraw_frames = REDRAW_FRAMES_AFTER_INPUT
         self.light_color = Vector3([1,1,1])
         self.light_intensity = 1.0
+        self.mesh_cache = mesh_cache
+        self.optimize_meshes = optimize_meshes
+        self.lod_ratios = lod_ratios
+        self.num_instances = num_instances
+        self.enable_profiling = enable_profiling
+        self.track_memory = track_memory
+        self.preserve_scenes = preserve_scenes
+        # Triangle under the mouse cursor, hierarchies are built in the background after each load
+        self.enable_picking = enable_picking
+        self.pick_result: PickResult = None
+        self.pick_time = 0.0
+        self.__pick_state: tuple = None
+        self.__bvh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='BVHBuilder')
+        self.__bvh_futures: list = []
+        self.reverse_z = reverse_z
+        # Offscreen scene framebuffer, float depth with reversed depth and sampled color when resolution is scaled
+        self.__scene_target: mgl.Framebuffer = None
+        self.__scene_target_key: tuple = None
+        # Scene resolution follows measured GPU frame time when enabled, GUI is always drawn at native resolution
+        self.resolution_scaler = ResolutionScaler(target_gpu_time, enabled=dynamic_resolution)
+        self.upscale_sharpness = DEFAULT_UPSCALE_SHARPNESS
+        self.__gpu_timer: GPUTimer = None
+        self.scene = Scene()
+        # GUI panel fields bound to the app state, see __BindUI
+        self.bindings = BindingSet()
+        # Models of the active file under common root transform, see ModelGroup
+        self.model_group: ModelGroup = None
+        self.model_filepath = None
+        self.vertex_layout = VertexLayout.Packed if packed_vertices else VertexLayout.Separate
         
         # Initialise GLFW window & OpenGL context
         if not glfw.init():
@@ -54,173 +110,407 @@ class AppWindow(object):
             self.gui = AppGUI(self.__win)
             self.gui.import_settings.ModelRequestSignal.connect(self.OnModelRequested)
             self.gui.import_settings.ModelReloadSignal.connect(self.OnModelReloadRequested)
+            self.gui.import_settings.ModelCancelSignal.connect(self.OnModelCancelRequested)
             self.gui.camera_settings.CameraFocusRequested.connect(self.OnCameraFocusRequested)
+            self.gui.scene_stats.TraceExportRequested.connect(self.OnTraceExportRequested)
             self.draw_gui = True
         else:
             self.gui = None
             self.draw_gui = False
 
+        # Chained after the GUI callbacks so those keep receiving events
+        self.__WatchInputs()
+
     def Init(self) -> None:
         """Initialises OpenGL graphics renderer"""
-        self.graphics = GFX(mgl.create_context())
+        self.graphics = GFX(mgl.create_context(), self.vertex_layout)
         self.graphics.PrintDeviceInfo()
+        self.profiler = self.graphics.profiler
+        self.profiler.SetEnabled(self.enable_profiling)
+        self.__gpu_timer = GPUTimer()
+        self.loader = AsyncModelLoader(self.graphics, self.mesh_cache, optimize_meshes=self.optimize_meshes, lod_ratios=self.lod_ratios, track_memory=self.track_memory, preserve_scenes=self.preserve_scenes)
+        # Latest request of a model to display, results of older requests are discarded
+        self.__display_request: LoadRequest = None
+        self.loader.ModelLoaded.connect(self.OnModelLoaded)
+        self.loader.ModelFailed.connect(self.OnModelLoadFailed)
         self.camera = Camera()
         self.camera.aspect = self.__aspec_ratio
         self.camera.fov = 30.0
         self.camera.transform.Translate(0.0, 0.0, 5.0)  
+        if self.reverse_z and not self.graphics.IsReverseZSupported():
+            print('Reverse-Z is not supported by the OpenGL context, using standard depth')
+            self.reverse_z = False
+        if self.reverse_z:
+            self.camera.projection_mode = ProjectionMode.ReverseZInfinite
 
         with importlib.resources.path('pyrousel.resources.models.obj', 'monkey.obj') as startup_model:
-            self.__LoadModel(startup_model)
+            self.model_filepath = startup_model
+            self.__display_request = self.loader.Request(startup_model, channel=DISPLAY_CHANNEL)
+            self.loader.Wait(self.__display_request)
         
         self.__FrameModel()
-        self.__UpdateUI()
+        self.__BindUI()
+        self.__SyncUI()
 
     def OnModelRequested(self, earg: str) -> None:
         """Event handler for loading new model into the scene"""
         if earg is not None and earg is not self.model_filepath:
             print(f'Loading model: {earg}')
-            self.model_filepath = earg
-            self.__LoadModel(earg)
-            self.__FrameModel()
+            self.__display_request = self.loader.Request(earg, channel=DISPLAY_CHANNEL)
 
     def OnModelReloadRequested(self, earg) -> None:
         """Event handler for reloading active model in the current scene"""
         if self.model_filepath is not None:
             print('Reloading active model')
-            self.__LoadModel(self.model_filepath)
-            self.__FrameModel()
+            self.__display_request = self.loader.Request(self.model_filepath, channel=DISPLAY_CHANNEL)
+
+    def OnModelCancelRequested(self, earg: str) -> None:
+        """Event handler for cancelling loading of given model file, other files keep loading"""
+        if earg is not None:
+            print(f'Cancelling model loading: {earg}')
+            self.loader.CancelFile(earg)
+
+    def OnModelLoaded(self, request: LoadRequest) -> None:
+        """Event handler for background model loading completion, swaps active model"""
+        group = request.group if request.group is not None else ModelGroup.FromModel(request.model)
+        # Results of superseded requests never replace the model requested later
+        if request is not self.__display_request:
+            self.graphics.ReleaseGroupBuffers(group)
+            return
+
+        print(f'Model loaded: {request.filepath}')
+        if request.memory is not None:
+            for stats in request.memory.GetStats():
+                print(f'--{stats}')
+        if self.model_group is not None and self.model_group is not group:
+            for model in self.model_group.models:
+                self.scene.RemoveModel(model)
+            self.graphics.ReleaseGroupBuffers(self.model_group)
+
+        self.model_filepath = request.filepath
+        self.model_group = group
+        if self.num_instances > 1:
+            if len(group.models) == 1:
+                self.__LayoutInstances(group.models[0], self.num_instances)
+                group.InvalidateBounds()
+            else:
+                print('Instanced layout is only applied to files with single model')
+        for model in group.models:
+            self.scene.AddModel(model)
+        self.__BuildHierarchies()
+        self.__FrameModel()
+        # Transform bindings now refer to the new model
+        self.bindings.Invalidate()
+        self.RequestRedraw()
+
+    def OnModelLoadFailed(self, request: LoadRequest) -> None:
+        """Event handler for background model loading failure, active model remains unchanged"""
+        print(f'Failed to load model {request.filepath} -> {request.error}')
+
+    def OnTraceExportRequested(self, earg: str) -> None:
+        """Event handler for exporting recorded profiler scopes as Chrome trace"""
+        if earg is not None:
+            print(f'Exporting profiler trace: {earg}')
+            self.profiler.ExportChromeTrace(earg)
 
     def OnCameraFocusRequested(self, earg) -> None:
         """Event handler for camera model focus"""
         print('Requesting model camera focus')
         self.__FrameModel()
 
-    def __LoadModel(self, filepath: str) -> None:
-        """Loads given model into the active scene"""
-        self.model_filepath = filepath
-        self.model = ModelLoader.LoadModel(filepath)
-        self.model.RecomputeBounds()
-        self.graphics.GenModelBuffers(self.model)
+    def __BuildHierarchies(self) -> None:
+        """Queues BVH builds of the active models, builds still pending for replaced models are dropped"""
+        for future in self.__bvh_futures:
+            future.cancel()
+        self.__bvh_futures = []
+        self.pick_result = None
+        self.__pick_state = None
+        if self.enable_picking:
+            for model in self.model_group.models:
+                if model.buffer_source is None:
+                    self.__bvh_futures.append(self.__bvh_executor.submit(model.BuildBVH))
+
+    def __SetPicking(self, enabled: bool) -> None:
+        self.enable_picking = enabled
+        self.pick_result = None
+        self.__pick_state = None
+        if enabled and not self.__bvh_futures:
+            self.__BuildHierarchies()
+
+    def __UpdatePicking(self) -> None:
+        """Picks the triangle under the mouse cursor when the cursor, camera or scene moved"""
+        if not self.enable_picking or self.model_group is None:
+            return
+        if self.gui is not None and self.draw_gui and self.gui.IsMouseCaptured():
+            self.pick_result = None
+            self.__pick_state = None
+            return
+
+        cursor = glfw.get_cursor_pos(self.__win)
+        size = glfw.get_window_size(self.__win)
+        # Pending builds make models pickable without any visible change
+        state = (
+            cursor,
+            size,
+            self.camera.version,
+            self.model_group.transform.version,
+            sum(future.done() for future in self.__bvh_futures)
+        )
+        if state == self.__pick_state or size[0] == 0 or size[1] == 0:
+            return
+
+        self.__pick_state = state
+        start = time.perf_counter()
+        origin, direction = self.camera.GetRay(cursor[0] / size[0] * 2.0 - 1.0, 1.0 - cursor[1] / size[1] * 2.0)
+        self.pick_result = self.scene.Pick(origin, direction)
+        self.pick_time = (time.perf_counter() - start) * 1000.0
+
+    @staticmethod
+    def __LayoutInstances(model: RenderModel, count: int) -> None:
+        """Instances given model in a square grid centered at the origin, tinted by grid position"""
+        side = int(math.ceil(math.sqrt(count)))
+        spacing = float(np.max(np.asarray(model.maxext) - np.asarray(model.minext))) * 1.25
+        cells = np.arange(count)
+        columns, rows = cells % side, cells // side
+
+        transforms = np.tile(np.identity(4, dtype='f4'), (count, 1, 1))
+        transforms[:, 3, 0] = (columns - (side - 1) * 0.5) * spacing
+        transforms[:, 3, 1] = (rows - (side - 1) * 0.5) * spacing
+        colors = np.stack([
+            0.5 + 0.5 * columns / max(side - 1, 1),
+            np.full(count, 0.75),
+            0.5 + 0.5 * rows / max(side - 1, 1),
+        ], axis=1)
+        model.SetInstances(transforms, colors)
 
     def __FrameModel(self) -> None:
-        """Aligns the camera so that the loaded model is in a full view"""
-        if self.model is not None:
-            minext = self.model.transform.GetMatrix() * self.model.minext
-            maxext = self.model.transform.GetMatrix() * self.model.maxext
-            center = (minext + maxext) * 0.5
-            size = vector3.length(maxext - center)
+        """Aligns the camera so that the whole scene is in a full view"""
+        if len(self.scene.models) > 0:
+            bounds = self.scene.GetWorldAABB()
+            center = bounds.GetCenter()
+            size = vector3.length(bounds.GetExtents())
             rfov = math.radians(self.camera.fov)
             radius = (size * 0.5) / math.tan(rfov * 0.5)
             pos = center - Vector3([0.0, 0.0, -1.0]) * (radius * 2.0)
             self.camera.transform.SetTranslation(pos.x, pos.y, pos.z)
 
-    def __UpdateUI(self) -> None:
-        """Updates various UI properties"""
+            # Tight clip range keeps depth precise enough for the wireframe overlay
+            distance = radius * 2.0
+            self.camera.near_clip = max(distance - size * 2.0, distance * 1e-3) * 0.5
+            self.camera.far_clip = (distance + size * 2.0) * 4.0
+
+    def __BindUI(self) -> None:
+        """Binds GUI panel fields to the app state they edit"""
         if self.gui is None:
             return
 
-        self.gui.import_settings.model_filepath = self.model_filepath
-        self.gui.scene_stats.num_vertex = len(self.model.vertices) / 3
-        self.gui.scene_stats.num_triangles = len(self.model.indices) / 3
-        self.gui.scene_stats.min_ext = self.model.minext
-        self.gui.scene_stats.max_ext = self.model.maxext
-        self.gui.scene_stats.fps = self.frame_counter.GetFPS()
-        self.gui.scene_stats.frame_time = self.frame_counter.GetFrameTime()
-        self.gui.scene_stats.frames = self.frame_counter.GetFrames()
-        self.gui.scene_stats.vsync = self.__enable_vsync
-
-        self.gui.overlays.wireframe_mode = self.render_hints.wireframe_mode
-        self.gui.overlays.visualise_state = self.render_hints.visualiser_mode
-        self.gui.overlays.wireframe_color = list(self.render_hints.wireframe_color)
-
-        self.gui.material_settings.color = list(self.material_settings.base_color)
-        self.gui.material_settings.rougness = self.material_settings.roughness
-        self.gui.material_settings.specular = self.material_settings.spec_intensity
-        self.gui.material_settings.F0 = self.material_settings.F0
-        
-        self.gui.camera_settings.fov = self.camera.fov
-        self.gui.camera_settings.near_plane = self.camera.near_clip
-        self.gui.camera_settings.far_plane = self.camera.far_clip
-
-        self.gui.light_settings.light_color = list(self.light_color)
-        self.gui.light_settings.light_intensity = self.light_intensity
-        
-        self.gui.transforms.spin_model = self.enable_carousel
-        translation = self.model.transform.GetTranslation()
-        self.gui.transforms.translation[0] = translation.x
-        self.gui.transforms.translation[1] = translation.y
-        self.gui.transforms.translation[2] = translation.z
-        rotation = self.model.transform.GetRotation()
-        self.gui.transforms.rotation[0] = np.degrees(rotation.x)
-        self.gui.transforms.rotation[1] = np.degrees(rotation.y)
-        self.gui.transforms.rotation[2] = np.degrees(rotation.z)
-        scale = self.model.transform.GetScale()
-        self.gui.transforms.scale[0] = scale.x
-        self.gui.transforms.scale[1] = scale.y
-        self.gui.transforms.scale[2] = scale.z
-
-    def __FetchUI(self) -> None:
-        """Fetches property values from UI that influence the app behaviour"""
+        bind = self.bindings.BindAttribute
+        stats = self.gui.scene_stats
+        self.bindings.Bind(stats, 'vsync', lambda: self.__enable_vsync, self.__SetVSync, poll=False)
+        self.bindings.Bind(stats, 'profiling', lambda: self.profiler.enabled, self.profiler.SetEnabled, poll=False)
+        bind(stats, 'enable_lod', self.render_hints, 'enable_lod', poll=False)
+        bind(stats, 'frustum_culling', self.scene, 'enable_frustum_culling', poll=False)
+        bind(stats, 'occlusion_culling', self.scene, 'enable_occlusion_culling', poll=False)
+        # Scale is moved by the scaler every frame, it is polled unlike the other settings
+        stats.min_scale = self.resolution_scaler.min_scale
+        stats.max_scale = self.resolution_scaler.max_scale
+        bind(stats, 'dynamic_resolution', self.resolution_scaler, 'enabled', poll=False)
+        bind(stats, 'resolution_scale', self.resolution_scaler, 'scale')
+        bind(stats, 'target_gpu_time', self.resolution_scaler, 'target_time', poll=False)
+        bind(stats, 'upscale_sharpness', self, 'upscale_sharpness', poll=False)
+
+        overlays = self.gui.overlays
+        bind(overlays, 'wireframe_mode', self.render_hints, 'wireframe_mode', poll=False)
+        bind(overlays, 'visualiser_mode', self.render_hints, 'visualiser_mode', poll=False)
+        bind(overlays, 'wireframe_color', self.render_hints, 'wireframe_color', Vector4, poll=False)
+
+        material = self.gui.material_settings
+        bind(material, 'color', self.material_settings, 'base_color', Vector3, poll=False)
+        bind(material, 'rougness', self.material_settings, 'roughness', poll=False)
+        bind(material, 'specular', self.material_settings, 'spec_intensity', poll=False)
+        bind(material, 'F0', self.material_settings, 'F0', poll=False)
+
+        light = self.gui.light_settings
+        bind(light, 'light_color', self, 'light_color', Vector3, poll=False)
+        bind(light, 'light_intensity', self, 'light_intensity', poll=False)
+
+        # Framing the model changes the camera as well, its values are pulled whenever its version changes
+        camera = self.gui.camera_settings
+        camera.reverse_z_supported = self.graphics.IsReverseZSupported()
+        bind(camera, 'fov', self.camera, 'fov', version=self.__GetCameraVersion)
+        bind(camera, 'near_plane', self.camera, 'near_clip', version=self.__GetCameraVersion)
+        bind(camera, 'far_plane', self.camera, 'far_clip', version=self.__GetCameraVersion)
+        if camera.reverse_z_supported:
+            self.bindings.Bind(camera, 'reverse_z', lambda: self.camera.reverse_z, self.__SetReverseZ, self.__GetCameraVersion)
+
+        # Carousel spins the model as well, its transform is pulled whenever the transform version changes
+        transforms = self.gui.transforms
+        bind(transforms, 'spin_model', self, 'enable_carousel', poll=False)
+        self.bindings.Bind(
+            transforms,
+            'translation',
+            lambda: self.__GetTransformValues(self.model_group.transform.store.translations),
+            lambda value: self.model_group.transform.SetTranslation(*value),
+            self.__GetTransformVersion
+        )
+        self.bindings.Bind(
+            transforms,
+            'rotation',
+            lambda: tuple(np.degrees(self.__GetTransformValues(self.model_group.transform.store.euler_angles))),
+            self.__SetModelRotation,
+            self.__GetTransformVersion
+        )
+        self.bindings.Bind(
+            transforms,
+            'scale',
+            lambda: self.__GetTransformValues(self.model_group.transform.store.scales),
+            lambda value: self.model_group.transform.SetScale(*value),
+            self.__GetTransformVersion
+        )
+
+        picking = self.gui.picking
+        self.bindings.Bind(picking, 'enable_picking', lambda: self.enable_picking, self.__SetPicking, poll=False)
+
+    def __GetCameraVersion(self) -> int:
+        return self.camera.version
+
+    def __GetTransformVersion(self) -> int:
+        return self.model_group.transform.version
+
+    def __GetTransformValues(self, array) -> tuple:
+        # Plain floats straight from the transform store are much cheaper to compare than Vector3 copies
+        return tuple(array[self.model_group.transform.index].tolist())
+
+    def __SetVSync(self, enabled: bool) -> None:
+        self.__enable_vsync = enabled
+        glfw.swap_interval(int(enabled))
+
+    def __SetReverseZ(self, enabled: bool) -> None:
+        self.camera.projection_mode = ProjectionMode.ReverseZInfinite if enabled else ProjectionMode.Perspective
+
+    def __SetModelRotation(self, degrees: list) -> None:
+        # Carousel owns the rotation while spinning
+        if not self.enable_carousel:
+            self.model_group.transform.SetRotation(*np.radians(degrees))
+
+    def __SyncUI(self) -> None:
+        """Exchanges edited values between GUI panels and the app, updates read only statistics"""
         if self.gui is None:
             return
-        
-        if self.__enable_vsync != self.gui.scene_stats.vsync:
-            self.__enable_vsync = self.gui.scene_stats.vsync
-            glfw.swap_interval(int(self.__enable_vsync))
 
-        self.render_hints.visualiser_mode = self.gui.overlays.visualiser_mode
-        self.render_hints.wireframe_mode = self.gui.overlays.wireframe_mode
-        self.render_hints.wireframe_color = Vector4(self.gui.overlays.wireframe_color)
-
-        self.material_settings.base_color = Vector3(self.gui.material_settings.color)
-        self.material_settings.roughness = self.gui.material_settings.rougness
-        self.material_settings.spec_intensity = self.gui.material_settings.specular
-        self.material_settings.F0 = self.gui.material_settings.F0
-
-        self.camera.fov = self.gui.camera_settings.fov
-        self.camera.near_clip = self.gui.camera_settings.near_plane
-        self.camera.far_clip = self.gui.camera_settings.far_plane
-        self.light_color = Vector3(self.gui.light_settings.light_color)
-        self.light_intensity = self.gui.light_settings.light_intensity
-
-        self.enable_carousel = self.gui.transforms.spin_model
-        if self.model is not None:
-            tr_x = self.gui.transforms.translation[0]
-            tr_y = self.gui.transforms.translation[1]
-            tr_z = self.gui.transforms.translation[2]
-            self.model.transform.SetTranslation(tr_x, tr_y, tr_z)
-
-            if not self.enable_carousel:
-                rot_x = np.radians(self.gui.transforms.rotation[0])
-                rot_y = np.radians(self.gui.transforms.rotation[1])
-                rot_z = np.radians(self.gui.transforms.rotation[2])
-                self.model.transform.SetRotation(rot_x, rot_y, rot_z)
-            
-            scale_x = self.gui.transforms.scale[0]
-            scale_y = self.gui.transforms.scale[1]
-            scale_z = self.gui.transforms.scale[2]
-            self.model.transform.SetScale(scale_x, scale_y, scale_z)
+        self.bindings.Sync()
+        if self.bindings.num_pushed > 0 or self.bindings.num_pulled > 0:
+            self.RequestRedraw()
+
+        self.gui.import_settings.model_filepath = self.model_filepath
+        self.gui.import_settings.loading_requests = [
+            (request.filepath, request.GetProgress()) for request in self.loader.GetActiveRequests()
+        ]
+        stats = self.gui.scene_stats
+        models = self.model_group.models
+        stats.num_vertex = self.model_group.num_vertices
+        stats.num_triangles = self.model_group.num_triangles
+        stats.lod_level = max(model.lod_index for model in models)
+        stats.lod_triangles = sum(self.graphics.GetLODRange(model)[1] // 3 for model in models)
+        stats.drawn_objects = self.scene.stats.drawn_objects
+        stats.culled_objects = self.scene.stats.frustum_culled_objects + self.scene.stats.occlusion_culled_objects
+        stats.drawn_triangles = self.scene.stats.drawn_triangles
+        stats.culled_triangles = self.scene.stats.culled_triangles
+        stats.draw_calls = self.scene.stats.draw_calls
+        stats.state_changes = self.scene.stats.state_changes
+        stats.min_ext = self.model_group.minext
+        stats.max_ext = self.model_group.maxext
+        stats.fps = self.frame_counter.GetFPS()
+        stats.frame_time = self.frame_counter.GetFrameTime()
+        stats.frames = self.frame_counter.GetFrames()
+        stats.gpu_time = self.resolution_scaler.gpu_time or 0.0
+        stats.profile_scopes = self.profiler.GetStats() if self.profiler.enabled else []
+
+        picking = self.gui.picking
+        picking.num_models = len(self.__bvh_futures)
+        picking.ready_models = sum(future.done() for future in self.__bvh_futures)
+        picking.query_time = self.pick_time
+        result = self.pick_result
+        picking.triangle = result.triangle if result is not None else -1
+        if result is not None:
+            picking.instance = result.instance
+            picking.distance = result.distance
+            picking.barycentrics = result.barycentrics.tolist()
+            picking.point = result.point.tolist()
 
     def __UpdateScene(self, delta_time: float) -> None:
         """Updates the scene"""
         self.__ProcessInputs()
-        if self.model and self.enable_carousel:
+        if self.model_group is not None and self.enable_carousel:
             angle = np.radians(180.0)
             rotation = Vector3([0.0, angle, 0.0]) * delta_time
-            self.model.transform.Rotate(rotation.x, rotation.y, rotation.z)
+            self.model_group.transform.Rotate(rotation.x, rotation.y, rotation.z)
+        self.__UpdatePicking()
 
     def __RenderScene(self) -> None:
         """Draws active scene content to the screen"""
-        self.graphics.ClearScreen(0.1, 0.1, 0.1)
-        self.graphics.SetViewMatrix(self.camera.GetViewMatrix())
-        self.graphics.SetPerspectiveMatrix(self.camera.GetPerspectiveMatrix())
+        # Uniform buffers are only written when camera or light changed
         self.graphics.light_value = self.light_color * self.light_intensity
-        self.graphics.RenderModel(self.model, self.render_hints, self.material_settings)
-        
+        self.graphics.SetCamera(self.camera)
+
+        ctx = self.graphics.GetContext()
+        size = glfw.get_framebuffer_size(self.__win)
+        # Whole frame is timed on the GPU, scale only follows results not seen before as they arrive frames late
+        self.resolution_scaler.Update(self.__gpu_timer.Begin())
+        target = self.__GetSceneTarget(size)
+        if target is not None:
+            target.use()
+            target.clear(0.1, 0.1, 0.1, 1.0, depth=self.graphics.GetClearDepth(), viewport=target.viewport)
+        else:
+            self.graphics.ClearScreen(0.1, 0.1, 0.1)
+
+        with self.profiler.Scope('scene'):
+            self.scene.Render(self.graphics, self.render_hints, self.material_settings)
+
+        if target is not None:
+            ctx.screen.use()
+            ctx.viewport = (0, 0, *size)
+            if self.__IsResolutionScaled():
+                with self.profiler.Scope('upscale'), self.profiler.GPUScope('upscale'):
+                    self.graphics.BlitScaled(target.color_attachments[0], target.viewport[2:], self.upscale_sharpness)
+            else:
+                ctx.copy_framebuffer(ctx.screen, target)
+
         if self.gui is not None and self.draw_gui:
-            self.gui.Render()
-        
-        glfw.swap_buffers(self.__win)
+            with self.profiler.Scope('gui'), self.profiler.GPUScope('gui'):
+                self.gui.Render()
+        self.__gpu_timer.End()
+
+        with self.profiler.Scope('swap_buffers'):
+            glfw.swap_buffers(self.__win)
+
+    def __IsResolutionScaled(self) -> bool:
+        return self.resolution_scaler.enabled or self.resolution_scaler.scale < 1.0
+
+    def __GetSceneTarget(self, size: tuple) -> mgl.Framebuffer:
+        """
+        Returns offscreen scene framebuffer, None when the scene is drawn straight to the screen
+
+        Target is needed for float depth when depth is reversed and as texture to upscale from when
+        resolution is scaled. It always matches the window, scaled scene is drawn into its lower left
+        corner through the viewport so scale changes never reallocate it.
+        """
+        scaled = self.__IsResolutionScaled()
+        if not self.camera.reverse_z and not scaled:
+            if self.__scene_target is not None:
+                self.__scene_target.release()
+                self.__scene_target = None
+            return None
+
+        key = (size, self.camera.reverse_z, scaled)
+        if self.__scene_target is not None and self.__scene_target_key != key:
+            self.__scene_target.release()
+            self.__scene_target = None
+        if self.__scene_target is None:
+            self.__scene_target = self.graphics.CreateRenderTarget(size, float_depth=self.camera.reverse_z, sampled=scaled)
+            self.__scene_target_key = key
+        self.__scene_target.viewport = (0, 0, *self.resolution_scaler.GetSize(size)) if scaled else (0, 0, *size)
+        return self.__scene_target
 
     def __ProcessInputs(self) -> None:
         """Process window key and mouse inputs"""
@@ -228,15 +518,75 @@ class AppWindow(object):
         if self.gui is not None and self.draw_gui:
             self.gui.ProcessInputs()
 
+    def RequestRedraw(self, frames: int = REDRAW_FRAMES_AFTER_INPUT) -> None:
+        """Marks the frame dirty so on-demand rendering draws at least given number of frames"""
+        self.__redraw_frames = max(self.__redraw_frames, frames)
+
+    def IsFrameDirty(self) -> bool:
+        """Returns whether the next frame has to be drawn in on-demand mode"""
+        if self.__redraw_frames > 0 or (self.model_group is not None and self.enable_carousel):
+            return True
+        return self.loader.IsBusy()
+
+    def __WatchInputs(self) -> None:
+        """Chains window event callbacks so that any input marks the frame dirty"""
+        for set_callback in [
+                glfw.set_key_callback,
+                glfw.set_char_callback,
+                glfw.set_cursor_pos_callback,
+                glfw.set_mouse_button_callback,
+                glfw.set_scroll_callback,
+                glfw.set_window_size_callback,
+                glfw.set_framebuffer_size_callback,
+                glfw.set_window_refresh_callback,
+                glfw.set_window_focus_callback]:
+            self.__ChainCallback(set_callback)
+
+    def __ChainCallback(self, set_callback) -> None:
+        previous = None
+
+        def OnEvent(*args):
+            self.RequestRedraw()
+            if previous is not None:
+                previous(*args)
+
+        previous = set_callback(self.__win, OnEvent)
+
+    def __WaitForEvents(self) -> bool:
+        """Blocks until the frame gets dirty or the idle timeout passes, returns whether to draw"""
+        if not self.on_demand or self.IsFrameDirty():
+            return True
+
+        glfw.wait_events_timeout(self.idle_timeout)
+        # Completed background loads are only delivered by the loader update
+        self.loader.Update()
+        if not self.IsFrameDirty():
+            return False
+
+        # Idle time is not animation time
+        self.frame_interpolator.Reset()
+        return True
+
     def Run(self) -> None:
         """Updates & Draw active scene continusely until window closes"""
         while not glfw.window_should_close(self.__win):
-            self.__FetchUI()
-            self.__UpdateUI()
-            self.__UpdateScene(self.frame_interpolator.GetDelta())
-            self.__RenderScene()
+            if not self.__WaitForEvents():
+                continue
+
+            self.frame_pacer.Wait()
+            self.profiler.BeginFrame()
+            with self.profiler.Scope('loader'):
+                self.loader.Update()
+            with self.profiler.Scope('sync_ui'):
+                self.__SyncUI()
+            with self.profiler.Scope('update_scene'):
+                self.__UpdateScene(self.frame_interpolator.GetDelta())
+            with self.profiler.Scope('render'):
+                self.__RenderScene()
+            self.profiler.EndFrame()
             self.frame_counter.Update()
             self.frame_interpolator.RegisterFrame()
+            self.__redraw_frames = max(self.__redraw_frames - 1, 0)
 
     def OnKeyCallback(self, window, key, scancode, action, mods) -> None:
         """Event handler for GLFW key input callbacks"""
@@ -255,6 +605,13 @@ class AppWindow(object):
             self.camera.aspect = self.__aspec_ratio
 
     def Quit(self) -> None:
+        self.scene.ReleaseQueries()
+        if self.__scene_target is not None:
+            self.__scene_target.release()
+        self.__gpu_timer.Release()
+        self.profiler.Release()
+        self.loader.Shutdown()
+        self.__bvh_executor.shutdown(wait=False, cancel_futures=True)
         self.gui.Shutdown()
         glfw.terminate()
 
@@ -306,16 +663,76 @@ class FrameCounter(object):
         """Returns average frame timein milliseconds across all the samples"""
         return self.__frameTime
 
-class FrameInterpolator(object) :
-    def __init__(self) -> None:
-        self.__last: float = time.time()
-        self.__current: float = time.time()
+class FrameInterpolator(object):
+    """
+    Smoothed time step between consecutive frames for animations
+
+    Delta is measured with perf_counter, clamped to max_delta so that stalls do not make
+    animations jump and smoothed with exponential moving average to hide per frame jitter.
+    """
+    def __init__(self, max_delta: float = DEFAULT_MAX_FRAME_DELTA, smoothing: float = DEFAULT_DELTA_SMOOTHING) -> None:
+        self.max_delta = max_delta
+        self.smoothing = smoothing
+        self.__last: float = time.perf_counter()
+        self.__current: float = self.__last
         self.__delta: float = 0.0
 
-    def GetDelta(self) -> float :
+    def GetDelta(self) -> float:
+        """Returns smoothed frame delta in seconds"""
         return self.__delta
-    
+
+    def Reset(self) -> None:
+        """Restarts timing from now, time passed since the last frame is discarded"""
+        self.__last = time.perf_counter()
+        self.__current = self.__last
+        self.__delta = 0.0
+
     def RegisterFrame(self) -> None:
+        """Samples time of the frame just finished"""
         self.__last = self.__current
-        self.__current = time.time()
-        self.__delta = self.__current - self.__last
\ No newline at end of file
+        self.__current = time.perf_counter()
+        delta = min(self.__current - self.__last, self.max_delta)
+        if self.__delta == 0.0:
+            self.__delta = delta
+        else:
+            self.__delta += (delta - self.__delta) * self.smoothing
+
+class FramePacer(object):
+    """
+    Frame rate cap, sleeps until shortly before the next frame deadline and spins the rest
+
+    Deadlines advance by whole frame intervals so that pacing does not drift, a pacer that
+    fell behind by more than a frame restarts from the current time instead of catching up.
+    """
+    def __init__(self, max_fps: float = 0.0, spin_time: float = DEFAULT_SPIN_TIME) -> None:
+        """
+        Parameters
+        ----------
+        max_fps : float
+            Frame rate cap, zero or less disables pacing
+        spin_time : float
+            Time in seconds before the deadline spent busy waiting instead of sleeping
+        """
+        self.max_fps = max_fps
+        self.spin_time = spin_time
+        self.__deadline: float = None
+
+    def Wait(self) -> float:
+        """Blocks until the next frame may start, returns waited time in seconds"""
+        if self.max_fps <= 0.0:
+            self.__deadline = None
+            return 0.0
+
+        start = time.perf_counter()
+        interval = 1.0 / self.max_fps
+        if self.__deadline is None or start - self.__deadline > interval:
+            self.__deadline = start
+
+        remaining = self.__deadline - start
+        if remaining > self.spin_time:
+            time.sleep(remaining - self.spin_time)
+        while time.perf_counter() < self.__deadline:
+            pass
+
+        self.__deadline += interval
+        return time.perf_counter() - start
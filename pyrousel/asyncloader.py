@@ -0,0 +1,244 @@
+import os
+import threading
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+from blinker import Signal
+
+from .gfx import GFX, ModelUpload
+from .model import ModelLoader, ModelGroup, RenderModel
+from .meshcache import MeshCache
+from .profiler import MemoryProfiler
+
+# Maximum number of bytes transferred to the GPU per frame
+DEFAULT_UPLOAD_BUDGET = 8 * 1024 * 1024
+
+class LoadState(Enum):
+    Loading = 0
+    Uploading = 1
+    Done = 2
+    Cancelled = 3
+    Failed = 4
+
+class LoadRequest(object):
+    def __init__(self, filepath: str, channel: str):
+        self.filepath: str = filepath
+        self.channel: str = channel
+        self.state: LoadState = LoadState.Loading
+        self.model: RenderModel = None
+        # Models of the file scene, only set when the loader preserves scenes
+        self.group: ModelGroup = None
+        self.error: Exception = None
+        self.future: Future = None
+        self.upload: ModelUpload = None
+        # Peak memory per load stage, only set when the loader tracks memory
+        self.memory: MemoryProfiler = None
+        self.__cancelled = threading.Event()
+
+    def __repr__(self):
+        return f'LoadRequest -> {self.filepath} state:{self.state.name} progress:{self.GetProgress():.2f}'
+
+    def GetProgress(self) -> float:
+        """Returns normalised (0.0 - 1.0) load progress, parsing accounts for first half"""
+        if self.state is LoadState.Uploading:
+            return 0.5 + self.upload.GetProgress() * 0.5
+        if self.state is LoadState.Done:
+            return 1.0
+        return 0.0
+
+    def IsFinished(self) -> bool:
+        """Returns true when request is done, cancelled or failed"""
+        return self.state in (LoadState.Done, LoadState.Cancelled, LoadState.Failed)
+
+    def IsCancelled(self) -> bool:
+        """Returns true when cancellation was requested, safe to call from worker threads"""
+        return self.__cancelled.is_set()
+
+    def Cancel(self) -> None:
+        """Requests cancellation, result of the already running parse is discarded"""
+        self.__cancelled.set()
+
+class AsyncModelLoader(object):
+    """
+    Loads models in background worker pool and uploads them to GPU within per frame budget
+
+    Model parsing runs on worker threads, GPU upload happens during Update which must be called
+    on the thread owning the OpenGL context. Each request belongs to a channel, new request
+    cancels any unfinished request on the same channel, requests on different channels
+    load concurrently. Single file loads can be cancelled regardless of their channel, see CancelFile.
+    """
+    def __init__(
+            self,
+            graphics: GFX,
+            mesh_cache: MeshCache = None,
+            max_workers: int = 2,
+            upload_budget: int = DEFAULT_UPLOAD_BUDGET,
+            optimize_meshes: bool = False,
+            lod_ratios: tuple = None,
+            track_memory: bool = False,
+            preserve_scenes: bool = False):
+        self.graphics: GFX = graphics
+        self.mesh_cache: MeshCache = mesh_cache
+        self.optimize_meshes: bool = optimize_meshes
+        self.lod_ratios: tuple = lod_ratios
+        self.upload_budget: int = upload_budget
+        self.track_memory: bool = track_memory
+        # Load files as ModelGroup keeping scene nodes & materials, see ModelLoader.LoadScene
+        self.preserve_scenes: bool = preserve_scenes
+        self.ModelLoaded = Signal()
+        self.ModelFailed = Signal()
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ModelLoader')
+        # Mesh simplification is pure Python heavy, keep it off the interpreter running the render loop
+        self.__lod_executor = ProcessPoolExecutor(max_workers=1) if lod_ratios else None
+        self.__requests: list[LoadRequest] = []
+
+    def Request(self, filepath: str, channel: str = 'default') -> LoadRequest:
+        """
+        Starts loading given model file in the background
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to the model file
+        channel : str
+            Request channel, unfinished requests on the same channel are cancelled
+
+        Returns
+        -------
+        LoadRequest tracking the load progress
+        """
+        self.Cancel(channel)
+        request = LoadRequest(filepath, channel)
+        if self.track_memory:
+            request.memory = MemoryProfiler()
+        request.future = self.__executor.submit(
+            AsyncModelLoader.__LoadWorker,
+            request,
+            self.mesh_cache,
+            self.optimize_meshes,
+            self.lod_ratios,
+            self.__lod_executor,
+            self.preserve_scenes
+        )
+        self.__requests.append(request)
+        return request
+
+    def Cancel(self, channel: str = 'default') -> None:
+        """Cancels all unfinished requests on given channel"""
+        for request in list(self.__requests):
+            if request.channel == channel:
+                self.__CancelRequest(request)
+
+    def CancelFile(self, filepath: str) -> None:
+        """Cancels all unfinished requests loading given file, other loads keep running"""
+        for request in list(self.__requests):
+            if os.fspath(request.filepath) == os.fspath(filepath):
+                self.__CancelRequest(request)
+
+    def GetActiveRequests(self) -> list:
+        """Returns list of unfinished requests"""
+        return list(self.__requests)
+
+    def IsBusy(self) -> bool:
+        """Returns true while there are unfinished requests"""
+        return len(self.__requests) > 0
+
+    def Update(self) -> None:
+        """
+        Advances all active requests, must be called from the OpenGL context thread every frame
+
+        Finished parses start GPU uploads, uploads share per frame byte budget.
+        Signals ModelLoaded or ModelFailed with the request as sender when request finishes.
+        """
+        budget = self.upload_budget
+        for request in list(self.__requests):
+            if request.IsCancelled():
+                self.__CancelRequest(request)
+                continue
+
+            if request.state is LoadState.Loading and request.future.done():
+                try:
+                    result = request.future.result()
+                    if isinstance(result, ModelGroup):
+                        request.group = result
+                        request.upload = self.graphics.BeginGroupUpload(result)
+                    else:
+                        request.model = result
+                        request.upload = self.graphics.BeginModelUpload(result)
+                    request.state = LoadState.Uploading
+                except Exception as err:
+                    self.__FailRequest(request, err)
+                    continue
+
+            if request.state is LoadState.Uploading and budget > 0:
+                uploaded_bytes = request.upload.uploaded_bytes
+                stage = request.memory.Stage if request.memory is not None else MemoryProfiler.NullStage
+                try:
+                    with stage('upload'):
+                        done = request.upload.Step(budget)
+                except Exception as err:
+                    self.__FailRequest(request, err)
+                    continue
+
+                budget -= request.upload.uploaded_bytes - uploaded_bytes
+                if done:
+                    request.state = LoadState.Done
+                    self.__requests.remove(request)
+                    self.ModelLoaded.send(request)
+
+    def Wait(self, request: LoadRequest):
+        """Blocks until given request finishes, returns loaded model, group when scenes are preserved, or None"""
+        while not request.IsFinished():
+            if request.state is LoadState.Loading:
+                request.future.exception()
+            self.Update()
+        return request.group if request.group is not None else request.model
+
+    def Shutdown(self) -> None:
+        """Cancels all requests and stops worker pool"""
+        for request in list(self.__requests):
+            self.__CancelRequest(request)
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+        if self.__lod_executor is not None:
+            self.__lod_executor.shutdown(wait=False, cancel_futures=True)
+
+    def __CancelRequest(self, request: LoadRequest) -> None:
+        if request.IsFinished():
+            return
+
+        request.Cancel()
+        request.future.cancel()
+        if request.upload is not None:
+            request.upload.Release()
+        request.state = LoadState.Cancelled
+        self.__requests.remove(request)
+
+    def __FailRequest(self, request: LoadRequest, error: Exception) -> None:
+        if request.upload is not None:
+            request.upload.Release()
+        request.error = error
+        request.state = LoadState.Failed
+        self.__requests.remove(request)
+        self.ModelFailed.send(request)
+
+    @staticmethod
+    def __LoadWorker(
+            request: LoadRequest,
+            mesh_cache: MeshCache,
+            optimize: bool,
+            lod_ratios: tuple,
+            lod_executor: ProcessPoolExecutor,
+            preserve_scenes: bool):
+        if request.IsCancelled():
+            return None
+
+        if preserve_scenes:
+            group = ModelLoader.LoadScene(request.filepath, optimize, lod_ratios, lod_executor, request.memory)
+            # Bounds are needed for framing the group, compute them while off the render thread
+            group.GetAABB()
+            return group
+
+        model = ModelLoader.LoadModel(request.filepath, mesh_cache, optimize, lod_ratios, lod_executor, request.memory)
+
+        # Bounds are needed for framing the model, compute them while off the render thread
+        model.GetAABB()
+        return model
@@ -0,0 +1,374 @@
+import os
+import sys
+import math
+import time
+import zlib
+import struct
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from pyrr import Vector3, Vector4
+import moderngl as mgl
+
+from .gfx import GFX, MaterialSettings, RenderHints, VertexLayout
+from .model import ModelLoader, RenderModel
+from .camera import Camera
+
+# Worker processes are recycled after rendering this many models, keeps leaks of long batches bounded
+DEFAULT_TASKS_PER_WORKER = 256
+# Number of models queued ahead per worker
+_QUEUE_DEPTH = 4
+
+def DefaultMaterial() -> MaterialSettings:
+    """Returns material matching the interactive viewer defaults"""
+    material = MaterialSettings()
+    material.base_color = Vector3([0.615, 0.28, 0.18])
+    material.roughness = 0.5
+    material.spec_intensity = 0.7
+    return material
+
+def DefaultRenderHints() -> RenderHints:
+    """Returns render hints matching the interactive viewer defaults"""
+    hints = RenderHints()
+    hints.wireframe_color = Vector4([0.0, 0.55, 0.0, 0.22])
+    return hints
+
+@dataclass
+class TurntableSettings:
+    width: int = 512
+    height: int = 512
+    # Number of evenly spaced carousel angles rendered per model
+    num_frames: int = 8
+    fov: float = 30.0
+    # Multisample anti-aliasing samples, 0 disables multisampling
+    samples: int = 0
+    background: tuple = (0.1, 0.1, 0.1)
+    packed_vertices: bool = True
+    # Models whose frames all exist already are skipped unless overwrite is set
+    overwrite: bool = False
+    material: MaterialSettings = field(default_factory=DefaultMaterial)
+    hints: RenderHints = field(default_factory=DefaultRenderHints)
+
+@dataclass
+class TurntableResult:
+    filepath: str
+    output_dir: str
+    num_frames: int = 0
+    skipped: bool = False
+    load_time: float = 0.0
+    render_time: float = 0.0
+    error: str = None
+
+@dataclass
+class BatchStats:
+    num_models: int = 0
+    num_rendered: int = 0
+    num_skipped: int = 0
+    num_failed: int = 0
+    num_frames: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def models_per_minute(self) -> float:
+        return (self.num_rendered + self.num_failed) / self.elapsed * 60.0 if self.elapsed > 0.0 else 0.0
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.num_frames / self.elapsed if self.elapsed > 0.0 else 0.0
+
+    def __repr__(self):
+        return (
+            f'{self.num_rendered} rendered, {self.num_skipped} skipped, {self.num_failed} failed '
+            f'in {self.elapsed:.1f}s -> {self.models_per_minute:.1f} models/min, {self.frames_per_second:.1f} frames/s'
+        )
+
+class TurntableRenderer(object):
+    """
+    Renders carousel frames of models into PNG images without any window
+
+    Uses standalone OpenGL context (EGL when available) and offscreen framebuffer,
+    all drawing goes through the same GFX pipeline as the interactive viewer.
+    """
+    def __init__(self, settings: TurntableSettings = TurntableSettings(), ctx: mgl.Context = None):
+        self.settings = settings
+        self.__ctx = ctx if ctx is not None else TurntableRenderer.CreateHeadlessContext()
+        layout = VertexLayout.Packed if settings.packed_vertices else VertexLayout.Separate
+        self.graphics = GFX(self.__ctx, layout)
+
+        size = (settings.width, settings.height)
+        self.__fbo = self.__ctx.framebuffer(
+            color_attachments=[self.__ctx.renderbuffer(size, samples=settings.samples)],
+            depth_attachment=self.__ctx.depth_renderbuffer(size, samples=settings.samples)
+        )
+        # Multisampled framebuffer has to be resolved before its pixels can be read
+        self.__resolve_fbo = None
+        if settings.samples > 0:
+            self.__resolve_fbo = self.__ctx.framebuffer(color_attachments=[self.__ctx.renderbuffer(size)])
+
+        self.camera = Camera()
+        self.camera.fov = settings.fov
+        self.camera.aspect = settings.width / settings.height
+
+    @staticmethod
+    def CreateHeadlessContext() -> mgl.Context:
+        """Returns standalone OpenGL context, prefers EGL which needs no display server"""
+        try:
+            return mgl.create_standalone_context(require=330, backend='egl')
+        except Exception:
+            return mgl.create_standalone_context(require=330)
+
+    def Render(self, filepath: str, output_dir: str) -> TurntableResult:
+        """
+        Renders turntable frames of given model file
+
+        Frames are written as image01.png, image02.png, ... into the output directory.
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to the model file, see ModelLoader.LoadModel for supported formats
+        output_dir : str
+            Directory receiving the frame images, created when missing
+
+        Returns
+        -------
+        TurntableResult describing the rendered frames, errors are reported rather than raised
+        """
+        result = TurntableResult(filepath, output_dir)
+        frame_paths = [self.GetFramePath(output_dir, index) for index in range(self.settings.num_frames)]
+        if not self.settings.overwrite and all(os.path.isfile(path) for path in frame_paths):
+            result.skipped = True
+            return result
+
+        model = None
+        try:
+            start = time.perf_counter()
+            model = ModelLoader.LoadModel(filepath)
+            self.graphics.GenModelBuffers(model)
+            result.load_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            os.makedirs(output_dir, exist_ok=True)
+            self.__FrameModel(model)
+            for index, path in enumerate(frame_paths):
+                angle = 2.0 * math.pi * index / self.settings.num_frames
+                TurntableRenderer.WritePNG(path, self.RenderFrame(model, angle))
+                result.num_frames += 1
+            result.render_time = time.perf_counter() - start
+        except Exception as err:
+            result.error = f'{type(err).__name__}: {err}'
+        finally:
+            if model is not None:
+                self.graphics.ReleaseModelBuffers(model)
+
+        return result
+
+    def RenderFrame(self, model: RenderModel, angle: float) -> np.ndarray:
+        """
+        Draws given model rotated around its center by the carousel angle
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model with generated buffers
+        angle : float
+            Rotation around the vertical axis in radians
+
+        Returns
+        -------
+        HxWx3 uint8 array of pixels, first row being the top of the image
+        """
+        # Rotate around the bounds center instead of the model origin so the model stays framed
+        model.transform.SetTranslation(0.0, 0.0, 0.0)
+        model.transform.SetRotation(0.0, angle, 0.0)
+        center = np.asarray(model.GetBoundingSphere().center) @ np.asarray(model.transform.GetMatrix())[:3, :3]
+        model.transform.SetTranslation(*(-center))
+
+        self.__fbo.use()
+        self.__fbo.clear(*self.settings.background, 1.0, depth=self.graphics.GetClearDepth())
+        self.graphics.SetCamera(self.camera)
+        self.graphics.RenderModel(model, self.settings.hints, self.settings.material)
+
+        fbo = self.__fbo
+        if self.__resolve_fbo is not None:
+            self.__ctx.copy_framebuffer(self.__resolve_fbo, self.__fbo)
+            fbo = self.__resolve_fbo
+
+        pixels = np.frombuffer(fbo.read(components=3), dtype=np.uint8)
+        return pixels.reshape(self.settings.height, self.settings.width, 3)[::-1]
+
+    def __FrameModel(self, model: RenderModel) -> None:
+        """Places the camera so the bounding sphere of the model fills the view under any rotation"""
+        radius = max(model.GetBoundingSphere().radius, 1e-6)
+        half_fov = math.radians(self.camera.fov) * 0.5
+        half_fov = min(half_fov, math.atan(math.tan(half_fov) * self.camera.aspect))
+        distance = radius / math.sin(half_fov)
+        self.camera.transform.SetTranslation(0.0, 0.0, distance)
+        self.camera.near_clip = max(distance - radius, distance * 1e-3) * 0.5
+        self.camera.far_clip = (distance + radius) * 2.0
+
+    def Release(self) -> None:
+        """Releases the context and all its resources"""
+        self.__ctx.release()
+
+    @staticmethod
+    def GetFramePath(output_dir: str, index: int) -> str:
+        """Returns filepath of given frame image"""
+        return os.path.join(output_dir, f'image{index + 1:02d}.png')
+
+    @staticmethod
+    def WritePNG(filepath: str, pixels: np.ndarray, compression: int = 6) -> None:
+        """
+        Writes 8-bit RGB or RGBA image into PNG file
+
+        Rows are stored with the 'up' filter which suits rendered images well.
+
+        Parameters
+        ----------
+        filepath : str
+            Destination PNG filepath
+        pixels : np.ndarray
+            HxWx3 or HxWx4 uint8 array, first row being the top of the image
+        compression : int
+            zlib compression level (0 - 9)
+        """
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+        height, width, channels = pixels.shape
+        if channels not in (3, 4):
+            raise Exception('PNG channel count invalid!')
+
+        rows = pixels.reshape(height, width * channels)
+        filtered = rows.copy()
+        filtered[1:] -= rows[:-1]
+        scanlines = np.hstack([np.full((height, 1), 2, dtype=np.uint8), filtered])
+
+        def Chunk(tag: bytes, data: bytes) -> bytes:
+            return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+        header = struct.pack('>IIBBBBB', width, height, 8, 2 if channels == 3 else 6, 0, 0, 0)
+        with open(filepath, 'wb') as file:
+            file.write(b'\x89PNG\r\n\x1a\n')
+            file.write(Chunk(b'IHDR', header))
+            file.write(Chunk(b'IDAT', zlib.compress(scanlines.tobytes(), compression)))
+            file.write(Chunk(b'IEND', b''))
+
+# Renderer owned by each worker process, see BatchRenderer
+_worker_renderer: TurntableRenderer = None
+
+def _InitWorker(settings: TurntableSettings, num_threads: int) -> None:
+    global _worker_renderer
+    # Software rasterizer threads, processes already saturate the cores
+    os.environ.setdefault('LP_NUM_THREADS', str(num_threads))
+    _worker_renderer = TurntableRenderer(settings)
+
+def _RenderWorker(filepath: str, output_dir: str) -> TurntableResult:
+    return _worker_renderer.Render(filepath, output_dir)
+
+class BatchRenderer(object):
+    """
+    Renders turntable frames of many models across pool of worker processes
+
+    Each worker owns its own headless context and renders whole models, parsing and
+    rasterization of different models overlap across workers. Intended for CPU only
+    machines with software rasterizer where process level parallelism scales best.
+    """
+    def __init__(self, settings: TurntableSettings = TurntableSettings(), num_workers: int = None):
+        self.settings = settings
+        self.num_workers = max(num_workers or os.cpu_count() or 1, 1)
+
+    @staticmethod
+    def FindModels(path: str) -> list:
+        """
+        Returns list of (model filepath, output name) tuples for given directory or manifest
+
+        Manifest is a text file listing one model filepath per line, relative filepaths are
+        resolved against the manifest directory. Empty lines and lines starting with # are ignored.
+        Output names are model filepaths relative to the directory or manifest, without extension.
+        """
+        if os.path.isdir(path):
+            root = path
+            filepaths = ModelLoader.FindModelFiles(path)
+        elif os.path.isfile(path):
+            root = os.path.dirname(os.path.abspath(path))
+            with open(path, 'r') as file:
+                entries = [line.strip() for line in file]
+            filepaths = [os.path.join(root, entry) for entry in entries if entry and not entry.startswith('#')]
+        else:
+            raise Exception(f'Model directory or manifest invalid -> {path}')
+
+        models = []
+        for filepath in filepaths:
+            name = os.path.relpath(os.path.abspath(filepath), os.path.abspath(root))
+            if name.startswith(os.pardir):
+                name = os.path.basename(filepath)
+            models.append((filepath, os.path.splitext(name)[0]))
+        return models
+
+    def Run(self, models: list, output_dir: str, progress_interval: float = 5.0) -> BatchStats:
+        """
+        Renders all given models, reports progress and throughput to the console output
+
+        Parameters
+        ----------
+        models : list
+            List of (model filepath, output name) tuples, see FindModels
+        output_dir : str
+            Root directory, frames of each model are written into its output name subdirectory
+        progress_interval : float
+            Seconds between progress reports
+
+        Returns
+        -------
+        BatchStats of the whole batch
+        """
+        stats = BatchStats(num_models=len(models))
+        start = time.perf_counter()
+        last_report = start
+        num_threads = max((os.cpu_count() or 1) // self.num_workers, 1)
+        pending = set()
+        queue = iter(models)
+        options = {}
+        # Worker recycling is only supported from Python 3.11, older versions keep workers for the whole batch
+        if sys.version_info >= (3, 11):
+            options['max_tasks_per_child'] = DEFAULT_TASKS_PER_WORKER
+
+        with ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_InitWorker,
+                initargs=(self.settings, num_threads),
+                **options) as executor:
+            while True:
+                # Keep the queue short so huge batches do not hold all futures at once
+                for filepath, name in queue:
+                    pending.add(executor.submit(_RenderWorker, filepath, os.path.join(output_dir, name)))
+                    if len(pending) >= self.num_workers * _QUEUE_DEPTH:
+                        break
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    BatchRenderer.__Accumulate(stats, future.result())
+
+                stats.elapsed = time.perf_counter() - start
+                if time.perf_counter() - last_report >= progress_interval:
+                    last_report = time.perf_counter()
+                    finished = stats.num_rendered + stats.num_skipped + stats.num_failed
+                    print(f'[{finished}/{stats.num_models}] {stats}')
+
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    @staticmethod
+    def __Accumulate(stats: BatchStats, result: TurntableResult) -> None:
+        if result.error is not None:
+            stats.num_failed += 1
+            print(f'Failed to render {result.filepath} -> {result.error}')
+        elif result.skipped:
+            stats.num_skipped += 1
+        else:
+            stats.num_rendered += 1
+            stats.num_frames += result.num_frames
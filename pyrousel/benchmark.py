@@ -0,0 +1,504 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import datetime
+import subprocess
+import importlib.resources
+from dataclasses import dataclass, field
+import numpy as np
+import moderngl as mgl
+import trimesh
+from pyrr import Matrix44
+
+from .gfx import GFX, MaterialSettings, RenderHints, VertexLayout, WireframeMode, WireframeTechnique, VisualiserMode
+from .edges import EdgeExtractor
+from .model import ModelLoader, RenderModel
+from .batchrender import TurntableRenderer, DefaultMaterial, DefaultRenderHints
+
+# Bump whenever result naming or measuring changes so stale baselines are not compared
+BENCHMARK_SCHEMA = 1
+DEFAULT_TRIANGLE_COUNTS = (1000, 10000, 100000, 1000000, 10000000)
+BENCHMARK_GROUPS = ('load', 'bounds', 'buffers', 'frames')
+# Relative median slowdown above which comparison reports regression
+DEFAULT_THRESHOLD = 0.1
+# Absolute slowdown in seconds below which changes are considered noise
+DEFAULT_NOISE_FLOOR = 0.0002
+# Number of monkey instances drawn by the instanced frame benchmark
+DEFAULT_INSTANCE_COUNT = 10000
+# Bundled vertex colored assets the trimesh to mesh data conversion is measured on
+CONVERSION_ASSETS = ('gltf/monkey-vc', 'obj/cube-vc')
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    group: str
+    # Wall clock duration of each measured run in seconds
+    samples: list = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+
+    @property
+    def median(self) -> float:
+        return float(np.median(self.samples))
+
+    @property
+    def minimum(self) -> float:
+        return float(np.min(self.samples))
+
+    @property
+    def mean(self) -> float:
+        return float(np.mean(self.samples))
+
+    @property
+    def stdev(self) -> float:
+        return float(np.std(self.samples))
+
+    def __repr__(self):
+        return f'{self.name}: median {self.median * 1000.0:.3f}ms min {self.minimum * 1000.0:.3f}ms ({len(self.samples)} runs)'
+
+    def ToDict(self) -> dict:
+        return {
+            'name': self.name,
+            'group': self.group,
+            'unit': 's',
+            'median': self.median,
+            'min': self.minimum,
+            'mean': self.mean,
+            'stdev': self.stdev,
+            'runs': len(self.samples),
+            'samples': list(self.samples),
+            'params': self.params,
+        }
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change of the median, positive values are slowdowns"""
+        return (self.current - self.baseline) / self.baseline if self.baseline > 0.0 else 0.0
+
+    def IsRegression(self, threshold: float = DEFAULT_THRESHOLD, noise_floor: float = DEFAULT_NOISE_FLOOR) -> bool:
+        return self.change > threshold and self.current - self.baseline > noise_floor
+
+class SyntheticMesh(object):
+    """
+    Procedural height field meshes of given triangle count
+    """
+    @staticmethod
+    def CreateGrid(num_triangles: int) -> RenderModel:
+        """
+        Creates wavy grid model with at least the given number of triangles
+
+        Parameters
+        ----------
+        num_triangles : int
+            Minimum number of triangles, actual count is rounded up to whole grid rows
+
+        Returns
+        -------
+        RenderModel with positions, normals, texture coordinates and indices
+        """
+        columns = max(int(np.ceil(np.sqrt(num_triangles / 2.0))), 1)
+        rows = max(int(np.ceil(num_triangles / (2.0 * columns))), 1)
+
+        u, v = np.meshgrid(np.linspace(0.0, 1.0, columns + 1), np.linspace(0.0, 1.0, rows + 1))
+        x, z = u * 2.0 - 1.0, (v * 2.0 - 1.0) * (rows / columns)
+        frequency = 8.0 * np.pi
+        y = 0.05 * np.sin(x * frequency) * np.cos(z * frequency)
+        dx = 0.05 * frequency * np.cos(x * frequency) * np.cos(z * frequency)
+        dz = -0.05 * frequency * np.sin(x * frequency) * np.sin(z * frequency)
+        normals = np.stack([-dx, np.ones_like(dx), -dz], axis=-1)
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+
+        corners = np.arange((rows + 1) * (columns + 1), dtype='i4').reshape(rows + 1, columns + 1)
+        top_left, top_right = corners[:-1, :-1].ravel(), corners[:-1, 1:].ravel()
+        bottom_left, bottom_right = corners[1:, :-1].ravel(), corners[1:, 1:].ravel()
+        indices = np.stack([
+            top_left, bottom_left, top_right,
+            top_right, bottom_left, bottom_right,
+        ], axis=-1)
+
+        model = RenderModel()
+        model.vertices = np.stack([x, y, z], axis=-1).astype('f4').ravel()
+        model.normals = normals.astype('f4').ravel()
+        model.texcoords = np.stack([u, v], axis=-1).astype('f4').ravel()
+        model.indices = indices.ravel()
+        return model
+
+    @staticmethod
+    def WriteOBJ(model: RenderModel, filepath: str, chunk_size: int = 1000000) -> None:
+        """Writes positions and triangles of given model into OBJ file"""
+        vertices = np.asarray(model.vertices).reshape(-1, 3)
+        faces = np.asarray(model.indices).reshape(-1, 3) + 1
+        with open(filepath, 'w') as file:
+            for start in range(0, len(vertices), chunk_size):
+                chunk = vertices[start:start + chunk_size]
+                file.write(('v %.6f %.6f %.6f\n' * len(chunk)) % tuple(chunk.ravel().tolist()))
+            for start in range(0, len(faces), chunk_size):
+                chunk = faces[start:start + chunk_size]
+                file.write(('f %d %d %d\n' * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+class BenchmarkSuite(object):
+    """
+    Offscreen performance benchmarks of model loading, bounds, buffer generation and drawing
+
+    Every benchmark runs once as a warmup followed by up to 'repeat' measured runs, measuring
+    stops early once a benchmark exceeds the time budget so the largest meshes stay affordable.
+    """
+    def __init__(
+            self,
+            triangle_counts: tuple = DEFAULT_TRIANGLE_COUNTS,
+            groups: tuple = BENCHMARK_GROUPS,
+            repeat: int = 5,
+            budget: float = 10.0,
+            num_frames: int = 60,
+            frame_size: tuple = (1024, 1024),
+            ctx: mgl.Context = None):
+        self.triangle_counts = tuple(sorted(triangle_counts))
+        self.groups = tuple(groups)
+        self.repeat = repeat
+        self.budget = budget
+        self.num_frames = num_frames
+        self.frame_size = frame_size
+        self.results: list[BenchmarkResult] = []
+        self.__ctx = ctx
+
+    def Run(self) -> dict:
+        """
+        Runs all selected benchmark groups, prints results as they finish
+
+        Returns
+        -------
+        Report dictionary with environment metadata and results, see Save
+        """
+        self.results = []
+        if self.__ctx is None and any(group in self.groups for group in ('buffers', 'frames')):
+            self.__ctx = TurntableRenderer.CreateHeadlessContext()
+
+        work_dir = tempfile.mkdtemp(prefix='pyrousel_benchmark_')
+        try:
+            assets = BenchmarkSuite.GetBundledAssets()
+            synthetic = {}
+            for count in self.triangle_counts:
+                model = SyntheticMesh.CreateGrid(count)
+                filepath = None
+                if 'load' in self.groups:
+                    filepath = os.path.join(work_dir, f'grid_{count}.obj')
+                    SyntheticMesh.WriteOBJ(model, filepath)
+                synthetic[f'grid_{count}'] = (model, filepath)
+
+            if 'load' in self.groups:
+                self.__RunLoad(assets, synthetic)
+            if 'bounds' in self.groups:
+                self.__RunBounds(assets, synthetic)
+            if 'buffers' in self.groups:
+                self.__RunBuffers(assets, synthetic)
+            if 'frames' in self.groups:
+                self.__RunFrames(assets, synthetic)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return {
+            'schema': BENCHMARK_SCHEMA,
+            'environment': BenchmarkSuite.GetEnvironment(self.__ctx),
+            'settings': {
+                'triangle_counts': list(self.triangle_counts),
+                'groups': list(self.groups),
+                'repeat': self.repeat,
+                'budget': self.budget,
+                'num_frames': self.num_frames,
+                'frame_size': list(self.frame_size),
+            },
+            'results': [result.ToDict() for result in self.results],
+        }
+
+    def Measure(self, name: str, group: str, func, setup=None, params: dict = None) -> BenchmarkResult:
+        """
+        Times given function and records the result
+
+        Parameters
+        ----------
+        name : str
+            Unique benchmark name, results are matched by name when comparing
+        group : str
+            Benchmark group name
+        func : callable
+            Function to time, called without arguments
+        setup : callable
+            Optional function called before each run, excluded from the timing
+        params : dict
+            Parameters stored alongside the result
+
+        Returns
+        -------
+        BenchmarkResult of the measured runs
+        """
+        samples = []
+        start = time.perf_counter()
+        for _ in range(self.repeat + 1):
+            if setup is not None:
+                setup()
+            run_start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - run_start)
+            if time.perf_counter() - start > self.budget:
+                break
+
+        # First run warms up caches and lazy initialization unless it is the only one
+        result = BenchmarkResult(name, group, samples[1:] if len(samples) > 1 else samples, params or {})
+        self.results.append(result)
+        print(result)
+        return result
+
+    def __RunLoad(self, assets: dict, synthetic: dict) -> None:
+        for name, filepath in assets.items():
+            self.Measure(f'load_model/{name}', 'load', lambda: ModelLoader.LoadModel(filepath))
+            if filepath.lower().endswith('.obj'):
+                self.Measure(f'load_obj/{name}', 'load', lambda: ModelLoader.LoadFromOBJ(filepath))
+
+        # Conversion alone, parsing is excluded by converting already loaded meshes
+        for name in CONVERSION_ASSETS:
+            meshes = ModelLoader.GetSceneMeshes(trimesh.load(assets[name], process=False))
+            params = {'vertices': sum(len(mesh.vertices) for mesh, _ in meshes)}
+            self.Measure(f'convert_mesh/{name}', 'load', lambda: ModelLoader.ConvertMeshes(meshes), params=params)
+
+        for name, (model, filepath) in synthetic.items():
+            params = {'triangles': len(model.indices) // 3}
+            self.Measure(f'load_model/{name}', 'load', lambda: ModelLoader.LoadModel(filepath), params=params)
+            self.Measure(f'load_obj/{name}', 'load', lambda: ModelLoader.LoadFromOBJ(filepath), params=params)
+
+    def __RunBounds(self, assets: dict, synthetic: dict) -> None:
+        models = {name: ModelLoader.LoadModel(filepath) for name, filepath in assets.items()}
+        models.update({name: model for name, (model, _) in synthetic.items()})
+        for name, model in models.items():
+            params = {'vertices': len(model.vertices) // 3}
+            self.Measure(f'recompute_bounds/{name}', 'bounds', model.RecomputeBounds, params=params)
+
+    def __RunBuffers(self, assets: dict, synthetic: dict) -> None:
+        models = {name: ModelLoader.LoadModel(filepath) for name, filepath in assets.items()}
+        models.update({name: model for name, (model, _) in synthetic.items()})
+        for layout in VertexLayout:
+            gfx = GFX(self.__ctx, layout)
+            for name, model in models.items():
+                def Generate():
+                    gfx.GenModelBuffers(model)
+                    self.__ctx.finish()
+
+                params = {'triangles': len(model.indices) // 3, 'layout': layout.name}
+                self.Measure(
+                    f'gen_buffers/{layout.name.lower()}/{name}',
+                    'buffers',
+                    Generate,
+                    setup=lambda: gfx.ReleaseModelBuffers(model),
+                    params=params
+                )
+                gfx.ReleaseModelBuffers(model)
+
+        for name, model in models.items():
+            params = {'triangles': len(model.indices) // 3}
+            self.Measure(
+                f'extract_edges/{name}',
+                'buffers',
+                lambda: EdgeExtractor.ExtractEdges(model.vertices, model.indices),
+                params=params
+            )
+
+    def __RunFrames(self, assets: dict, synthetic: dict) -> None:
+        models = {'obj/monkey': ModelLoader.LoadModel(assets['obj/monkey'])}
+        largest = [name for name, (model, _) in synthetic.items() if len(model.indices) // 3 <= 1000000]
+        if largest:
+            models[largest[-1]] = synthetic[largest[-1]][0]
+
+        fbo = self.__ctx.framebuffer(
+            color_attachments=[self.__ctx.renderbuffer(self.frame_size)],
+            depth_attachment=self.__ctx.depth_renderbuffer(self.frame_size)
+        )
+        gfx = GFX(self.__ctx)
+        material = DefaultMaterial()
+        for name, model in models.items():
+            gfx.GenModelBuffers(model)
+            BenchmarkSuite.__FrameModel(gfx, model, self.frame_size)
+            for wireframe_mode in WireframeMode:
+                for visualiser_mode in VisualiserMode:
+                    hints = DefaultRenderHints()
+                    hints.wireframe_mode = wireframe_mode
+                    hints.visualiser_mode = visualiser_mode
+                    self.__MeasureFrames(gfx, fbo, model, name, hints, material)
+                    if wireframe_mode is not WireframeMode.WireframeOff:
+                        # Two pass polygon mode wireframe as reference for the single pass default
+                        hints.wireframe_technique = WireframeTechnique.PolygonMode
+                        self.__MeasureFrames(gfx, fbo, model, name, hints, material)
+            gfx.ReleaseModelBuffers(model)
+
+        # Single instanced draw of many mesh copies laid out in a square grid
+        instanced = ModelLoader.LoadModel(assets['obj/monkey'])
+        side = int(np.ceil(np.sqrt(DEFAULT_INSTANCE_COUNT)))
+        cells = np.arange(DEFAULT_INSTANCE_COUNT)
+        spacing = float(np.max(np.asarray(instanced.maxext) - np.asarray(instanced.minext))) * 1.25
+        transforms = np.tile(np.identity(4, dtype='f4'), (DEFAULT_INSTANCE_COUNT, 1, 1))
+        transforms[:, 3, 0] = (cells % side - (side - 1) * 0.5) * spacing
+        transforms[:, 3, 1] = (cells // side - (side - 1) * 0.5) * spacing
+        instanced.SetInstances(transforms)
+        gfx.GenModelBuffers(instanced)
+        BenchmarkSuite.__FrameModel(gfx, instanced, self.frame_size)
+        hints = DefaultRenderHints()
+        hints.wireframe_mode = WireframeMode.WireframeOff
+        self.__MeasureFrames(gfx, fbo, instanced, f'instanced/monkey_{DEFAULT_INSTANCE_COUNT}', hints, material)
+        gfx.ReleaseModelBuffers(instanced)
+        fbo.release()
+
+    def __MeasureFrames(
+            self,
+            gfx: GFX,
+            fbo: mgl.Framebuffer,
+            model: RenderModel,
+            name: str,
+            hints: RenderHints,
+            material: MaterialSettings) -> None:
+        """Records steady state frame times, each frame waits for the GPU to finish"""
+        def DrawFrame():
+            fbo.use()
+            fbo.clear(0.1, 0.1, 0.1, 1.0, depth=1.0)
+            gfx.RenderModel(model, hints, material)
+            self.__ctx.finish()
+
+        # Warmup stays within the budget as well, frames of the largest scenes take seconds on software rasterizers
+        start = time.perf_counter()
+        for _ in range(max(self.num_frames // 10, 1)):
+            DrawFrame()
+            if time.perf_counter() - start > self.budget:
+                break
+
+        samples = []
+        start = time.perf_counter()
+        for _ in range(self.num_frames):
+            frame_start = time.perf_counter()
+            DrawFrame()
+            samples.append(time.perf_counter() - frame_start)
+            if time.perf_counter() - start > self.budget:
+                break
+
+        params = {
+            'triangles': len(model.indices) // 3,
+            'instances': model.num_instances,
+            'wireframe_mode': hints.wireframe_mode.name,
+            'visualiser_mode': hints.visualiser_mode.name,
+            'wireframe_technique': hints.wireframe_technique.name,
+            'frame_size': list(self.frame_size),
+        }
+        result_name = f'frame/{name}/{hints.wireframe_mode.name}/{hints.visualiser_mode.name}'
+        if hints.wireframe_mode is not WireframeMode.WireframeOff and hints.wireframe_technique is not WireframeTechnique.SinglePass:
+            result_name += f'/{hints.wireframe_technique.name}'
+        result = BenchmarkResult(result_name, 'frames', samples, params)
+        self.results.append(result)
+        print(result)
+
+    @staticmethod
+    def __FrameModel(gfx: GFX, model: RenderModel, frame_size: tuple) -> None:
+        if model.is_instanced:
+            aabb = model.GetInstancesAABB()
+            center = (np.asarray(aabb.minext) + np.asarray(aabb.maxext)) * 0.5
+            radius = float(np.linalg.norm(np.asarray(aabb.maxext) - np.asarray(aabb.minext))) * 0.5
+        else:
+            sphere = model.GetBoundingSphere()
+            center, radius = np.asarray(sphere.center), sphere.radius
+        distance = radius / np.sin(np.radians(15.0))
+        eye = center + [0.0, 0.0, distance]
+        gfx.SetViewMatrix(Matrix44.look_at(eye, center, [0.0, 1.0, 0.0]))
+        gfx.SetPerspectiveMatrix(Matrix44.perspective_projection(
+            30.0, frame_size[0] / frame_size[1], distance * 0.01, distance * 10.0
+        ))
+
+    @staticmethod
+    def GetBundledAssets() -> dict:
+        """Returns dictionary of bundled model filepaths keyed by format/name"""
+        assets = {}
+        for package in ['obj', 'gltf', 'collada']:
+            resources = importlib.resources.files(f'pyrousel.resources.models.{package}')
+            for entry in sorted(resources.iterdir(), key=lambda entry: entry.name):
+                if entry.is_file() and not entry.name.startswith('__'):
+                    assets[f'{package}/{os.path.splitext(entry.name)[0]}'] = str(entry)
+        return assets
+
+    @staticmethod
+    def GetEnvironment(ctx: mgl.Context = None) -> dict:
+        """Returns metadata describing the machine, libraries and source revision"""
+        environment = {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'moderngl': mgl.__version__,
+            'revision': None,
+        }
+
+        try:
+            import trimesh
+            environment['trimesh'] = trimesh.__version__
+        except Exception:
+            pass
+
+        if ctx is not None:
+            environment['gl_renderer'] = ctx.info['GL_RENDERER']
+            environment['gl_vendor'] = ctx.info['GL_VENDOR']
+            environment['gl_version'] = ctx.info['GL_VERSION']
+
+        try:
+            environment['revision'] = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True,
+                text=True,
+                timeout=5
+            ).stdout.strip() or None
+        except Exception:
+            pass
+
+        return environment
+
+    @staticmethod
+    def Save(report: dict, filepath: str) -> None:
+        """Writes benchmark report as JSON"""
+        with open(filepath, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    @staticmethod
+    def Load(filepath: str) -> dict:
+        """Reads benchmark report, raises when its schema does not match"""
+        with open(filepath, 'r') as file:
+            report = json.load(file)
+        if report.get('schema') != BENCHMARK_SCHEMA:
+            raise Exception(f'Benchmark report schema invalid! -> {filepath}')
+        return report
+
+    @staticmethod
+    def Compare(baseline: dict, current: dict) -> list:
+        """
+        Matches results of two reports by name
+
+        Parameters
+        ----------
+        baseline : dict
+            Saved baseline report
+        current : dict
+            Report to compare against the baseline
+
+        Returns
+        -------
+        List of Comparison for results present in both reports, in current report order
+        """
+        baseline_results = {result['name']: result for result in baseline['results']}
+        return [
+            Comparison(result['name'], baseline_results[result['name']]['median'], result['median'])
+            for result in current['results'] if result['name'] in baseline_results
+        ]
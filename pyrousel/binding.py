@@ -0,0 +1,194 @@
+import numpy as np
+
+_UNSET = object()
+
+class TrackedPanel(object):
+    """
+    Base of GUI panels recording which fields the user edited during the last widget update
+
+    Panels route widget results through Track or Set, BindingSet then pushes only the
+    recorded fields to the application state.
+    """
+    def __init__(self):
+        self.changes: set = set()
+
+    def Track(self, field: str, result: tuple):
+        """
+        Records field as edited when the widget reports a change
+
+        Parameters
+        ----------
+        field : str
+            Name of the panel field the widget edits
+        result : tuple
+            (changed, value) as returned by the imgui widget
+
+        Returns
+        -------
+        Widget value to be assigned back to the field
+        """
+        changed, value = result
+        if changed:
+            self.changes.add(field)
+        return value
+
+    def Set(self, field: str, value) -> None:
+        """Assigns field and records it as edited"""
+        setattr(self, field, value)
+        self.changes.add(field)
+
+class PropertyBinding(object):
+    """
+    Binding of single panel field to application state
+
+    Values are pushed to the application only when the panel field is edited and pulled
+    back into the panel only when the application value changed since the last exchange.
+    Change is detected from version function when given, by comparing values otherwise.
+    Values only ever changed through the panel can skip polling altogether.
+    """
+    def __init__(self, panel: TrackedPanel, field: str, getter, setter=None, version=None, poll: bool = True):
+        """
+        Parameters
+        ----------
+        panel : TrackedPanel
+            Panel owning the field
+        field : str
+            Name of the panel field
+        getter : callable
+            Returns application value, vectors should be returned as tuples
+        setter : callable
+            Applies edited panel value to the application, None for read only fields
+        version : callable
+            Optional function returning counter incremented whenever the application value changes
+        poll : bool
+            Whether application value is checked every sync, otherwise it is pulled only after Invalidate
+        """
+        self.panel = panel
+        self.field = field
+        self.__getter = getter
+        self.__setter = setter
+        self.__version = version
+        self.__poll = poll
+        self.__last_version = _UNSET
+        self.__last_value = _UNSET
+
+    def Invalidate(self) -> None:
+        """Forces the application value to be pulled on next sync"""
+        self.__last_version = _UNSET
+        self.__last_value = _UNSET
+
+    def Push(self) -> bool:
+        """Applies panel value to the application, returns whether the binding is writable"""
+        if self.__setter is None:
+            return False
+
+        value = getattr(self.panel, self.field)
+        self.__setter(value)
+        self.__last_value = tuple(value) if isinstance(value, list) else value
+        if self.__version is not None:
+            self.__last_version = self.__version()
+        return True
+
+    def Pull(self) -> bool:
+        """Copies application value into the panel when it changed, returns whether it did"""
+        if not self.__poll and self.__last_value is not _UNSET:
+            return False
+
+        if self.__version is not None:
+            version = self.__version()
+            if version == self.__last_version:
+                return False
+            self.__last_version = version
+
+        value = self.__getter()
+        if value == self.__last_value:
+            return False
+        self.__last_value = value
+        # Panel widgets edit vector fields in place
+        setattr(self.panel, self.field, list(value) if isinstance(value, tuple) else value)
+        return True
+
+class BindingSet(object):
+    """
+    Collection of panel bindings synchronised once per frame
+
+    Sync pushes fields edited since the previous sync and then pulls application values
+    changed by anything else than the panels.
+    """
+    def __init__(self):
+        self.bindings: list[PropertyBinding] = []
+        # Bindings per edited panel field, keyed by panel id and field name
+        self.__fields: dict = {}
+        self.__panels: dict = {}
+        # Number of values transferred during the last sync in each direction
+        self.num_pushed = 0
+        self.num_pulled = 0
+
+    def Bind(self, panel: TrackedPanel, field: str, getter, setter=None, version=None, poll: bool = True) -> PropertyBinding:
+        """Binds panel field to application state, see PropertyBinding"""
+        binding = PropertyBinding(panel, field, getter, setter, version, poll)
+        self.bindings.append(binding)
+        self.__panels[id(panel)] = panel
+        self.__fields.setdefault((id(panel), field), []).append(binding)
+        return binding
+
+    def BindAttribute(
+            self,
+            panel: TrackedPanel,
+            field: str,
+            target,
+            attribute: str,
+            convert=None,
+            version=None,
+            poll: bool = True) -> PropertyBinding:
+        """
+        Binds panel field to attribute of given object
+
+        Parameters
+        ----------
+        panel : TrackedPanel
+            Panel owning the field
+        field : str
+            Name of the panel field
+        target : object
+            Object owning the attribute
+        attribute : str
+            Name of the bound attribute, array values are exchanged with the panel as tuples
+        convert : callable
+            Optional conversion of panel values into attribute values, e.g. Vector3
+        version : callable
+            Optional function returning counter incremented whenever the attribute changes
+        poll : bool
+            Whether attribute is checked every sync, see PropertyBinding
+        """
+        def Get():
+            value = getattr(target, attribute)
+            return tuple(value) if isinstance(value, np.ndarray) else value
+
+        def Set(value):
+            setattr(target, attribute, convert(value) if convert is not None else value)
+
+        return self.Bind(panel, field, Get, Set, version, poll)
+
+    def Invalidate(self) -> None:
+        """Forces all application values to be pulled on next sync, e.g. after swapping bound objects"""
+        for binding in self.bindings:
+            binding.Invalidate()
+
+    def Sync(self) -> None:
+        """Pushes panel edits to the application and pulls changed application values into the panels"""
+        pushed = 0
+        for panel in self.__panels.values():
+            if not panel.changes:
+                continue
+            for field in panel.changes:
+                for binding in self.__fields.get((id(panel), field), ()):
+                    pushed += binding.Push()
+            panel.changes.clear()
+
+        pulled = 0
+        for binding in self.bindings:
+            pulled += binding.Pull()
+
+        self.num_pushed = pushed
+        self.num_pulled = pulled
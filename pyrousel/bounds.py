@@ -0,0 +1,300 @@
+import numpy as np
+from dataclasses import dataclass, field
+from pyrr import Matrix44, Vector3
+
+@dataclass
+class AABB:
+    minext: Vector3 = field(default_factory=lambda: Vector3([0.0, 0.0, 0.0]))
+    maxext: Vector3 = field(default_factory=lambda: Vector3([0.0, 0.0, 0.0]))
+
+    def GetCenter(self) -> Vector3:
+        """Returns center point of the box"""
+        return (self.minext + self.maxext) * 0.5
+
+    def GetExtents(self) -> Vector3:
+        """Returns half size of the box along each axis"""
+        return (self.maxext - self.minext) * 0.5
+
+@dataclass
+class BoundingSphere:
+    center: Vector3 = field(default_factory=lambda: Vector3([0.0, 0.0, 0.0]))
+    radius: float = 0.0
+
+@dataclass
+class OrientedBox:
+    center: Vector3 = field(default_factory=lambda: Vector3([0.0, 0.0, 0.0]))
+    # Box local axes stored as rows
+    axes: np.ndarray = field(default_factory=lambda: np.identity(3, dtype='f4'))
+    extents: Vector3 = field(default_factory=lambda: Vector3([0.0, 0.0, 0.0]))
+
+    def GetCorners(self) -> np.ndarray:
+        """Returns 8x3 array of the box corner points"""
+        signs = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype='f4')
+        return np.asarray(self.center) + (signs * np.asarray(self.extents)) @ self.axes
+
+class Bounds(object):
+    """Bounding volume computations over flat vertex position arrays"""
+    @staticmethod
+    def ComputeAABB(vertices: np.ndarray) -> AABB:
+        """
+        Computes axis aligned bounding box of given vertex positions
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat or Nx3 array of vertex positions
+
+        Returns
+        -------
+        AABB enclosing all vertices, zero sized box when there are no vertices
+        """
+        points = Bounds.__AsPoints(vertices)
+        if len(points) == 0:
+            return AABB()
+
+        return AABB(Vector3(points.min(axis=0)), Vector3(points.max(axis=0)))
+
+    @staticmethod
+    def ComputeSphere(vertices: np.ndarray) -> BoundingSphere:
+        """
+        Computes bounding sphere of given vertex positions
+
+        Tests both the box center and the vertex centroid as sphere origin and picks the tighter fit.
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat or Nx3 array of vertex positions
+
+        Returns
+        -------
+        BoundingSphere enclosing all vertices
+        """
+        points = Bounds.__AsPoints(vertices).astype('f8')
+        if len(points) == 0:
+            return BoundingSphere()
+
+        best_center = None
+        best_radius = np.inf
+        for center in [(points.min(axis=0) + points.max(axis=0)) * 0.5, points.mean(axis=0)]:
+            delta = points - center
+            radius = np.sqrt(np.einsum('ij,ij->i', delta, delta).max())
+            if radius < best_radius:
+                best_center = center
+                best_radius = radius
+
+        return BoundingSphere(Vector3(best_center), float(best_radius))
+
+    @staticmethod
+    def ComputeOrientedBox(vertices: np.ndarray) -> OrientedBox:
+        """
+        Computes oriented bounding box of given vertex positions
+
+        Box axes are fitted to the principal components of the vertex distribution.
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat or Nx3 array of vertex positions
+
+        Returns
+        -------
+        OrientedBox enclosing all vertices
+        """
+        points = Bounds.__AsPoints(vertices).astype('f8')
+        if len(points) == 0:
+            return OrientedBox()
+
+        centroid = points.mean(axis=0)
+        delta = points - centroid
+        covariance = delta.T @ delta / len(points)
+        _, eigen_vectors = np.linalg.eigh(covariance)
+
+        # Largest component first, keep right handed basis
+        axes = eigen_vectors[:, ::-1].T
+        axes[2] = np.cross(axes[0], axes[1])
+
+        local = delta @ axes.T
+        local_min = local.min(axis=0)
+        local_max = local.max(axis=0)
+        center = centroid + ((local_min + local_max) * 0.5) @ axes
+        extents = (local_max - local_min) * 0.5
+
+        return OrientedBox(Vector3(center), axes.astype('f4'), Vector3(extents))
+
+    @staticmethod
+    def TransformAABB(aabb: AABB, matrix: Matrix44) -> AABB:
+        """
+        Computes axis aligned box enclosing given box transformed by the matrix
+
+        Parameters
+        ----------
+        aabb : AABB
+            Local space bounding box
+        matrix : Matrix44
+            Local to world transformation matrix (row vector convention)
+
+        Returns
+        -------
+        AABB in world space, exact for boxes under rotation and scale
+        """
+        mat = np.asarray(matrix, dtype='f8')
+        center = np.asarray(aabb.GetCenter()) @ mat[:3, :3] + mat[3, :3]
+        extents = np.asarray(aabb.GetExtents()) @ np.abs(mat[:3, :3])
+        return AABB(Vector3(center - extents), Vector3(center + extents))
+
+    @staticmethod
+    def TransformAABBs(minext: np.ndarray, maxext: np.ndarray, matrices: np.ndarray) -> tuple:
+        """
+        Batched version of TransformAABB
+
+        Parameters
+        ----------
+        minext : np.ndarray
+            Nx3 local space box minimum extends
+        maxext : np.ndarray
+            Nx3 local space box maximum extends
+        matrices : np.ndarray
+            Nx4x4 local to world transformation matrices (row vector convention)
+
+        Returns
+        -------
+        Tuple of Nx3 world space (minimum, maximum) extends
+        """
+        center = (minext + maxext) * 0.5
+        extents = (maxext - minext) * 0.5
+        world_center = np.einsum('ni,nij->nj', center, matrices[:, :3, :3]) + matrices[:, 3, :3]
+        world_extents = np.einsum('ni,nij->nj', extents, np.abs(matrices[:, :3, :3]))
+        return world_center - world_extents, world_center + world_extents
+
+    @staticmethod
+    def ExtractFrustumPlanes(view_projection: Matrix44, depth_zero_to_one: bool = False) -> np.ndarray:
+        """
+        Extracts view frustum planes from combined view projection matrix (Gribb & Hartmann)
+
+        Parameters
+        ----------
+        view_projection : Matrix44
+            World to clip space matrix (row vector convention, OpenGL clip space)
+        depth_zero_to_one : bool
+            Clip space depth ranges [0, 1] instead of [-1, 1], e.g. reverse-Z projections
+
+        Returns
+        -------
+        6x4 array of normalized inwards facing planes (nx, ny, nz, d) -> left, right, bottom, top, near, far
+        Depth planes swap places for reversed depth, infinite far plane has zero normal and never culls
+        """
+        mat = np.asarray(view_projection, dtype='f8')
+        planes = np.array([
+            mat[:, 3] + mat[:, 0],
+            mat[:, 3] - mat[:, 0],
+            mat[:, 3] + mat[:, 1],
+            mat[:, 3] - mat[:, 1],
+            mat[:, 2] if depth_zero_to_one else mat[:, 3] + mat[:, 2],
+            mat[:, 3] - mat[:, 2],
+        ])
+        lengths = np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+        return planes / np.where(lengths > 0.0, lengths, 1.0)
+
+    @staticmethod
+    def IntersectFrustum(minext: np.ndarray, maxext: np.ndarray, planes: np.ndarray) -> np.ndarray:
+        """
+        Tests axis aligned boxes against frustum planes
+
+        Parameters
+        ----------
+        minext : np.ndarray
+            Nx3 box minimum extends
+        maxext : np.ndarray
+            Nx3 box maximum extends
+        planes : np.ndarray
+            Mx4 inwards facing planes, see ExtractFrustumPlanes
+
+        Returns
+        -------
+        Boolean array of N flags, true for boxes at least partially inside all planes
+        """
+        center = (minext + maxext) * 0.5
+        extents = (maxext - minext) * 0.5
+        # Signed distance of the box center against projected box radius for every box & plane pair
+        distance = center @ planes[:, :3].T + planes[:, 3]
+        radius = extents @ np.abs(planes[:, :3]).T
+        return np.all(distance + radius >= 0.0, axis=1)
+
+    @staticmethod
+    def IntersectRay(minext: np.ndarray, maxext: np.ndarray, origin: np.ndarray, direction: np.ndarray) -> np.ndarray:
+        """
+        Tests axis aligned boxes against single ray (slab test)
+
+        Parameters
+        ----------
+        minext : np.ndarray
+            Nx3 box minimum extends
+        maxext : np.ndarray
+            Nx3 box maximum extends
+        origin : np.ndarray
+            Ray origin
+        direction : np.ndarray
+            Ray direction, need not be normalized
+
+        Returns
+        -------
+        Array of N ray parameters where the ray enters each box, 0.0 for boxes containing the origin
+        and inf for boxes the ray misses
+        """
+        direction = np.asarray(direction, dtype='f8')
+        # Zero components would turn into NaN slabs for origins lying on the slab plane
+        direction = np.where(np.abs(direction) < 1e-30, np.copysign(1e-30, direction), direction)
+        near = (minext - np.asarray(origin, dtype='f8')) / direction
+        far = (maxext - np.asarray(origin, dtype='f8')) / direction
+        entry = np.maximum(np.minimum(near, far).max(axis=1), 0.0)
+        leave = np.maximum(near, far).min(axis=1)
+        return np.where(entry <= leave, entry, np.inf)
+
+    @staticmethod
+    def TransformSphere(sphere: BoundingSphere, matrix: Matrix44) -> BoundingSphere:
+        """
+        Computes sphere enclosing given sphere transformed by the matrix
+
+        Parameters
+        ----------
+        sphere : BoundingSphere
+            Local space bounding sphere
+        matrix : Matrix44
+            Local to world transformation matrix (row vector convention)
+
+        Returns
+        -------
+        BoundingSphere in world space, radius is scaled by the largest axis scale
+        """
+        mat = np.asarray(matrix, dtype='f8')
+        center = np.asarray(sphere.center) @ mat[:3, :3] + mat[3, :3]
+        scale = np.sqrt((mat[:3, :3] ** 2).sum(axis=1)).max()
+        return BoundingSphere(Vector3(center), float(sphere.radius * scale))
+
+    @staticmethod
+    def TransformSpheres(center: Vector3, radius: float, matrices: np.ndarray) -> tuple:
+        """
+        Batched version of TransformSphere, transforms single sphere by many matrices
+
+        Parameters
+        ----------
+        center : Vector3
+            Local space sphere center
+        radius : float
+            Local space sphere radius
+        matrices : np.ndarray
+            Nx4x4 local to world transformation matrices (row vector convention)
+
+        Returns
+        -------
+        Tuple of (Nx3 world space centers, N radii)
+        """
+        matrices = np.asarray(matrices, dtype='f8')
+        centers = np.asarray(center, dtype='f8') @ matrices[:, :3, :3] + matrices[:, 3, :3]
+        scales = np.sqrt((matrices[:, :3, :3] ** 2).sum(axis=2)).max(axis=1)
+        return centers, radius * scales
+
+    @staticmethod
+    def __AsPoints(vertices: np.ndarray) -> np.ndarray:
+        return np.asarray(vertices).reshape(-1, 3)
@@ -0,0 +1,513 @@
+import numpy as np
+from dataclasses import dataclass
+
+# Number of bins candidate SAH splits are evaluated at along the node axis
+DEFAULT_SAH_BINS = 16
+# Nodes with this many triangles or fewer always become leaves
+DEFAULT_LEAF_SIZE = 4
+# Nodes with more triangles are split even when SAH prefers a leaf
+MAX_LEAF_SIZE = 16
+# Cost of visiting a node relative to intersecting single triangle
+TRAVERSAL_COST = 1.0
+# Rays nearly parallel to the triangle plane are treated as missing it
+PARALLEL_EPSILON = 1e-12
+# Binary tree levels collapsed into single traversal step of queries, every step costs the same numpy call overhead
+TRAVERSAL_COLLAPSE = 3
+
+@dataclass
+class TriangleHits:
+    # Triangle index per query, -1 where nothing was found
+    triangles: np.ndarray
+    # Ray distance in units of the ray direction length, or point distance, inf where nothing was found
+    distances: np.ndarray
+    # Nx3 weights of the triangle corners, see BVH.Intersect
+    barycentrics: np.ndarray
+    # Nx3 hit or closest points
+    points: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+    @property
+    def found(self) -> np.ndarray:
+        """Boolean array flagging queries which found a triangle"""
+        return self.triangles >= 0
+
+class BVH(object):
+    """
+    Bounding volume hierarchy over triangles of single mesh
+
+    Nodes are kept in flat arrays, children of inner node i are nodes child[i] and child[i] + 1,
+    leaves reference range of triangles in leaf order. The tree is built top-down one tree level
+    at a time, surface area heuristic is evaluated for binned centroids of all nodes of a level
+    at once. Queries traverse breadth first, every step tests whole batch of (query, node) pairs.
+    """
+    def __init__(self, vertices: np.ndarray, indices: np.ndarray):
+        """
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat or Nx3 vertex positions
+        indices : np.ndarray
+            Flat or Mx3 triangle vertex indices
+        """
+        self.vertices: np.ndarray = np.asarray(vertices).reshape(-1, 3)
+        self.indices: np.ndarray = np.asarray(indices).reshape(-1, 3)
+        self.node_minext: np.ndarray = np.zeros((0, 3), dtype='f4')
+        self.node_maxext: np.ndarray = np.zeros((0, 3), dtype='f4')
+        # First child of inner nodes, -1 for leaves
+        self.node_child: np.ndarray = np.zeros(0, dtype='i4')
+        # Range of leaf triangles within triangle order, count is 0 for inner nodes
+        self.node_first: np.ndarray = np.zeros(0, dtype='i4')
+        self.node_count: np.ndarray = np.zeros(0, dtype='i4')
+        # Triangle indices in leaf order
+        self.triangles: np.ndarray = np.zeros(0, dtype='i4')
+        # (first, end) node range of every tree level, parents always precede their children
+        self.levels: list = []
+        # Descendants visited after each inner node by queries, -1 padded, see TRAVERSAL_COLLAPSE
+        self.__descendants: np.ndarray = None
+
+    def __repr__(self):
+        return f'BVH -> triangles:{len(self.triangles)} nodes:{self.num_nodes} depth:{len(self.levels)}'
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_child)
+
+    @staticmethod
+    def Build(vertices: np.ndarray, indices: np.ndarray, num_bins: int = DEFAULT_SAH_BINS, leaf_size: int = DEFAULT_LEAF_SIZE) -> 'BVH':
+        """
+        Builds hierarchy over given triangles
+
+        Every node is split along the longest axis of its triangle centroid bounds at the bin
+        boundary with the lowest surface area heuristic cost. Nodes turn into leaves when they
+        are small enough, their centroids coincide or splitting costs more than intersecting
+        all their triangles.
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat or Nx3 vertex positions
+        indices : np.ndarray
+            Flat or Mx3 triangle vertex indices
+        num_bins : int
+            Number of candidate split bins per node
+        leaf_size : int
+            Nodes with this many triangles or fewer are not split
+
+        Returns
+        -------
+        BVH over all triangles, single empty leaf when there are none
+        """
+        bvh = BVH(vertices, indices)
+        corners = bvh.vertices[bvh.indices]
+        tri_minext = corners.min(axis=1)
+        tri_maxext = corners.max(axis=1)
+        del corners
+        centroids = (tri_minext + tri_maxext) * 0.5
+        num_triangles = len(tri_minext)
+        order = np.arange(num_triangles, dtype='i4')
+
+        levels_minext, levels_maxext, levels_child, levels_first, levels_count = [], [], [], [], []
+        starts = np.zeros(1, dtype=np.int64)
+        counts = np.full(1, num_triangles, dtype=np.int64)
+        num_nodes = 1
+        while len(starts) > 0:
+            num_segments = len(starts)
+            offsets = np.cumsum(counts) - counts
+            segments = np.repeat(np.arange(num_segments), counts)
+            positions = starts[segments] + np.arange(len(segments)) - offsets[segments]
+            primitives = order[positions]
+
+            # Empty root only, keep the tree valid
+            if len(primitives) == 0:
+                minext = maxext = np.zeros((num_segments, 3), dtype='f4')
+                cmin = cmax = minext
+            else:
+                minext = np.minimum.reduceat(tri_minext[primitives], offsets, axis=0)
+                maxext = np.maximum.reduceat(tri_maxext[primitives], offsets, axis=0)
+                cmin = np.minimum.reduceat(centroids[primitives], offsets, axis=0)
+                cmax = np.maximum.reduceat(centroids[primitives], offsets, axis=0)
+
+            axes = np.argmax(cmax - cmin, axis=1)
+            extents = (cmax - cmin)[np.arange(num_segments), axes]
+            split = (counts > leaf_size) & (extents > 0.0)
+
+            # Bin centroids of all nodes worth splitting, candidates are indexed in segment order
+            candidates = np.flatnonzero(split)
+            mask = split[segments]
+            primitives, segments = primitives[mask], segments[mask]
+            ids = np.searchsorted(candidates, segments)
+            bins = np.clip(
+                ((centroids[primitives, axes[segments]] - cmin[segments, axes[segments]]) * (num_bins / extents[segments])).astype(np.int64),
+                0,
+                num_bins - 1
+            )
+            best_bins, accepted = BVH.__FindSplits(
+                tri_minext[primitives], tri_maxext[primitives], ids, bins, num_bins,
+                minext[candidates], maxext[candidates], counts[candidates]
+            )
+            split[candidates] = accepted
+
+            children = np.full(num_segments, -1, dtype='i4')
+            children[split] = num_nodes + 2 * np.arange(np.count_nonzero(split))
+            levels_minext.append(minext)
+            levels_maxext.append(maxext)
+            levels_child.append(children)
+            levels_first.append(np.where(split, 0, starts).astype('i4'))
+            levels_count.append(np.where(split, 0, counts).astype('i4'))
+            bvh.levels.append((num_nodes - num_segments, num_nodes))
+            if not split.any():
+                break
+
+            # Stable partition of every split node range into its left and right child range
+            mask = accepted[ids]
+            primitives, bins, ids = primitives[mask], bins[mask], ids[mask]
+            ids = np.cumsum(accepted)[ids] - 1
+            best_bins = best_bins[accepted]
+            split_starts = starts[split]
+            split_counts = counts[split]
+            split_offsets = np.cumsum(split_counts) - split_counts
+            left = bins <= best_bins[ids]
+            num_left = np.bincount(ids, weights=left, minlength=len(split_starts)).astype(np.int64)
+            left_before = np.cumsum(left) - left
+            right_before = np.arange(len(left)) - left_before
+            first = split_offsets[ids]
+            destinations = split_starts[ids] + np.where(
+                left,
+                left_before - left_before[first],
+                num_left[ids] + right_before - right_before[first]
+            )
+            order[destinations] = primitives
+
+            starts = np.stack([split_starts, split_starts + num_left], axis=1).reshape(-1)
+            counts = np.stack([num_left, split_counts - num_left], axis=1).reshape(-1)
+            num_nodes += len(starts)
+
+        bvh.node_minext = np.concatenate(levels_minext).astype('f4')
+        bvh.node_maxext = np.concatenate(levels_maxext).astype('f4')
+        bvh.node_child = np.concatenate(levels_child)
+        bvh.node_first = np.concatenate(levels_first)
+        bvh.node_count = np.concatenate(levels_count)
+        bvh.triangles = order
+        return bvh
+
+    def Refit(self, vertices: np.ndarray = None) -> None:
+        """
+        Recomputes node bounds bottom-up keeping the tree topology, e.g. after vertices were animated
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Optional new flat or Nx3 vertex positions, currently referenced vertices are refit otherwise
+        """
+        if vertices is not None:
+            self.vertices = np.asarray(vertices).reshape(-1, 3)
+        if len(self.triangles) == 0:
+            return
+
+        corners = self.vertices[self.indices[self.triangles]]
+        leaves = np.flatnonzero(self.node_child < 0)
+        leaves = leaves[np.argsort(self.node_first[leaves], kind='stable')]
+        # Leaf ranges are disjoint and cover all triangles, sorted by start they split the leaf order exactly
+        self.node_minext[leaves] = np.minimum.reduceat(corners.min(axis=1), self.node_first[leaves], axis=0)
+        self.node_maxext[leaves] = np.maximum.reduceat(corners.max(axis=1), self.node_first[leaves], axis=0)
+        for first, end in reversed(self.levels):
+            nodes = np.arange(first, end)
+            nodes = nodes[self.node_child[nodes] >= 0]
+            children = self.node_child[nodes]
+            self.node_minext[nodes] = np.minimum(self.node_minext[children], self.node_minext[children + 1])
+            self.node_maxext[nodes] = np.maximum(self.node_maxext[children], self.node_maxext[children + 1])
+
+    def GetAABB(self) -> tuple:
+        """Returns (minimum, maximum) extends of all triangles"""
+        return self.node_minext[0], self.node_maxext[0]
+
+    def Intersect(self, origins: np.ndarray, directions: np.ndarray, max_distance: float = np.inf) -> TriangleHits:
+        """
+        Finds the nearest triangle hit by each ray
+
+        Parameters
+        ----------
+        origins : np.ndarray
+            Nx3 ray origins or single origin shared by all rays
+        directions : np.ndarray
+            Nx3 ray directions, need not be normalized
+        max_distance : float
+            Hits further than this many direction lengths are ignored
+
+        Returns
+        -------
+        TriangleHits with ray parameter of the hits, hit point equals origin + distance * direction
+        and its barycentrics are weights of the triangle corners in index order
+        """
+        directions = np.asarray(directions, dtype='f8').reshape(-1, 3)
+        origins = np.broadcast_to(np.asarray(origins, dtype='f8').reshape(-1, 3), directions.shape)
+        num_rays = len(directions)
+        best_distances = np.full(num_rays, max_distance, dtype='f8')
+        best_triangles = np.full(num_rays, -1, dtype='i4')
+        best_weights = np.zeros((num_rays, 2), dtype='f8')
+
+        # Zero components would turn into NaN slabs for origins lying on the slab plane
+        safe_directions = np.where(np.abs(directions) < 1e-30, np.copysign(1e-30, directions), directions)
+        inverse_directions = 1.0 / safe_directions
+        rays = np.arange(num_rays) if len(self.triangles) > 0 else np.zeros(0, dtype=np.int64)
+        nodes = np.zeros(len(rays), dtype=np.int64)
+        while len(rays) > 0:
+            near = (self.node_minext[nodes] - origins[rays]) * inverse_directions[rays]
+            far = (self.node_maxext[nodes] - origins[rays]) * inverse_directions[rays]
+            entry = np.minimum(near, far).max(axis=1)
+            leave = np.maximum(near, far).min(axis=1)
+            hit = (entry <= leave) & (leave >= 0.0) & (entry <= best_distances[rays])
+            rays, nodes = rays[hit], nodes[hit]
+
+            leaf = self.node_child[nodes] < 0
+            if leaf.any():
+                pairs, triangles = self.__ExpandLeaves(rays[leaf], nodes[leaf])
+                distances, u, v = BVH.IntersectTriangles(origins[pairs], directions[pairs], *self.__GetCorners(triangles))
+                closer = np.flatnonzero(distances < best_distances[pairs])
+                nearest = closer[BVH.__GetNearest(pairs[closer], distances[closer])]
+                pairs = pairs[nearest]
+                best_distances[pairs] = distances[nearest]
+                best_triangles[pairs] = triangles[nearest]
+                best_weights[pairs] = np.column_stack([u[nearest], v[nearest]])
+
+            rays, nodes = self.__Descend(rays[~leaf], nodes[~leaf])
+
+        found = best_triangles >= 0
+        distances = np.where(found, best_distances, np.inf)
+        barycentrics = np.column_stack([1.0 - best_weights.sum(axis=1), best_weights])
+        points = np.where(found[:, np.newaxis], origins + directions * np.where(found, distances, 0.0)[:, np.newaxis], np.nan)
+        return TriangleHits(best_triangles, distances, np.where(found[:, np.newaxis], barycentrics, 0.0), points)
+
+    def ClosestPoints(self, points: np.ndarray, max_distance: float = np.inf) -> TriangleHits:
+        """
+        Finds the closest point on the mesh surface to each query point
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Nx3 query points
+        max_distance : float
+            Surface further than this from the query point is ignored
+
+        Returns
+        -------
+        TriangleHits with euclidean distances, closest surface points and their barycentrics
+        """
+        points = np.asarray(points, dtype='f8').reshape(-1, 3)
+        num_points = len(points)
+        best_squared = np.full(num_points, max_distance ** 2, dtype='f8')
+        # Upper bound of the closest distance, every node box holds a triangle no further than its farthest corner
+        bounds = best_squared.copy()
+        best_triangles = np.full(num_points, -1, dtype='i4')
+        best_points = np.full((num_points, 3), np.nan, dtype='f8')
+        best_weights = np.zeros((num_points, 3), dtype='f8')
+
+        queries = np.arange(num_points) if len(self.triangles) > 0 else np.zeros(0, dtype=np.int64)
+        nodes = np.zeros(len(queries), dtype=np.int64)
+        while len(queries) > 0:
+            minext = self.node_minext[nodes]
+            maxext = self.node_maxext[nodes]
+            positions = points[queries]
+            outside = np.maximum(np.maximum(minext - positions, positions - maxext), 0.0)
+            farthest = np.maximum(np.abs(positions - minext), np.abs(positions - maxext))
+            np.minimum.at(bounds, queries, (farthest * farthest).sum(axis=1) * (1.0 + 1e-6))
+            near = (outside * outside).sum(axis=1) <= bounds[queries]
+            queries, nodes = queries[near], nodes[near]
+
+            leaf = self.node_child[nodes] < 0
+            if leaf.any():
+                pairs, triangles = self.__ExpandLeaves(queries[leaf], nodes[leaf])
+                closest, weights = BVH.ClosestPointsOnTriangles(points[pairs], *self.__GetCorners(triangles))
+                squared = ((closest - points[pairs]) ** 2).sum(axis=1)
+                closer = np.flatnonzero(squared <= best_squared[pairs])
+                nearest = closer[BVH.__GetNearest(pairs[closer], squared[closer])]
+                pairs = pairs[nearest]
+                best_squared[pairs] = squared[nearest]
+                best_triangles[pairs] = triangles[nearest]
+                best_points[pairs] = closest[nearest]
+                best_weights[pairs] = weights[nearest]
+                np.minimum.at(bounds, pairs, best_squared[pairs])
+
+            queries, nodes = self.__Descend(queries[~leaf], nodes[~leaf])
+
+        found = best_triangles >= 0
+        return TriangleHits(best_triangles, np.where(found, np.sqrt(best_squared), np.inf), best_weights, best_points)
+
+    @staticmethod
+    def IntersectTriangles(origins: np.ndarray, directions: np.ndarray, v0: np.ndarray, v1: np.ndarray, v2: np.ndarray) -> tuple:
+        """
+        Intersects rays with triangles pairwise using Moller-Trumbore test
+
+        Returns
+        -------
+        Tuple of ray parameters, inf where the ray misses, and barycentric u, v of the hits
+        """
+        edge1 = v1 - v0
+        edge2 = v2 - v0
+        p = BVH.__Cross(directions, edge2)
+        determinants = (edge1 * p).sum(axis=1)
+        valid = np.abs(determinants) > PARALLEL_EPSILON
+        inverse = 1.0 / np.where(valid, determinants, 1.0)
+        offsets = origins - v0
+        u = (offsets * p).sum(axis=1) * inverse
+        q = BVH.__Cross(offsets, edge1)
+        v = (directions * q).sum(axis=1) * inverse
+        distances = (edge2 * q).sum(axis=1) * inverse
+        valid &= (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (distances >= 0.0)
+        return np.where(valid, distances, np.inf), u, v
+
+    @staticmethod
+    def ClosestPointsOnTriangles(points: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> tuple:
+        """
+        Finds closest points on triangles to points pairwise by Voronoi region classification
+
+        Returns
+        -------
+        Tuple of Nx3 closest points and Nx3 barycentric weights of triangle corners
+        """
+        ab = b - a
+        ac = c - a
+        ap = points - a
+        bp = points - b
+        cp = points - c
+        d1 = (ab * ap).sum(axis=1)
+        d2 = (ac * ap).sum(axis=1)
+        d3 = (ab * bp).sum(axis=1)
+        d4 = (ac * bp).sum(axis=1)
+        d5 = (ab * cp).sum(axis=1)
+        d6 = (ac * cp).sum(axis=1)
+        va = d3 * d6 - d5 * d4
+        vb = d5 * d2 - d1 * d6
+        vc = d1 * d4 - d3 * d2
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            edge_ab = d1 / (d1 - d3)
+            edge_ac = d2 / (d2 - d6)
+            edge_bc = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+            area = va + vb + vc
+            face_b = vb / area
+            face_c = vc / area
+        zeros = np.zeros_like(d1)
+        ones = np.ones_like(d1)
+        conditions = [
+            (d1 <= 0.0) & (d2 <= 0.0),
+            (d3 >= 0.0) & (d4 <= d3),
+            (vc <= 0.0) & (d1 >= 0.0) & (d3 <= 0.0),
+            (d6 >= 0.0) & (d5 <= d6),
+            (vb <= 0.0) & (d2 >= 0.0) & (d6 <= 0.0),
+            (va <= 0.0) & (d4 - d3 >= 0.0) & (d5 - d6 >= 0.0),
+        ]
+        weights_b = np.select(conditions, [zeros, ones, edge_ab, zeros, zeros, 1.0 - edge_bc], face_b)
+        weights_c = np.select(conditions, [zeros, zeros, zeros, ones, edge_ac, edge_bc], face_c)
+        weights = np.column_stack([1.0 - weights_b - weights_c, weights_b, weights_c])
+        # Degenerate triangles have no interior, snap to their first corner
+        weights = np.where(np.isfinite(weights).all(axis=1)[:, np.newaxis], weights, [1.0, 0.0, 0.0])
+        closest = a * weights[:, 0:1] + b * weights[:, 1:2] + c * weights[:, 2:3]
+        return closest, weights
+
+    def __Descend(self, queries: np.ndarray, nodes: np.ndarray) -> tuple:
+        """Returns (query, node) pairs of the next traversal step below given inner nodes"""
+        if self.__descendants is None:
+            descendants = self.node_child[:, np.newaxis] + np.arange(2)
+            for _ in range(TRAVERSAL_COLLAPSE - 1):
+                inner = descendants >= 0
+                inner[inner] = self.node_child[descendants[inner]] >= 0
+                children = np.where(inner, self.node_child[np.maximum(descendants, 0)], descendants)
+                descendants = np.stack([children, np.where(inner, children + 1, -1)], axis=2).reshape(len(descendants), -1)
+            self.__descendants = descendants
+
+        descendants = self.__descendants[nodes]
+        valid = descendants >= 0
+        return np.repeat(queries, valid.sum(axis=1)), descendants[valid]
+
+    def __ExpandLeaves(self, queries: np.ndarray, leaves: np.ndarray) -> tuple:
+        """Returns (query, triangle) pairs for all triangles of given leaves"""
+        counts = self.node_count[leaves]
+        offsets = np.cumsum(counts) - counts
+        firsts = np.repeat(self.node_first[leaves] - offsets, counts)
+        return np.repeat(queries, counts), self.triangles[firsts + np.arange(len(firsts))]
+
+    def __GetCorners(self, triangles: np.ndarray) -> tuple:
+        corners = self.vertices[self.indices[triangles]].astype('f8')
+        return corners[:, 0], corners[:, 1], corners[:, 2]
+
+    @staticmethod
+    def __GetNearest(queries: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """Returns indices of the smallest distance of each query"""
+        order = np.lexsort((distances, queries))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = queries[order[1:]] != queries[order[:-1]]
+        return order[first]
+
+    @staticmethod
+    def __Cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # np.cross carries considerable overhead for the small batches of single traversal step
+        return np.column_stack([
+            a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+            a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+            a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0],
+        ])
+
+    @staticmethod
+    def __FindSplits(
+            tri_minext: np.ndarray,
+            tri_maxext: np.ndarray,
+            ids: np.ndarray,
+            bins: np.ndarray,
+            num_bins: int,
+            minext: np.ndarray,
+            maxext: np.ndarray,
+            counts: np.ndarray) -> tuple:
+        """
+        Evaluates surface area heuristic at all bin boundaries of all candidate nodes
+
+        Returns tuple of the last bin of the left child and flag whether splitting pays off, per candidate
+        """
+        num_candidates = len(counts)
+        if num_candidates == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+        keys = ids * num_bins + bins
+        bin_counts = np.bincount(keys, minlength=num_candidates * num_bins).reshape(num_candidates, num_bins)
+        bin_minext = np.full((num_candidates * num_bins, 3), np.inf, dtype=tri_minext.dtype)
+        bin_maxext = np.full((num_candidates * num_bins, 3), -np.inf, dtype=tri_maxext.dtype)
+        # Segmented reduction over sorted keys, ufunc.at is an order of magnitude slower for large levels
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        bin_minext[keys[starts]] = np.minimum.reduceat(tri_minext[order], starts, axis=0)
+        bin_maxext[keys[starts]] = np.maximum.reduceat(tri_maxext[order], starts, axis=0)
+        bin_minext = bin_minext.reshape(num_candidates, num_bins, 3)
+        bin_maxext = bin_maxext.reshape(num_candidates, num_bins, 3)
+
+        # Sweep bins from both sides, split i puts bins 0..i to the left
+        left_counts = np.cumsum(bin_counts, axis=1)[:, :-1]
+        right_counts = counts[:, np.newaxis] - left_counts
+        left_areas = BVH.__GetAreas(
+            np.minimum.accumulate(bin_minext, axis=1)[:, :-1],
+            np.maximum.accumulate(bin_maxext, axis=1)[:, :-1],
+            left_counts
+        )
+        right_areas = BVH.__GetAreas(
+            np.minimum.accumulate(bin_minext[:, ::-1], axis=1)[:, -2::-1],
+            np.maximum.accumulate(bin_maxext[:, ::-1], axis=1)[:, -2::-1],
+            right_counts
+        )
+        costs = np.where((left_counts > 0) & (right_counts > 0), left_areas * left_counts + right_areas * right_counts, np.inf)
+        best_bins = np.argmin(costs, axis=1)
+        best_costs = costs[np.arange(num_candidates), best_bins]
+
+        node_areas = np.maximum(BVH.__GetAreas(minext, maxext, counts), np.finfo('f4').tiny)
+        split_costs = TRAVERSAL_COST + best_costs / node_areas
+        accepted = np.isfinite(best_costs) & ((split_costs < counts) | (counts > MAX_LEAF_SIZE))
+        return best_bins, accepted
+
+    @staticmethod
+    def __GetAreas(minext: np.ndarray, maxext: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Returns surface areas of boxes, zero for boxes holding no triangles"""
+        with np.errstate(invalid='ignore', over='ignore'):
+            sizes = (maxext - minext).astype('f8')
+            areas = 2.0 * (sizes[..., 0] * sizes[..., 1] + sizes[..., 1] * sizes[..., 2] + sizes[..., 2] * sizes[..., 0])
+        return np.where(counts > 0, areas, 0.0)
@@ -1,30 +1,204 @@
+from enum import Enum
+import numpy as np
 from pyrr import Matrix44, Vector3
 
+from .bounds import Bounds
 from .transform import Transform
 
+class ProjectionMode(Enum):
+    # OpenGL perspective projection between near & far clip planes
+    Perspective = 0
+    # Infinite far plane perspective with depth reversed into [0, 1] range, requires float depth buffer and clip control
+    ReverseZInfinite = 1
+
 class Camera(object):
+    """
+    Perspective camera looking down the negative Z axis from its transform translation
+
+    View, projection and view projection matrices and frustum planes are cached, they are only
+    rebuilt after camera properties or its transform change. Version is incremented with every
+    such change so consumers can skip uploading unchanged matrices.
+    """
     def __init__(self):
         self.transform: Transform = Transform()
-        self.perspective: Matrix44 = Matrix44.identity()
-        self.up: Vector3 = Vector3([0.0, 1.0, 0.0])
-        self.near_clip: float = 0.001
-        self.far_clip: float = 1000000.0
-        self.fov = 60.0
-        self.aspect = 16 / 9
+        self.__up: Vector3 = Vector3([0.0, 1.0, 0.0])
+        self.__near_clip: float = 0.01
+        self.__far_clip: float = 10000.0
+        self.__fov: float = 60.0
+        self.__aspect: float = 16 / 9
+        self.__projection_mode = ProjectionMode.Perspective
+        self.__view: Matrix44 = None
+        self.__perspective: Matrix44 = None
+        self.__view_perspective: Matrix44 = None
+        self.__frustum_planes: np.ndarray = None
+        self.__transform_version = -1
+        self.__version = 0
+
+    @property
+    def up(self) -> Vector3:
+        return self.__up
+
+    @up.setter
+    def up(self, value: Vector3) -> None:
+        if not np.array_equal(value, self.__up):
+            self.__up = Vector3(value)
+            self.__view = None
+            self.__InvalidateViewPerspective()
+
+    @property
+    def near_clip(self) -> float:
+        return self.__near_clip
+
+    @near_clip.setter
+    def near_clip(self, value: float) -> None:
+        self.__SetProjectionValue('_Camera__near_clip', value)
+
+    @property
+    def far_clip(self) -> float:
+        return self.__far_clip
+
+    @far_clip.setter
+    def far_clip(self, value: float) -> None:
+        self.__SetProjectionValue('_Camera__far_clip', value)
+
+    @property
+    def fov(self) -> float:
+        return self.__fov
+
+    @fov.setter
+    def fov(self, value: float) -> None:
+        self.__SetProjectionValue('_Camera__fov', value)
+
+    @property
+    def aspect(self) -> float:
+        return self.__aspect
+
+    @aspect.setter
+    def aspect(self, value: float) -> None:
+        self.__SetProjectionValue('_Camera__aspect', value)
+
+    @property
+    def projection_mode(self) -> ProjectionMode:
+        return self.__projection_mode
+
+    @projection_mode.setter
+    def projection_mode(self, value: ProjectionMode) -> None:
+        self.__SetProjectionValue('_Camera__projection_mode', value)
+
+    @property
+    def reverse_z(self) -> bool:
+        """Whether projection maps depth reversed into [0, 1] range, see ProjectionMode"""
+        return self.__projection_mode == ProjectionMode.ReverseZInfinite
+
+    @property
+    def version(self) -> int:
+        """Counter incremented whenever any camera matrix changes"""
+        self.__ValidateView()
+        return self.__version
 
     def GetViewMatrix(self) -> Matrix44:
         """ Returns camera view transform matrix"""
-        return Matrix44.look_at(
-            self.transform.GetTranslation(),
-            self.transform.GetTranslation() + Vector3([0.0, 0.0, -10000000.0]), 
-            self.up
-        )
+        self.__ValidateView()
+        if self.__view is None:
+            position = self.transform.GetTranslation()
+            self.__view = Matrix44.look_at(position, position + Vector3([0.0, 0.0, -1.0]), self.__up).astype('f4')
+        return self.__view
 
     def GetPerspectiveMatrix(self) -> Matrix44:
         """ Returns camera perspective projection matrix"""
-        return Matrix44.perspective_projection(
-            self.fov,
-            self.aspect,
-            self.near_clip,
-            self.far_clip
-        )
\ No newline at end of file
+        if self.__perspective is None:
+            if self.reverse_z:
+                self.__perspective = Camera.CreateReverseZInfinitePerspective(self.__fov, self.__aspect, self.__near_clip)
+            else:
+                self.__perspective = Matrix44.perspective_projection(
+                    self.__fov,
+                    self.__aspect,
+                    self.__near_clip,
+                    self.__far_clip
+                ).astype('f4')
+        return self.__perspective
+
+    def GetViewPerspectiveMatrix(self) -> Matrix44:
+        """Returns combined world to clip space matrix"""
+        self.__ValidateView()
+        if self.__view_perspective is None:
+            self.__view_perspective = Matrix44(
+                np.asarray(self.GetViewMatrix(), dtype='f8') @ np.asarray(self.GetPerspectiveMatrix(), dtype='f8')
+            )
+        return self.__view_perspective
+
+    def GetFrustumPlanes(self) -> np.ndarray:
+        """Returns 6x4 world space frustum planes, see Bounds.ExtractFrustumPlanes"""
+        self.__ValidateView()
+        if self.__frustum_planes is None:
+            self.__frustum_planes = Bounds.ExtractFrustumPlanes(self.GetViewPerspectiveMatrix(), depth_zero_to_one=self.reverse_z)
+        return self.__frustum_planes
+
+    def GetRay(self, x: float, y: float) -> tuple:
+        """
+        Returns world space ray through given viewport position
+
+        Parameters
+        ----------
+        x : float
+            Horizontal normalized device coordinate, -1.0 at the left viewport edge
+        y : float
+            Vertical normalized device coordinate, -1.0 at the bottom viewport edge
+
+        Returns
+        -------
+        Tuple of ray origin at the camera position and normalized ray direction
+        """
+        # Mid depth lies inside the frustum for both standard and reversed depth ranges
+        clip = np.array([x, y, 0.5, 1.0])
+        point = clip @ np.linalg.inv(np.asarray(self.GetViewPerspectiveMatrix(), dtype='f8'))
+        origin = np.asarray(self.transform.GetTranslation(), dtype='f8')
+        direction = point[:3] / point[3] - origin
+        return origin, direction / np.linalg.norm(direction)
+
+    @staticmethod
+    def CreateReverseZInfinitePerspective(fov: float, aspect: float, near: float) -> Matrix44:
+        """
+        Creates perspective projection with infinitely distant far plane and reversed depth
+
+        Depth is 1.0 at the near plane and approaches 0.0 towards infinity, clip space depth has
+        to be configured to [0, 1] range (glClipControl) and depth tested with greater comparison.
+
+        Parameters
+        ----------
+        fov : float
+            Vertical field of view in degrees
+        aspect : float
+            Viewport width to height ratio
+        near : float
+            Near clip plane distance
+
+        Returns
+        -------
+        Float32 projection matrix, row vector convention
+        """
+        focal = 1.0 / np.tan(np.radians(fov) * 0.5)
+        return Matrix44([
+            [focal / aspect, 0.0, 0.0, 0.0],
+            [0.0, focal, 0.0, 0.0],
+            [0.0, 0.0, 0.0, -1.0],
+            [0.0, 0.0, near, 0.0],
+        ], dtype='f4')
+
+    def __SetProjectionValue(self, attribute: str, value) -> None:
+        if getattr(self, attribute) != value:
+            setattr(self, attribute, value)
+            self.__perspective = None
+            self.__InvalidateViewPerspective()
+
+    def __ValidateView(self) -> None:
+        """Drops cached view matrix when the camera transform has been modified"""
+        if self.transform.version != self.__transform_version:
+            self.__transform_version = self.transform.version
+            self.__view = None
+            self.__InvalidateViewPerspective()
+
+    def __InvalidateViewPerspective(self) -> None:
+        self.__view_perspective = None
+        self.__frustum_planes = None
+        self.__version += 1
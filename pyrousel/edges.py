@@ -0,0 +1,72 @@
+import numpy as np
+
+class EdgeExtractor(object):
+    """
+    Unique edge extraction of triangle meshes for GL_LINES wireframes
+
+    Vertices are welded by position first so attribute seams (split normals, texture
+    coordinates) neither duplicate edges nor appear as open boundaries.
+    """
+    @staticmethod
+    def ExtractEdges(vertices: np.ndarray, indices: np.ndarray, crease_angle: float = None) -> np.ndarray:
+        """
+        Returns line list of unique triangle edges
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat array of vertex positions
+        indices : np.ndarray
+            Flat array of triangle indices
+        crease_angle : float
+            Optional angle in degrees, edges whose adjacent faces meet at a smaller angle are
+            omitted, boundary and non-manifold edges are always kept
+
+        Returns
+        -------
+        Flat int32 array of line vertex index pairs into the original vertex data
+        """
+        triangles = np.asarray(indices, dtype='i4').reshape(-1, 3)
+        if len(triangles) == 0:
+            return np.zeros(0, dtype='i4')
+
+        positions = np.asarray(vertices).reshape(-1, 3)
+        _, welded = np.unique(positions, axis=0, return_inverse=True)
+        welded = welded.reshape(-1).astype('i8')
+
+        # Three edges per triangle, both as original indices and as welded vertex ids
+        corners = np.array([[0, 1], [1, 2], [2, 0]])
+        edges = triangles[:, corners].reshape(-1, 2)
+        welded_edges = np.sort(welded[edges], axis=1)
+        valid = welded_edges[:, 0] != welded_edges[:, 1]
+        keys = welded_edges[:, 0] * (welded.max() + 1) + welded_edges[:, 1]
+
+        order = np.argsort(keys, kind='stable')
+        order = order[valid[order]]
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        counts = np.diff(np.r_[starts, len(sorted_keys)])
+        first = order[starts]
+
+        if crease_angle is not None:
+            face_normals = EdgeExtractor.__ComputeFaceNormals(positions, triangles)
+            keep = counts != 2
+            # Manifold edges are shared by exactly two faces, the second one directly follows in sorted order
+            shared = starts[counts == 2]
+            cosines = np.einsum(
+                'ij,ij->i',
+                face_normals[order[shared] // 3],
+                face_normals[order[shared + 1] // 3]
+            )
+            keep[counts == 2] = cosines < np.cos(np.radians(crease_angle))
+            first = first[keep]
+
+        return edges[first].astype('i4').reshape(-1)
+
+    @staticmethod
+    def __ComputeFaceNormals(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+        """Returns Nx3 unit face normals, zero for degenerate triangles"""
+        points = positions.astype('f8')[triangles]
+        normals = np.cross(points[:, 1] - points[:, 0], points[:, 2] - points[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        return normals / np.where(lengths > 0.0, lengths, 1.0)
@@ -5,8 +5,14 @@ from dataclasses import dataclass
 from pyrr import Matrix44, Vector3, Vector4
 import moderngl as mgl
 
-from .shader import ShaderSource
-from .model import RenderModel
+from .shader import ShaderSource, ShaderVariantCache
+from .model import RenderModel, ModelGroup, INSTANCE_DTYPE
+from .material import MaterialSettings
+from .camera import Camera
+from .bounds import Bounds
+from .edges import EdgeExtractor
+from .profiler import Profiler
+from .vertexformat import VertexStream
 
 class WireframeMode(Enum):
     WireframeOff = 0
@@ -19,42 +25,175 @@ class VisualiserMode(Enum):
     ShowTexcoords = 2
     ShowColor = 3
 
-class MaterialSettings(object):
-    def __init__(self):
-        self.base_color: Vector3 = Vector3([1.0, 1.0, 1.0])
-        self.roughness = 0.5
-        self.spec_intensity = 1.0
-        self.F0 = 0.04
+class WireframeTechnique(Enum):
+    # Second draw of all triangles in polygon line mode
+    PolygonMode = 0
+    # Shaded pass draws edges from barycentric distances, wireframe only mode draws unique edge lines
+    SinglePass = 1
+
+class VertexLayout(Enum):
+    # Separate float32 buffer per attribute
+    Separate = 0
+    # Single interleaved buffer with quantized attributes, see VertexPacker
+    Packed = 1
 
 @dataclass
 class RenderHints:
     visualiser_mode = VisualiserMode.ShowDefault
     wireframe_mode = WireframeMode.WireframeShaded
     wireframe_color = Vector4([0.0, 1.0, 0.0, 1.0])
+    wireframe_technique = WireframeTechnique.SinglePass
+    # Line width in pixels of the single pass shaded overlay
+    wireframe_width = 1.0
+    # Edge lines between faces meeting at smaller angle (degrees) are omitted, None draws all edges
+    wireframe_crease_angle = None
+    # Detail level is picked so each triangle covers roughly this many pixels, see GFX.SelectLOD
+    enable_lod = True
+    lod_pixels_per_triangle = 16.0
+    # Fraction by which the model has to shrink past a level threshold before switching to coarser level
+    lod_hysteresis = 0.15
+
+# Fragment shader defines replacing lighting with debug output per visualiser mode
+VISUALISER_DEFINES = {
+    VisualiserMode.ShowNormals: 'VISUALISE_NORMALS',
+    VisualiserMode.ShowTexcoords: 'VISUALISE_TEXCOORDS',
+    VisualiserMode.ShowColor: 'VISUALISE_COLORS',
+}
+
+# Largest amount of buffer data converted & written at once, bounds temporary memory of uploads
+DEFAULT_UPLOAD_CHUNK = 4 * 1024 * 1024
+
+# Model attributes holding geometry buffer objects, see RenderModel.CreateShared
+GEOMETRY_BUFFERS = ('vertex_buffer', 'index_buffer', 'normal_buffer', 'texcoord_buffer', 'color_buffer')
+
+# Occlusion proxy boxes grow by this fraction of their largest side, faces lying on the bounds would hide their own proxy otherwise
+OCCLUSION_PROXY_PADDING = 0.01
+
+# Uniform block binding points shared by all programs
+FRAME_DATA_BINDING = 0
+MATERIAL_DATA_BINDING = 1
+
+# std140 layout of the FrameData uniform block
+FRAME_DATA_DTYPE = np.dtype([
+    ('view_transform', 'f4', (4, 4)),
+    ('perspective_transform', 'f4', (4, 4)),
+    ('view_perspective_transform', 'f4', (4, 4)),
+    ('camera_position', 'f4', 4),
+    ('light_color', 'f4', 4),
+    ('light_position', 'f4', 4),
+])
+
+# std140 layout of the MaterialData uniform block
+MATERIAL_DATA_DTYPE = np.dtype([
+    ('mat_base_color', 'f4', 4),
+    ('mat_roughness', 'f4'),
+    ('mat_spec_intensity', 'f4'),
+    ('mat_f0', 'f4'),
+    ('padding', 'f4'),
+])
+
+@dataclass
+class DrawStats:
+    draw_calls: int = 0
+    # Number of draws switching program, material or vertex buffers against the previous draw
+    program_changes: int = 0
+    material_changes: int = 0
+    buffer_changes: int = 0
+
+    @property
+    def state_changes(self) -> int:
+        return self.program_changes + self.material_changes + self.buffer_changes
 
 class GFX(object):
-    def __init__(self, ctx: mgl.Context):
+    def __init__(self, ctx: mgl.Context, vertex_layout: VertexLayout = VertexLayout.Packed):
         self.__ctx = ctx
+        self.vertex_layout = vertex_layout
         self.__ctx.enable(mgl.DEPTH_TEST)
         self.__ctx.enable(mgl.BLEND)
         self.__ctx.blend_func = (mgl.SRC_ALPHA, mgl.ONE_MINUS_SRC_ALPHA)
+
+        # Per frame camera & light state and active material are shared by all programs via uniform buffers
+        self.__frame_data = np.zeros(1, dtype=FRAME_DATA_DTYPE)
+        self.__frame_buffer = self.__ctx.buffer(reserve=FRAME_DATA_DTYPE.itemsize)
+        self.__material_data = np.zeros(1, dtype=MATERIAL_DATA_DTYPE)
+        self.__material_buffer = self.__ctx.buffer(reserve=MATERIAL_DATA_DTYPE.itemsize)
+        self.__material_key = None
+        self.__frame_dirty = True
+        # Camera and its version whose matrices are uploaded, see SetCamera
+        self.__camera: Camera = None
+        self.__camera_version = -1
+        self.__frustum_planes: np.ndarray = None
+        # Depth reversed into [0, 1] clip range, see SetReverseZ
+        self.reverse_z = False
+        # Disabled by default, see Profiler.SetEnabled
+        self.profiler = Profiler(ctx)
+        # Draw calls & state changes since the last ResetDrawStats
+        self.draw_stats = DrawStats()
+        # Program and vertex buffer of the previous draw, geometry uniforms are only written when either changes
+        self.__draw_program = None
+        self.__draw_geometry = None
+
         self.view_matrix: Matrix44 = Matrix44.identity().astype('float32')
         self.perspective_matrix: Matrix44  = Matrix44.identity().astype('float32')
+        self.__light_value: Vector3 = None
+        self.__light_position: Vector3 = None
         self.light_value = Vector3([1,1,1])
         self.light_position = Vector3([1000, 1000, 1000])
+        self.__UpdateFrameData()
+
+        # Default programs are compiled per define set on first use, see GetShaderDefines
+        shaders = importlib.resources.files('pyrousel.resources.shaders')
+        self.shaded_variants = ShaderVariantCache(
+            ShaderSource.LoadFromFile(shaders.joinpath('default.vs'), shaders.joinpath('default.fs')),
+            self.CompileShaderProgram
+        )
+
+        # Shaded programs with wireframe overlay computed from triangle edge distances
+        self.overlay_variants = ShaderVariantCache(
+            ShaderSource.LoadFromFile(
+                shaders.joinpath('default.vs'),
+                shaders.joinpath('default.fs'),
+                shaders.joinpath('wireframe_overlay.gs')
+            ),
+            self.CompileShaderProgram
+        )
 
-        def_shader_src = ShaderSource.LoadFromFile(
-            importlib.resources.files('pyrousel.resources.shaders').joinpath('default.vs'), 
-            importlib.resources.files('pyrousel.resources.shaders').joinpath('default.fs')
+        self.wire_variants = ShaderVariantCache(
+            ShaderSource.LoadFromFile(shaders.joinpath('wireframe.vs'), shaders.joinpath('wireframe.fs')),
+            self.CompileShaderProgram
         )
 
-        def_wireshader_src = ShaderSource.LoadFromFile(
-            importlib.resources.files('pyrousel.resources.shaders').joinpath('wireframe.vs'), 
-            importlib.resources.files('pyrousel.resources.shaders').joinpath('wireframe.fs')
+        # Scaled scene upscaled to the window, bilinear or with SHARPEN define, see BlitScaled
+        self.upscale_variants = ShaderVariantCache(
+            ShaderSource.LoadFromFile(shaders.joinpath('upscale.vs'), shaders.joinpath('upscale.fs')),
+            self.CompileShaderProgram
         )
+        self.__blit_arrays: dict = {}
+
+        self.def_shader = self.shaded_variants.GetProgram()
+        self.def_wire_shader = self.wire_variants.GetProgram()
+        # Instanced variant sources model transform from per instance attributes
+        self.def_instanced_wire_shader = self.wire_variants.GetProgram({'INSTANCED': None})
+
+        # Single element buffers sourcing constant values of attributes missing from the model
+        self.__constant_buffers = {
+            'normal_buffer': ('3f/r', self.__ctx.buffer(np.array([1.0, 1.0, 1.0], dtype='f4'))),
+            'texcoord_buffer': ('2f/r', self.__ctx.buffer(np.array([0.0, 0.0], dtype='f4'))),
+            'color_buffer': ('3f/r', self.__ctx.buffer(np.array([1.0, 1.0, 1.0], dtype='f4'))),
+        }
 
-        self.def_shader = self.CompileShaderProgram(def_shader_src)
-        self.def_wire_shader = self.CompileShaderProgram(def_wireshader_src)
+        # Unit cube drawn as bounding box proxy for occlusion queries, see RenderOcclusionProxy
+        cube_vertices = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype='f4')
+        cube_indices = np.array([
+            0, 1, 3, 0, 3, 2, 4, 6, 7, 4, 7, 5,
+            0, 4, 5, 0, 5, 1, 2, 3, 7, 2, 7, 6,
+            0, 2, 6, 0, 6, 4, 1, 5, 7, 1, 7, 3,
+        ], dtype='i4')
+        self.__proxy_array = self.__ctx.vertex_array(
+            self.def_wire_shader,
+            [(self.__ctx.buffer(cube_vertices), '3f', 'in_position')],
+            index_buffer=self.__ctx.buffer(cube_indices)
+        )
 
     def GetContext(self) -> mgl.Context:
         """
@@ -62,17 +201,203 @@ class GFX(object):
         """
         return self.__ctx
 
+    @property
+    def light_value(self) -> Vector3:
+        return self.__light_value
+
+    @light_value.setter
+    def light_value(self, value: Vector3) -> None:
+        if np.array_equal(value, self.__light_value):
+            return
+        self.__light_value = value
+        self.__frame_data['light_color'][0, :3] = value
+        self.__frame_dirty = True
+
+    @property
+    def light_position(self) -> Vector3:
+        return self.__light_position
+
+    @light_position.setter
+    def light_position(self, value: Vector3) -> None:
+        if np.array_equal(value, self.__light_position):
+            return
+        self.__light_position = value
+        self.__frame_data['light_position'][0, :3] = value
+        self.__frame_dirty = True
+
+    def GetCameraPosition(self) -> Vector3:
+        """Returns world space camera position of the active view transform"""
+        return Vector3(self.__frame_data['camera_position'][0, :3])
+
+    def GetViewPerspectiveMatrix(self) -> Matrix44:
+        """Returns combined world to clip space transform of the active view & perspective matrices"""
+        return Matrix44(self.__frame_data['view_perspective_transform'][0])
+
+    def GetFrustumPlanes(self) -> np.ndarray:
+        """Returns 6x4 world space frustum planes of the active view & perspective matrices"""
+        if self.__frustum_planes is None:
+            self.__frustum_planes = Bounds.ExtractFrustumPlanes(self.GetViewPerspectiveMatrix(), self.reverse_z)
+        return self.__frustum_planes
+
     def SetViewMatrix(self, viewmat: Matrix44):
         """
-        Updates active view transform matrix
+        Updates active view transform matrix and per frame uniform buffer
         """
         self.view_matrix = viewmat.astype('float32')
+        self.__frame_data['camera_position'][0, :3] = np.linalg.inv(self.view_matrix)[3, :3]
+        self.__camera = None
+        self.__UpdateFrameData()
 
     def SetPerspectiveMatrix(self, perspmat: Matrix44):
         """
-        Updates active view perspective projection matrix
+        Updates active view perspective projection matrix and per frame uniform buffer
         """
         self.perspective_matrix = perspmat.astype('float32')
+        self.__camera = None
+        self.__UpdateFrameData()
+
+    def SetCamera(self, camera: Camera) -> None:
+        """
+        Makes given camera active, matrices are uploaded only when the camera changed since last call
+
+        Depth mode is switched to match the camera projection, see SetReverseZ
+        """
+        if camera is self.__camera and camera.version == self.__camera_version:
+            return
+
+        if camera.reverse_z != self.reverse_z:
+            self.SetReverseZ(camera.reverse_z)
+
+        self.view_matrix = camera.GetViewMatrix()
+        self.perspective_matrix = camera.GetPerspectiveMatrix()
+        self.__frame_data['camera_position'][0, :3] = camera.transform.GetTranslation()
+        self.__UpdateFrameData()
+        self.__frustum_planes = camera.GetFrustumPlanes()
+        self.__camera = camera
+        self.__camera_version = camera.version
+
+    def SetReverseZ(self, enabled: bool) -> None:
+        """
+        Switches between standard and reversed depth
+
+        Reversed depth maps clip space depth into [0, 1] range, clears depth to 0.0 and keeps
+        fragments with greater depth. Best used with float depth buffer, see CreateRenderTarget.
+
+        Parameters
+        ----------
+        enabled : bool
+            Reverse depth, raises when the context does not support clip control
+        """
+        if enabled and not self.IsReverseZSupported():
+            raise Exception('Reverse-Z requires OpenGL 4.5 or ARB_clip_control, invalid!')
+
+        # ModernGL does not expose clip control, PyOpenGL calls into the same current context
+        from OpenGL import GL
+        GL.glClipControl(GL.GL_LOWER_LEFT, GL.GL_ZERO_TO_ONE if enabled else GL.GL_NEGATIVE_ONE_TO_ONE)
+        self.__ctx.depth_func = '>' if enabled else '<'
+        self.reverse_z = enabled
+        self.__camera = None
+        self.__frustum_planes = None
+
+    def IsReverseZSupported(self) -> bool:
+        """Returns whether the context can map clip space depth into [0, 1] range"""
+        return self.__ctx.version_code >= 450 or 'GL_ARB_clip_control' in self.__ctx.extensions
+
+    def GetClearDepth(self) -> float:
+        """Returns depth value of the farthest point for the active depth mode"""
+        return 0.0 if self.reverse_z else 1.0
+
+    def CreateRenderTarget(self, size: tuple, samples: int = 0, float_depth: bool = False, sampled: bool = False) -> mgl.Framebuffer:
+        """
+        Creates offscreen framebuffer with RGBA8 color and depth attachments
+
+        Parameters
+        ----------
+        size : tuple
+            Width & height in pixels
+        samples : int
+            Multisample anti-aliasing samples
+        float_depth : bool
+            Use 32 bit float depth instead of 24 bit normalized depth, keeps reversed depth precise
+        sampled : bool
+            Color is bilinearly filtered texture which can be read by shaders, see BlitScaled
+
+        Returns
+        -------
+        Framebuffer object, owner is responsible for releasing it
+        """
+        if sampled:
+            if samples > 0:
+                raise Exception('Multisampled render target can not be sampled!')
+            color = self.__ctx.texture(size, 4)
+            color.filter = (mgl.LINEAR, mgl.LINEAR)
+            color.repeat_x = False
+            color.repeat_y = False
+        else:
+            color = self.__ctx.renderbuffer(size, samples=samples)
+        if not float_depth:
+            return self.__ctx.framebuffer(color_attachments=[color], depth_attachment=self.__ctx.depth_renderbuffer(size, samples=samples))
+
+        # ModernGL always allocates 24 bit depth, storage of the renderbuffer is respecified as float
+        from OpenGL import GL
+        depth = self.__ctx.depth_renderbuffer(size, samples=samples)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, depth.glo)
+        if samples > 0:
+            GL.glRenderbufferStorageMultisample(GL.GL_RENDERBUFFER, samples, GL.GL_DEPTH_COMPONENT32F, *size)
+        else:
+            GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH_COMPONENT32F, *size)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+        return self.__ctx.framebuffer(color_attachments=[color], depth_attachment=depth)
+
+    def BlitScaled(self, texture: mgl.Texture, region: tuple, sharpness: float = 0.0) -> None:
+        """
+        Stretches lower left region of the texture over the viewport of the bound framebuffer
+
+        Parameters
+        ----------
+        texture : mgl.Texture
+            Source texture, e.g. color of sampled render target
+        region : tuple
+            Width & height in texels of the region to stretch
+        sharpness : float
+            Strength of the sharpening (0.0 - 1.0) applied after bilinear upscale, 0.0 disables it
+        """
+        program = self.upscale_variants.GetProgram({'SHARPEN': None} if sharpness > 0.0 else None)
+        if program.glo not in self.__blit_arrays:
+            self.__blit_arrays[program.glo] = self.__ctx.vertex_array(program, [])
+        program['region_size'] = tuple(float(value) for value in region)
+        if sharpness > 0.0:
+            program['sharpness'] = float(sharpness)
+
+        texture.use(0)
+        self.__ctx.disable(mgl.DEPTH_TEST | mgl.BLEND)
+        self.__blit_arrays[program.glo].render(mgl.TRIANGLES, vertices=3)
+        self.__ctx.enable(mgl.DEPTH_TEST | mgl.BLEND)
+
+    def __UpdateFrameData(self) -> None:
+        """Uploads per frame uniform block data"""
+        frame_data = self.__frame_data[0]
+        frame_data['view_transform'] = self.view_matrix
+        frame_data['perspective_transform'] = self.perspective_matrix
+        frame_data['view_perspective_transform'] = np.asarray(self.view_matrix, dtype='f8') @ self.perspective_matrix
+        self.__frustum_planes = None
+        self.__frame_buffer.write(self.__frame_data)
+        self.__frame_dirty = False
+
+    def __UpdateMaterialData(self, material: MaterialSettings) -> None:
+        """Uploads material uniform block data when material settings differ from uploaded ones"""
+        key = material.GetKey()
+        if key == self.__material_key:
+            return
+        self.draw_stats.material_changes += 1
+
+        material_data = self.__material_data[0]
+        material_data['mat_base_color'][:3] = material.base_color
+        material_data['mat_roughness'] = material.roughness
+        material_data['mat_spec_intensity'] = material.spec_intensity
+        material_data['mat_f0'] = material.F0
+        self.__material_buffer.write(self.__material_data)
+        self.__material_key = key
 
     def CompileShaderProgram(self, shader: ShaderSource) -> mgl.Program:
         """
@@ -89,7 +414,16 @@ class GFX(object):
         -------
         OpenGL object representation of compiled shader program
         """
-        return self.GetContext().program(shader.vertex_source, shader.fragment_source)
+        program = self.GetContext().program(
+            vertex_shader=shader.vertex_source,
+            fragment_shader=shader.fragment_source,
+            geometry_shader=shader.geometry_source
+        )
+        if 'FrameData' in program:
+            program['FrameData'].binding = FRAME_DATA_BINDING
+        if 'MaterialData' in program:
+            program['MaterialData'].binding = MATERIAL_DATA_BINDING
+        return program
 
     def ClearScreen(self, red: float, green: float, blue: float) -> None:
         """
@@ -106,46 +440,357 @@ class GFX(object):
         blue : float
             Blue channel color value
         """
-        self.GetContext().clear(red, green, blue)
+        self.GetContext().clear(red, green, blue, depth=self.GetClearDepth())
 
     def GenModelBuffers(self, model: RenderModel):
         """
         Generates given model buffers objects (vertex, index, etc.)
 
+        Buffers are reserved up front and filled in bounded chunks converted straight from
+        the model arrays, see ModelUpload.
+
         Parameters
         ----------
         model : RenderModel
             Model to generate buffers for
         """
+        upload = self.BeginModelUpload(model)
+        upload.Step(upload.total_bytes)
+
+    def BeginModelUpload(self, model: RenderModel) -> 'ModelUpload':
+        """
+        Allocates given model buffers objects and returns upload which fills them incrementally
+
+        Buffers and their vertex layout are assigned to the model only once the upload completes,
+        model which is already drawable keeps drawing its previous buffers until then. Previous
+        buffers owned by the model are released on completion. See ModelUpload.Step for uploading
+        the data within fixed byte budget.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model to generate buffers for
 
-        # Geometry vertices & triangle indices are required
-        model.vertex_buffer = self.GetContext().buffer(model.vertices)
-        model.index_buffer = self.GetContext().buffer(model.indices)
+        Returns
+        -------
+        ModelUpload tracking the buffer data transfer
+        """
+        if self.vertex_layout is VertexLayout.Packed:
+            buffer_data, layout = self.__PackModelBuffers(model)
+        else:
+            buffer_data, layout = self.__SeparateModelBuffers(model)
 
         # Geometry data such as normals, texture coordinates, etc. are optional
-        # When such data is not available we generated placeholder data to make
+        # When such data is not available we source constant value instead to make
         # sure our model remains compatible with our shading pipepline.
-        if len(model.normals) > 0:
-            model.normal_buffer = self.GetContext().buffer(model.normals)
+        sourced = set(attrib for attribs, _ in buffer_data for attrib in attribs)
+        for attrib, (fmt, buffer) in self.__constant_buffers.items():
+            if attrib not in sourced:
+                name = attrib.replace('_buffer', '')
+                layout['vertex_format'].append((attrib, fmt, f'in_{name}'))
+                layout[attrib] = buffer
+
+        return ModelUpload(self.GetContext(), model, buffer_data, self.__OnModelBuffersUploaded, layout=layout)
+
+    def __SeparateModelBuffers(self, model: RenderModel) -> tuple:
+        """Sets up separate float32 buffer per attribute, returns buffer data to upload and model layout attributes"""
+        buffer_data = [
+            (['vertex_buffer'], StreamSource.FromArrays([model.vertices], 'f4')),
+            (['index_buffer'], StreamSource.FromArrays(GFX.__GetLODIndices(model), 'i4')),
+        ]
+        layout = {
+            'vertex_format': [('vertex_buffer', '3f', 'in_position')],
+            'position_format': '3f',
+            'index_element_size': 4,
+            'position_offset': Vector3([0.0, 0.0, 0.0]),
+            'position_scale': Vector3([1.0, 1.0, 1.0]),
+            'octahedral_normals': False,
+        }
+
+        for attrib, data, fmt in [
+                ('normal_buffer', model.normals, '3f'),
+                ('texcoord_buffer', model.texcoords, '2f'),
+                ('color_buffer', model.colors, '3f')]:
+            if len(data) > 0:
+                name = attrib.replace('_buffer', '')
+                # 8-bit colors are sourced as normalized bytes rather than widened to floats
+                if np.asarray(data).dtype == np.uint8:
+                    fmt = '3f1 x1'
+                    source = StreamSource(len(data) // 3, 4, lambda first, count, data=data: GFX.__PadColors(data, first, count))
+                else:
+                    source = StreamSource.FromArrays([data], 'f4')
+                buffer_data.append(([attrib], source))
+                layout['vertex_format'].append((attrib, fmt, f'in_{name}'))
+
+        return buffer_data, layout
+
+    def __PackModelBuffers(self, model: RenderModel) -> tuple:
+        """Sets up single interleaved packed buffer, returns buffer data to upload and model layout attributes"""
+        aabb = model.GetAABB()
+        stream = VertexStream(
+            model.vertices,
+            normals=model.normals,
+            texcoords=model.texcoords,
+            colors=model.colors,
+            minext=aabb.minext,
+            maxext=aabb.maxext
+        )
+
+        attribs = [attrib.replace('in_', '') + '_buffer' for attrib in stream.attributes]
+        attribs[0] = 'vertex_buffer'
+        layout = {
+            'vertex_format': [('vertex_buffer', stream.format, *stream.attributes)],
+            'position_format': stream.position_format,
+            'index_element_size': np.dtype(stream.index_type).itemsize,
+            'position_offset': stream.position_offset,
+            'position_scale': stream.position_scale,
+            'octahedral_normals': 'in_normal' in stream.attributes,
+        }
+
+        return [
+            (attribs, StreamSource(stream.num_vertices, stream.dtype.itemsize, stream.Pack)),
+            (['index_buffer'], StreamSource.FromArrays(GFX.__GetLODIndices(model), stream.index_type)),
+        ], layout
+
+    @staticmethod
+    def __PadColors(colors: np.ndarray, first: int, count: int) -> np.ndarray:
+        """Returns Nx4 bytes of given 8-bit RGB color range, padded to keep vertices 4 byte aligned"""
+        padded = np.full((count, 4), 255, dtype='u1')
+        padded[:, :3] = colors.reshape(-1, 3)[first:first + count]
+        return padded
+
+    @staticmethod
+    def __GetLODIndices(model: RenderModel) -> list:
+        """Returns full detail indices followed by all simplified level indices, assigns level offsets"""
+        first_index = len(model.indices)
+        for lod in model.lods:
+            lod.first_index = first_index
+            first_index += len(lod.indices)
+        model.lod_index = 0
+        return [model.indices] + [lod.indices for lod in model.lods]
+
+    def __OnModelBuffersUploaded(self, model: RenderModel, previous: list = None) -> None:
+        """Validates freshly uploaded model buffers, releases given replaced buffers and builds vertex arrays for default passes"""
+        self.__ValidateModelBuffers(model)
+        self.ReleaseVertexArrays(model)
+        if previous is not None:
+            self.__ReleaseGeometryBuffers(model, previous)
+        self.UpdateInstanceBuffer(model)
+        # Edges are derived from the index data which might have changed
+        if model.edge_buffer is not None:
+            model.edge_buffer.release()
+            model.edge_buffer = None
+            model.edge_crease_angle = None
+
+        if model.shader is not None:
+            self.GetVertexArray(model, model.shader, 'shaded')
+            self.GetVertexArray(model, self.GetWireProgram(model), 'wire')
         else:
-            size = len(model.vertices)
-            dummy_normals = np.array([1.0] * size, dtype='f4')
-            model.normal_buffer = self.GetContext().buffer(dummy_normals)
+            self.GetVertexArray(model, self.GetModelProgram(model, VisualiserMode.ShowDefault), 'shaded')
+            self.GetVertexArray(model, self.GetModelProgram(model, VisualiserMode.ShowDefault, overlay=True), 'shaded')
+
+    def GetShaderDefines(self, model: RenderModel, visualiser_mode: VisualiserMode, overlay: bool = False) -> dict:
+        """
+        Returns preprocessor defines selecting default program variant for given model
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model to draw, its vertex attributes and instancing decide the vertex stage variant
+        visualiser_mode : VisualiserMode
+            Debug visualisation, lighting is only compiled into the default mode variant
+        overlay : bool
+            Draw wireframe over the shaded triangles within the same pass
 
+        Returns
+        -------
+        Dictionary of define names, all defines are flags without value
+        """
+        defines = {}
+        if model.is_instanced:
+            defines['INSTANCED'] = None
+        if len(model.normals) > 0:
+            defines['HAS_NORMALS'] = None
+            if model.octahedral_normals:
+                defines['OCTAHEDRAL_NORMALS'] = None
         if len(model.texcoords) > 0:
-            model.texcoord_buffer = self.GetContext().buffer(model.texcoords)
-        else:
-            size = int((len(model.vertices) / 3) * 2)
-            dummy_texcoords = np.array([0.0] * size, dtype='f4')
-            model.texcoord_buffer = self.GetContext().buffer(dummy_texcoords)
-        
+            defines['HAS_TEXCOORDS'] = None
         if len(model.colors) > 0:
-            model.color_buffer = self.GetContext().buffer(model.colors)
-        else:
-            size = len(model.vertices)
-            dummy_colors = np.array([1.0] * size, dtype='f4')
-            model.color_buffer = self.GetContext().buffer(dummy_colors)
-        self.__ValidateModelBuffers(model)
+            defines['HAS_COLORS'] = None
+        if visualiser_mode in VISUALISER_DEFINES:
+            defines[VISUALISER_DEFINES[visualiser_mode]] = None
+        if overlay:
+            defines['WIREFRAME_OVERLAY'] = None
+        return defines
+
+    def GetModelProgram(self, model: RenderModel, visualiser_mode: VisualiserMode, overlay: bool = False) -> mgl.Program:
+        """Returns program drawing shaded model, either its own shader or matching default variant"""
+        if model.shader is not None:
+            return model.shader
+        variants = self.overlay_variants if overlay else self.shaded_variants
+        return variants.GetProgram(self.GetShaderDefines(model, visualiser_mode, overlay))
+
+    def GetWireProgram(self, model: RenderModel) -> mgl.Program:
+        """Returns position only program drawing model wireframe"""
+        return self.def_instanced_wire_shader if model.is_instanced else self.def_wire_shader
+
+    def GetVertexArray(self, model: RenderModel, program: mgl.Program, layout: str) -> mgl.VertexArray:
+        """
+        Returns cached vertex array binding given model buffers to the shader program
+
+        Vertex arrays are cached on the model per (program, attribute layout) and created on first use.
+        Cache is reset whenever model buffers are regenerated, see ReleaseVertexArrays.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model owning the vertex and index buffers
+        program : mgl.Program
+            Shader program the vertex array is bound to
+        layout : str
+            Attribute layout, either 'shaded' (all attributes), 'wire' (positions only) or 'edges'
+            (positions indexed by the model edge buffer, see UpdateEdgeBuffer), instanced programs
+            additionally source the model instance buffer
+
+        Returns
+        -------
+        Vertex array ready to render
+        """
+        key = (program.glo, layout)
+        vertex_array = model.vertex_arrays.get(key)
+        if vertex_array is None:
+            if layout in ('wire', 'edges'):
+                attribs = [(model.vertex_buffer, model.position_format, 'in_position')]
+            else:
+                attribs = [(getattr(model, attrib), fmt, *names) for attrib, fmt, *names in model.vertex_format]
+
+            # Instanced programs step through the per instance buffer once per drawn instance
+            if model.instance_buffer is not None and 'in_instance_transform' in program:
+                if 'in_instance_color' in program:
+                    attribs.append((model.instance_buffer, '16f 4f/i', 'in_instance_transform', 'in_instance_color'))
+                else:
+                    attribs.append((model.instance_buffer, '16f 16x/i', 'in_instance_transform'))
+
+            # Program variants compile out attributes they do not read, those are skipped
+            edges = layout == 'edges'
+            vertex_array = self.GetContext().vertex_array(
+                program,
+                attribs,
+                index_buffer=model.edge_buffer if edges else model.index_buffer,
+                index_element_size=4 if edges else model.index_element_size,
+                skip_errors=True
+            )
+            model.vertex_arrays[key] = vertex_array
+
+        return vertex_array
+
+    def ReleaseVertexArrays(self, model: RenderModel) -> None:
+        """Releases all cached vertex arrays of given model, required after changing its shader"""
+        for vertex_array in model.vertex_arrays.values():
+            vertex_array.release()
+        model.vertex_arrays.clear()
+
+    def ReleaseModelBuffers(self, model: RenderModel) -> None:
+        """
+        Releases given model vertex arrays and buffer objects
+
+        Shared constant attribute buffers and buffers of the model buffer source are left intact.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model to release GPU resources of, model has to be regenerated before drawing again
+        """
+        self.ReleaseVertexArrays(model)
+        if model.edge_buffer is not None:
+            model.edge_buffer.release()
+            model.edge_buffer = None
+            model.edge_ranges = []
+            model.edge_crease_angle = None
+        if model.instance_buffer is not None:
+            model.instance_buffer.release()
+            model.instance_buffer = None
+            model.instance_dirty_range = None if model.instance_data is None else (0, len(model.instance_data))
+
+        buffers = GFX.__GetGeometryBuffers(model)
+        for attrib in GEOMETRY_BUFFERS:
+            setattr(model, attrib, None)
+        self.__ReleaseGeometryBuffers(model, buffers)
+
+    def __ReleaseGeometryBuffers(self, model: RenderModel, buffers: list) -> None:
+        """Releases given geometry buffers of the model except shared ones and the ones still assigned to it"""
+        shared = set(buffer.glo for _, buffer in self.__constant_buffers.values())
+        # Buffers taken over from the buffer source are released along with the source
+        if model.buffer_source is not None:
+            shared.update(buffer.glo for buffer in GFX.__GetGeometryBuffers(model.buffer_source) if buffer is not None)
+        shared.update(buffer.glo for buffer in GFX.__GetGeometryBuffers(model) if buffer is not None)
+        for buffer in buffers:
+            if buffer is None or buffer.glo in shared:
+                continue
+            shared.add(buffer.glo)
+            buffer.release()
+        # Released handles get reused by new buffers, uniforms written for them are stale
+        self.__draw_geometry = None
+
+    @staticmethod
+    def __GetGeometryBuffers(model: RenderModel) -> list:
+        return [getattr(model, attrib) for attrib in GEOMETRY_BUFFERS]
+
+    def ShareModelBuffers(self, model: RenderModel) -> None:
+        """
+        Points given model at the uploaded geometry buffers of its buffer source, see RenderModel.CreateShared
+
+        Vertex arrays, instance and edge buffers remain per model.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model sharing geometry of its buffer source, the source buffers have to be generated
+        """
+        source = model.buffer_source
+        if source is None or source.vertex_buffer is None:
+            raise Exception('Model buffer source invalid!')
+
+        for attrib in GEOMETRY_BUFFERS:
+            setattr(model, attrib, getattr(source, attrib))
+        model.vertex_format = list(source.vertex_format)
+        model.position_format = source.position_format
+        model.index_element_size = source.index_element_size
+        model.position_offset = source.position_offset
+        model.position_scale = source.position_scale
+        model.octahedral_normals = source.octahedral_normals
+        model.lod_index = 0
+        self.__OnModelBuffersUploaded(model)
+
+    def ReleaseGroupBuffers(self, group: ModelGroup) -> None:
+        """Releases vertex arrays and buffer objects of all group models, see ReleaseModelBuffers"""
+        # Models sharing buffers go first, buffer sources release the shared buffers
+        for model in sorted(group.models, key=lambda model: model.buffer_source is None):
+            self.ReleaseModelBuffers(model)
+
+    def BeginGroupUpload(self, group: ModelGroup) -> 'GroupUpload':
+        """
+        Allocates buffers of all group models and returns upload which fills them incrementally
+
+        Only models owning their geometry are uploaded, models sharing geometry take over
+        the buffers of their source once the whole group is uploaded.
+
+        Parameters
+        ----------
+        group : ModelGroup
+            Group of models to generate buffers for
+
+        Returns
+        -------
+        GroupUpload tracking the buffer data transfer
+        """
+        uploads = [self.BeginModelUpload(model) for model in group.models if model.buffer_source is None]
+        return GroupUpload(group, uploads, self.__OnGroupBuffersUploaded, self.ReleaseModelBuffers)
+
+    def __OnGroupBuffersUploaded(self, group: ModelGroup) -> None:
+        for model in group.models:
+            if model.buffer_source is not None:
+                self.ShareModelBuffers(model)
 
     def __ValidateModelBuffers(self, model: RenderModel) -> None:
         if model.vertex_buffer is None:
@@ -159,17 +804,215 @@ class GFX(object):
         if model.color_buffer is None:
             raise Exception('Invalid color  buffer handle!')
 
+    def UpdateInstanceBuffer(self, model: RenderModel) -> None:
+        """
+        Uploads modified range of given model instance data
+
+        Instance buffer is only reallocated when instance count outgrows it, in which case
+        vertex arrays referencing the previous buffer are released.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Instanced model, see RenderModel.SetInstances
+        """
+        if model.instance_data is None or model.instance_dirty_range is None:
+            return
+
+        data = model.instance_data
+        if model.instance_buffer is None or model.instance_buffer.size < max(data.nbytes, INSTANCE_DTYPE.itemsize):
+            if model.instance_buffer is not None:
+                model.instance_buffer.release()
+            self.ReleaseVertexArrays(model)
+            model.instance_buffer = self.GetContext().buffer(reserve=max(data.nbytes, INSTANCE_DTYPE.itemsize), dynamic=True)
+            first, end = 0, len(data)
+        else:
+            first, end = model.instance_dirty_range
+
+        if end > first:
+            model.instance_buffer.write(data[first:end], offset=first * INSTANCE_DTYPE.itemsize)
+        model.instance_dirty_range = None
+
+    def UpdateEdgeBuffer(self, model: RenderModel, crease_angle: float = None) -> None:
+        """
+        Builds line list buffer of unique model edges for every detail level, see EdgeExtractor
+
+        Buffer is only rebuilt when missing or when the crease angle differs from the one it was built with.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model with generated buffers
+        crease_angle : float
+            Edges between faces meeting at smaller angle in degrees are omitted, None keeps all edges
+        """
+        if model.edge_buffer is not None and model.edge_crease_angle == crease_angle:
+            return
+
+        levels = [model.indices] + [lod.indices for lod in model.lods]
+        lines = [EdgeExtractor.ExtractEdges(model.vertices, indices, crease_angle) for indices in levels]
+        offsets = np.cumsum([0] + [len(level) for level in lines])
+        model.edge_ranges = [(int(first), len(level)) for first, level in zip(offsets, lines)]
+        data = np.concatenate(lines).astype('i4')
+
+        # Vertex arrays reference the edge buffer object, drop them so they get rebuilt
+        for key in [key for key in model.vertex_arrays if key[1] == 'edges']:
+            model.vertex_arrays.pop(key).release()
+        if model.edge_buffer is not None:
+            model.edge_buffer.release()
+        # Empty buffers are not allowed, lines of a point mesh are never drawn anyway
+        model.edge_buffer = self.GetContext().buffer(data if len(data) > 0 else np.zeros(2, dtype='i4'))
+        model.edge_crease_angle = crease_angle
+
+    def SelectLOD(self, model: RenderModel, hints: RenderHints) -> int:
+        """
+        Selects given model detail level from the projected screen size of its bounding sphere
+
+        Coarsest level whose triangles each still cover at most lod_pixels_per_triangle of the
+        projected bounds is picked. Switching to coarser level is delayed until the model shrinks
+        by lod_hysteresis past the level threshold, which avoids popping back and forth.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model to select detail level for, selection is stored in model.lod_index
+        hints : RenderHints
+            LOD selection settings
+
+        Returns
+        -------
+        Selected detail level, 0 being the full detail
+        """
+        if not hints.enable_lod or len(model.lods) == 0:
+            model.lod_index = 0
+            return model.lod_index
+
+        # Projected diameter of the bounding sphere in pixels, instances share the level of the largest one
+        if model.is_instanced:
+            # Instance transforms apply before the model transform
+            sphere = model.GetBoundingSphere()
+            centers, radii = Bounds.TransformSpheres(sphere.center, sphere.radius, model.instance_data['transform'])
+            model_matrix = np.asarray(model.transform.GetMatrixView(), dtype='f8')
+            centers = centers @ model_matrix[:3, :3] + model_matrix[3, :3]
+            radii = radii * np.sqrt((model_matrix[:3, :3] ** 2).sum(axis=1)).max()
+        else:
+            sphere = model.GetWorldBoundingSphere()
+            centers, radii = np.asarray(sphere.center).reshape(1, 3), np.array([sphere.radius])
+        distances = np.linalg.norm(centers - self.__frame_data['camera_position'][0, :3], axis=1)
+        viewport_height = self.GetContext().viewport[3]
+        if len(distances) == 0 or np.any(distances <= radii):
+            screen_size = np.inf
+        else:
+            screen_size = np.max(radii / distances) * self.perspective_matrix[1, 1] * viewport_height
+
+        # Size in pixels up to which each level is detailed enough
+        num_triangles = [len(model.indices) // 3] + [lod.num_triangles for lod in model.lods]
+        thresholds = np.sqrt(np.asarray(num_triangles, dtype='f8') * hints.lod_pixels_per_triangle)
+        thresholds[0] = np.inf
+
+        current = min(model.lod_index, len(model.lods))
+        coarser = int(np.count_nonzero(screen_size <= thresholds * (1.0 - hints.lod_hysteresis))) - 1
+        if coarser > current:
+            model.lod_index = coarser
+        elif screen_size > thresholds[current]:
+            model.lod_index = int(np.count_nonzero(screen_size <= thresholds)) - 1
+        else:
+            model.lod_index = current
+
+        return model.lod_index
+
+    def ResetDrawStats(self) -> None:
+        """Restarts counting draw calls & state changes, typically at the start of a frame"""
+        self.draw_stats = DrawStats()
+        self.__draw_program = None
+        self.__draw_geometry = None
+
+    def GetDrawKey(self, model: RenderModel, hints: RenderHints, material: MaterialSettings) -> tuple:
+        """
+        Returns key ordering draws of given model by (program, material, vertex buffers)
+
+        Drawing models sorted by their keys keeps consecutive draws on the same program, material
+        and geometry, which minimises program switches, material uploads and uniform writes.
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model with generated buffers
+        hints : RenderHints
+            Flags defining rendering behaviour, select the program
+        material : MaterialSettings
+            Material used for models without their own material
+
+        Returns
+        -------
+        Tuple of program handle, material key and vertex buffer handle
+        """
+        if hints.wireframe_mode is WireframeMode.WireframeOnly:
+            program = self.GetWireProgram(model)
+        else:
+            program = self.GetModelProgram(model, hints.visualiser_mode, GFX.__IsOverlayDrawn(model, hints))
+        material = model.material if model.material is not None else material
+        geometry = model.vertex_buffer.glo if model.vertex_buffer is not None else 0
+        return program.glo, material.GetKey(), geometry
+
+    def __CountDraw(self, program: mgl.Program, model: RenderModel) -> bool:
+        """Counts draw call and state changes, returns whether model geometry uniforms of the program are outdated"""
+        geometry = model.vertex_buffer.glo if model is not None else None
+        stats = self.draw_stats
+        stats.draw_calls += 1
+        stats.program_changes += program.glo != self.__draw_program
+        stats.buffer_changes += geometry != self.__draw_geometry
+        outdated = program.glo != self.__draw_program or geometry != self.__draw_geometry
+        self.__draw_program = program.glo
+        self.__draw_geometry = geometry
+        return outdated
+
+    @staticmethod
+    def __IsOverlayDrawn(model: RenderModel, hints: RenderHints) -> bool:
+        """Returns whether wireframe is drawn by the overlay geometry shader within the shaded pass"""
+        # Custom shaders can not be combined with the wireframe overlay geometry shader
+        single_pass = hints.wireframe_technique is WireframeTechnique.SinglePass and model.shader is None
+        return single_pass and hints.wireframe_mode is WireframeMode.WireframeShaded
+
+    def GetLODRange(self, model: RenderModel) -> tuple:
+        """Returns (first index, index count) of given model active detail level within its index buffer"""
+        if model.lod_index == 0 or model.lod_index > len(model.lods):
+            return 0, len(model.indices)
+        lod = model.lods[model.lod_index - 1]
+        return lod.first_index, len(lod.indices)
+
     def RenderModel(self, model: RenderModel, hints: RenderHints, material: MaterialSettings) -> None:
         if model is None:
             return
+
+        if model.num_instances == 0:
+            return
+
+        self.UpdateInstanceBuffer(model)
+        self.SelectLOD(model, hints)
+
+        # Light values might have been updated since camera matrices
+        if self.__frame_dirty:
+            self.__frame_buffer.write(self.__frame_data)
+            self.__frame_dirty = False
+
+        self.__frame_buffer.bind_to_uniform_block(FRAME_DATA_BINDING)
+        self.__material_buffer.bind_to_uniform_block(MATERIAL_DATA_BINDING)
         
-        if hints.wireframe_mode is not WireframeMode.WireframeOnly :
-            self.__DrawModel(model, hints, material)
+        # Custom shaders can not be combined with the wireframe overlay geometry shader
+        single_pass = hints.wireframe_technique is WireframeTechnique.SinglePass and model.shader is None
+        shaded = hints.wireframe_mode is not WireframeMode.WireframeOnly
+        wire = hints.wireframe_mode is WireframeMode.WireframeOnly or hints.wireframe_mode is WireframeMode.WireframeShaded
+
+        if shaded:
+            self.__DrawModel(model, hints, model.material if model.material is not None else material, overlay=wire and single_pass)
 
-        if hints.wireframe_mode is WireframeMode.WireframeOnly or hints.wireframe_mode is  WireframeMode.WireframeShaded:
+        if wire and not shaded and single_pass:
+            self.__DrawModelEdges(model, hints)
+        elif wire and not single_pass:
             self.__DrawModelWire(model, hints.wireframe_color)
 
-    def __DrawModel(self, model: RenderModel, hints: RenderHints, material: MaterialSettings) -> None:
+    def __DrawModel(self, model: RenderModel, hints: RenderHints, material: MaterialSettings, overlay: bool = False) -> None:
         """
         Draws given model to the screen
 
@@ -187,43 +1030,38 @@ class GFX(object):
             Model to draw to screen
         hints: RenderHints
             Flags defining rendering behaviour
+        overlay : bool
+            Draw wireframe over the shaded triangles within the same pass
         """
-        transform = model.transform.GetMatrix()
-
-        # Vertex attribute layout (pos, normal)
-        attribs = [
-            (model.vertex_buffer, '3f', 'in_position'),
-            (model.normal_buffer, '3f', 'in_normal'),
-            (model.texcoord_buffer, '2f', 'in_texcoord'),
-            (model.color_buffer, '3f', 'in_color')
-        ]
+        transform = model.transform.GetMatrixView()
+        shader_program = self.GetModelProgram(model, hints.visualiser_mode, overlay)
 
-        shader_program = self.def_shader
+        # Vertex attribute layout (pos, normal, texcoord, color)
+        renderable = self.GetVertexArray(model, shader_program, 'shaded')
+        renderable.program['model_transform'].write(transform)
+        if self.__CountDraw(shader_program, model):
+            renderable.program['position_offset'] = model.position_offset
+            renderable.program['position_scale'] = model.position_scale
         if model.shader is not None:
-            shader_program = model.shader
-
-        renderable = self.GetContext().vertex_array(
-            shader_program,
-            attribs,
-            index_buffer=model.index_buffer
-        )
-        
-        renderable.program['model_transform'].write(transform.tobytes())
-        renderable.program['view_transform'].write(self.view_matrix.tobytes())
-        renderable.program['perspective_transform'].write(self.perspective_matrix.tobytes())
-        renderable.program['visualise_normals'] = float(hints.visualiser_mode == VisualiserMode.ShowNormals)
-        renderable.program['visualise_texcoords'] = float(hints.visualiser_mode == VisualiserMode.ShowTexcoords)
-        renderable.program['visualise_colors'] = float(hints.visualiser_mode == VisualiserMode.ShowColor)
-        renderable.program['light_color'] = self.light_value
-        renderable.program['light_position'] = self.light_position
-        renderable.program['mat_base_color'] = material.base_color
-        renderable.program['mat_roughness'] = material.roughness
-        renderable.program['mat_spec_intensity'] = material.spec_intensity
-        renderable.program['mat_f0'] = material.F0
+            # Custom shaders select normal decoding & visualisation at runtime
+            for name, value in [
+                    ('octahedral_normals', float(model.octahedral_normals)),
+                    ('visualise_normals', float(hints.visualiser_mode == VisualiserMode.ShowNormals)),
+                    ('visualise_texcoords', float(hints.visualiser_mode == VisualiserMode.ShowTexcoords)),
+                    ('visualise_colors', float(hints.visualiser_mode == VisualiserMode.ShowColor))]:
+                if name in shader_program:
+                    shader_program[name] = value
+        if overlay:
+            renderable.program['viewport_size'] = tuple(self.GetContext().viewport[2:])
+            renderable.program['wire_color'] = tuple(hints.wireframe_color)
+            renderable.program['wire_width'] = hints.wireframe_width
+        self.__UpdateMaterialData(material)
         
         self.GetContext().wireframe = False
         self.GetContext().polygon_offset = (0,0)
-        renderable.render()
+        first, count = self.GetLODRange(model)
+        with self.profiler.GPUScope('shaded'):
+            renderable.render(vertices=count, first=first, instances=model.num_instances)
 
     def __DrawModelWire(self, model: RenderModel, color: Vector4) -> None:
         """
@@ -241,27 +1079,86 @@ class GFX(object):
         coloe : Vector3
             Color (RGBA) of the wireframe lines
         """
-        mat = model.transform.GetMatrix()
-
-        # Vertex attribute layout (pos, normal)
-        attribs = [
-            (model.vertex_buffer, '3f', 'in_position'),
-        ]
+        mat = model.transform.GetMatrixView()
 
-        renderable = self.GetContext().vertex_array(
-            self.def_wire_shader,
-            attribs,
-            index_buffer=model.index_buffer
-        )
-
-        renderable.program['model_transform'].write(mat.tobytes())
-        renderable.program['view_transform'].write(self.view_matrix.tobytes())
-        renderable.program['perspective_transform'].write(self.perspective_matrix.tobytes())
+        # Vertex attribute layout (pos)
+        wire_program = self.GetWireProgram(model)
+        renderable = self.GetVertexArray(model, wire_program, 'wire')
+        renderable.program['model_transform'].write(mat)
+        if self.__CountDraw(wire_program, model):
+            renderable.program['position_offset'] = model.position_offset
+            renderable.program['position_scale'] = model.position_scale
         renderable.program['color'] = color
 
         self.GetContext().wireframe = True
-        self.GetContext().polygon_offset = (-10,-10)
-        renderable.render()
+        # Pull lines towards the camera, that is towards greater depth when depth is reversed
+        offset = 10 if self.reverse_z else -10
+        self.GetContext().polygon_offset = (offset, offset)
+        first, count = self.GetLODRange(model)
+        with self.profiler.GPUScope('wireframe'):
+            renderable.render(vertices=count, first=first, instances=model.num_instances)
+
+    def __DrawModelEdges(self, model: RenderModel, hints: RenderHints) -> None:
+        """
+        Draws unique edges of given model active detail level as lines
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model with generated buffers, edge buffer is built on first use
+        hints : RenderHints
+            Wireframe color & crease angle
+        """
+        self.UpdateEdgeBuffer(model, hints.wireframe_crease_angle)
+        first, count = model.edge_ranges[min(model.lod_index, len(model.edge_ranges) - 1)]
+        if count == 0:
+            return
+
+        wire_program = self.GetWireProgram(model)
+        renderable = self.GetVertexArray(model, wire_program, 'edges')
+        renderable.program['model_transform'].write(model.transform.GetMatrixView())
+        if self.__CountDraw(wire_program, model):
+            renderable.program['position_offset'] = model.position_offset
+            renderable.program['position_scale'] = model.position_scale
+        renderable.program['color'] = hints.wireframe_color
+
+        self.GetContext().wireframe = False
+        self.GetContext().polygon_offset = (0, 0)
+        with self.profiler.GPUScope('wireframe'):
+            renderable.render(mgl.LINES, vertices=count, first=first, instances=model.num_instances)
+
+    def RenderOcclusionProxy(self, minext: Vector3, maxext: Vector3, query: 'OcclusionQuery') -> None:
+        """
+        Draws slightly padded world space box within given occlusion query without writing color or depth
+
+        Parameters
+        ----------
+        minext : Vector3
+            World space box minimum extends
+        maxext : Vector3
+            World space box maximum extends
+        query : OcclusionQuery
+            Samples passed query of visible box fragments
+        """
+        program = self.def_wire_shader
+        self.__CountDraw(program, None)
+        program['model_transform'].write(Matrix44.identity().astype('f4').tobytes())
+        size = np.asarray(maxext, dtype='f8') - np.asarray(minext, dtype='f8')
+        padding = size.max() * OCCLUSION_PROXY_PADDING
+        program['position_offset'] = tuple(np.asarray(minext, dtype='f8') - padding)
+        program['position_scale'] = tuple(size + padding * 2.0)
+        self.__frame_buffer.bind_to_uniform_block(FRAME_DATA_BINDING)
+
+        fbo = self.GetContext().fbo
+        color_mask, depth_mask = fbo.color_mask, fbo.depth_mask
+        fbo.color_mask = (False, False, False, False)
+        fbo.depth_mask = False
+        self.GetContext().wireframe = False
+        self.GetContext().polygon_offset = (0, 0)
+        with self.profiler.GPUScope('occlusion'), query:
+            self.__proxy_array.render()
+        fbo.color_mask = color_mask
+        fbo.depth_mask = depth_mask
 
     def PrintDeviceInfo(self) -> None:
         """
@@ -278,3 +1175,270 @@ class GFX(object):
         print(f'Vendor: {vendor}')
         print(f'Version: {version}')
         print(f'Version Code: {version_code}\n')
+
+class OcclusionQuery(object):
+    """
+    Any samples passed query whose result can be read without waiting for the GPU
+
+    ModernGL queries neither expose their names nor result availability and reading their
+    samples blocks until the GPU finished them, the query is therefore issued through PyOpenGL
+    on the current context. Conditional rendering does not wait for the result either.
+    """
+    def __init__(self):
+        from OpenGL import GL
+        self.glo = int(GL.glGenQueries(1)[0])
+        # Whether the query was issued and its result was not read yet
+        self.pending = False
+        self.crender = _ConditionalRender(self)
+
+    def __enter__(self):
+        from OpenGL import GL
+        GL.glBeginQuery(GL.GL_ANY_SAMPLES_PASSED, self.glo)
+        return self
+
+    def __exit__(self, *args):
+        from OpenGL import GL
+        GL.glEndQuery(GL.GL_ANY_SAMPLES_PASSED)
+        self.pending = True
+        return False
+
+    def GetResult(self) -> bool:
+        """
+        Returns whether any samples passed, None when the result is not available yet
+
+        Result of each issued query is returned only once.
+        """
+        from OpenGL import GL
+        if not self.pending or not GL.glGetQueryObjectiv(self.glo, GL.GL_QUERY_RESULT_AVAILABLE):
+            return None
+        self.pending = False
+        return bool(GL.glGetQueryObjectuiv(self.glo, GL.GL_QUERY_RESULT))
+
+    def Release(self) -> None:
+        from OpenGL import GL
+        GL.glDeleteQueries(1, [self.glo])
+        self.glo = 0
+
+class _ConditionalRender(object):
+    """Draws commands within it only when query of the previous issue passed any samples"""
+    def __init__(self, query: OcclusionQuery):
+        self.__query = query
+
+    def __enter__(self):
+        from OpenGL import GL
+        GL.glBeginConditionalRender(self.__query.glo, GL.GL_QUERY_NO_WAIT)
+        return self
+
+    def __exit__(self, *args):
+        from OpenGL import GL
+        GL.glEndConditionalRender()
+        return False
+
+class StreamSource(object):
+    """
+    Data of single GPU buffer produced on request in ranges of whole elements
+
+    Ranges are converted from the source data only while being uploaded, so full size
+    copy of the buffer contents never has to be held in memory, see ModelUpload.
+    """
+    def __init__(self, num_elements: int, element_size: int, read):
+        """
+        Parameters
+        ----------
+        num_elements : int
+            Number of elements (vertices, indices) in the buffer
+        element_size : int
+            Size of single element in bytes
+        read : callable
+            Function taking first element and element count, returning contiguous array of the range
+        """
+        self.num_elements = num_elements
+        self.element_size = element_size
+        self.nbytes = num_elements * element_size
+        self.__read = read
+
+    def Read(self, first: int, count: int) -> np.ndarray:
+        """Returns contiguous array of elements [first, first + count)"""
+        return np.ascontiguousarray(self.__read(first, count))
+
+    @staticmethod
+    def FromArrays(arrays: list, dtype: str) -> 'StreamSource':
+        """
+        Returns source of given flat arrays concatenated and cast to dtype
+
+        Ranges within single array already of the target type are returned as views
+        without copying.
+        """
+        arrays = [np.asarray(array).reshape(-1) for array in arrays]
+        ends = np.cumsum([len(array) for array in arrays], dtype='i8')
+        starts = ends - [len(array) for array in arrays]
+
+        def Read(first, count):
+            end = first + count
+            parts = []
+            for array, start, stop in zip(arrays, starts, ends):
+                if stop <= first or start >= end:
+                    continue
+                parts.append(array[max(first - start, 0):min(end, stop) - start].astype(dtype, copy=False))
+            if len(parts) == 1:
+                return parts[0]
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+        return StreamSource(int(ends[-1]) if len(ends) > 0 else 0, np.dtype(dtype).itemsize, Read)
+
+class ModelUpload(object):
+    """
+    Incremental transfer of model data into GPU buffers, see GFX.BeginModelUpload
+
+    Buffers are reserved up front and written at increasing offsets, each write converts at
+    most chunk_size bytes of the source data.
+    """
+    def __init__(self, ctx: mgl.Context, model: RenderModel, buffer_data: list, on_complete=None, chunk_size: int = DEFAULT_UPLOAD_CHUNK, layout: dict = None):
+        self.model: RenderModel = model
+        self.total_bytes: int = 0
+        self.uploaded_bytes: int = 0
+        self.chunk_size: int = chunk_size
+        # Called with the model and its replaced geometry buffers once the upload completes
+        self.__on_complete = on_complete
+        # Model attributes describing the new buffers, assigned along with them
+        self.__layout = layout if layout is not None else {}
+        self.__pending = []
+        self.__buffers = []
+
+        for attribs, source in buffer_data:
+            if not isinstance(source, StreamSource):
+                source = StreamSource.FromArrays([source], np.asarray(source).dtype)
+            # Zero sized buffers are invalid, keep them one element large
+            buffer = ctx.buffer(reserve=max(source.nbytes, source.element_size))
+            self.__buffers.append((attribs, buffer))
+            self.__pending.append((buffer, source, 0))
+            self.total_bytes += source.nbytes
+
+    def GetProgress(self) -> float:
+        """Returns normalised (0.0 - 1.0) upload progress"""
+        if self.total_bytes == 0:
+            return 1.0
+        return self.uploaded_bytes / self.total_bytes
+
+    def IsDone(self) -> bool:
+        """Returns true when all the data has been uploaded"""
+        return len(self.__pending) == 0
+
+    def Step(self, budget: int) -> bool:
+        """
+        Uploads next portion of the model data
+
+        Model buffers and layout are assigned and validated once last portion of data is uploaded.
+
+        Parameters
+        ----------
+        budget : int
+            Maximum number of bytes to upload during this step
+
+        Returns
+        -------
+        True when the upload has completed
+        """
+        while self.__pending and budget > 0:
+            buffer, source, offset = self.__pending[0]
+            size = min(budget, self.chunk_size, source.nbytes - offset)
+            if size > 0:
+                # Budget may split elements, convert all elements the byte range touches
+                first = offset // source.element_size
+                end = -(-(offset + size) // source.element_size)
+                chunk = source.Read(first, end - first).reshape(-1).view('u1')
+                skip = offset - first * source.element_size
+                buffer.write(chunk[skip:skip + size], offset=offset)
+            offset += size
+            budget -= size
+            self.uploaded_bytes += size
+
+            if offset < source.nbytes:
+                self.__pending[0] = (buffer, source, offset)
+            else:
+                self.__pending.pop(0)
+
+        if not self.__pending and self.__buffers:
+            previous = [getattr(self.model, attrib) for attrib in GEOMETRY_BUFFERS]
+            for attrib, value in self.__layout.items():
+                setattr(self.model, attrib, value)
+            for attribs, buffer in self.__buffers:
+                for attrib in attribs:
+                    setattr(self.model, attrib, buffer)
+            self.__buffers = []
+            if self.__on_complete is not None:
+                self.__on_complete(self.model, previous)
+
+        return self.IsDone()
+
+    def Release(self) -> None:
+        """Aborts the upload and releases buffers which were not assigned to the model yet"""
+        for _, buffer in self.__buffers:
+            buffer.release()
+        self.__buffers = []
+        self.__pending = []
+
+class GroupUpload(object):
+    """
+    Incremental transfer of all models within a group, see GFX.BeginGroupUpload
+
+    Model uploads run one after another within the budget of each step.
+    """
+    def __init__(self, group: ModelGroup, uploads: list, on_complete=None, release_model=None):
+        self.group: ModelGroup = group
+        self.total_bytes: int = sum(upload.total_bytes for upload in uploads)
+        self.__uploads: list[ModelUpload] = uploads
+        self.__on_complete = on_complete
+        # Releases buffers of models uploaded before the group upload got aborted
+        self.__release_model = release_model
+        self.__completed = False
+
+    @property
+    def uploaded_bytes(self) -> int:
+        return sum(upload.uploaded_bytes for upload in self.__uploads)
+
+    def GetProgress(self) -> float:
+        """Returns normalised (0.0 - 1.0) upload progress"""
+        if self.total_bytes == 0:
+            return 1.0
+        return self.uploaded_bytes / self.total_bytes
+
+    def IsDone(self) -> bool:
+        """Returns true when all the data has been uploaded"""
+        return all(upload.IsDone() for upload in self.__uploads)
+
+    def Step(self, budget: int) -> bool:
+        """
+        Uploads next portion of the group data
+
+        Parameters
+        ----------
+        budget : int
+            Maximum number of bytes to upload during this step
+
+        Returns
+        -------
+        True when the upload has completed
+        """
+        for upload in self.__uploads:
+            if budget <= 0:
+                break
+            if upload.IsDone():
+                continue
+            uploaded_bytes = upload.uploaded_bytes
+            upload.Step(budget)
+            budget -= upload.uploaded_bytes - uploaded_bytes
+
+        if self.IsDone() and not self.__completed:
+            self.__completed = True
+            if self.__on_complete is not None:
+                self.__on_complete(self.group)
+
+        return self.IsDone()
+
+    def Release(self) -> None:
+        """Aborts the upload and releases buffers of all models which were not handed over yet"""
+        for upload in self.__uploads:
+            if upload.IsDone() and not self.__completed and self.__release_model is not None:
+                self.__release_model(upload.model)
+            upload.Release()
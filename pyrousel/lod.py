@@ -0,0 +1,226 @@
+import numpy as np
+from dataclasses import dataclass
+
+from .meshopt import MeshOptimizer
+
+# Triangle ratios of generated detail levels relative to the full resolution mesh
+DEFAULT_LOD_RATIOS = (0.5, 0.25, 0.125, 0.0625)
+
+# Boundary edges are kept in place by perpendicular planes weighted by this factor
+_BOUNDARY_WEIGHT = 10.0
+# Collapses rotating triangle normals beyond this cosine are rejected
+_MIN_NORMAL_COSINE = 0.2
+
+@dataclass
+class LODLevel:
+    # Triangle indices into the full resolution vertex data
+    indices: np.ndarray
+    # Offset of the level indices within the model index buffer, assigned on upload
+    first_index: int = 0
+
+    @property
+    def num_triangles(self) -> int:
+        return len(self.indices) // 3
+
+class MeshSimplifier(object):
+    """
+    Quadric error metric mesh simplification (Garland & Heckbert 1997)
+
+    Uses half-edge collapses, vertices are only ever merged into existing vertices so all detail
+    levels index the full resolution vertex data and only differ in their index buffers.
+    Collapses are applied in batches of independent cheapest edges which keeps each pass vectorized.
+    """
+    @staticmethod
+    def GenerateLODs(
+            vertices: np.ndarray,
+            indices: np.ndarray,
+            ratios: tuple = DEFAULT_LOD_RATIOS,
+            optimize: bool = False) -> list:
+        """
+        Generates chain of simplified index arrays
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat array of vertex positions
+        indices : np.ndarray
+            Flat array of triangle indices
+        ratios : tuple
+            Target triangle ratios relative to the input mesh, levels which fail to simplify
+            meaningfully below the previous level are omitted
+        optimize : bool
+            Reorder triangles of each level for vertex cache locality
+
+        Returns
+        -------
+        List of flat index arrays ordered from the most to the least detailed level
+        """
+        positions = np.asarray(vertices, dtype='f8').reshape(-1, 3)
+        triangles = np.asarray(indices, dtype='i4').reshape(-1, 3)
+        targets = [int(len(triangles) * ratio) for ratio in sorted(ratios, reverse=True) if 0.0 < ratio < 1.0]
+
+        levels = []
+        previous = len(triangles)
+        for level in MeshSimplifier.Simplify(positions, triangles, targets):
+            # Levels which barely reduce the triangle count are not worth switching to
+            if len(level) == 0 or len(level) > previous * 0.9:
+                continue
+            if optimize:
+                level, _ = MeshOptimizer.OptimizeVertexCache(level, len(positions))
+            levels.append(level.ravel())
+            previous = len(level)
+
+        return levels
+
+    @staticmethod
+    def Simplify(vertices: np.ndarray, indices: np.ndarray, targets: list) -> list:
+        """
+        Simplifies mesh down to given triangle counts
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Vx3 vertex positions
+        indices : np.ndarray
+            Nx3 triangle indices
+        targets : list
+            Descending target triangle counts
+
+        Returns
+        -------
+        List of Nx3 index arrays, one per target, each as close to its target as topology allows
+        """
+        quadrics = MeshSimplifier.__ComputeQuadrics(vertices, indices)
+        homogeneous = np.hstack([vertices, np.ones((len(vertices), 1))])
+        num_vertices = len(vertices)
+        triangles = indices
+        # Directed collapses (source * num_vertices + destination) which folded triangles
+        rejected = np.array([], dtype=np.int64)
+        levels = []
+
+        for target in targets:
+            while len(triangles) > target:
+                edges, locked = MeshSimplifier.__ComputeEdges(triangles, num_vertices)
+
+                # Cost of moving either endpoint onto the other, locked vertices can not move
+                combined = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+                costs = np.stack([
+                    np.einsum('ei,eij,ej->e', homogeneous[edges[:, 1]], combined, homogeneous[edges[:, 1]]),
+                    np.einsum('ei,eij,ej->e', homogeneous[edges[:, 0]], combined, homogeneous[edges[:, 0]]),
+                ], axis=1)
+                costs[locked[edges]] = np.inf
+                costs[np.isin(edges[:, 0] * num_vertices + edges[:, 1], rejected), 0] = np.inf
+                costs[np.isin(edges[:, 1] * num_vertices + edges[:, 0], rejected), 1] = np.inf
+                reverse = costs[:, 1] < costs[:, 0]
+                sources = np.where(reverse, edges[:, 1], edges[:, 0])
+                destinations = np.where(reverse, edges[:, 0], edges[:, 1])
+                cost = np.minimum(costs[:, 0], costs[:, 1])
+
+                valid = np.flatnonzero(np.isfinite(cost))
+                if len(valid) == 0:
+                    break
+                selected = valid[MeshSimplifier.__SelectIndependentEdges(edges[valid], cost[valid], num_vertices)]
+
+                # Each interior collapse removes two triangles
+                needed = max((len(triangles) - target + 1) // 2, 1)
+                selected = selected[np.argsort(cost[selected], kind='stable')[:needed]]
+
+                remap, folded = MeshSimplifier.__RejectFlips(vertices, triangles, sources[selected], destinations[selected])
+                rejected = np.union1d(rejected, sources[selected][folded] * num_vertices + destinations[selected][folded])
+
+                collapsed = np.flatnonzero(remap != np.arange(num_vertices))
+                quadrics[remap[collapsed]] += quadrics[collapsed]
+                triangles = remap[triangles]
+                triangles = triangles[
+                    (triangles[:, 0] != triangles[:, 1]) &
+                    (triangles[:, 1] != triangles[:, 2]) &
+                    (triangles[:, 0] != triangles[:, 2])
+                ]
+
+            levels.append(triangles)
+
+        return levels
+
+    @staticmethod
+    def __ComputeQuadrics(vertices: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """Returns Vx4x4 area weighted plane quadrics including boundary constraint planes"""
+        corners = vertices[indices]
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        areas = np.linalg.norm(normals, axis=1)
+        normals = np.divide(normals, areas[:, None], out=np.zeros_like(normals), where=areas[:, None] > 0.0)
+        planes = np.hstack([normals, -np.einsum('ij,ij->i', normals, corners[:, 0])[:, None]])
+        face_quadrics = np.einsum('fi,fj->fij', planes, planes) * (areas * 0.5)[:, None, None]
+
+        quadrics = np.zeros((len(vertices), 4, 4))
+        for corner in range(3):
+            np.add.at(quadrics, indices[:, corner], face_quadrics)
+
+        # Planes perpendicular to boundary edges penalize moving boundary vertices off the boundary
+        edges = np.concatenate([indices[:, [0, 1]], indices[:, [1, 2]], indices[:, [2, 0]]])
+        faces = np.tile(np.arange(len(indices)), 3)
+        keys = np.sort(edges, axis=1)
+        _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+        boundary = counts[inverse.ravel()] == 1
+        if np.any(boundary):
+            edges, faces = edges[boundary], faces[boundary]
+            start, end = vertices[edges[:, 0]], vertices[edges[:, 1]]
+            edge_normals = np.cross(end - start, normals[faces])
+            lengths = np.linalg.norm(edge_normals, axis=1)
+            edge_normals = np.divide(edge_normals, lengths[:, None], out=np.zeros_like(edge_normals), where=lengths[:, None] > 0.0)
+            edge_planes = np.hstack([edge_normals, -np.einsum('ij,ij->i', edge_normals, start)[:, None]])
+            edge_quadrics = np.einsum('fi,fj->fij', edge_planes, edge_planes)
+            edge_quadrics *= (np.linalg.norm(end - start, axis=1) ** 2 * _BOUNDARY_WEIGHT)[:, None, None]
+            np.add.at(quadrics, edges[:, 0], edge_quadrics)
+            np.add.at(quadrics, edges[:, 1], edge_quadrics)
+
+        return quadrics
+
+    @staticmethod
+    def __ComputeEdges(indices: np.ndarray, num_vertices: int) -> tuple:
+        """Returns unique Ex2 edges and per vertex flags of vertices on boundary or non-manifold edges"""
+        edges = np.sort(np.concatenate([indices[:, [0, 1]], indices[:, [1, 2]], indices[:, [2, 0]]]), axis=1)
+        edges, counts = np.unique(edges, axis=0, return_counts=True)
+        locked = np.zeros(num_vertices, dtype=bool)
+        locked[edges[counts != 2].ravel()] = True
+        return edges, locked
+
+    @staticmethod
+    def __SelectIndependentEdges(edges: np.ndarray, cost: np.ndarray, num_vertices: int) -> np.ndarray:
+        """Returns indices of edges which are the cheapest among all edges sharing either of their vertices"""
+        rank = np.empty(len(cost), dtype=np.int64)
+        rank[np.argsort(cost, kind='stable')] = np.arange(len(cost))
+        vertex_rank = np.full(num_vertices, len(cost), dtype=np.int64)
+        np.minimum.at(vertex_rank, edges[:, 0], rank)
+        np.minimum.at(vertex_rank, edges[:, 1], rank)
+        return np.flatnonzero((vertex_rank[edges[:, 0]] == rank) & (vertex_rank[edges[:, 1]] == rank))
+
+    @staticmethod
+    def __RejectFlips(vertices: np.ndarray, indices: np.ndarray, sources: np.ndarray, destinations: np.ndarray) -> tuple:
+        """
+        Returns tuple of (vertex remap, rejected collapse flags) of given collapses without those folding over triangles
+
+        All collapses moving any vertex of a folded triangle are rejected as it is not known which of them caused the fold.
+        """
+        corners = vertices[indices]
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        rejected = np.zeros(len(sources), dtype=bool)
+
+        while True:
+            remap = np.arange(len(vertices))
+            remap[sources[~rejected]] = destinations[~rejected]
+            collapsed = remap[indices]
+            moved = np.any(collapsed != indices, axis=1)
+            moved &= (collapsed[:, 0] != collapsed[:, 1]) & (collapsed[:, 1] != collapsed[:, 2]) & (collapsed[:, 0] != collapsed[:, 2])
+
+            new_corners = vertices[collapsed[moved]]
+            new_normals = np.cross(new_corners[:, 1] - new_corners[:, 0], new_corners[:, 2] - new_corners[:, 0])
+            old_normals = normals[moved]
+            dots = np.einsum('ij,ij->i', old_normals, new_normals)
+            lengths = np.linalg.norm(old_normals, axis=1) * np.linalg.norm(new_normals, axis=1)
+            folded = dots <= _MIN_NORMAL_COSINE * lengths
+            if not np.any(folded):
+                return remap, rejected
+
+            folded_vertices = np.zeros(len(vertices), dtype=bool)
+            folded_vertices[indices[moved][folded].ravel()] = True
+            rejected |= folded_vertices[sources]
@@ -0,0 +1,12 @@
+from pyrr import Vector3
+
+class MaterialSettings(object):
+    def __init__(self):
+        self.base_color: Vector3 = Vector3([1.0, 1.0, 1.0])
+        self.roughness = 0.5
+        self.spec_intensity = 1.0
+        self.F0 = 0.04
+
+    def GetKey(self) -> tuple:
+        """Returns hashable key of the material values, equal materials share the same key"""
+        return (tuple(float(value) for value in self.base_color), float(self.roughness), float(self.spec_intensity), float(self.F0))
@@ -0,0 +1,253 @@
+import os
+import json
+import struct
+import hashlib
+import threading
+import numpy as np
+from dataclasses import dataclass, field
+
+CACHE_VERSION = 3
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+CACHE_DIR_ENV = 'PYROUSEL_CACHE_DIR'
+
+_MAGIC = b'PYRMESH\0'
+_ALIGNMENT = 64
+_HASH_BLOCK_SIZE = 1024 * 1024
+_FILE_EXT = '.mesh'
+
+# Cached attribute name, element data type
+_ATTRIBUTES = [
+    ('vertices', 'f4'),
+    ('normals', 'f4'),
+    ('texcoords', 'f4'),
+    ('colors', 'u1'),
+    ('indices', 'i4'),
+    ('lod_indices', 'i4'),
+    ('lod_counts', 'i4'),
+]
+
+# Magic, cache version and (offset, count) pair per attribute
+_HEADER = struct.Struct('<8sI' + 'QQ' * len(_ATTRIBUTES))
+
+@dataclass
+class MeshData:
+    vertices: np.ndarray
+    normals: np.ndarray
+    texcoords: np.ndarray
+    colors: np.ndarray
+    indices: np.ndarray
+    # Concatenated index arrays of simplified detail levels and index count of each level
+    lod_indices: np.ndarray = field(default_factory=lambda: np.array([], dtype='i4'))
+    lod_counts: np.ndarray = field(default_factory=lambda: np.array([], dtype='i4'))
+
+class MeshCache(object):
+    """
+    Persistent on-disk cache of flattened mesh arrays
+
+    Entries are keyed by the model file content hash, cache version and import options.
+    Each entry is single binary file holding aligned raw attribute arrays which are memory
+    mapped on load, cache hit involves no parsing or copying of the mesh data.
+    Total cache size is bounded, least recently used entries are evicted first.
+    """
+    def __init__(self, cache_dir: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        if cache_dir is None:
+            cache_dir = MeshCache.DefaultDirectory()
+
+        self.cache_dir: str = cache_dir
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def DefaultDirectory() -> str:
+        """Returns default cache directory, can be overridden by PYROUSEL_CACHE_DIR variable"""
+        if os.environ.get(CACHE_DIR_ENV):
+            return os.environ[CACHE_DIR_ENV]
+
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(cache_home, 'pyrousel', 'meshes')
+
+    @staticmethod
+    def ComputeKey(filepath: str, options: dict = None) -> str:
+        """
+        Computes cache key for given model file
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to the model file
+        options : dict
+            Import options affecting the resulting mesh data, must be JSON serialisable
+
+        Returns
+        -------
+        Hex digest identifying file content, cache version and import options
+        """
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as file:
+            block = file.read(_HASH_BLOCK_SIZE)
+            while block:
+                digest.update(block)
+                block = file.read(_HASH_BLOCK_SIZE)
+
+        digest.update(struct.pack('<I', CACHE_VERSION))
+        digest.update(json.dumps(options or {}, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def GetEntryPath(self, key: str) -> str:
+        """Returns filepath of the cache entry for given key"""
+        return os.path.join(self.cache_dir, key + _FILE_EXT)
+
+    def Get(self, key: str) -> MeshData:
+        """
+        Fetches mesh data for given key
+
+        Parameters
+        ----------
+        key : str
+            Cache key, see ComputeKey
+
+        Returns
+        -------
+        MeshData with read only memory mapped arrays or None when entry is missing or invalid
+        """
+        entry_path = self.GetEntryPath(key)
+        try:
+            data = MeshCache.__ReadEntry(entry_path)
+        except (OSError, ValueError):
+            data = None
+
+        if data is None:
+            self.misses += 1
+            return None
+
+        # Refresh entry access time, eviction is based on modification time
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return data
+
+    def Put(self, key: str, data: MeshData) -> str:
+        """
+        Stores mesh data under given key and evicts old entries if cache is over its size limit
+
+        Parameters
+        ----------
+        key : str
+            Cache key, see ComputeKey
+        data : MeshData
+            Flattened mesh attribute arrays
+
+        Returns
+        -------
+        Filepath of the written cache entry
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        arrays = []
+        offsets = []
+        offset = _Align(_HEADER.size)
+        for name, dtype in _ATTRIBUTES:
+            array = np.ascontiguousarray(getattr(data, name), dtype=dtype).ravel()
+            arrays.append(array)
+            offsets.extend([offset, len(array)])
+            offset = _Align(offset + array.nbytes)
+
+        # Write into temporary file first so readers never see partial entries
+        entry_path = self.GetEntryPath(key)
+        temp_path = f'{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, CACHE_VERSION, *offsets))
+            for array, array_offset in zip(arrays, offsets[::2]):
+                file.seek(array_offset)
+                file.write(array.tobytes())
+            file.truncate(offset)
+
+        os.replace(temp_path, entry_path)
+        self.Evict(keep=entry_path)
+        return entry_path
+
+    def GetSize(self) -> int:
+        """Returns total size of all cache entries in bytes"""
+        return sum(size for _, _, size in self.__ListEntries())
+
+    def Evict(self, keep: str = None) -> int:
+        """
+        Removes least recently used entries until the cache fits within its size limit
+
+        Parameters
+        ----------
+        keep : str
+            Optional entry filepath which should never be evicted
+
+        Returns
+        -------
+        Number of removed entries
+        """
+        entries = sorted(self.__ListEntries(), key=lambda entry: entry[1])
+        total_size = sum(size for _, _, size in entries)
+        removed = 0
+        for entry_path, _, size in entries:
+            if total_size <= self.max_size:
+                break
+            if entry_path == keep:
+                continue
+            try:
+                os.remove(entry_path)
+            except OSError:
+                # Entry might be mapped by another process, leave it for later
+                continue
+            total_size -= size
+            removed += 1
+
+        return removed
+
+    def Clear(self) -> None:
+        """Removes all cache entries"""
+        for entry_path, _, _ in self.__ListEntries():
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
+
+    def __ListEntries(self) -> list:
+        """Returns list of (filepath, modification time, size) tuples of all cache entries"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(_FILE_EXT):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+    @staticmethod
+    def __ReadEntry(entry_path: str) -> MeshData:
+        """Memory maps cache entry file, returns None when entry does not exist or is invalid"""
+        if not os.path.isfile(entry_path):
+            return None
+
+        buffer = np.memmap(entry_path, dtype='u1', mode='r')
+        if len(buffer) < _HEADER.size:
+            return None
+
+        header = _HEADER.unpack(buffer[:_HEADER.size].tobytes())
+        if header[0] != _MAGIC or header[1] != CACHE_VERSION:
+            return None
+
+        arrays = {}
+        for i, (name, dtype) in enumerate(_ATTRIBUTES):
+            offset, count = header[2 + i * 2], header[3 + i * 2]
+            if offset + count * np.dtype(dtype).itemsize > len(buffer):
+                return None
+            arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+        return MeshData(**arrays)
+
+def _Align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
@@ -0,0 +1,366 @@
+import numpy as np
+from dataclasses import dataclass, field
+
+from .meshcache import MeshData
+
+# Post-transform vertex cache size assumed by the reordering & statistics
+DEFAULT_CACHE_SIZE = 16
+# Cluster ACMR may grow by this factor to allow finer overdraw ordering
+DEFAULT_OVERDRAW_THRESHOLD = 1.05
+
+@dataclass
+class CacheStats:
+    # Average cache miss ratio, transformed vertices per triangle (0.5 - 3.0)
+    acmr: float = 0.0
+    # Average transformed to vertex ratio, transformed vertices per referenced vertex (>= 1.0)
+    atvr: float = 0.0
+    num_triangles: int = 0
+    num_vertices: int = 0
+
+@dataclass
+class StageStats:
+    stage: str
+    before: CacheStats = field(default_factory=CacheStats)
+    after: CacheStats = field(default_factory=CacheStats)
+
+    def __repr__(self):
+        return (
+            f'{self.stage:<13} '
+            f'ACMR {self.before.acmr:.3f} -> {self.after.acmr:.3f}  '
+            f'ATVR {self.before.atvr:.3f} -> {self.after.atvr:.3f}  '
+            f'vertices {self.before.num_vertices} -> {self.after.num_vertices}  '
+            f'triangles {self.before.num_triangles} -> {self.after.num_triangles}'
+        )
+
+class MeshOptimizer(object):
+    """
+    Post-load optimization of indexed triangle meshes
+
+    Stages are run in following order:
+        -- Weld: merges vertices whose position and all attributes are equal
+        -- Degenerates: removes triangles with repeated indices or zero area
+        -- Vertex cache: reorders triangles for post-transform cache locality (Tipsify)
+        -- Overdraw: reorders triangle clusters front to back facing outwards first
+        -- Vertex fetch: reorders vertices by first use within the index buffer
+    """
+    @staticmethod
+    def Optimize(
+            data: MeshData,
+            cache_size: int = DEFAULT_CACHE_SIZE,
+            overdraw_threshold: float = DEFAULT_OVERDRAW_THRESHOLD) -> tuple:
+        """
+        Runs all optimization stages on given mesh data
+
+        Parameters
+        ----------
+        data : MeshData
+            Flattened mesh attribute arrays
+        cache_size : int
+            Simulated FIFO post-transform vertex cache size
+        overdraw_threshold : float
+            Allowed ACMR growth of the vertex cache order for overdraw reordering
+
+        Returns
+        -------
+        Tuple of (optimized MeshData, list of StageStats)
+        """
+        vertices, attributes = MeshOptimizer.__SplitAttributes(data)
+        indices = np.asarray(data.indices, dtype='i4').reshape(-1, 3)
+        stats = MeshOptimizer.ComputeCacheStats(indices, cache_size)
+        report = []
+
+        def Report(stage: str, indices: np.ndarray) -> None:
+            report.append(StageStats(stage, report[-1].after if report else stats, MeshOptimizer.ComputeCacheStats(indices, cache_size)))
+
+        indices, vertices, attributes = MeshOptimizer.WeldVertices(indices, vertices, attributes)
+        Report('weld', indices)
+
+        indices = MeshOptimizer.RemoveDegenerates(indices, vertices)
+        Report('degenerates', indices)
+
+        reordered, boundaries = MeshOptimizer.OptimizeVertexCache(indices, len(vertices), cache_size)
+        if MeshOptimizer.ComputeCacheStats(reordered, cache_size).acmr <= report[-1].after.acmr:
+            indices = reordered
+        else:
+            # Input order is already more cache friendly, keep it as single cluster for the overdraw stage
+            boundaries = np.array([0], dtype='i4')
+        Report('vertex cache', indices)
+
+        indices = MeshOptimizer.OptimizeOverdraw(indices, vertices, boundaries, cache_size, overdraw_threshold)
+        Report('overdraw', indices)
+
+        indices, vertices, attributes = MeshOptimizer.OptimizeVertexFetch(indices, vertices, attributes)
+        Report('vertex fetch', indices)
+
+        optimized = MeshData(
+            vertices=vertices.ravel(),
+            normals=attributes.get('normals', np.array([], dtype='f4')).ravel(),
+            texcoords=attributes.get('texcoords', np.array([], dtype='f4')).ravel(),
+            colors=attributes.get('colors', np.array([], dtype='f4')).ravel(),
+            indices=indices.ravel()
+        )
+        return optimized, report
+
+    @staticmethod
+    def WeldVertices(indices: np.ndarray, vertices: np.ndarray, attributes: dict) -> tuple:
+        """
+        Merges vertices with bitwise equal position and attributes
+
+        Parameters
+        ----------
+        indices : np.ndarray
+            Nx3 triangle indices
+        vertices : np.ndarray
+            Vx3 vertex positions
+        attributes : dict
+            Per vertex attribute arrays (VxK) keyed by name
+
+        Returns
+        -------
+        Tuple of (remapped indices, welded vertices, welded attributes), welded vertices keep first occurrence order
+        """
+        # Adding zero folds negative zeros so +0.0 and -0.0 compare equal bitwise
+        columns = [vertices] + list(attributes.values())
+        rows = np.ascontiguousarray(np.hstack(columns).astype('f4') + np.float32(0.0))
+        keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        # np.unique sorts by key, restore the original vertex order
+        order = np.argsort(first)
+        remap = np.empty(len(order), dtype='i4')
+        remap[order] = np.arange(len(order), dtype='i4')
+        unique = first[order]
+
+        welded = {name: attribute[unique] for name, attribute in attributes.items()}
+        return remap[inverse.ravel()][indices], vertices[unique], welded
+
+    @staticmethod
+    def RemoveDegenerates(indices: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+        """Returns Nx3 triangle indices without triangles which repeat a vertex or have zero area"""
+        repeated = (indices[:, 0] == indices[:, 1]) | (indices[:, 1] == indices[:, 2]) | (indices[:, 0] == indices[:, 2])
+        corners = vertices[indices]
+        cross = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        zero_area = ~np.any(cross, axis=1)
+        return indices[~(repeated | zero_area)]
+
+    @staticmethod
+    def OptimizeVertexCache(indices: np.ndarray, num_vertices: int, cache_size: int = DEFAULT_CACHE_SIZE) -> tuple:
+        """
+        Reorders triangles for post-transform vertex cache locality
+
+        Implements Tipsify from "Fast Triangle Reordering for Vertex Locality and Reduced Overdraw"
+        (Sander, Nehab & Barczak 2007), triangles are emitted as fans around the vertex which is
+        expected to stay longest in the cache.
+
+        Returns
+        -------
+        Tuple of (reordered Nx3 indices, triangle offsets where the fan sequence restarted from a dead end)
+        """
+        num_triangles = len(indices)
+        if num_triangles == 0:
+            return indices, np.array([0], dtype='i4')
+
+        # Vertex to triangle adjacency in compressed row form
+        flat = indices.ravel()
+        live = np.bincount(flat, minlength=num_vertices)
+        adjacency_offsets = np.concatenate([[0], np.cumsum(live)])
+        adjacency = (np.argsort(flat, kind='stable') // 3).tolist()
+        adjacency_offsets = adjacency_offsets.tolist()
+        triangles = indices.tolist()
+        live = live.tolist()
+
+        cache_time = [-cache_size - 1] * num_vertices
+        emitted = [False] * num_triangles
+        order = []
+        boundaries = [0]
+        dead_end = []
+        timestamp = 0
+        cursor = 0
+        fan_vertex = int(flat[0])
+
+        while fan_vertex >= 0:
+            candidates = []
+            for triangle in adjacency[adjacency_offsets[fan_vertex]:adjacency_offsets[fan_vertex + 1]]:
+                if emitted[triangle]:
+                    continue
+                emitted[triangle] = True
+                order.append(triangle)
+                for vertex in triangles[triangle]:
+                    dead_end.append(vertex)
+                    candidates.append(vertex)
+                    live[vertex] -= 1
+                    if timestamp - cache_time[vertex] > cache_size:
+                        cache_time[vertex] = timestamp
+                        timestamp += 1
+
+            # Pick candidate which will still be in the cache after its remaining triangles are emitted
+            fan_vertex = -1
+            best_priority = -1
+            for vertex in candidates:
+                if live[vertex] <= 0:
+                    continue
+                priority = 0
+                age = timestamp - cache_time[vertex]
+                if age + 2 * live[vertex] <= cache_size:
+                    priority = age
+                if priority > best_priority:
+                    best_priority = priority
+                    fan_vertex = vertex
+
+            if fan_vertex >= 0:
+                continue
+
+            # Dead end, continue from recently referenced vertex or the next one in input order
+            while dead_end and fan_vertex < 0:
+                vertex = dead_end.pop()
+                if live[vertex] > 0:
+                    fan_vertex = vertex
+            while fan_vertex < 0 and cursor < num_vertices:
+                if live[cursor] > 0:
+                    fan_vertex = cursor
+                cursor += 1
+            if fan_vertex >= 0:
+                boundaries.append(len(order))
+
+        return indices[np.asarray(order, dtype='i4')], np.asarray(boundaries, dtype='i4')
+
+    @staticmethod
+    def OptimizeOverdraw(
+            indices: np.ndarray,
+            vertices: np.ndarray,
+            boundaries: np.ndarray,
+            cache_size: int = DEFAULT_CACHE_SIZE,
+            threshold: float = DEFAULT_OVERDRAW_THRESHOLD) -> np.ndarray:
+        """
+        Reorders triangle clusters so outwards facing surfaces are drawn first
+
+        Clusters of the vertex cache optimized order are split further wherever the ACMR of the split
+        off part stays within threshold of the whole cluster ACMR, clusters are then sorted by how much their
+        average normal points away from the mesh centroid. Triangle order within clusters is kept.
+
+        Parameters
+        ----------
+        indices : np.ndarray
+            Nx3 vertex cache optimized triangle indices
+        vertices : np.ndarray
+            Vx3 vertex positions
+        boundaries : np.ndarray
+            Triangle offsets of hard cluster boundaries, see OptimizeVertexCache
+        cache_size : int
+            Simulated FIFO post-transform vertex cache size
+        threshold : float
+            Allowed ACMR growth from splitting clusters
+
+        Returns
+        -------
+        Reordered Nx3 triangle indices
+        """
+        num_triangles = len(indices)
+        if num_triangles == 0:
+            return indices
+
+        # Split hard clusters further wherever their ACMR measured from a cold cache stays within threshold
+        hard = np.append(boundaries[boundaries < num_triangles], num_triangles)
+        splits = []
+        triangles = indices.tolist()
+        for cluster_start, cluster_end in zip(hard[:-1].tolist(), hard[1:].tolist()):
+            cluster_misses = MeshOptimizer.SimulateVertexCache(indices[cluster_start:cluster_end], cache_size).sum()
+            max_acmr = threshold * cluster_misses / (cluster_end - cluster_start)
+
+            start = cluster_start
+            splits.append(start)
+            cache_time = {}
+            timestamp = 0
+            misses = 0
+            for triangle in range(cluster_start, cluster_end - 1):
+                for vertex in triangles[triangle]:
+                    if timestamp - cache_time.get(vertex, -cache_size - 1) > cache_size:
+                        cache_time[vertex] = timestamp
+                        timestamp += 1
+                        misses += 1
+                if misses / (triangle - start + 1) <= max_acmr and triangle > start:
+                    start = triangle + 1
+                    splits.append(start)
+                    cache_time = {}
+                    misses = 0
+        splits = np.asarray(splits, dtype='i4')
+
+        # Sort clusters by outwards facing direction of their area weighted normal
+        corners = vertices[indices].astype('f8')
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        centroids = corners.mean(axis=1)
+        areas = np.linalg.norm(normals, axis=1)
+        mesh_centroid = (centroids * areas[:, None]).sum(axis=0) / max(areas.sum(), 1e-30)
+
+        cluster_normals = np.add.reduceat(normals, splits)
+        cluster_areas = np.maximum(np.add.reduceat(areas, splits), 1e-30)
+        cluster_centroids = np.add.reduceat(centroids * areas[:, None], splits) / cluster_areas[:, None]
+        facing = np.einsum('ij,ij->i', cluster_centroids - mesh_centroid, cluster_normals) / cluster_areas
+
+        # Concatenate triangle ranges of the sorted clusters
+        cluster_order = np.argsort(-facing, kind='stable')
+        starts = splits[cluster_order]
+        lengths = np.diff(np.append(splits, num_triangles))[cluster_order]
+        output_starts = np.cumsum(lengths) - lengths
+        triangle_order = np.repeat(starts - output_starts, lengths) + np.arange(num_triangles)
+        return indices[triangle_order]
+
+    @staticmethod
+    def OptimizeVertexFetch(indices: np.ndarray, vertices: np.ndarray, attributes: dict) -> tuple:
+        """
+        Reorders vertices by their first use in the index buffer, unreferenced vertices are dropped
+
+        Returns
+        -------
+        Tuple of (remapped indices, reordered vertices, reordered attributes)
+        """
+        flat = indices.ravel()
+        _, first = np.unique(flat, return_index=True)
+        order = flat[np.sort(first)]
+        remap = np.full(len(vertices), -1, dtype='i4')
+        remap[order] = np.arange(len(order), dtype='i4')
+
+        reordered = {name: attribute[order] for name, attribute in attributes.items()}
+        return remap[indices], vertices[order], reordered
+
+    @staticmethod
+    def SimulateVertexCache(indices: np.ndarray, cache_size: int = DEFAULT_CACHE_SIZE) -> np.ndarray:
+        """Returns number of FIFO post-transform vertex cache misses of each triangle"""
+        cache_time = {}
+        timestamp = 0
+        misses = []
+        for triangle in np.asarray(indices).reshape(-1, 3).tolist():
+            count = 0
+            for vertex in triangle:
+                if timestamp - cache_time.get(vertex, -cache_size - 1) > cache_size:
+                    cache_time[vertex] = timestamp
+                    timestamp += 1
+                    count += 1
+            misses.append(count)
+        return np.asarray(misses, dtype='i4')
+
+    @staticmethod
+    def ComputeCacheStats(indices: np.ndarray, cache_size: int = DEFAULT_CACHE_SIZE) -> CacheStats:
+        """Computes ACMR & ATVR of given triangle order for FIFO post-transform vertex cache"""
+        indices = np.asarray(indices).reshape(-1, 3)
+        num_triangles = len(indices)
+        num_vertices = len(np.unique(indices))
+        misses = int(MeshOptimizer.SimulateVertexCache(indices, cache_size).sum())
+        return CacheStats(
+            acmr=misses / num_triangles if num_triangles > 0 else 0.0,
+            atvr=misses / num_vertices if num_vertices > 0 else 0.0,
+            num_triangles=num_triangles,
+            num_vertices=num_vertices
+        )
+
+    @staticmethod
+    def __SplitAttributes(data: MeshData) -> tuple:
+        """Returns Vx3 positions and dictionary of present per vertex attributes reshaped into VxK arrays"""
+        vertices = np.asarray(data.vertices, dtype='f4').reshape(-1, 3)
+        attributes = {}
+        for name, width in [('normals', 3), ('texcoords', 2), ('colors', 3)]:
+            # Colors may be stored as 8-bit, welding compares all attributes as float32
+            attribute = np.asarray(getattr(data, name))
+            if len(attribute) == len(vertices) * width and len(attribute) > 0:
+                attributes[name] = attribute.reshape(-1, width)
+        return vertices, attributes
@@ -1,21 +1,43 @@
+import os
+from concurrent.futures import Executor
 import numpy as np
 from pyrr import Vector3
 
 from .transform import Transform
+from .material import MaterialSettings
+from .bounds import Bounds, AABB, BoundingSphere, OrientedBox
+from .objparser import OBJParser
+from .meshcache import MeshCache, MeshData
+from .meshopt import MeshOptimizer
+from .lod import MeshSimplifier, LODLevel
+from .bvh import BVH
+from .profiler import MemoryProfiler
 
 #from .trimesh import trimesh as trimesh
 import trimesh
 
+# Bump whenever LoadModel output changes so stale mesh cache entries are ignored
+LOADER_VERSION = 2
+
+# Per instance data layout of instanced render models, matches instance attributes of instanced shaders
+INSTANCE_DTYPE = np.dtype([
+    ('transform', 'f4', (4, 4)),
+    ('color', 'f4', 4),
+])
+
 class Model(object):
     def __init__(self):
+        self.__aabb: AABB = None
+        self.__sphere: BoundingSphere = None
+        self.__oriented_box: OrientedBox = None
         self.vertices: list(np.array) = np.array([], dtype='f4')
         self.normals: list(np.array) = np.array([], dtype='f4')
         self.indices: list(np.array) = np.array([], dtype='i4')
         self.texcoords: list(np.array) = np.array([], dtype='f4')
         self.colors: list(np.array) = np.array([], dtype='f4')
+        # Simplified detail levels ordered from the most detailed, indices is the full detail level
+        self.lods: list[LODLevel] = []
         self.transform: Transform = Transform()
-        self.minext: Vector3 = Vector3([0.0, 0.0, 0.0])
-        self.maxext: Vector3 = Vector3([0.0, 0.0, 0.0])
 
     def __repr__(self):
         num_vertices = int(len(self.vertices) / 3)
@@ -26,15 +48,61 @@ class Model(object):
 
         return f'Model -> vertices:{num_vertices} normals:{num_normals} texcoords:{num_texcoords} colors:{num_colors} indices:{num_indices}'
 
-    def RecomputeBounds(self):
+    @property
+    def vertices(self) -> np.ndarray:
+        return self.__vertices
+
+    @vertices.setter
+    def vertices(self, value: np.ndarray) -> None:
+        self.__vertices = value
+        self.InvalidateBounds()
+
+    @property
+    def minext(self) -> Vector3:
+        """Minimum local extends of the vertex data"""
+        return self.GetAABB().minext
+
+    @property
+    def maxext(self) -> Vector3:
+        """Maximum local extends of the vertex data"""
+        return self.GetAABB().maxext
+
+    def InvalidateBounds(self) -> None:
+        """Discards cached bounds, required after modifying vertex data in place"""
+        self.__aabb = None
+        self.__sphere = None
+        self.__oriented_box = None
+
+    def RecomputeBounds(self) -> None:
         """Recalucaltes local extends/bounds based on the vertex data"""
-        for i in range(0, len(self.vertices), 3):
-            self.minext.x = min(self.minext.x, self.vertices[i])
-            self.minext.y = min(self.minext.y, self.vertices[i+1])
-            self.minext.z = min(self.minext.z, self.vertices[i+2])
-            self.maxext.x = max(self.maxext.x, self.vertices[i])
-            self.maxext.y = max(self.maxext.y, self.vertices[i+1])
-            self.maxext.z = max(self.maxext.z, self.vertices[i+2])
+        self.InvalidateBounds()
+        self.GetAABB()
+
+    def GetAABB(self) -> AABB:
+        """Returns local space axis aligned bounding box"""
+        if self.__aabb is None:
+            self.__aabb = Bounds.ComputeAABB(self.vertices)
+        return self.__aabb
+
+    def GetBoundingSphere(self) -> BoundingSphere:
+        """Returns local space bounding sphere"""
+        if self.__sphere is None:
+            self.__sphere = Bounds.ComputeSphere(self.vertices)
+        return self.__sphere
+
+    def GetOrientedBox(self) -> OrientedBox:
+        """Returns local space PCA fitted oriented bounding box"""
+        if self.__oriented_box is None:
+            self.__oriented_box = Bounds.ComputeOrientedBox(self.vertices)
+        return self.__oriented_box
+
+    def GetWorldAABB(self) -> AABB:
+        """Returns world space axis aligned bounding box under current transform"""
+        return Bounds.TransformAABB(self.GetAABB(), self.transform.GetMatrixView())
+
+    def GetWorldBoundingSphere(self) -> BoundingSphere:
+        """Returns world space bounding sphere under current transform"""
+        return Bounds.TransformSphere(self.GetBoundingSphere(), self.transform.GetMatrixView())
 
 class RenderModel(Model):
     def __init__(self):
@@ -45,7 +113,250 @@ class RenderModel(Model):
         self.texcoord_buffer = None
         self.color_buffer = None
         self.index_buffer = None
-        self.vertex_array = None
+        # Vertex arrays cached per (shader program, attribute layout), see GFX.GetVertexArray
+        self.vertex_arrays: dict = {}
+        # Vertex array content as (buffer attribute name, buffer format, *shader attribute names)
+        self.vertex_format: list = []
+        self.position_format: str = '3f'
+        self.index_element_size: int = 4
+        # Packed vertex layout decode parameters
+        self.position_offset: Vector3 = Vector3([0.0, 0.0, 0.0])
+        self.position_scale: Vector3 = Vector3([1.0, 1.0, 1.0])
+        self.octahedral_normals: bool = False
+        # Active detail level, 0 is the full detail level otherwise lods[lod_index - 1], see GFX.SelectLOD
+        self.lod_index: int = 0
+        # Unique edge line list of all detail levels and (first, count) range of each level, see GFX.UpdateEdgeBuffer
+        self.edge_buffer = None
+        self.edge_ranges: list = []
+        self.edge_crease_angle: float = None
+        # Per instance transforms & tint colors, None when the model is drawn once
+        self.instance_data: np.ndarray = None
+        self.instance_buffer = None
+        # Range of instances (first, end) modified since the last upload, see GFX.UpdateInstanceBuffer
+        self.instance_dirty_range: tuple = None
+        self.__instances_aabb: AABB = None
+        # Material of this model, None draws it with the material given for the frame
+        self.material: MaterialSettings = None
+        # Model owning the geometry buffers this model draws, None when the model owns its buffers, see CreateShared
+        self.buffer_source: RenderModel = None
+        # Model space triangle hierarchy for picking, built on demand, see BuildBVH
+        self.bvh: BVH = None
+
+    @property
+    def is_instanced(self) -> bool:
+        return self.instance_data is not None
+
+    @property
+    def num_instances(self) -> int:
+        """Number of drawn copies of the model, 1 when the model is not instanced"""
+        return 1 if self.instance_data is None else len(self.instance_data)
+
+    def InvalidateBounds(self) -> None:
+        super().InvalidateBounds()
+        self.__instances_aabb = None
+
+    def CreateShared(self) -> 'RenderModel':
+        """
+        Returns new model drawing the geometry of this model under its own transform
+
+        Vertex arrays are shared rather than copied and GPU buffers are taken over from this
+        model once uploaded, see GFX.ShareModelBuffers. Instancing and material are per model.
+        """
+        model = RenderModel()
+        model.vertices = self.vertices
+        model.normals = self.normals
+        model.texcoords = self.texcoords
+        model.colors = self.colors
+        model.indices = self.indices
+        model.lods = self.lods
+        model.shader = self.shader
+        model.material = self.material
+        model.buffer_source = self.buffer_source if self.buffer_source is not None else self
+        return model
+
+    def GetBVH(self) -> BVH:
+        """Returns triangle hierarchy of the model geometry, None until it has been built"""
+        if self.buffer_source is not None:
+            return self.buffer_source.GetBVH()
+        return self.bvh
+
+    def BuildBVH(self) -> BVH:
+        """
+        Builds triangle hierarchy of the full detail geometry unless it already exists
+
+        Safe to call from worker threads, the hierarchy only becomes visible to GetBVH once complete.
+        Models sharing geometry build it for their source, see CreateShared.
+        """
+        if self.buffer_source is not None:
+            return self.buffer_source.BuildBVH()
+        if self.bvh is None:
+            self.bvh = BVH.Build(self.vertices, self.indices)
+        return self.bvh
+
+    def SetInstances(self, transforms: np.ndarray, colors: np.ndarray = None) -> None:
+        """
+        Makes the model instanced, all instances are drawn with a single draw call
+
+        Parameters
+        ----------
+        transforms : np.ndarray
+            Nx4x4 instance transforms applied before the model transform, same convention as Matrix44
+        colors : np.ndarray
+            Nx3 or Nx4 instance tint colors multiplying the material base color, white when not given
+        """
+        transforms = np.asarray(transforms, dtype='f4').reshape(-1, 4, 4)
+        self.instance_data = np.zeros(len(transforms), dtype=INSTANCE_DTYPE)
+        self.instance_data['transform'] = transforms
+        self.instance_data['color'] = 1.0
+        if colors is not None:
+            self.SetInstanceColors(colors)
+        self.instance_dirty_range = (0, len(transforms))
+        self.__instances_aabb = None
+
+    def SetInstanceTransforms(self, transforms: np.ndarray, first: int = 0) -> None:
+        """
+        Overwrites consecutive instance transforms, only modified range is uploaded on next draw
+
+        Parameters
+        ----------
+        transforms : np.ndarray
+            Mx4x4 instance transforms
+        first : int
+            Index of the first overwritten instance
+        """
+        transforms = np.asarray(transforms, dtype='f4').reshape(-1, 4, 4)
+        self.__ValidateInstanceRange(first, len(transforms))
+        self.instance_data['transform'][first:first + len(transforms)] = transforms
+        self.__MarkInstancesDirty(first, first + len(transforms))
+        self.__instances_aabb = None
+
+    def SetInstanceColors(self, colors: np.ndarray, first: int = 0) -> None:
+        """
+        Overwrites consecutive instance tint colors, only modified range is uploaded on next draw
+
+        Parameters
+        ----------
+        colors : np.ndarray
+            Mx3 or Mx4 instance tint colors, alpha defaults to 1.0
+        first : int
+            Index of the first overwritten instance
+        """
+        colors = np.asarray(colors, dtype='f4')
+        colors = colors.reshape(-1, colors.shape[-1])
+        self.__ValidateInstanceRange(first, len(colors))
+        self.instance_data['color'][first:first + len(colors), :colors.shape[1]] = colors
+        self.__MarkInstancesDirty(first, first + len(colors))
+
+    def ClearInstances(self) -> None:
+        """Stops instancing the model, instance buffer is kept until model buffers are released"""
+        self.instance_data = None
+        self.instance_dirty_range = None
+        self.__instances_aabb = None
+
+    def GetInstancesAABB(self) -> AABB:
+        """Returns model space axis aligned box enclosing all instances, same as GetAABB when not instanced"""
+        if self.instance_data is None:
+            return self.GetAABB()
+        if len(self.instance_data) == 0:
+            return AABB()
+        if self.__instances_aabb is None:
+            aabb = self.GetAABB()
+            shape = (len(self.instance_data), 3)
+            minext, maxext = Bounds.TransformAABBs(
+                np.broadcast_to(np.asarray(aabb.minext, dtype='f8'), shape),
+                np.broadcast_to(np.asarray(aabb.maxext, dtype='f8'), shape),
+                self.instance_data['transform'].astype('f8')
+            )
+            self.__instances_aabb = AABB(Vector3(minext.min(axis=0)), Vector3(maxext.max(axis=0)))
+        return self.__instances_aabb
+
+    def __ValidateInstanceRange(self, first: int, count: int) -> None:
+        if self.instance_data is None:
+            raise Exception('Model is not instanced!')
+        if first < 0 or first + count > len(self.instance_data):
+            raise Exception('Instance range invalid!')
+
+    def __MarkInstancesDirty(self, first: int, end: int) -> None:
+        if self.instance_dirty_range is not None:
+            first = min(first, self.instance_dirty_range[0])
+            end = max(end, self.instance_dirty_range[1])
+        self.instance_dirty_range = (first, end)
+
+class ModelGroup(object):
+    """
+    Render models of single scene file placed under common root transform
+
+    Each model keeps its scene node transform as local transform relative to the root,
+    moving the root moves the whole group. The group has to be kept alive while its models
+    are drawn, freeing the root detaches the model transforms from it.
+    """
+    def __init__(self):
+        self.transform: Transform = Transform()
+        self.models: list[RenderModel] = []
+        self.__aabb: AABB = None
+
+    def __repr__(self):
+        return f'ModelGroup -> models:{len(self.models)} vertices:{self.num_vertices} triangles:{self.num_triangles}'
+
+    @property
+    def num_vertices(self) -> int:
+        """Number of vertices of all models, shared geometry counts once per model drawing it"""
+        return sum(len(model.vertices) // 3 for model in self.models)
+
+    @property
+    def num_triangles(self) -> int:
+        """Number of triangles of all models, shared geometry counts once per model drawing it"""
+        return sum(len(model.indices) // 3 for model in self.models)
+
+    @property
+    def minext(self) -> Vector3:
+        """Minimum extends of all models relative to the root transform"""
+        return self.GetAABB().minext
+
+    @property
+    def maxext(self) -> Vector3:
+        """Maximum extends of all models relative to the root transform"""
+        return self.GetAABB().maxext
+
+    def AddModel(self, model: RenderModel, matrix: np.ndarray = None) -> None:
+        """
+        Attaches model under the root transform
+
+        Parameters
+        ----------
+        model : RenderModel
+            Model to add, its transform is parented to the group root
+        matrix : np.ndarray
+            Optional 4x4 local transform of the model, same convention as Matrix44
+        """
+        model.transform.SetParent(self.transform)
+        if matrix is not None:
+            model.transform.SetLocalMatrix(matrix)
+        self.models.append(model)
+        self.__aabb = None
+
+    def InvalidateBounds(self) -> None:
+        """Discards cached bounds, required after modifying model vertex data, instances or local transforms"""
+        self.__aabb = None
+
+    def GetAABB(self) -> AABB:
+        """Returns axis aligned box enclosing all models relative to the root transform"""
+        if len(self.models) == 0:
+            return AABB()
+        if self.__aabb is None:
+            aabbs = [Bounds.TransformAABB(model.GetInstancesAABB(), model.transform.GetLocalMatrix()) for model in self.models]
+            self.__aabb = AABB(
+                Vector3(np.min([aabb.minext for aabb in aabbs], axis=0)),
+                Vector3(np.max([aabb.maxext for aabb in aabbs], axis=0))
+            )
+        return self.__aabb
+
+    @staticmethod
+    def FromModel(model: RenderModel) -> 'ModelGroup':
+        """Returns group holding single model placed at the group root"""
+        group = ModelGroup()
+        group.AddModel(model)
+        return group
 
 class PrimitiveFactory:
     @staticmethod
@@ -157,65 +468,42 @@ class PrimitiveFactory:
 
 class ModelLoader():
     @staticmethod
-    def LoadFromOBJ(filepath: str) -> RenderModel:
+    def LoadFromOBJ(filepath: str, num_workers: int = None) -> RenderModel:
         """
         Loads model from given OBJ file
 
-        Passed shader source should have vertex_shader and fragment_shader defined at minimum.
-
-        At the moment only vertices and vertex normal mesh data ise supported
+        Vertex positions, colors, texture coordinates and normals are supported.
+        Polygons are triangulated and v/vt/vn face indices are de-indexed into
+        single index buffer, see OBJParser for details.
 
         Parameters
         ----------
         filepath : str
             Filepath to the OBJ file containing the model data
+        num_workers : int
+            Maximum number of processes used to parse large files
 
         Returns
         -------
         RenderModel object representing OBJ model
         """
-        vertices = []
-        normals = []
-        texcoords = []
-        indices = []
-        with open(filepath, 'r') as file:
-            for line in file:
-                if line.startswith('v '):
-                    data = list(map(float, line.strip().split()[1:]))
-                    if(len(data) != 3):
-                        raise Exception("Vertex format is invalid!")
-                    vertices.append(data[0])
-                    vertices.append(data[1])
-                    vertices.append(data[2])
-                elif line.startswith('vn '):
-                    data = list(map(float, line.strip().split()[1:]))
-                    if(len(data) != 3):
-                        raise Exception("Vertex normal format is invalid!")
-                    normals.append(data[0])
-                    normals.append(data[1])
-                    normals.append(data[2])
-                elif line.startswith('vt '):
-                    data = list(map(float, line.strip().split()[1:]))
-                    if(len(data) < 2):
-                        raise Exception("Texcoord format is invalid!")
-                    texcoords.append(data[0])
-                    texcoords.append(data[1])
-                elif line.startswith('f '):
-                    facedata = line.strip().split()[1:]
-                    if(len(facedata) != 3):
-                        raise Exception("Face index format is invalid!")
-                    for faceset in facedata:
-                        face_indices = faceset.split('/')
-                        indices.append(int(face_indices[0]) - 1)
+        data = OBJParser.Parse(filepath, num_workers=num_workers)
         model = RenderModel()
-        model.vertices = np.array(vertices, dtype='f4')
-        model.normals = np.array(normals, dtype='f4')
-        model.texcoords = np.array(texcoords, dtype='f4')
-        model.indices = np.array(indices, dtype='i4')
+        model.vertices = data.vertices
+        model.normals = data.normals
+        model.texcoords = data.texcoords
+        model.colors = data.colors
+        model.indices = data.indices
         return model
     
     @staticmethod
-    def LoadModel(filepath: str) -> RenderModel:
+    def LoadModel(
+            filepath: str,
+            cache: MeshCache = None,
+            optimize: bool = False,
+            lod_ratios: tuple = None,
+            executor: Executor = None,
+            memory: MemoryProfiler = None) -> RenderModel:
         """
         Loads model from wide variety of formats via Trimesh library
 
@@ -225,45 +513,343 @@ class ModelLoader():
         ----------
         filepath : str
             Filepath to the OBJ file containing the model data
+        cache : MeshCache
+            Optional mesh cache, on cache hit model arrays are memory mapped from the cache entry
+        optimize : bool
+            Run MeshOptimizer on the loaded mesh, optimized result is what gets cached
+        lod_ratios : tuple
+            Triangle ratios of simplified detail levels to generate, see MeshSimplifier.GenerateLODs
+        executor : Executor
+            Optional executor (typically process pool) to run the detail level generation on
+        memory : MemoryProfiler
+            Optional memory profiler recording peak memory of each load stage
 
         Returns
         -------
         RenderModel object representing OBJ model
         """
-        vertices = []
-        normals = []
-        texcoords = []
-        colors = []
-        indices = []
+        stage = memory.Stage if memory is not None else MemoryProfiler.NullStage
+        key = None
+        if cache is not None:
+            key = MeshCache.ComputeKey(filepath, ModelLoader.GetImportOptions(optimize, lod_ratios))
+            with stage('cache_read'):
+                data = cache.Get(key)
+            if data is not None:
+                return ModelLoader.__CreateRenderModel(data)
+
+        with stage('parse'):
+            loaded = trimesh.load(filepath, process=False)
+
+        with stage('convert'):
+            data = ModelLoader.ConvertMeshes(ModelLoader.GetSceneMeshes(loaded))
+        # Source meshes are not needed past conversion, release them before the heavier stages
+        del loaded
+
+        data = ModelLoader.__ProcessMeshData(data, filepath, optimize, lod_ratios, executor, stage)
+
+        if cache is not None:
+            with stage('cache_write'):
+                cache.Put(key, data)
+
+        return ModelLoader.__CreateRenderModel(data)
+
+    @staticmethod
+    def LoadScene(
+            filepath: str,
+            optimize: bool = False,
+            lod_ratios: tuple = None,
+            executor: Executor = None,
+            memory: MemoryProfiler = None) -> ModelGroup:
+        """
+        Loads model file keeping its scene structure via Trimesh library
+
+        Every scene node becomes separate RenderModel placed by the node transform under the group
+        root. Each geometry is converted once, nodes referencing the same geometry share its arrays
+        and GPU buffers, see RenderModel.CreateShared. Materials of the geometry are kept per model.
+        Scene imports bypass the mesh cache, which only holds flattened meshes.
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to the model file
+        optimize : bool
+            Run MeshOptimizer on every geometry
+        lod_ratios : tuple
+            Triangle ratios of simplified detail levels to generate for every geometry
+        executor : Executor
+            Optional executor (typically process pool) to run the detail level generation on
+        memory : MemoryProfiler
+            Optional memory profiler recording peak memory of each load stage
 
-        mesh = trimesh.load(filepath, force='mesh', process=False)
-        vertices = mesh.vertices.flatten()
-        indices = mesh.faces.flatten()
-        normals = mesh.vertex_normals.flatten()
+        Returns
+        -------
+        ModelGroup holding models of all scene nodes
+        """
+        stage = memory.Stage if memory is not None else MemoryProfiler.NullStage
+        with stage('parse'):
+            loaded = trimesh.load(filepath, process=False)
+
+        group = ModelGroup()
+        sources = {}
+        for mesh, transform in ModelLoader.GetSceneMeshes(loaded):
+            source = sources.get(id(mesh))
+            if source is not None:
+                model = source.CreateShared()
+            else:
+                with stage('convert'):
+                    data = ModelLoader.ConvertMeshes([(mesh, None)])
+                data = ModelLoader.__ProcessMeshData(data, filepath, optimize, lod_ratios, executor, stage)
+                model = ModelLoader.__CreateRenderModel(data)
+                model.material = ModelLoader.GetMaterial(mesh)
+                sources[id(mesh)] = model
+            # Trimesh node transforms apply to column vectors
+            group.AddModel(model, transform.T if transform is not None else None)
+
+        if len(group.models) == 0:
+            raise Exception('Model contains no triangle meshes, invalid!')
+        return group
+
+    @staticmethod
+    def GetMaterial(mesh: trimesh.Trimesh) -> MaterialSettings:
+        """
+        Returns material settings of given mesh PBR material, None when it has none
+
+        Metalness is folded into the specular reflectance at normal incidence, metals
+        reflect their base color.
+        """
+        material = getattr(mesh.visual, 'material', None)
+        if not isinstance(material, trimesh.visual.material.PBRMaterial):
+            return None
+
+        settings = MaterialSettings()
+        if material.baseColorFactor is not None:
+            color = np.asarray(material.baseColorFactor)[:3]
+            settings.base_color = Vector3(color / 255.0 if color.dtype == np.uint8 else color)
+        if material.roughnessFactor is not None:
+            settings.roughness = float(material.roughnessFactor)
+        if material.metallicFactor is not None:
+            metallic = float(material.metallicFactor)
+            settings.F0 = settings.F0 + (float(np.mean(settings.base_color)) - settings.F0) * metallic
+        return settings
+
+    @staticmethod
+    def __ProcessMeshData(data: MeshData, filepath: str, optimize: bool, lod_ratios: tuple, executor: Executor, stage) -> MeshData:
+        """Optimizes converted mesh data and generates its detail levels when requested"""
+        if optimize:
+            with stage('optimize'):
+                data, report = MeshOptimizer.Optimize(data)
+            print(f'Optimized mesh: {filepath}')
+            for line in report:
+                print(f'--{line}')
+
+        if lod_ratios:
+            with stage('lod'):
+                args = (data.vertices, data.indices, tuple(lod_ratios), optimize)
+                if executor is not None:
+                    levels = executor.submit(MeshSimplifier.GenerateLODs, *args).result()
+                else:
+                    levels = MeshSimplifier.GenerateLODs(*args)
+                if len(levels) > 0:
+                    data.lod_indices = np.concatenate(levels).astype('i4')
+                    data.lod_counts = np.array([len(level) for level in levels], dtype='i4')
+
+        return data
+
+    @staticmethod
+    def GetSceneMeshes(loaded) -> list:
+        """
+        Returns list of (mesh, transform) pairs of all triangle meshes within loaded trimesh object
+
+        Scene geometry is listed once per node referencing it, transform is None for meshes
+        which are already in model space.
+        """
+        if isinstance(loaded, trimesh.Trimesh):
+            return [(loaded, None)]
+        if not isinstance(loaded, trimesh.Scene):
+            return []
+
+        meshes = []
+        identity = np.identity(4)
+        for node in loaded.graph.nodes_geometry:
+            transform, geometry = loaded.graph[node]
+            mesh = loaded.geometry.get(geometry)
+            if isinstance(mesh, trimesh.Trimesh):
+                meshes.append((mesh, None if np.array_equal(transform, identity) else transform))
+        return meshes
+
+    @staticmethod
+    def ConvertMeshes(meshes: list) -> MeshData:
+        """
+        Converts trimesh meshes into single set of flat mesh data arrays
+
+        Attributes are cast straight into preallocated arrays, each one exactly once. Normals
+        supplied by the file are used as loaded, only missing ones get computed. Vertex colors
+        are kept as 8-bit RGB, texture coordinates and colors are only kept when all meshes have them.
+
+        Parameters
+        ----------
+        meshes : list
+            List of (trimesh.Trimesh, 4x4 transform or None) pairs, see GetSceneMeshes
 
+        Returns
+        -------
+        MeshData holding float32 positions, normals & texcoords, uint8 colors and int32 indices
+        """
+        if len(meshes) == 0:
+            raise Exception('Model contains no triangle meshes, invalid!')
+
+        texcoords = [ModelLoader.__GetTexcoords(mesh) for mesh, _ in meshes]
+        colors = [ModelLoader.__GetColors(mesh) for mesh, _ in meshes]
+        has_texcoords = all(uv is not None for uv in texcoords)
+        has_colors = all(rgb is not None for rgb in colors)
+
+        num_vertices = sum(len(mesh.vertices) for mesh, _ in meshes)
+        num_faces = sum(len(mesh.faces) for mesh, _ in meshes)
+        data = MeshData(
+            vertices=np.empty((num_vertices, 3), dtype='f4'),
+            normals=np.empty((num_vertices, 3), dtype='f4'),
+            texcoords=np.empty((num_vertices if has_texcoords else 0, 2), dtype='f4'),
+            colors=np.empty((num_vertices if has_colors else 0, 3), dtype='u1'),
+            indices=np.empty((num_faces, 3), dtype='i4')
+        )
+
+        first_vertex = 0
+        first_face = 0
+        for (mesh, transform), uv, rgb in zip(meshes, texcoords, colors):
+            vertex_range = slice(first_vertex, first_vertex + len(mesh.vertices))
+            face_range = slice(first_face, first_face + len(mesh.faces))
+            ModelLoader.__TransformInto(mesh, transform, data.vertices[vertex_range], data.normals[vertex_range])
+            np.add(mesh.faces, first_vertex, out=data.indices[face_range], casting='same_kind')
+            if has_texcoords:
+                data.texcoords[vertex_range] = uv
+            if has_colors:
+                data.colors[vertex_range] = rgb
+            first_vertex = vertex_range.stop
+            first_face = face_range.stop
+
+        for name in ['vertices', 'normals', 'texcoords', 'colors', 'indices']:
+            setattr(data, name, getattr(data, name).reshape(-1))
+        return data
+
+    @staticmethod
+    def __TransformInto(mesh: trimesh.Trimesh, transform: np.ndarray, vertices: np.ndarray, normals: np.ndarray) -> None:
+        """Writes mesh positions & normals into given Nx3 float32 arrays, transformed when transform is given"""
+        # Supplied normals are returned as loaded, trimesh computes them from faces otherwise
+        if transform is None:
+            vertices[:] = mesh.vertices
+            normals[:] = mesh.vertex_normals
+            return
+
+        rotation = transform[:3, :3]
+        np.matmul(mesh.vertices, rotation.T, out=vertices, casting='same_kind')
+        vertices += transform[:3, 3].astype('f4')
+        # Normals transform by inverse transpose, renormalise to remove scaling
+        np.matmul(mesh.vertex_normals, np.linalg.inv(rotation), out=normals, casting='same_kind')
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        np.divide(normals, lengths, out=normals, where=lengths > 0.0)
+
+    @staticmethod
+    def __GetTexcoords(mesh: trimesh.Trimesh) -> np.ndarray:
+        """Returns Nx2 texture coordinates of given mesh, None when it has none"""
+        uv = getattr(mesh.visual, 'uv', None)
+        if uv is None or len(uv) != len(mesh.vertices):
+            return None
+        return uv
+
+    @staticmethod
+    def __GetColors(mesh: trimesh.Trimesh) -> np.ndarray:
+        """Returns Nx3 uint8 vertex colors of given mesh, None when it has none"""
         # Note: Vertex color support in Trimesh is limited when meshes contain texture coords or materials
-        # Will have to make modification to enable better support
-
-        if hasattr(mesh.visual, 'uv') and mesh.visual.uv is not None:
-            texcoords = mesh.visual.uv.flatten()
-
-        if hasattr(mesh.visual, 'vertex_colors') and mesh.visual.vertex_colors is not None:
-            print('Fetching pure vertex color')
-            for color in mesh.visual.vertex_colors:
-                colors.append(color[0] / 255)
-                colors.append(color[1] / 255)
-                colors.append(color[2] / 255)
-        elif hasattr(mesh.visual, 'vertex_attributes') and 'color' in mesh.visual.vertex_attributes:
-            print('Fetching vertex color via vertex attributes')
-            for color in mesh.visual.vertex_attributes["color"]:
-                colors.append(color[0] / 255)
-                colors.append(color[1] / 255)
-                colors.append(color[2] / 255)
+        # Colors next to texture coordinates are only available as vertex attribute
+        visual = mesh.visual
+        colors = getattr(visual, 'vertex_colors', None)
+        if colors is None and 'color' in getattr(visual, 'vertex_attributes', {}):
+            colors = visual.vertex_attributes['color']
+        if colors is None:
+            return None
+
+        colors = np.asarray(colors)
+        if colors.ndim != 2 or len(colors) != len(mesh.vertices) or colors.shape[1] < 3:
+            return None
+        colors = colors[:, :3]
+        if colors.dtype == np.uint8:
+            return colors
+        if np.issubdtype(colors.dtype, np.integer):
+            # Wider normalized integers keep their most significant byte
+            return (colors >> (8 * (colors.dtype.itemsize - 1))).astype('u1')
+        return np.rint(np.clip(colors, 0.0, 1.0) * 255.0).astype('u1')
+
+    @staticmethod
+    def GetImportOptions(optimize: bool = False, lod_ratios: tuple = None) -> dict:
+        """Returns options affecting LoadModel output, used as part of the mesh cache key"""
+        return {
+            'loader': 'trimesh',
+            'loader_version': LOADER_VERSION,
+            'trimesh_version': trimesh.__version__,
+            'scene': 'flatten',
+            'process': False,
+            'optimize': optimize,
+            'lod_ratios': list(lod_ratios) if lod_ratios else None
+        }
+
+    @staticmethod
+    def WarmCache(directory: str, cache: MeshCache, optimize: bool = False, lod_ratios: tuple = None) -> int:
+        """
+        Loads all supported model files within given directory tree into the mesh cache
 
+        Parameters
+        ----------
+        directory : str
+            Root directory to search for model files
+        cache : MeshCache
+            Mesh cache to populate
+        optimize : bool
+            Cache optimized meshes, see LoadModel
+        lod_ratios : tuple
+            Cache simplified detail levels, see LoadModel
+
+        Returns
+        -------
+        Number of model files added to the cache
+        """
+        num_added = 0
+        for filepath in ModelLoader.FindModelFiles(directory):
+            key = MeshCache.ComputeKey(filepath, ModelLoader.GetImportOptions(optimize, lod_ratios))
+            if os.path.isfile(cache.GetEntryPath(key)):
+                print(f'Cached: {filepath}')
+                continue
+
+            try:
+                ModelLoader.LoadModel(filepath, cache, optimize, lod_ratios)
+            except Exception as err:
+                print(f'Failed to cache {filepath} -> {err}')
+                continue
+
+            print(f'Added: {filepath}')
+            num_added += 1
+
+        return num_added
+
+    @staticmethod
+    def FindModelFiles(directory: str) -> list:
+        """Returns sorted filepaths of all model files in supported formats within given directory tree"""
+        extensions = set(f'.{ext.lower()}' for ext in trimesh.available_formats())
+        filepaths = []
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1].lower() in extensions:
+                    filepaths.append(os.path.join(root, filename))
+        return filepaths
+
+    @staticmethod
+    def __CreateRenderModel(data: MeshData) -> RenderModel:
         model = RenderModel()
-        model.vertices = np.array(vertices, dtype='f4')
-        model.normals = np.array(normals, dtype='f4')
-        model.texcoords = np.array(texcoords, dtype='f4')
-        model.colors = np.array(colors, dtype='f4')
-        model.indices = np.array(indices, dtype='i4')
-        return model
\ No newline at end of file
+        model.vertices = data.vertices
+        model.normals = data.normals
+        model.texcoords = data.texcoords
+        model.colors = data.colors
+        model.indices = data.indices
+        offsets = np.cumsum(data.lod_counts) - data.lod_counts
+        model.lods = [LODLevel(data.lod_indices[offset:offset + count]) for offset, count in zip(offsets, data.lod_counts)]
+        return model
@@ -0,0 +1,560 @@
+import os
+import mmap
+import warnings
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import numpy as np
+
+# Record type codes assigned to every line of the parsed file
+RECORD_OTHER = 0
+RECORD_VERTEX = 1
+RECORD_TEXCOORD = 2
+RECORD_NORMAL = 3
+RECORD_FACE = 4
+
+# Files smaller than this are parsed on the calling process
+PARALLEL_THRESHOLD = 32 * 1024 * 1024
+# Chunks are parsed in blocks of this many bytes, temporaries of a block stay in cache and
+# are recycled by the allocator rather than page faulted in fresh for every pass over the file
+BLOCK_SIZE = 256 * 1024
+
+_PADDING = 16
+_NEWLINE = ord('\n')
+_SPACE = ord(' ')
+_SLASH = ord('/')
+_MINUS = ord('-')
+
+# Constants used to parse up to 8 ASCII digits packed into single 64bit word at once
+_ASCII_ZEROS = np.uint64(0x3030303030303030)
+_ASCII_ZERO = np.uint64(0x30)
+_DIGIT_CHECK = np.uint64(0x3333333333333333)
+_HIGH_NIBBLES = np.uint64(0xF0F0F0F0F0F0F0F0)
+_LOW_NIBBLES = np.uint64(0x0F0F0F0F0F0F0F0F)
+_CARRY = np.uint64(0x0606060606060606)
+_LOW_BITS = np.uint64(0x7F7F7F7F7F7F7F7F)
+_POINTS = np.uint64(0x2E2E2E2E2E2E2E2E)
+_BYTE_INDICES = np.uint64(0x0001020304050607)
+_LEADING_MASKS = np.array([(1 << (8 * i)) - 1 for i in range(8)] + [(1 << 64) - 1], dtype=np.uint64)
+
+# Exact powers of ten, divisions by these are correctly rounded
+_POW10 = 10.0 ** np.arange(16, dtype=np.float64)
+
+@dataclass
+class OBJData:
+    """Flattened, render ready geometry parsed from an OBJ file"""
+    vertices: np.ndarray = field(default_factory=lambda: np.array([], dtype='f4'))
+    normals: np.ndarray = field(default_factory=lambda: np.array([], dtype='f4'))
+    texcoords: np.ndarray = field(default_factory=lambda: np.array([], dtype='f4'))
+    colors: np.ndarray = field(default_factory=lambda: np.array([], dtype='f4'))
+    indices: np.ndarray = field(default_factory=lambda: np.array([], dtype='i4'))
+
+class OBJParser(object):
+    @staticmethod
+    def Parse(filepath: str, num_workers: int = None, chunk_size: int = None) -> OBJData:
+        """
+        Parses given OBJ file into flattened, de-indexed geometry
+
+        The file is memory-mapped and its lines are classified by record type in bulk,
+        numeric data of each record type is then parsed with NumPy in a single pass.
+        Polygons are fan triangulated and every unique v/vt/vn corner triplet becomes
+        single vertex referenced by the resulting index buffer.
+
+        Files larger than the chunk size are split on line boundaries and parsed in
+        parallel by a pool of worker processes. Every chunk is parsed in cache sized blocks.
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to the OBJ file
+        num_workers : int
+            Maximum number of worker processes, defaults to number of CPU cores
+        chunk_size : int
+            Size in bytes above which the file is split into parallel chunks
+
+        Returns
+        -------
+        OBJData object holding the parsed geometry
+        """
+        if chunk_size is None:
+            chunk_size = PARALLEL_THRESHOLD
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+
+        size = os.path.getsize(filepath)
+        if size == 0:
+            return OBJData()
+
+        with open(filepath, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                ranges = _SplitLines(data, 0, size, max(chunk_size, 1))
+        if len(ranges) == 1 or num_workers <= 1:
+            blocks = [_ParseChunk(filepath, start, stop) for start, stop in ranges]
+        else:
+            starts, stops = zip(*ranges)
+            with ProcessPoolExecutor(max_workers=min(num_workers, len(ranges))) as executor:
+                blocks = list(executor.map(_ParseChunk, repeat(filepath), starts, stops))
+
+        return OBJParser.__Merge([block for chunk in blocks for block in chunk])
+
+    @staticmethod
+    def __Merge(chunks: list) -> OBJData:
+        """Joins parsed file chunks and builds final de-indexed geometry"""
+        counts = np.array([[len(c['v']), len(c['vt']), len(c['vn'])] for c in chunks], dtype=np.int64)
+        offsets = np.cumsum(counts, axis=0) - counts
+
+        # Relative (negative) face indices were resolved against chunk local
+        # record counts so they need shifting by records from preceding chunks
+        for chunk, offset in zip(chunks, offsets):
+            for key, column in (('fv', 0), ('fvt', 1), ('fvn', 2)):
+                relative = chunk[key + '_rel']
+                if relative is not None:
+                    chunk[key][relative] += offset[column]
+
+        positions = np.concatenate([c['v'] for c in chunks])
+        texcoords = np.concatenate([c['vt'] for c in chunks])
+        normals = np.concatenate([c['vn'] for c in chunks])
+        colors = None
+        if all(c['vc'] is not None for c in chunks) and len(positions) > 0:
+            colors = np.concatenate([c['vc'] for c in chunks])
+
+        corners = np.concatenate([c['corners'] for c in chunks])
+        face_v = np.concatenate([c['fv'] for c in chunks])
+        face_vt = np.concatenate([c['fvt'] for c in chunks])
+        face_vn = np.concatenate([c['fvn'] for c in chunks])
+
+        triangles = OBJParser.__Triangulate(corners)
+        if len(triangles) == 0:
+            return OBJData()
+
+        face_v = face_v[triangles]
+        face_vt = face_vt[triangles]
+        face_vn = face_vn[triangles]
+        OBJParser.__ValidateIndices(face_v, len(positions), 0, 'Face vertex index is out of range!')
+        OBJParser.__ValidateIndices(face_vt, len(texcoords), -1, 'Face texcoord index is out of range!')
+        OBJParser.__ValidateIndices(face_vn, len(normals), -1, 'Face normal index is out of range!')
+
+        has_texcoords = bool(np.any(face_vt >= 0))
+        has_normals = bool(np.any(face_vn >= 0))
+        _, first, inverse = OBJParser.__UniqueCorners(
+            face_v,
+            face_vt if has_texcoords else None,
+            face_vn if has_normals else None,
+            len(texcoords),
+            len(normals)
+        )
+
+        result = OBJData()
+        result.indices = inverse.astype('i4')
+        result.vertices = positions[face_v[first]].reshape(-1)
+        if has_texcoords:
+            result.texcoords = OBJParser.__Gather(texcoords, face_vt[first], 2)
+        if has_normals:
+            result.normals = OBJParser.__Gather(normals, face_vn[first], 3)
+        if colors is not None:
+            result.colors = colors[face_v[first]].reshape(-1)
+        return result
+
+    @staticmethod
+    def __Triangulate(corners: np.ndarray) -> np.ndarray:
+        """Returns flat corner indices of fan triangulated polygons"""
+        num_tris = np.maximum(corners - 2, 0)
+        face_start = np.cumsum(corners) - corners
+        total = int(num_tris.sum())
+        if total == 0:
+            return np.array([], dtype=np.int64)
+
+        tri_start = np.repeat(face_start, num_tris)
+        local = np.arange(total) - np.repeat(np.cumsum(num_tris) - num_tris, num_tris)
+        triangles = np.empty((total, 3), dtype=np.int64)
+        triangles[:, 0] = tri_start
+        triangles[:, 1] = tri_start + local + 1
+        triangles[:, 2] = tri_start + local + 2
+        return triangles.reshape(-1)
+
+    @staticmethod
+    def __UniqueCorners(face_v, face_vt, face_vn, num_texcoords: int, num_normals: int):
+        """Finds unique v/vt/vn triplets, ordered by vertex index"""
+        key = face_v.astype(np.int64)
+        span = 1
+        for attrib, count in ((face_vt, num_texcoords), (face_vn, num_normals)):
+            if attrib is not None:
+                span *= count + 1
+
+        num_positions = int(key.max()) + 1
+        if num_positions * span < np.iinfo(np.int64).max:
+            for attrib, count in ((face_vt, num_texcoords), (face_vn, num_normals)):
+                if attrib is not None:
+                    key = key * (count + 1) + (attrib + 1)
+            unique = OBJParser.__UniquePerPosition(face_v, key, num_positions)
+            if unique is not None:
+                return unique
+            return np.unique(key, return_index=True, return_inverse=True)
+
+        columns = [face_v] + [a for a in (face_vt, face_vn) if a is not None]
+        return np.unique(np.column_stack(columns), axis=0, return_index=True, return_inverse=True)
+
+    @staticmethod
+    def __UniquePerPosition(face_v: np.ndarray, key: np.ndarray, num_positions: int):
+        """
+        Finds unique corners without sorting when each position always comes with the same texcoord & normal
+
+        Vertices come out in the same order as with np.unique, keys then order by position index.
+        Returns None when some position is shared by corners with different attributes.
+        """
+        per_position = np.empty(num_positions, dtype=np.int64)
+        per_position[face_v] = key
+        if not np.array_equal(per_position[face_v], key):
+            return None
+
+        used = np.zeros(num_positions, dtype=bool)
+        used[face_v] = True
+        inverse = np.cumsum(used)[face_v] - 1
+        first = np.empty(int(inverse.max()) + 1, dtype=np.int64)
+        first[inverse] = np.arange(len(face_v))
+        return per_position[used], first, inverse
+
+    @staticmethod
+    def __Gather(values: np.ndarray, indices: np.ndarray, width: int) -> np.ndarray:
+        """Gathers attribute rows by index, rows for missing (-1) indices are zeroed"""
+        if len(indices) > 0 and indices.min() >= 0:
+            return values[indices].reshape(-1)
+        result = np.zeros((len(indices), width), dtype='f4')
+        valid = indices >= 0
+        result[valid] = values[indices[valid]]
+        return result.reshape(-1)
+
+    @staticmethod
+    def __ValidateIndices(indices: np.ndarray, count: int, minimum: int, message: str) -> None:
+        if len(indices) > 0 and (int(indices.max()) >= count or int(indices.min()) < minimum):
+            raise Exception(message)
+
+def _SplitLines(data: mmap.mmap, start: int, stop: int, size: int) -> list:
+    """Returns byte ranges of roughly given size covering start to stop, split at line boundaries"""
+    ranges = []
+    while start < stop:
+        end = data.find(b'\n', min(start + size, stop) - 1, stop)
+        end = stop if end < 0 else end + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def _ParseChunk(filepath: str, start: int, stop: int, block_size: int = BLOCK_SIZE) -> list:
+    """Parses single byte range of an OBJ file block by block (runs in worker processes), returns parsed blocks"""
+    blocks = []
+    with open(filepath, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for first, last in _SplitLines(mapped, start, stop, block_size):
+                # Leading padding keeps 64bit word reads of every token within the buffer
+                data = np.full(_PADDING + last - first, _SPACE, dtype=np.uint8)
+                data[_PADDING:] = np.frombuffer(mapped, dtype=np.uint8, count=last - first, offset=first)
+                blocks.append(_ParseBytes(data))
+    return blocks
+
+def _ParseBytes(data: np.ndarray) -> dict:
+    """Parses raw OBJ bytes (with leading padding) into per record type NumPy arrays"""
+    # Split whole chunk into tokens at once, slashes separate face indices
+    separator = (data <= _SPACE) | (data == _SLASH)
+    edges = np.flatnonzero(separator[1:] != separator[:-1]) + 1
+    if not separator[-1]:
+        edges = np.concatenate((edges, [len(data)]))
+    starts = edges[0::2]
+    ends = edges[1::2]
+
+    # First token of every line holds the record tag, the remaining ones its values
+    is_tag = data[starts - 1] == _NEWLINE
+    is_tag[0] = True
+    # Newline may precede the token by more than one byte, e.g. CRLF line endings or indentation
+    wide = np.flatnonzero(separator[starts - 2] & ~is_tag)
+    if len(wide) > 0:
+        newlines = np.flatnonzero(data == _NEWLINE)
+        is_tag[wide] = np.searchsorted(newlines, starts[wide]) > np.searchsorted(newlines, ends[wide - 1])
+    tags = np.flatnonzero(is_tag)
+    value_counts = np.diff(tags, append=len(starts)) - 1
+
+    tag_length = ends[tags] - starts[tags]
+    first = data[starts[tags]]
+    second = data[np.minimum(starts[tags] + 1, len(data) - 1)]
+    record_types = np.full(len(tags), RECORD_OTHER, dtype=np.uint8)
+    record_types[(tag_length == 1) & (first == ord('v'))] = RECORD_VERTEX
+    record_types[(tag_length == 2) & (first == ord('v')) & (second == ord('t'))] = RECORD_TEXCOORD
+    record_types[(tag_length == 2) & (first == ord('v')) & (second == ord('n'))] = RECORD_NORMAL
+    record_types[(tag_length == 1) & (first == ord('f'))] = RECORD_FACE
+    token_types = np.repeat(record_types, value_counts + 1)
+    token_types[tags] = RECORD_OTHER
+
+    tokens = _Tokens(data, starts, ends, token_types, record_types, value_counts)
+    message = 'Vertex format is invalid!'
+    positions, counts = tokens.ParseRecords(RECORD_VERTEX, False, message)
+    _ValidateComponents(counts, 3, message)
+    colors = None
+    if len(counts) == 0 or counts.min() >= 6:
+        colors = _TakeComponents(positions, counts, 3, 3)
+    positions = _TakeComponents(positions, counts, 0, 3)
+
+    message = 'Vertex normal format is invalid!'
+    normals, counts = tokens.ParseRecords(RECORD_NORMAL, False, message)
+    _ValidateComponents(counts, 3, message)
+    normals = _TakeComponents(normals, counts, 0, 3)
+
+    message = 'Texcoord format is invalid!'
+    texcoords, counts = tokens.ParseRecords(RECORD_TEXCOORD, False, message)
+    _ValidateComponents(counts, 2, message)
+    texcoords = _TakeComponents(texcoords, counts, 0, 2)
+
+    result = _ParseFaceRecords(tokens)
+    result.update({'v': positions, 'vc': colors, 'vt': texcoords, 'vn': normals})
+    return result
+
+@dataclass
+class _Tokens:
+    """Token boundaries of a parsed chunk along with the record type of each token"""
+    data: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    token_types: np.ndarray
+    record_types: np.ndarray
+    # Number of value tokens following the tag of each record
+    value_counts: np.ndarray
+
+    def Select(self, record: int) -> np.ndarray:
+        """Returns indices of value tokens of given record type"""
+        return np.flatnonzero(self.token_types == record)
+
+    def CountPerRecord(self, record: int) -> np.ndarray:
+        """Returns number of value tokens in each record of given type"""
+        return self.value_counts[self.record_types == record]
+
+    def ParseRecords(self, record: int, integer: bool, message: str):
+        """Parses values of all records of given type, returns flat values and value count per record"""
+        selected = self.Select(record)
+        values = _ParseDecimals(
+            self.data,
+            self.starts[selected],
+            self.ends[selected],
+            integer,
+            message
+        )
+        return values, self.CountPerRecord(record)
+
+def _ParseDecimals(data, starts, ends, integer: bool, message: str) -> np.ndarray:
+    """
+    Parses decimal number tokens given by their byte ranges
+
+    Digits are folded 8 at a time from 64bit words read straight out of the data, most
+    decimals have all their digits within the last 8 bytes and fold at once. Mantissas of up
+    to 15 digits are scaled by exact powers of ten which yields the same results as strtod.
+    Tokens outside of that (exponents, nan, long fractions) are handed over to NumPy text parser instead.
+    """
+    if len(starts) == 0:
+        return np.array([], dtype=np.int64 if integer else np.float32)
+
+    words = np.ndarray(shape=(len(data) - 7,), dtype='<u8', buffer=data, strides=(1,))
+    negative = data[starts] == _MINUS
+    if integer:
+        int_count = ends - starts - negative
+        valid = (int_count > 0) & (int_count <= 16)
+        value, folded = _FoldDigits(words, ends, np.clip(int_count, 0, 8))
+        valid &= folded
+        if int_count.max() > 8:
+            high, folded = _FoldDigits(words, ends - 8, np.clip(int_count - 8, 0, 8))
+            value += high * np.uint64(100000000)
+            valid &= folded
+        values = value.astype(np.int64)
+    else:
+        values, valid = _ParseFloats(words, starts, ends, negative)
+    np.negative(values, out=values, where=negative)
+
+    invalid = np.flatnonzero(~valid)
+    if len(invalid) > 0:
+        values[invalid] = _ParseDecimalsFallback(data, starts[invalid], ends[invalid], integer, message)
+    return values if integer else values.astype(np.float32)
+
+def _ParseFloats(words: np.ndarray, starts: np.ndarray, ends: np.ndarray, negative: np.ndarray):
+    """Parses unsigned part of decimal tokens, returns the values along with flags telling whether they were parsed"""
+    # Decimal point has to be within the last 8 bytes of the token
+    length = ends - starts - negative
+    tail = _MaskLeading(words[ends - 8], np.minimum(length, 8))
+    frac_count, has_point = _FindPoint(tail)
+
+    # Digits preceding the point are moved one byte up over it, the remaining digits then fold at once
+    point = 7 - frac_count
+    merged = ((tail & _LEADING_MASKS[point]) << np.uint64(8)) | (tail & ~_LEADING_MASKS[point + 1]) | _ASCII_ZERO
+    merged = np.where(has_point, merged, tail)
+    mantissa, valid = _FoldWord(merged)
+    valid &= (length <= 8) & (length > has_point)
+    values = mantissa.astype(np.float64) / _POW10[frac_count]
+
+    # Integer and fractional digits of longer tokens are folded separately
+    long = np.flatnonzero(~valid)
+    if len(long) > 0:
+        starts, ends, negative = starts[long], ends[long], negative[long]
+        frac_count, has_point, tail = frac_count[long], has_point[long], tail[long]
+        points = ends - frac_count - has_point
+        int_count = points - starts - negative
+        parsed = (int_count >= 0) & (int_count + frac_count > 0) & (int_count + frac_count <= 15)
+        int_count[~parsed] = 0
+
+        value, folded = _FoldDigits(words, points, np.minimum(int_count, 8))
+        parsed &= folded
+        if int_count.max() > 8:
+            high, folded = _FoldDigits(words, points - 8, np.maximum(int_count - 8, 0))
+            value += high * np.uint64(100000000)
+            parsed &= folded
+
+        frac, folded = _FoldWord(_MaskLeading(tail, frac_count))
+        parsed &= folded
+        scale = _POW10[frac_count]
+        values[long] = (value * scale.astype(np.uint64) + frac).astype(np.float64) / scale
+        valid[long] = parsed
+    return values, valid
+
+def _FindPoint(words: np.ndarray):
+    """
+    Locates decimal point within 64bit words holding last 8 bytes of each token
+
+    Returns number of bytes following the point and flags telling whether it was found.
+    """
+    # Exact zero byte test, sets top bit of every byte that matched the point character
+    matched = words ^ _POINTS
+    matched = ~(((matched & _LOW_BITS) + _LOW_BITS) | matched | _LOW_BITS)
+
+    # Index of the single matched byte is gathered into the top byte, tokens with more than one point are left for the fallback
+    found = (matched != 0) & ((matched & (matched - np.uint64(1))) == 0)
+    position = (((matched >> np.uint64(7)) * _BYTE_INDICES) >> np.uint64(56)).astype(np.int64)
+    frac_count = np.where(found, 7 - position, 0)
+    return frac_count, found
+
+def _FoldDigits(words: np.ndarray, ends: np.ndarray, counts: np.ndarray):
+    """Converts up to 8 ASCII digits preceding given end positions into integers"""
+    return _FoldWord(_MaskLeading(words[ends - 8], counts))
+
+def _MaskLeading(chunk: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Replaces bytes preceding given number of top bytes of 64bit words with ASCII zeros"""
+    leading = _LEADING_MASKS[8 - counts]
+    return (chunk & ~leading) | (_ASCII_ZEROS & leading)
+
+def _FoldWord(chunk: np.ndarray):
+    """
+    Converts 8 ASCII digits held in 64bit words into integers
+
+    Returns the integers along with flags telling whether all the bytes were digits.
+    """
+    checked = (chunk & _HIGH_NIBBLES) | (((chunk + _CARRY) & _HIGH_NIBBLES) >> np.uint64(4))
+    valid = checked == _DIGIT_CHECK
+
+    chunk = ((chunk & _LOW_NIBBLES) * np.uint64(2561)) >> np.uint64(8)
+    chunk = ((chunk & np.uint64(0x00FF00FF00FF00FF)) * np.uint64(6553601)) >> np.uint64(16)
+    chunk = ((chunk & np.uint64(0x0000FFFF0000FFFF)) * np.uint64(42949672960001)) >> np.uint64(32)
+    return chunk, valid
+
+def _ParseDecimalsFallback(data: np.ndarray, starts: np.ndarray, ends: np.ndarray, integer: bool, message: str) -> np.ndarray:
+    """Parses number tokens with NumPy text parser"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    owners = np.repeat(np.arange(len(starts)), lengths)
+    source = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths) + starts[owners]
+
+    # Tokens are copied into a space separated buffer
+    text = np.full(total + len(starts), _SPACE, dtype=np.uint8)
+    text[np.arange(total) + owners] = data[source]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(text.tobytes(), dtype=np.int64 if integer else np.float32, sep=' ')
+    if len(values) != len(starts):
+        raise Exception(message)
+    return values
+
+def _ValidateComponents(counts: np.ndarray, minimum: int, message: str) -> None:
+    if len(counts) > 0 and counts.min() < minimum:
+        raise Exception(message)
+
+def _TakeComponents(values: np.ndarray, counts: np.ndarray, first: int, width: int) -> np.ndarray:
+    """Takes fixed number of components from each record of variable length"""
+    if len(counts) == 0:
+        return np.zeros((0, width), dtype='f4')
+    if counts.min() == counts.max():
+        return values.reshape(len(counts), -1)[:, first:first + width]
+    starts = np.cumsum(counts) - counts
+    return values[starts[:, None] + np.arange(first, first + width)]
+
+def _ParseFaceRecords(tokens: _Tokens) -> dict:
+    """Parses face records into per corner v/vt/vn indices and corner count per face"""
+    data = tokens.data
+    selected = tokens.Select(RECORD_FACE)
+    starts = tokens.starts[selected]
+    values = _ParseDecimals(
+        data,
+        starts,
+        tokens.ends[selected],
+        True,
+        'Face index format is invalid!'
+    )
+
+    # Corner layout is one of: v, v/vt, v//vn or v/vt/vn
+    corner_start = data[starts - 1] <= _SPACE
+    corner_first = np.flatnonzero(corner_start)
+    # Value tokens of each face are contiguous, its corners are the tokens starting a corner
+    counts = tokens.CountPerRecord(RECORD_FACE)
+    corners = np.zeros(len(counts), dtype=np.int64)
+    filled = counts > 0
+    offsets = np.cumsum(counts) - counts
+    if np.any(filled):
+        corners[filled] = np.add.reduceat(corner_start, offsets[filled], dtype=np.int64)
+    split = _SplitUniformCorners(data, starts, values, corner_first)
+    if split is not None:
+        face_v, face_vt, face_vn = split
+    else:
+        after_double = (data[starts - 1] == _SLASH) & (data[np.maximum(starts - 2, 0)] == _SLASH)
+        corner_ids = np.cumsum(corner_start) - 1
+        rank = np.arange(len(starts)) - corner_first[corner_ids]
+
+        face_v = values[corner_first]
+        face_vt = np.zeros_like(face_v)
+        face_vn = np.zeros_like(face_v)
+        is_vt = (rank == 1) & ~after_double
+        is_vn = ((rank == 2) | after_double) & (rank > 0)
+        face_vt[corner_ids[is_vt]] = values[is_vt]
+        face_vn[corner_ids[is_vn]] = values[is_vn]
+
+    # Relative indices refer to records defined before the face line
+    face_records = tokens.record_types == RECORD_FACE
+    result = {'corners': corners}
+    for key, index, record in (('fv', face_v, RECORD_VERTEX), ('fvt', face_vt, RECORD_TEXCOORD), ('fvn', face_vn, RECORD_NORMAL)):
+        resolved = index - 1
+        if len(index) > 0 and index.min() < 0:
+            relative = index < 0
+            preceding = np.cumsum(tokens.record_types == record)[face_records]
+            resolved[relative] = np.repeat(preceding, corners)[relative] + index[relative]
+        else:
+            relative = None
+        result[key] = resolved
+        result[key + '_rel'] = relative
+    return result
+
+def _SplitUniformCorners(data: np.ndarray, starts: np.ndarray, values: np.ndarray, corner_first: np.ndarray):
+    """
+    Splits face indices into v/vt/vn columns when all corners share single layout
+
+    Returns None when corners differ in their layout, these are split one by one instead.
+    """
+    num_corners = len(corner_first)
+    width = len(starts) // num_corners if num_corners > 0 else 0
+    if width == 0 or width > 3 or width * num_corners != len(starts):
+        return None
+    if not np.array_equal(corner_first, np.arange(0, len(starts), width)):
+        return None
+
+    columns = values.reshape(num_corners, width)
+    missing = np.zeros(num_corners, dtype=values.dtype)
+    if width == 1:
+        return columns[:, 0], missing, missing
+
+    # Second index follows double slash only when texcoords are left out
+    second = starts[1::width]
+    double = (data[second - 1] == _SLASH) & (data[second - 2] == _SLASH)
+    if not np.any(double):
+        return columns[:, 0], columns[:, 1], columns[:, 2] if width == 3 else missing
+    if width == 2 and np.all(double):
+        return columns[:, 0], missing, columns[:, 1]
+    return None
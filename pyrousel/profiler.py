@@ -0,0 +1,576 @@
+import os
+import json
+import ctypes
+import time
+import threading
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+import numpy as np
+import moderngl as mgl
+
+# Number of frames kept per scope for percentile statistics
+DEFAULT_HISTORY = 240
+# Maximum number of events kept for Chrome trace export
+DEFAULT_TRACE_EVENTS = 200000
+# Number of whole frames submitted after a frame before its GPU query results are read, avoids stalls
+GPU_QUERY_LATENCY = 1
+# Frames whose GPU query results are pending at most, older frames are dropped rather than waited for
+MAX_PENDING_GPU_FRAMES = 8
+# Seconds between resident set size samples taken while a memory stage runs
+DEFAULT_RSS_SAMPLE_INTERVAL = 0.002
+
+@dataclass
+class ScopeStats:
+    name: str
+    # Either 'cpu' or 'gpu'
+    category: str
+    # Nesting depth of the scope, 0 being the whole frame, GPU passes are always at depth 0
+    depth: int = 0
+    last: float = 0.0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+
+    def __repr__(self):
+        return f'{self.category}:{self.name} p50:{self.p50:.3f}ms p95:{self.p95:.3f}ms p99:{self.p99:.3f}ms'
+
+class SampleRing(object):
+    """
+    Fixed size ring buffer of timing samples
+    """
+    def __init__(self, size: int = DEFAULT_HISTORY):
+        self.__samples = np.zeros(size, dtype='f8')
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return min(self.__count, len(self.__samples))
+
+    def Add(self, value: float) -> None:
+        """Stores sample, overwriting the oldest one when the ring is full"""
+        self.__samples[self.__count % len(self.__samples)] = value
+        self.__count += 1
+
+    def GetLast(self) -> float:
+        """Returns most recently added sample"""
+        if self.__count == 0:
+            return 0.0
+        return float(self.__samples[(self.__count - 1) % len(self.__samples)])
+
+    def GetPercentiles(self, percentiles: tuple = (50, 95, 99)) -> np.ndarray:
+        """Returns given percentiles of stored samples, zeros when empty"""
+        if self.__count == 0:
+            return np.zeros(len(percentiles))
+        return np.percentile(self.__samples[:len(self)], percentiles)
+
+class _NullScope(object):
+    """Scope returned while profiling is disabled"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_NULL_SCOPE = _NullScope()
+
+class _CPUScope(object):
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.__profiler = profiler
+        self.__name = name
+        self.__start = 0
+
+    def __enter__(self):
+        self.__start = self.__profiler._BeginCPUScope(self.__name)
+        return self
+
+    def __exit__(self, *args):
+        self.__profiler._EndCPUScope(self.__name, self.__start)
+        return False
+
+class _ElapsedQuery(object):
+    """
+    Time elapsed query whose result availability can be checked without waiting for the GPU
+
+    ModernGL queries expose neither their names nor result availability and reading their
+    elapsed time blocks until the GPU finished them, the query is issued through PyOpenGL instead.
+    """
+    def __init__(self):
+        from OpenGL import GL
+        self.glo = int(GL.glGenQueries(1)[0])
+
+    def __enter__(self):
+        from OpenGL import GL
+        GL.glBeginQuery(GL.GL_TIME_ELAPSED, self.glo)
+        return self
+
+    def __exit__(self, *args):
+        from OpenGL import GL
+        GL.glEndQuery(GL.GL_TIME_ELAPSED)
+        return False
+
+    def IsAvailable(self) -> bool:
+        """Returns true when result of the last issue can be read without waiting"""
+        from OpenGL import GL
+        return bool(GL.glGetQueryObjectiv(self.glo, GL.GL_QUERY_RESULT_AVAILABLE))
+
+    def GetElapsed(self) -> int:
+        """Returns elapsed GPU time in nanoseconds, waits for the result unless it is available"""
+        from OpenGL import GL
+        from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+        # PyOpenGL can not convert 64 bit query results, raw call writes into ctypes value instead
+        elapsed = ctypes.c_uint64()
+        glGetQueryObjectui64v(self.glo, GL.GL_QUERY_RESULT, ctypes.byref(elapsed))
+        return elapsed.value
+
+    def Release(self) -> None:
+        from OpenGL import GL
+        GL.glDeleteQueries(1, [self.glo])
+        self.glo = 0
+
+class _GPUScope(object):
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.__profiler = profiler
+        self.__name = name
+        self.__query = None
+
+    def __enter__(self):
+        self.__query = self.__profiler._BeginGPUScope(self.__name)
+        if self.__query is not None:
+            self.__query.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        if self.__query is not None:
+            self.__query.__exit__(*args)
+            self.__profiler._EndGPUScope()
+        return False
+
+class Profiler(object):
+    """
+    Per frame CPU scope and GPU pass timer
+
+    CPU scopes are timed with perf_counter_ns and may nest. GPU scopes time the commands
+    issued within them via timer queries, GPU scopes do not nest (inner ones are folded into
+    the outer one) and same named scope may run several times per frame, its times are summed.
+    Query results are read at least GPU_QUERY_LATENCY frames late and only once all queries of
+    the frame are available, frames still running on the GPU stay pending and new frames use
+    another query set. Each scope keeps ring of recent per frame times for percentile statistics.
+    While disabled scopes are shared no-op objects.
+    """
+    def __init__(self, ctx: mgl.Context = None, history: int = DEFAULT_HISTORY, enabled: bool = False):
+        self.__ctx = ctx
+        self.__history = history
+        self.enabled = enabled
+        self.frame_index = 0
+        self.__frame_start = 0
+        self.__depth = 0
+        # Per frame accumulated CPU time & depth per scope name, flushed into rings on EndFrame
+        self.__cpu_frame: dict = {}
+        self.__cpu_rings: dict = {}
+        self.__cpu_depths: dict = {}
+        self.__gpu_rings: dict = {}
+        # Query sets, each maps scope name to (queries, number used, CPU start timestamps)
+        self.__gpu_set: dict = {}
+        # Sets of submitted frames oldest first, along with the frame index, and sets ready for reuse
+        self.__gpu_pending: deque = deque()
+        self.__gpu_free: list = []
+        self.__gpu_active = False
+        self.__in_frame = False
+        self.trace_events = deque(maxlen=DEFAULT_TRACE_EVENTS)
+
+    def SetEnabled(self, enabled: bool) -> None:
+        """Enables or disables profiling, pending GPU results are discarded when disabling"""
+        if self.enabled == enabled:
+            return
+        self.enabled = enabled
+        if not enabled:
+            self.__ResetQueries()
+            self.__cpu_frame.clear()
+            self.__in_frame = False
+            self.__depth = 0
+
+    def Scope(self, name: str):
+        """
+        Returns context manager timing CPU work within it
+
+        Parameters
+        ----------
+        name : str
+            Scope name, nested scopes should have unique names
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _CPUScope(self, name)
+
+    def GPUScope(self, name: str):
+        """
+        Returns context manager timing GPU execution of commands issued within it
+
+        Parameters
+        ----------
+        name : str
+            Pass name, time of all same named scopes within a frame is summed
+        """
+        if not self.enabled or self.__ctx is None:
+            return _NULL_SCOPE
+        return _GPUScope(self, name)
+
+    def BeginFrame(self) -> None:
+        """Starts new frame, collects GPU times of earlier frames whose query results are available"""
+        if not self.enabled:
+            return
+
+        if any(used > 0 for _, used, _ in self.__gpu_set.values()):
+            self.__gpu_pending.append((self.frame_index, self.__gpu_set))
+            self.__gpu_set = self.__gpu_free.pop() if self.__gpu_free else {}
+        self.frame_index += 1
+        self.__in_frame = True
+        self.__depth = 0
+        self.__frame_start = time.perf_counter_ns()
+        self.__CollectGPUTimes()
+
+    def EndFrame(self) -> None:
+        """Ends current frame and stores per frame CPU times of all its scopes"""
+        if not self.enabled or not self.__in_frame:
+            return
+
+        end = time.perf_counter_ns()
+        self.__AddTraceEvent('frame', 'cpu', self.__frame_start, end - self.__frame_start, 0)
+        self.__GetRing(self.__cpu_rings, 'frame').Add((end - self.__frame_start) * 1e-6)
+        self.__cpu_depths['frame'] = 0
+        for name, (elapsed, depth) in self.__cpu_frame.items():
+            self.__GetRing(self.__cpu_rings, name).Add(elapsed * 1e-6)
+            self.__cpu_depths[name] = depth
+        self.__cpu_frame.clear()
+        self.__in_frame = False
+
+    def GetStats(self) -> list:
+        """Returns list of ScopeStats, CPU scopes in order of first appearance followed by GPU passes"""
+        stats = []
+        for category, rings in [('cpu', self.__cpu_rings), ('gpu', self.__gpu_rings)]:
+            for name, ring in rings.items():
+                p50, p95, p99 = ring.GetPercentiles((50, 95, 99))
+                depth = self.__cpu_depths.get(name, 0) if category == 'cpu' else 0
+                stats.append(ScopeStats(name, category, depth, ring.GetLast(), float(p50), float(p95), float(p99)))
+        return stats
+
+    def ExportChromeTrace(self, filepath: str) -> None:
+        """
+        Writes recorded scopes as Chrome trace event JSON (chrome://tracing, Perfetto)
+
+        CPU scopes are on thread 0, GPU passes on thread 1 placed at the time they were issued.
+        """
+        trace = {
+            'traceEvents': list(self.trace_events),
+            'displayTimeUnit': 'ms',
+            'otherData': {'frames': self.frame_index},
+        }
+        with open(filepath, 'w') as file:
+            json.dump(trace, file)
+
+    def Reset(self) -> None:
+        """Discards all statistics and recorded trace events"""
+        self.__cpu_rings.clear()
+        self.__cpu_depths.clear()
+        self.__gpu_rings.clear()
+        self.trace_events.clear()
+
+    def Release(self) -> None:
+        """Deletes GPU timer queries, must be called while the context is current"""
+        self.__ResetQueries()
+        for queries in self.__gpu_free + [self.__gpu_set]:
+            for pool, _, _ in queries.values():
+                for query in pool:
+                    query.Release()
+        self.__gpu_free.clear()
+        self.__gpu_set = {}
+
+    def _BeginCPUScope(self, name: str) -> int:
+        # Reserve the entry so scopes are reported in order they begin rather than end
+        if self.__in_frame:
+            self.__cpu_frame.setdefault(name, (0, self.__depth + 1))
+        self.__depth += 1
+        return time.perf_counter_ns()
+
+    def _EndCPUScope(self, name: str, start: int) -> None:
+        end = time.perf_counter_ns()
+        self.__depth -= 1
+        # Scopes outside of frame, e.g. profiling enabled mid frame, are not recorded
+        if not self.__in_frame:
+            return
+        elapsed, _ = self.__cpu_frame.get(name, (0, 0))
+        # Top level scopes are nested within the frame
+        self.__cpu_frame[name] = (elapsed + end - start, self.__depth + 1)
+        self.__AddTraceEvent(name, 'cpu', start, end - start, 0)
+
+    def _BeginGPUScope(self, name: str) -> _ElapsedQuery:
+        if self.__gpu_active or not self.__in_frame:
+            return None
+
+        queries = self.__gpu_set
+        pool, used, starts = queries.get(name, ([], 0, []))
+        if used == len(pool):
+            pool.append(_ElapsedQuery())
+        starts = starts[:used] + [time.perf_counter_ns()]
+        queries[name] = (pool, used + 1, starts)
+        self.__gpu_active = True
+        return pool[used]
+
+    def _EndGPUScope(self) -> None:
+        self.__gpu_active = False
+
+    def __CollectGPUTimes(self) -> None:
+        """Reads results of pending query sets in frame order, stops at the first set still running on the GPU"""
+        while self.__gpu_pending:
+            frame_index, queries = self.__gpu_pending[0]
+            if len(self.__gpu_pending) <= MAX_PENDING_GPU_FRAMES:
+                if self.frame_index - frame_index <= GPU_QUERY_LATENCY:
+                    break
+                if not all(query.IsAvailable() for pool, used, _ in queries.values() for query in pool[:used]):
+                    break
+
+                for name, (pool, used, starts) in queries.items():
+                    if used == 0:
+                        continue
+                    elapsed = 0
+                    for query, start in zip(pool[:used], starts):
+                        duration = query.GetElapsed()
+                        elapsed += duration
+                        self.__AddTraceEvent(name, 'gpu', start, duration, 1)
+                    self.__GetRing(self.__gpu_rings, name).Add(elapsed * 1e-6)
+            self.__gpu_pending.popleft()
+            self.__FreeQueries(queries)
+
+    def __AddTraceEvent(self, name: str, category: str, start: int, duration: int, thread: int) -> None:
+        self.trace_events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start / 1000.0,
+            'dur': duration / 1000.0,
+            'pid': 0,
+            'tid': thread,
+        })
+
+    def __GetRing(self, rings: dict, name: str) -> SampleRing:
+        ring = rings.get(name)
+        if ring is None:
+            ring = SampleRing(self.__history)
+            rings[name] = ring
+        return ring
+
+    def __FreeQueries(self, queries: dict) -> None:
+        """Marks queries of given set unused and keeps the set for reuse"""
+        for name, (pool, _, _) in queries.items():
+            queries[name] = (pool, 0, [])
+        self.__gpu_free.append(queries)
+
+    def __ResetQueries(self) -> None:
+        """Discards pending GPU results, queries are kept for reuse"""
+        while self.__gpu_pending:
+            self.__FreeQueries(self.__gpu_pending.popleft()[1])
+        self.__FreeQueries(self.__gpu_set)
+        self.__gpu_set = self.__gpu_free.pop()
+        self.__gpu_active = False
+
+class GPUTimer(object):
+    """
+    GPU time of the commands issued between Begin and End, e.g. whole frame
+
+    Measured with timestamp queries rather than time elapsed queries, these do not nest so the
+    timer may enclose Profiler GPU scopes. Results are read GPU_QUERY_LATENCY frames late and
+    only when available, the timer never stalls the pipeline and skips late results instead.
+    """
+    def __init__(self, latency: int = GPU_QUERY_LATENCY):
+        from OpenGL import GL
+        self.__queries = [tuple(int(query) for query in GL.glGenQueries(2)) for _ in range(latency + 1)]
+        self.__pending = [False] * len(self.__queries)
+        self.__index = 0
+        self.__active = False
+        # Last read GPU time in milliseconds, None until the first result is read
+        self.last_time: float = None
+
+    def __enter__(self):
+        self.Begin()
+        return self
+
+    def __exit__(self, *args):
+        self.End()
+        return False
+
+    def Begin(self) -> float:
+        """
+        Reads result of the oldest pending measurement and starts new one
+
+        Returns
+        -------
+        GPU time in milliseconds read by this call, None when no new result was available
+        """
+        from OpenGL import GL
+        gpu_time = self.__Collect(self.__index)
+        GL.glQueryCounter(self.__queries[self.__index][0], GL.GL_TIMESTAMP)
+        self.__active = True
+        return gpu_time
+
+    def End(self) -> None:
+        """Ends measurement started by Begin"""
+        from OpenGL import GL
+        if not self.__active:
+            return
+        GL.glQueryCounter(self.__queries[self.__index][1], GL.GL_TIMESTAMP)
+        self.__pending[self.__index] = True
+        self.__index = (self.__index + 1) % len(self.__queries)
+        self.__active = False
+
+    def Release(self) -> None:
+        """Deletes timestamp queries, timer can not be used afterwards"""
+        from OpenGL import GL
+        GL.glDeleteQueries(len(self.__queries) * 2, [query for pair in self.__queries for query in pair])
+        self.__queries = []
+
+    def __Collect(self, index: int) -> float:
+        from OpenGL import GL
+        from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+        if not self.__pending[index]:
+            return None
+        self.__pending[index] = False
+        begin, end = self.__queries[index]
+        if not GL.glGetQueryObjectiv(end, GL.GL_QUERY_RESULT_AVAILABLE):
+            return None
+
+        # PyOpenGL can not convert 64 bit query results, raw call writes into ctypes values instead
+        timestamps = [ctypes.c_uint64(), ctypes.c_uint64()]
+        for query, timestamp in zip((begin, end), timestamps):
+            glGetQueryObjectui64v(query, GL.GL_QUERY_RESULT, ctypes.byref(timestamp))
+        self.last_time = (timestamps[1].value - timestamps[0].value) * 1e-6
+        return self.last_time
+
+@dataclass
+class MemoryStats:
+    name: str
+    # Peak of traced Python & NumPy allocations during the stage above its start, in bytes
+    traced_peak: int = 0
+    # Peak sampled resident set size during the stage, in bytes, zero when unavailable
+    rss_peak: int = 0
+    # Resident set size at the start of the stage, in bytes
+    rss_start: int = 0
+
+    def __repr__(self):
+        megabyte = 1024.0 * 1024.0
+        return (
+            f'{self.name} traced peak:{self.traced_peak / megabyte:.1f}MB '
+            f'rss peak:{self.rss_peak / megabyte:.1f}MB (+{(self.rss_peak - self.rss_start) / megabyte:.1f}MB)'
+        )
+
+class _MemoryScope(object):
+    def __init__(self, profiler: 'MemoryProfiler', name: str):
+        self.__profiler = profiler
+        self.__name = name
+        self.__traced_start = 0
+        self.__rss_start = 0
+        self.__rss_peak = 0
+        self.__stop = threading.Event()
+        self.__sampler = None
+
+    def __enter__(self):
+        MemoryProfiler._StartTracing()
+        tracemalloc.reset_peak()
+        self.__traced_start = tracemalloc.get_traced_memory()[0]
+        self.__rss_start = MemoryProfiler.GetRSS()
+        self.__rss_peak = self.__rss_start
+        self.__sampler = threading.Thread(target=self.__SampleRSS, name='MemorySampler', daemon=True)
+        self.__sampler.start()
+        return self
+
+    def __exit__(self, *args):
+        traced_peak = tracemalloc.get_traced_memory()[1] - self.__traced_start
+        self.__stop.set()
+        self.__sampler.join()
+        MemoryProfiler._StopTracing()
+        self.__rss_peak = max(self.__rss_peak, MemoryProfiler.GetRSS())
+        self.__profiler._AddStats(MemoryStats(self.__name, max(traced_peak, 0), self.__rss_peak, self.__rss_start))
+        return False
+
+    def __SampleRSS(self) -> None:
+        interval = self.__profiler.sample_interval
+        while not self.__stop.wait(interval):
+            self.__rss_peak = max(self.__rss_peak, MemoryProfiler.GetRSS())
+
+class MemoryProfiler(object):
+    """
+    Peak memory of named stages of one-off work such as loading a model
+
+    Traced peak comes from tracemalloc which also accounts NumPy array data, resident set
+    size is sampled by background thread while the stage runs and includes native allocations
+    (e.g. driver staging memory). Tracing is process wide and only active while some stage
+    runs, stages should not nest and concurrently running stages see each other allocations.
+    Stages entered repeatedly under the same name keep their largest peaks.
+    """
+    __trace_lock = threading.Lock()
+    __trace_users = 0
+    __trace_owned = False
+
+    def __init__(self, sample_interval: float = DEFAULT_RSS_SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+        self.__stats: dict = {}
+        self.__lock = threading.Lock()
+
+    def Stage(self, name: str):
+        """
+        Returns context manager measuring peak memory of the work within it
+
+        Parameters
+        ----------
+        name : str
+            Stage name
+        """
+        return _MemoryScope(self, name)
+
+    @staticmethod
+    def NullStage(name: str):
+        """Returns no-op stage, stand-in for Stage when memory is not profiled"""
+        return _NULL_SCOPE
+
+    def GetStats(self) -> list:
+        """Returns list of MemoryStats in order the stages first ran"""
+        with self.__lock:
+            return list(self.__stats.values())
+
+    def GetPeakRSS(self) -> int:
+        """Returns largest resident set size seen across all stages in bytes"""
+        return max((stats.rss_peak for stats in self.GetStats()), default=0)
+
+    @staticmethod
+    def GetRSS() -> int:
+        """Returns current resident set size of the process in bytes, zero when unavailable"""
+        try:
+            with open('/proc/self/statm', 'r') as file:
+                return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def _AddStats(self, stats: MemoryStats) -> None:
+        with self.__lock:
+            previous = self.__stats.get(stats.name)
+            if previous is not None:
+                stats.traced_peak = max(stats.traced_peak, previous.traced_peak)
+                stats.rss_start = previous.rss_start
+                stats.rss_peak = max(stats.rss_peak, previous.rss_peak)
+            self.__stats[stats.name] = stats
+
+    @classmethod
+    def _StartTracing(cls) -> None:
+        with cls.__trace_lock:
+            if cls.__trace_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                cls.__trace_owned = True
+            cls.__trace_users += 1
+
+    @classmethod
+    def _StopTracing(cls) -> None:
+        with cls.__trace_lock:
+            cls.__trace_users -= 1
+            # Tracing started by someone else is left running
+            if cls.__trace_users == 0 and cls.__trace_owned:
+                tracemalloc.stop()
+                cls.__trace_owned = False
@@ -0,0 +1,100 @@
+import math
+
+# GPU frame time in milliseconds the resolution scale is adjusted to hold
+DEFAULT_TARGET_GPU_TIME = 12.0
+# Bounds of the scene resolution relative to the window framebuffer
+DEFAULT_MIN_SCALE = 0.5
+DEFAULT_MAX_SCALE = 1.0
+# Relative deviation from the target tolerated without touching the scale, stops oscillation around the target
+DEFAULT_SCALE_TOLERANCE = 0.1
+# Fraction of the estimated scale correction applied per measurement
+DEFAULT_SCALE_RESPONSE = 0.5
+# Weight of the latest measurement within the smoothed GPU time, filters out single frame spikes
+DEFAULT_TIME_SMOOTHING = 0.3
+# Scales are kept on multiples of this step, tiny changes would only shimmer the image
+SCALE_STEP = 1.0 / 64.0
+
+class ResolutionScaler(object):
+    """
+    Scene resolution scale controller holding measured GPU frame time at a target
+
+    GPU time is assumed to scale with the number of shaded pixels, the scale is therefore
+    moved by the square root of the target to measured time ratio. Only part of the correction
+    is applied per measurement and measurements within tolerance of the target are ignored,
+    smoothed time is rescaled along with the scale so the lag of GPU timers does not overshoot.
+    """
+    def __init__(
+            self,
+            target_time: float = DEFAULT_TARGET_GPU_TIME,
+            min_scale: float = DEFAULT_MIN_SCALE,
+            max_scale: float = DEFAULT_MAX_SCALE,
+            enabled: bool = True):
+        """
+        Parameters
+        ----------
+        target_time : float
+            GPU frame time in milliseconds to hold
+        min_scale : float
+            Smallest resolution scale
+        max_scale : float
+            Largest resolution scale, also the initial one
+        enabled : bool
+            Whether Update adjusts the scale, the scale stays as set otherwise
+        """
+        self.target_time: float = target_time
+        self.min_scale: float = min_scale
+        self.max_scale: float = max_scale
+        self.enabled: bool = enabled
+        self.tolerance: float = DEFAULT_SCALE_TOLERANCE
+        self.response: float = DEFAULT_SCALE_RESPONSE
+        self.smoothing: float = DEFAULT_TIME_SMOOTHING
+        self.scale: float = max_scale
+        # Smoothed GPU time in milliseconds, None until the first measurement
+        self.gpu_time: float = None
+
+    def __repr__(self):
+        return f'ResolutionScaler -> scale:{self.scale:.3f} target:{self.target_time:.2f}ms enabled:{self.enabled}'
+
+    def Reset(self) -> None:
+        """Returns to the largest scale and drops measured history, e.g. after window resize"""
+        self.scale = self.max_scale
+        self.gpu_time = None
+
+    def GetSize(self, size: tuple) -> tuple:
+        """Returns given framebuffer size scaled by the current scale, at least one pixel"""
+        return tuple(max(1, int(round(value * self.scale))) for value in size)
+
+    def Update(self, gpu_time: float) -> float:
+        """
+        Adjusts scale from measured GPU frame time
+
+        Parameters
+        ----------
+        gpu_time : float
+            Last measured GPU frame time in milliseconds, None when no measurement is available
+
+        Returns
+        -------
+        Resolution scale for the next frame
+        """
+        if gpu_time is None or gpu_time <= 0.0:
+            return self.scale
+        if self.gpu_time is None:
+            self.gpu_time = gpu_time
+        else:
+            self.gpu_time += (gpu_time - self.gpu_time) * self.smoothing
+        if not self.enabled:
+            return self.scale
+
+        ratio = self.target_time / self.gpu_time
+        if abs(ratio - 1.0) <= self.tolerance:
+            return self.scale
+
+        desired = self.scale * math.sqrt(ratio)
+        scale = self.scale + (desired - self.scale) * self.response
+        scale = min(max(round(scale / SCALE_STEP) * SCALE_STEP, self.min_scale), self.max_scale)
+        if scale != self.scale:
+            # Expected time at the new scale, measurements of frames still in flight would undo the change otherwise
+            self.gpu_time *= (scale / self.scale) ** 2
+            self.scale = scale
+        return self.scale
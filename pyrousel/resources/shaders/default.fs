@@ -1,25 +1,50 @@
 #version 330
 
+// Variant defines, see GFX.GetShaderDefines
+//   VISUALISE_NORMALS / VISUALISE_TEXCOORDS / VISUALISE_COLORS -- output debug attribute instead of lighting
+//   WIREFRAME_OVERLAY                                           -- blend wireframe over the shaded triangles
+
 #define PI 3.1415926535897932384626433832795
 
-in vec3 vertex_position;
-in vec3 vertex_normal;
-in vec3 object_normal;
-in vec2 texcoord;
-in vec3 color;
+in VertexData
+{
+    vec3 vertex_position;
+    vec3 vertex_normal;
+    vec3 object_normal;
+    vec2 texcoord;
+    vec3 color;
+    vec4 tint;
+#ifdef WIREFRAME_OVERLAY
+    // Screen space distances to triangle edges, see wireframe_overlay.gs
+    noperspective vec3 edge_distance;
+#endif
+};
 
 out vec4 f_color;
 
-uniform mat4 view_transform;
-uniform vec3 light_color;
-uniform vec3 light_position;
-uniform vec3 mat_base_color;
-uniform float mat_roughness;
-uniform float mat_spec_intensity;
-uniform float mat_f0;
-uniform float visualise_normals;
-uniform float visualise_texcoords;
-uniform float visualise_colors;
+layout (std140) uniform FrameData
+{
+    mat4 view_transform;
+    mat4 perspective_transform;
+    mat4 view_perspective_transform;
+    vec4 camera_position;
+    vec4 light_color;
+    vec4 light_position;
+};
+
+layout (std140) uniform MaterialData
+{
+    vec4 mat_base_color;
+    float mat_roughness;
+    float mat_spec_intensity;
+    float mat_f0;
+};
+
+#ifdef WIREFRAME_OVERLAY
+// Single pass wireframe overlay, line width in pixels
+uniform vec4 wire_color;
+uniform float wire_width;
+#endif
 
 float ComputeDiffuse(float NdotL)
 {
@@ -58,12 +83,18 @@ float ComputeSpecularBRDF(
 
 void main() 
 {
+#if defined(VISUALISE_NORMALS)
+    vec3 final = (vertex_normal + vec3(1,1,1) * 0.5);
+#elif defined(VISUALISE_TEXCOORDS)
+    vec3 final = vec3(texcoord.xy, 0.0);
+#elif defined(VISUALISE_COLORS)
+    vec3 final = color;
+#else
     // Lighting inputs
-    vec3 camera_position = view_transform[3].xyz;
     vec3 surface_normal = normalize(object_normal);
-    vec3 view_dir = normalize(vertex_position - camera_position);
-    vec3 light_dir = normalize(light_position - vertex_position);
-    vec3 base_color = mat_base_color;
+    vec3 view_dir = normalize(camera_position.xyz - vertex_position);
+    vec3 light_dir = normalize(light_position.xyz - vertex_position);
+    vec3 base_color = mat_base_color.rgb * tint.rgb;
 
     // BRDF inputs
     vec3 H = normalize(view_dir + light_dir); // Halfway vector between view and light
@@ -75,15 +106,15 @@ void main()
     // Lighting components
     vec3 diffuse = ComputeDiffuse(NdotL) * base_color;
     vec3 spec = ComputeSpecularBRDF(NdotL, NdotV, NdotH, mat_roughness, mat_spec_intensity, mat_f0) * vec3(1);
-    vec3 final = (diffuse + spec) * light_color;
-    
-    // Debug visualisation
-    vec3 debugNormals = (vertex_normal + vec3(1,1,1) * 0.5);
-    vec3 debugTexcoords = vec3(texcoord.xy, 0.0);
-    vec3 debugColors = color;
-    final = mix(final, debugNormals, visualise_normals);
-    final = mix(final, debugTexcoords, visualise_texcoords);
-    final = mix(final, debugColors, visualise_colors);
+    vec3 final = (diffuse + spec) * light_color.rgb;
+#endif
+
+#ifdef WIREFRAME_OVERLAY
+    // Wireframe overlay, anti-aliased over one pixel
+    float edge = min(min(edge_distance.x, edge_distance.y), edge_distance.z);
+    float wire = 1.0 - smoothstep(wire_width * 0.5 - 0.5, wire_width * 0.5 + 0.5, edge);
+    final = mix(final, wire_color.rgb, wire_color.a * wire);
+#endif
 
     // Final pixel color output
     f_color = vec4(final, 1.0);
@@ -1,28 +1,100 @@
 #version 330
 
+// Variant defines, see GFX.GetShaderDefines
+//   INSTANCED           -- model & tint sourced from per instance attributes
+//   HAS_NORMALS         -- model provides vertex normals
+//   HAS_TEXCOORDS       -- model provides texture coordinates
+//   HAS_COLORS          -- model provides vertex colors
+//   OCTAHEDRAL_NORMALS  -- normals are packed octahedral encoded, see VertexPacker
+//   WIREFRAME_OVERLAY   -- edge distances are computed by wireframe_overlay.gs
+
 layout (location = 0) in vec3 in_position;
 layout (location = 1) in vec3 in_normal;
 layout (location = 2) in vec2 in_texcoord;
 layout (location = 3) in vec3 in_color;
+#ifdef INSTANCED
+// Per instance attributes
+layout (location = 4) in mat4 in_instance_transform;
+layout (location = 8) in vec4 in_instance_color;
+#endif
+
+out VertexData
+{
+    vec3 vertex_position;
+    vec3 vertex_normal;
+    vec3 object_normal;
+    vec2 texcoord;
+    vec3 color;
+    vec4 tint;
+#ifdef WIREFRAME_OVERLAY
+    // Screen space distances to triangle edges, only written by the wireframe overlay geometry shader
+    noperspective vec3 edge_distance;
+#endif
+};
 
-out vec3 vertex_position;
-out vec3 vertex_normal;
-out vec3 object_normal;
-out vec2 texcoord;
-out vec3 color;
-out vec3 camera_position;
+layout (std140) uniform FrameData
+{
+    mat4 view_transform;
+    mat4 perspective_transform;
+    mat4 view_perspective_transform;
+    vec4 camera_position;
+    vec4 light_color;
+    vec4 light_position;
+};
 
 uniform mat4 model_transform;
-uniform mat4 view_transform;
-uniform mat4 perspective_transform;
+
+// Packed vertex layout decoding, identity for float32 layout
+uniform vec3 position_offset;
+uniform vec3 position_scale;
+
+vec3 DecodeOctahedral(vec2 encoded)
+{
+    vec2 e = encoded / 32767.0;
+    vec3 n = vec3(e.xy, 1.0 - abs(e.x) - abs(e.y));
+    float fold = max(-n.z, 0.0);
+    n.x += n.x >= 0.0 ? -fold : fold;
+    n.y += n.y >= 0.0 ? -fold : fold;
+    return n;
+}
 
 void main() 
 {
-    mat4 mvp = perspective_transform * view_transform * model_transform;
-    vertex_position = (model_transform * vec4(in_position, 1.0)).xyz;
-    vertex_normal = normalize(in_normal);
-    object_normal = (model_transform * vec4(vertex_normal.xyz, 0.0)).xyz;
+#ifdef INSTANCED
+    mat4 world_transform = model_transform * in_instance_transform;
+    tint = in_instance_color;
+#else
+    mat4 world_transform = model_transform;
+    tint = vec4(1.0);
+#endif
+    mat4 mvp = view_perspective_transform * world_transform;
+    vec3 position = in_position * position_scale + position_offset;
+
+#if defined(HAS_NORMALS) && defined(OCTAHEDRAL_NORMALS)
+    vec3 normal = DecodeOctahedral(in_normal.xy);
+#elif defined(HAS_NORMALS)
+    vec3 normal = in_normal;
+#else
+    vec3 normal = vec3(1.0);
+#endif
+
+#ifdef HAS_TEXCOORDS
     texcoord = in_texcoord;
+#else
+    texcoord = vec2(0.0);
+#endif
+
+#ifdef HAS_COLORS
     color = in_color;
-    gl_Position = mvp * vec4(in_position, 1.0);
-}
\ No newline at end of file
+#else
+    color = vec3(1.0);
+#endif
+
+    vertex_position = (world_transform * vec4(position, 1.0)).xyz;
+    vertex_normal = normalize(normal);
+    object_normal = (world_transform * vec4(vertex_normal.xyz, 0.0)).xyz;
+#ifdef WIREFRAME_OVERLAY
+    edge_distance = vec3(1.0e6);
+#endif
+    gl_Position = mvp * vec4(position, 1.0);
+}
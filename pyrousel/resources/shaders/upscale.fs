@@ -0,0 +1,37 @@
+#version 330
+
+uniform sampler2D source;
+// Size of the rendered region in the lower left corner of the source texture, in texels
+uniform vec2 region_size;
+#ifdef SHARPEN
+// Strength of the sharpening, 0.0 samples bilinearly only
+uniform float sharpness;
+#endif
+
+in vec2 uv;
+out vec4 f_color;
+
+vec4 SampleRegion(vec2 texel)
+{
+    // Bilinear filter must not fetch texels outside the rendered region
+    texel = clamp(texel, vec2(0.5), region_size - 0.5);
+    return texture(source, texel / vec2(textureSize(source, 0)));
+}
+
+void main()
+{
+    vec2 texel = uv * region_size;
+    vec4 color = SampleRegion(texel);
+#ifdef SHARPEN
+    vec3 north = SampleRegion(texel + vec2(0.0, 1.0)).rgb;
+    vec3 south = SampleRegion(texel - vec2(0.0, 1.0)).rgb;
+    vec3 east = SampleRegion(texel + vec2(1.0, 0.0)).rgb;
+    vec3 west = SampleRegion(texel - vec2(1.0, 0.0)).rgb;
+    // Unsharp mask limited to the neighbourhood range so edges do not ring
+    vec3 minimum = min(min(min(north, south), min(east, west)), color.rgb);
+    vec3 maximum = max(max(max(north, south), max(east, west)), color.rgb);
+    vec3 sharpened = color.rgb + (color.rgb * 4.0 - north - south - east - west) * sharpness;
+    color.rgb = clamp(sharpened, minimum, maximum);
+#endif
+    f_color = vec4(color.rgb, 1.0);
+}
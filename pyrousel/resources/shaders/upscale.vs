@@ -0,0 +1,11 @@
+#version 330
+
+out vec2 uv;
+
+void main()
+{
+    // Single triangle covering the whole viewport, no vertex buffers needed
+    vec2 position = vec2(float((gl_VertexID & 1) << 2), float((gl_VertexID & 2) << 1)) - 1.0;
+    uv = position * 0.5 + 0.5;
+    gl_Position = vec4(position, 0.0, 1.0);
+}
@@ -1,17 +1,38 @@
 #version 330
 
 layout (location = 0) in vec3 in_position;
+#ifdef INSTANCED
+// Per instance attributes
+layout (location = 4) in mat4 in_instance_transform;
+#endif
+
+layout (std140) uniform FrameData
+{
+    mat4 view_transform;
+    mat4 perspective_transform;
+    mat4 view_perspective_transform;
+    vec4 camera_position;
+    vec4 light_color;
+    vec4 light_position;
+};
 
 uniform mat4 model_transform;
-uniform mat4 view_transform;
-uniform mat4 perspective_transform;
 uniform vec4 color;
 
+// Packed vertex layout decoding, identity for float32 layout
+uniform vec3 position_offset;
+uniform vec3 position_scale;
+
 out vec4 wireColor;
 
 void main() 
 {
-    mat4 mvp = perspective_transform * view_transform * model_transform;
+#ifdef INSTANCED
+    mat4 mvp = view_perspective_transform * model_transform * in_instance_transform;
+#else
+    mat4 mvp = view_perspective_transform * model_transform;
+#endif
     wireColor = color;
-    gl_Position = mvp * vec4(in_position, 1.0);
-}
\ No newline at end of file
+    vec3 position = in_position * position_scale + position_offset;
+    gl_Position = mvp * vec4(position, 1.0);
+}
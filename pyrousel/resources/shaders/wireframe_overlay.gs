@@ -0,0 +1,59 @@
+#version 330
+
+// Passes shaded triangles through and adds per vertex distances to the opposite triangle edge
+// in pixels, interpolated without perspective they give distance of each fragment to its nearest edge
+layout (triangles) in;
+layout (triangle_strip, max_vertices = 3) out;
+
+in VertexData
+{
+    vec3 vertex_position;
+    vec3 vertex_normal;
+    vec3 object_normal;
+    vec2 texcoord;
+    vec3 color;
+    vec4 tint;
+    noperspective vec3 edge_distance;
+} vertex_in[];
+
+out VertexData
+{
+    vec3 vertex_position;
+    vec3 vertex_normal;
+    vec3 object_normal;
+    vec2 texcoord;
+    vec3 color;
+    vec4 tint;
+    noperspective vec3 edge_distance;
+} vertex_out;
+
+uniform vec2 viewport_size;
+
+void main()
+{
+    vec2 p0 = viewport_size * 0.5 * gl_in[0].gl_Position.xy / gl_in[0].gl_Position.w;
+    vec2 p1 = viewport_size * 0.5 * gl_in[1].gl_Position.xy / gl_in[1].gl_Position.w;
+    vec2 p2 = viewport_size * 0.5 * gl_in[2].gl_Position.xy / gl_in[2].gl_Position.w;
+    vec2 e0 = p2 - p1;
+    vec2 e1 = p2 - p0;
+    vec2 e2 = p1 - p0;
+    float area = abs(e1.x * e2.y - e1.y * e2.x);
+    vec3 heights = vec3(area / length(e0), area / length(e1), area / length(e2));
+
+    // Projected distances are meaningless for triangles crossing the camera plane, those get no wire
+    bool behind = min(min(gl_in[0].gl_Position.w, gl_in[1].gl_Position.w), gl_in[2].gl_Position.w) <= 0.0;
+
+    for (int i = 0; i < 3; ++i)
+    {
+        vertex_out.vertex_position = vertex_in[i].vertex_position;
+        vertex_out.vertex_normal = vertex_in[i].vertex_normal;
+        vertex_out.object_normal = vertex_in[i].object_normal;
+        vertex_out.texcoord = vertex_in[i].texcoord;
+        vertex_out.color = vertex_in[i].color;
+        vertex_out.tint = vertex_in[i].tint;
+        vertex_out.edge_distance = behind ? vec3(1.0e6) : vec3(i == 0, i == 1, i == 2) * heights;
+        gl_Position = gl_in[i].gl_Position;
+        EmitVertex();
+    }
+    EndPrimitive();
+}
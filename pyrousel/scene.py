@@ -0,0 +1,289 @@
+import numpy as np
+from dataclasses import dataclass
+from pyrr import Vector3
+
+from .bounds import AABB, Bounds
+from .gfx import GFX, MaterialSettings, RenderHints, OcclusionQuery
+from .model import RenderModel
+from .transform import TransformStore
+
+# Only models at least this detailed are worth testing with occlusion queries
+DEFAULT_OCCLUSION_MIN_TRIANGLES = 2048
+
+@dataclass
+class SceneStats:
+    num_objects: int = 0
+    drawn_objects: int = 0
+    frustum_culled_objects: int = 0
+    occlusion_culled_objects: int = 0
+    drawn_triangles: int = 0
+    culled_triangles: int = 0
+    # Draw calls & program, material and buffer switches of the frame, see GFX.DrawStats
+    draw_calls: int = 0
+    state_changes: int = 0
+
+@dataclass
+class PickResult:
+    model: RenderModel
+    # Index of the hit instance, 0 for models drawn once
+    instance: int
+    # Index of the hit triangle within the model indices
+    triangle: int
+    # Ray parameter of the hit, world space distance for normalized ray directions
+    distance: float
+    # Weights of the triangle corners in index order
+    barycentrics: np.ndarray
+    # World space hit point
+    point: np.ndarray
+
+class Scene(object):
+    """
+    Container of render models drawn together each frame
+
+    Local bounds of all models are kept in contiguous arrays, world bounds and frustum
+    visibility are computed for all models at once every frame. Visible models are drawn
+    grouped by program, material and buffers, front to back within each group, see
+    GFX.GetDrawKey. Detailed models can be
+    occlusion tested, their bounding box is drawn into samples query after all models
+    and the next frame renders the model conditionally on that query result. Rays are picked
+    against the same world bounds first and then against model hierarchies, see Pick.
+    """
+    def __init__(self):
+        self.models: list[RenderModel] = []
+        self.stats = SceneStats()
+        self.enable_frustum_culling = True
+        self.enable_occlusion_culling = False
+        self.occlusion_min_triangles = DEFAULT_OCCLUSION_MIN_TRIANGLES
+        self.__local_minext: np.ndarray = np.zeros((0, 3))
+        self.__local_maxext: np.ndarray = np.zeros((0, 3))
+        self.__bounds_dirty = False
+        # Transform slots of all models when they share single store, world matrices are then gathered at once
+        self.__transform_store: TransformStore = None
+        self.__transform_indices: np.ndarray = np.zeros(0, dtype='i4')
+        # Occlusion query per model id, paired with flag whether the query holds a result for the model
+        self.__queries: dict = {}
+        # Queries of removed models kept for reuse, models are often only toggled in and out of testing
+        self.__free_queries: list = []
+
+    def AddModel(self, model: RenderModel) -> None:
+        """Adds model to the scene, model keeps its own transform"""
+        self.models.append(model)
+        self.__bounds_dirty = True
+
+    def RemoveModel(self, model: RenderModel) -> None:
+        """Removes model from the scene, model GPU resources are left intact"""
+        self.models.remove(model)
+        self.__ReleaseQuery(model)
+        self.__bounds_dirty = True
+
+    def Clear(self) -> None:
+        """Removes all models from the scene"""
+        for model in list(self.models):
+            self.RemoveModel(model)
+
+    def InvalidateBounds(self) -> None:
+        """Discards cached local bounds, required after modifying vertex data, instances or transform objects of scene models"""
+        self.__bounds_dirty = True
+
+    def GetWorldBounds(self) -> tuple:
+        """Returns tuple of Nx3 world space (minimum, maximum) extends of all scene models"""
+        if self.__bounds_dirty:
+            self.__UpdateLocalBounds()
+
+        if len(self.models) == 0:
+            return np.zeros((0, 3)), np.zeros((0, 3))
+
+        if self.__transform_store is not None:
+            matrices = self.__transform_store.GetWorldMatrices(self.__transform_indices).astype('f8')
+        else:
+            matrices = np.stack([model.transform.GetMatrixView() for model in self.models]).astype('f8')
+        return Bounds.TransformAABBs(self.__local_minext, self.__local_maxext, matrices)
+
+    def GetWorldAABB(self) -> AABB:
+        """Returns world space axis aligned box enclosing all scene models"""
+        minext, maxext = self.GetWorldBounds()
+        if len(minext) == 0:
+            return AABB()
+        return AABB(Vector3(minext.min(axis=0)), Vector3(maxext.max(axis=0)))
+
+    def Cull(self, planes: np.ndarray) -> np.ndarray:
+        """
+        Tests all scene models against view frustum
+
+        Parameters
+        ----------
+        planes : np.ndarray
+            6x4 frustum planes, see Bounds.ExtractFrustumPlanes
+
+        Returns
+        -------
+        Boolean array of visibility flags per scene model
+        """
+        minext, maxext = self.GetWorldBounds()
+        return Bounds.IntersectFrustum(minext, maxext, planes)
+
+    def Pick(self, origin: np.ndarray, direction: np.ndarray, max_distance: float = np.inf) -> PickResult:
+        """
+        Finds the nearest model triangle hit by world space ray
+
+        Models are tested nearest first against world bounds derived from the current transforms,
+        moving models therefore never requires rebuilding their hierarchies. The ray is transformed
+        into the model space of every instance of a candidate and all instances are traced through
+        the model BVH at once. Models without built BVH are skipped, see RenderModel.BuildBVH.
+
+        Parameters
+        ----------
+        origin : np.ndarray
+            World space ray origin
+        direction : np.ndarray
+            World space ray direction, see Camera.GetRay
+        max_distance : float
+            Hits further than this many direction lengths are ignored
+
+        Returns
+        -------
+        PickResult of the nearest hit, None when the ray misses all models
+        """
+        origin = np.asarray(origin, dtype='f8')
+        direction = np.asarray(direction, dtype='f8')
+        minext, maxext = self.GetWorldBounds()
+        entries = Bounds.IntersectRay(minext, maxext, origin, direction)
+        result = None
+        for index in np.argsort(entries):
+            if entries[index] > max_distance:
+                break
+
+            model = self.models[index]
+            bvh = model.GetBVH()
+            if bvh is None:
+                continue
+
+            matrices = np.asarray(model.transform.GetMatrixView(), dtype='f8')[np.newaxis]
+            if model.is_instanced:
+                matrices = model.instance_data['transform'].astype('f8') @ matrices
+            # Affine inverse keeps the ray parameter, hits of all spaces compare directly
+            inverse = np.linalg.inv(matrices)
+            hits = bvh.Intersect(
+                (np.append(origin, 1.0) @ inverse)[:, :3],
+                direction @ inverse[:, :3, :3],
+                max_distance
+            )
+            instance = int(np.argmin(hits.distances))
+            if hits.triangles[instance] >= 0:
+                max_distance = float(hits.distances[instance])
+                result = PickResult(
+                    model,
+                    instance,
+                    int(hits.triangles[instance]),
+                    max_distance,
+                    hits.barycentrics[instance],
+                    origin + direction * max_distance
+                )
+        return result
+
+    def Render(self, gfx: GFX, hints: RenderHints, material: MaterialSettings) -> None:
+        """
+        Draws visible scene models with active camera of the graphics
+
+        Parameters
+        ----------
+        gfx : GFX
+            Graphics with view & perspective matrices already set for this frame
+        hints : RenderHints
+            Flags defining rendering behaviour
+        material : MaterialSettings
+            Material used for models without their own material
+        """
+        gfx.ResetDrawStats()
+        stats = SceneStats(num_objects=len(self.models))
+        minext, maxext = self.GetWorldBounds()
+        if self.enable_frustum_culling:
+            planes = gfx.GetFrustumPlanes()
+            visible = Bounds.IntersectFrustum(minext, maxext, planes)
+        else:
+            visible = np.ones(len(self.models), dtype=bool)
+
+        # State changes cost more than overdraw, front to back order only applies within draws sharing state
+        camera = np.asarray(gfx.GetCameraPosition())
+        distances = np.linalg.norm((minext + maxext) * 0.5 - camera, axis=1)
+        keys = {index: gfx.GetDrawKey(self.models[index], hints, material) for index in np.flatnonzero(visible)}
+        order = sorted(keys, key=lambda index: (keys[index], distances[index]))
+
+        tested = []
+        for index in np.flatnonzero(~visible):
+            model = self.models[index]
+            stats.frustum_culled_objects += 1
+            stats.culled_triangles += len(model.indices) // 3 * model.num_instances
+            if id(model) in self.__queries:
+                self.__queries[id(model)][1] = False
+
+        for index in order:
+            model = self.models[index]
+            query = self.__GetQuery(gfx, model, minext[index], maxext[index])
+            occluded = False
+            if query is not None and self.__queries[id(model)][1]:
+                with query.crender:
+                    gfx.RenderModel(model, hints, material)
+                # Stats only follow results the GPU already finished, conditional render draws the model too when unavailable
+                passed = query.GetResult()
+                occluded = passed is not None and not passed
+            else:
+                gfx.RenderModel(model, hints, material)
+
+            if query is not None:
+                tested.append(index)
+
+            num_triangles = gfx.GetLODRange(model)[1] // 3 * model.num_instances
+            if occluded:
+                stats.occlusion_culled_objects += 1
+                stats.culled_triangles += num_triangles
+            else:
+                stats.drawn_objects += 1
+                stats.drawn_triangles += num_triangles
+
+        # Query bounding boxes against complete depth buffer, results are used during the next frame
+        for index in tested:
+            query = self.__queries[id(self.models[index])]
+            gfx.RenderOcclusionProxy(minext[index], maxext[index], query[0])
+            query[1] = True
+
+        stats.draw_calls = gfx.draw_stats.draw_calls
+        stats.state_changes = gfx.draw_stats.state_changes
+        self.stats = stats
+
+    def ReleaseQueries(self) -> None:
+        """Detaches occlusion queries from all models, queries are reused once models are tested again"""
+        for model in self.models:
+            self.__ReleaseQuery(model)
+
+    def __GetQuery(self, gfx: GFX, model: RenderModel, minext: np.ndarray, maxext: np.ndarray) -> OcclusionQuery:
+        """Returns occlusion query of given model or None if the model should not be occlusion tested"""
+        if not self.enable_occlusion_culling or len(model.indices) // 3 < self.occlusion_min_triangles:
+            self.__ReleaseQuery(model)
+            return None
+
+        # Proxy box faces would be clipped away when the camera is inside the box
+        camera = np.asarray(gfx.GetCameraPosition())
+        if np.all(camera >= minext) and np.all(camera <= maxext):
+            if id(model) in self.__queries:
+                self.__queries[id(model)][1] = False
+            return None
+
+        if id(model) not in self.__queries:
+            query = self.__free_queries.pop() if self.__free_queries else OcclusionQuery()
+            self.__queries[id(model)] = [query, False]
+        return self.__queries[id(model)][0]
+
+    def __ReleaseQuery(self, model: RenderModel) -> None:
+        query = self.__queries.pop(id(model), None)
+        if query is not None:
+            self.__free_queries.append(query[0])
+
+    def __UpdateLocalBounds(self) -> None:
+        aabbs = [model.GetInstancesAABB() for model in self.models]
+        self.__local_minext = np.array([aabb.minext for aabb in aabbs], dtype='f8').reshape(-1, 3)
+        self.__local_maxext = np.array([aabb.maxext for aabb in aabbs], dtype='f8').reshape(-1, 3)
+        stores = {id(model.transform.store) for model in self.models}
+        self.__transform_store = self.models[0].transform.store if len(stores) == 1 else None
+        self.__transform_indices = np.array([model.transform.index for model in self.models], dtype='i4')
+        self.__bounds_dirty = False
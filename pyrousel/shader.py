@@ -4,9 +4,10 @@ class ShaderSource(object):
     def __init__(self):
         self.vertex_source = None
         self.fragment_source = None
+        self.geometry_source = None
 
     @staticmethod
-    def LoadFromFile(vertexFilepath: str, fragmentFilepath: str) -> ShaderSource:
+    def LoadFromFile(vertexFilepath: str, fragmentFilepath: str, geometryFilepath: str = None) -> ShaderSource:
         """
         Return shader source object representing shader code from disk
 
@@ -16,10 +17,95 @@ class ShaderSource(object):
             Filepath to file containing vertex shader source
         fragmentFilepath : str
             Filepath to file containing fragment shader source
+        geometryFilepath : str
+            Optional filepath to file containing geometry shader source
         """
         shader = ShaderSource()
         with open(vertexFilepath, 'r') as file:
             shader.vertex_source = file.read()
         with open(fragmentFilepath, 'r') as file:
-            shader.fragment_source = file.read() 
-        return shader
\ No newline at end of file
+            shader.fragment_source = file.read()
+        if geometryFilepath is not None:
+            with open(geometryFilepath, 'r') as file:
+                shader.geometry_source = file.read()
+        return shader
+
+    def WithDefines(self, defines: dict) -> ShaderSource:
+        """
+        Returns copy of the shader source with preprocessor defines injected into all stages
+
+        Parameters
+        ----------
+        defines : dict
+            Define names mapped to their values, None defines the name without value
+        """
+        shader = ShaderSource()
+        shader.vertex_source = ShaderSource.InjectDefines(self.vertex_source, defines)
+        shader.fragment_source = ShaderSource.InjectDefines(self.fragment_source, defines)
+        shader.geometry_source = ShaderSource.InjectDefines(self.geometry_source, defines)
+        return shader
+
+    @staticmethod
+    def InjectDefines(source: str, defines: dict) -> str:
+        """Returns GLSL source with '#define' lines inserted after its '#version' directive"""
+        if source is None or not defines:
+            return source
+
+        lines = [f'#define {name}' if value is None else f'#define {name} {value}' for name, value in sorted(defines.items())]
+        head, newline, body = source.partition('\n')
+        if not head.lstrip().startswith('#version'):
+            return '\n'.join(lines) + '\n' + source
+        # Keep line numbers of compiler messages matching the source file
+        return head + newline + '\n'.join(lines) + '\n#line 2\n' + body
+
+class ShaderVariantCache(object):
+    """
+    Programs compiled from single shader source with different sets of preprocessor defines
+
+    Variants are compiled on first request and kept until released, each distinct define
+    set is compiled once.
+    """
+    def __init__(self, source: ShaderSource, compile_program):
+        """
+        Parameters
+        ----------
+        source : ShaderSource
+            Shader source all variants are compiled from
+        compile_program : callable
+            Function compiling ShaderSource into program, see GFX.CompileShaderProgram
+        """
+        self.source = source
+        self.__compile_program = compile_program
+        self.__programs: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.__programs)
+
+    def GetProgram(self, defines: dict = None):
+        """
+        Returns program compiled with given defines, compiling it when requested for the first time
+
+        Parameters
+        ----------
+        defines : dict
+            Define names mapped to their values, None defines the name without value
+        """
+        key = ShaderVariantCache.GetKey(defines)
+        program = self.__programs.get(key)
+        if program is None:
+            program = self.__compile_program(self.source.WithDefines(dict(key)))
+            self.__programs[key] = program
+        return program
+
+    def Release(self) -> None:
+        """Releases all compiled variants"""
+        for program in self.__programs.values():
+            program.release()
+        self.__programs.clear()
+
+    @staticmethod
+    def GetKey(defines: dict) -> tuple:
+        """Returns hashable key of given define set, independent of define order"""
+        if not defines:
+            return ()
+        return tuple(sorted(defines.items()))
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.appwindow import FrameInterpolator, FramePacer
+
+class FramePacingTest(unittest.TestCase):
+    def test_interpolator_clamp(self):
+        interpolator = FrameInterpolator(max_delta=0.01, smoothing=0.5)
+        time.sleep(0.03)
+        interpolator.RegisterFrame()
+        assert interpolator.GetDelta() == 0.01, 'Frame delta was not clamped!'
+
+        interpolator.Reset()
+        assert interpolator.GetDelta() == 0.0, 'Reset should discard frame delta!'
+        interpolator.RegisterFrame()
+        assert interpolator.GetDelta() < 0.01, 'Time before reset should not be counted!'
+
+    def test_interpolator_smoothing(self):
+        interpolator = FrameInterpolator(max_delta=0.02, smoothing=0.5)
+        time.sleep(0.03)
+        interpolator.RegisterFrame()
+        interpolator.RegisterFrame()
+        delta = interpolator.GetDelta()
+        assert 0.0 < delta < 0.02, 'Short frame should only partially affect smoothed delta!'
+        assert abs(delta - 0.01) < 0.005, 'Invalid smoothed delta!'
+
+    def test_pacer_interval(self):
+        pacer = FramePacer(max_fps=100.0)
+        pacer.Wait()
+        start = time.perf_counter()
+        for _ in range(10):
+            pacer.Wait()
+        elapsed = time.perf_counter() - start
+        assert elapsed >= 0.0995, 'Frames were not held to the frame rate cap!'
+        assert elapsed < 0.2, 'Pacer waited too long!'
+
+    def test_pacer_uncapped(self):
+        pacer = FramePacer()
+        assert pacer.Wait() == 0.0, 'Uncapped pacer should not wait!'
+
+if __name__ == '__main__':
+    unittest.main()
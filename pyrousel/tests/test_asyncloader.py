@@ -0,0 +1,156 @@
+import os
+import sys
+import unittest
+import importlib.resources
+import glfw
+import numpy as np
+import moderngl as mgl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.gfx import GFX, VertexLayout
+from pyrousel.asyncloader import AsyncModelLoader, LoadState
+
+class AsyncModelLoaderTest(unittest.TestCase):
+    def test_budgeted_upload(self):
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+
+        loaded = []
+        loader = AsyncModelLoader(GFX(ctx, VertexLayout.Separate), upload_budget=64 * 1024)
+        loader.ModelLoaded.connect(lambda request: loaded.append(request), weak=False)
+        request = loader.Request(model_filepath)
+        request.future.result()
+
+        # Upload should be spread across multiple frames within the budget
+        frames = 0
+        while not request.IsFinished():
+            uploaded_bytes = request.upload.uploaded_bytes if request.upload else 0
+            loader.Update()
+            assert request.upload.uploaded_bytes - uploaded_bytes <= loader.upload_budget, 'Upload exceeds budget!'
+            frames += 1
+
+        assert request.state is LoadState.Done, f'Model failed to load -> {request.error}'
+        assert frames > 1, 'Upload was not spread across frames!'
+        assert loaded == [request], 'ModelLoaded signal was not sent!'
+
+        model = request.model
+        assert model.vertex_buffer is not None, 'Vertex buffer was not assigned!'
+        data = np.frombuffer(model.vertex_buffer.read(), dtype='f4')
+        assert np.array_equal(data, model.vertices), 'Uploaded vertex data does not match!'
+
+        loader.Shutdown()
+        self.__DestroyDummyContext()
+
+    def test_cancel_stale_request(self):
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        first_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        second_filepath = importlib.resources.files('resources.models.obj').joinpath('cube-vc.obj')
+        other_filepath = importlib.resources.files('resources.models.obj').joinpath('sphere.obj')
+
+        loaded = []
+        loader = AsyncModelLoader(GFX(ctx))
+        loader.ModelLoaded.connect(lambda request: loaded.append(request.filepath), weak=False)
+        first = loader.Request(first_filepath)
+        second = loader.Request(second_filepath)
+        other = loader.Request(other_filepath, channel='other')
+
+        assert first.state is LoadState.Cancelled, 'Stale request was not cancelled!'
+        assert loader.Wait(second) is not None, 'Newer request failed to load!'
+        assert loader.Wait(other) is not None, 'Request on another channel failed to load!'
+        assert first_filepath not in loaded, 'Cancelled request should not be delivered!'
+
+        loader.Shutdown()
+        self.__DestroyDummyContext()
+
+    def test_superseded_upload(self):
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        large_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        small_filepath = importlib.resources.files('resources.models.obj').joinpath('cube-vc.obj')
+
+        loaded = []
+        loader = AsyncModelLoader(GFX(ctx), upload_budget=16 * 1024)
+        loader.ModelLoaded.connect(lambda request: loaded.append(request), weak=False)
+        # Large model is already uploading when the small one gets requested for display
+        large = loader.Request(large_filepath, channel='display')
+        large.future.result()
+        loader.Update()
+        assert large.state is LoadState.Uploading, 'Large model should still be uploading!'
+
+        small = loader.Request(small_filepath, channel='display')
+        assert loader.Wait(small) is not None, 'Newer request failed to load!'
+        while loader.IsBusy():
+            loader.Update()
+
+        # The stale load never finishes after the newer one and does not replace it
+        assert large.state is LoadState.Cancelled, 'Superseded request was not cancelled!'
+        assert loaded == [small], f'Superseded request was delivered -> {[request.filepath for request in loaded]}'
+
+        loader.Shutdown()
+        self.__DestroyDummyContext()
+
+    def test_cancel_file(self):
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        filepaths = [importlib.resources.files('resources.models.obj').joinpath(name) for name in ['monkey.obj', 'cube-vc.obj', 'sphere.obj']]
+
+        loaded = []
+        loader = AsyncModelLoader(GFX(ctx))
+        loader.ModelLoaded.connect(lambda request: loaded.append(request.filepath), weak=False)
+        # Files on their own channels load concurrently, cancelling one of them leaves the others running
+        requests = [loader.Request(filepath, channel=os.fspath(filepath)) for filepath in filepaths]
+        assert len(loader.GetActiveRequests()) == 3, 'Requests on different channels should not cancel each other!'
+
+        loader.CancelFile(os.fspath(filepaths[1]))
+        assert requests[1].state is LoadState.Cancelled, 'Request of the cancelled file is still active!'
+        assert loader.Wait(requests[0]) is not None and loader.Wait(requests[2]) is not None, 'Other files failed to load!'
+        assert filepaths[1] not in loaded and len(loaded) == 2, f'Unexpected loaded files -> {loaded}'
+
+        loader.Shutdown()
+        self.__DestroyDummyContext()
+
+    def test_failed_request(self):
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        failed = []
+        loader = AsyncModelLoader(GFX(ctx))
+        loader.ModelFailed.connect(lambda request: failed.append(request), weak=False)
+        request = loader.Request('missing-model.obj')
+
+        assert loader.Wait(request) is None, 'Missing model should not load!'
+        assert request.state is LoadState.Failed and request.error is not None, 'Request should fail!'
+        assert failed == [request], 'ModelFailed signal was not sent!'
+
+        loader.Shutdown()
+        self.__DestroyDummyContext()
+
+    def __CreateDummyContext(self):
+        if not glfw.init():
+            return None
+        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+        glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+
+        win = glfw.create_window(512, 512, "Test", None, None)
+        if win is None:
+            self.__DestroyDummyContext()
+            return None
+        glfw.make_context_current(win)
+        ctx = mgl.create_context()
+
+        return ctx
+
+    def __DestroyDummyContext(self):
+        glfw.terminate()
+
+if __name__ == "__main__":
+    unittest.main()
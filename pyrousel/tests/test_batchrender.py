@@ -0,0 +1,106 @@
+import os
+import sys
+import zlib
+import shutil
+import struct
+import tempfile
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.batchrender import BatchRenderer, TurntableRenderer, TurntableSettings
+from pyrousel.model import ModelLoader
+
+class BatchRenderTest(unittest.TestCase):
+    def test_find_models(self):
+        model_dir = os.path.dirname(importlib.resources.files('resources.models.obj').joinpath('monkey.obj'))
+        models = BatchRenderer.FindModels(model_dir)
+        names = [name for _, name in models]
+        assert 'monkey' in names and 'sphere' in names, f'Model files were not found -> {names}'
+        assert all(os.path.isfile(filepath) for filepath, _ in models), 'Invalid model filepath!'
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            manifest = os.path.join(temp_dir, 'manifest.txt')
+            with open(manifest, 'w') as file:
+                file.write(f'# Thumbnails\n{os.path.join(model_dir, "monkey.obj")}\n\nmodels/cube.obj\n')
+            models = BatchRenderer.FindModels(manifest)
+            assert [name for _, name in models] == ['monkey', os.path.join('models', 'cube')], 'Invalid manifest models!'
+            assert models[1][0] == os.path.join(temp_dir, 'models/cube.obj'), 'Relative entries should resolve against manifest!'
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_write_png(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            pixels = np.random.default_rng(0).integers(0, 256, (5, 7, 3), dtype=np.uint8)
+            filepath = os.path.join(temp_dir, 'image.png')
+            TurntableRenderer.WritePNG(filepath, pixels)
+
+            # Decode the single IDAT chunk and reverse the 'up' filter
+            with open(filepath, 'rb') as file:
+                data = file.read()
+            assert data[:8] == b'\x89PNG\r\n\x1a\n', 'Invalid PNG signature!'
+            width, height = struct.unpack('>II', data[16:24])
+            assert (width, height) == (7, 5), 'Invalid PNG size!'
+            length = struct.unpack('>I', data[33:37])[0]
+            scanlines = np.frombuffer(zlib.decompress(data[41:41 + length]), dtype=np.uint8).reshape(5, -1)
+            assert np.all(scanlines[:, 0] == 2), 'Rows should use up filter!'
+            decoded = np.cumsum(scanlines[:, 1:], axis=0, dtype=np.uint8).reshape(5, 7, 3)
+            assert np.array_equal(decoded, pixels), 'Decoded pixels do not match!'
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_turntable(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+
+        settings = TurntableSettings(width=64, height=48, num_frames=3)
+        renderer = TurntableRenderer(settings)
+        temp_dir = tempfile.mkdtemp()
+        try:
+            result = renderer.Render(model_filepath, temp_dir)
+            assert result.error is None, f'Turntable failed -> {result.error}'
+            assert result.num_frames == 3, 'Not all frames were rendered!'
+            for index in range(3):
+                assert os.path.isfile(TurntableRenderer.GetFramePath(temp_dir, index)), 'Frame image missing!'
+
+            # Model stays centered in the frame under rotation
+            model = ModelLoader.LoadModel(model_filepath)
+            renderer.graphics.GenModelBuffers(model)
+            for angle in [0.0, 2.0]:
+                pixels = renderer.RenderFrame(model, angle)
+                assert pixels.shape == (48, 64, 3), 'Invalid frame size!'
+                rows, columns = np.nonzero(np.any(pixels != pixels[0, 0], axis=2))
+                assert len(rows) > 0, 'Model was not rendered!'
+                assert abs(columns.mean() - 32.0) < 8.0, 'Model is not centered!'
+            renderer.graphics.ReleaseModelBuffers(model)
+
+            assert renderer.Render(model_filepath, temp_dir).skipped, 'Existing frames should be skipped!'
+        finally:
+            renderer.Release()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_run(self):
+        model_dir = os.path.dirname(importlib.resources.files('resources.models.obj').joinpath('monkey.obj'))
+        models = BatchRenderer.FindModels(model_dir)
+
+        settings = TurntableSettings(width=32, height=32, num_frames=2)
+        renderer = BatchRenderer(settings, num_workers=1)
+        temp_dir = tempfile.mkdtemp()
+        try:
+            stats = renderer.Run(models, temp_dir)
+            assert stats.num_failed == 0, 'Some models failed to render!'
+            assert stats.num_rendered == len(models) and stats.num_frames == len(models) * 2, f'Not all models were rendered -> {stats}'
+            for _, name in models:
+                assert os.path.isfile(TurntableRenderer.GetFramePath(os.path.join(temp_dir, name), 1)), f'Frame image missing -> {name}'
+
+            stats = renderer.Run(models, temp_dir)
+            assert stats.num_skipped == len(models), 'Existing frames should be skipped!'
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
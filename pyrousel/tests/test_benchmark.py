@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.benchmark import BenchmarkSuite, BenchmarkResult, SyntheticMesh, BENCHMARK_SCHEMA
+
+class BenchmarkTest(unittest.TestCase):
+    def test_synthetic_mesh(self):
+        for count in [1, 1000, 12345]:
+            model = SyntheticMesh.CreateGrid(count)
+            num_triangles = len(model.indices) // 3
+            assert count <= num_triangles < count * 1.1 + 4, f'Invalid triangle count {num_triangles} for {count}!'
+            assert model.indices.max() < len(model.vertices) // 3, 'Index out of range!'
+            assert len(model.normals) == len(model.vertices), 'Missing normals!'
+
+    def test_compare(self):
+        baseline = {'schema': BENCHMARK_SCHEMA, 'results': [
+            BenchmarkResult('a', 'load', [0.010, 0.010, 0.011]).ToDict(),
+            BenchmarkResult('b', 'load', [0.010]).ToDict(),
+            BenchmarkResult('removed', 'load', [0.010]).ToDict(),
+        ]}
+        current = {'schema': BENCHMARK_SCHEMA, 'results': [
+            BenchmarkResult('a', 'load', [0.0105, 0.0105, 0.020]).ToDict(),
+            BenchmarkResult('b', 'load', [0.015]).ToDict(),
+            BenchmarkResult('added', 'load', [0.010]).ToDict(),
+        ]}
+        comparisons = {comparison.name: comparison for comparison in BenchmarkSuite.Compare(baseline, current)}
+        assert sorted(comparisons) == ['a', 'b'], 'Only results present in both reports should be compared!'
+        assert not comparisons['a'].IsRegression(0.1), 'Median within threshold is not a regression!'
+        assert comparisons['b'].IsRegression(0.1), 'Median slowdown above threshold should be a regression!'
+        assert not comparisons['b'].IsRegression(0.6), 'Threshold should be respected!'
+
+    def test_bounds_group(self):
+        suite = BenchmarkSuite(triangle_counts=(1000,), groups=('bounds',), repeat=2)
+        report = suite.Run()
+        names = [result['name'] for result in report['results']]
+        assert 'recompute_bounds/obj/monkey' in names and 'recompute_bounds/grid_1000' in names, f'Missing results -> {names}'
+        assert all(result['runs'] == 2 for result in report['results']), 'Warmup run should be excluded!'
+        assert report['environment']['numpy'], 'Missing environment metadata!'
+
+if __name__ == '__main__':
+    unittest.main()
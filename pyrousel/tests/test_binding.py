@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.binding import BindingSet, TrackedPanel
+from pyrousel.gfx import MaterialSettings
+from pyrousel.transform import Transform
+
+class BoundPanel(TrackedPanel):
+    def __init__(self):
+        super().__init__()
+        self.roughness = 0.0
+        self.translation = [0.0, 0.0, 0.0]
+
+class BindingTest(unittest.TestCase):
+    def test_push_edits(self):
+        panel = BoundPanel()
+        material = MaterialSettings()
+        bindings = BindingSet()
+        bindings.BindAttribute(panel, 'roughness', material, 'roughness', poll=False)
+        bindings.Sync()
+        assert panel.roughness == material.roughness, 'Initial value was not pulled into the panel!'
+
+        # Untouched fields are not written back even when the panel value differs
+        panel.roughness = 0.9
+        bindings.Sync()
+        assert material.roughness == 0.5, 'Unchanged field should not be pushed!'
+        assert bindings.num_pushed == 0 and bindings.num_pulled == 0, 'Idle sync should not transfer values!'
+
+        panel.roughness = panel.Track('roughness', (True, 0.25))
+        bindings.Sync()
+        assert material.roughness == 0.25, 'Edited field was not pushed!'
+        assert bindings.num_pushed == 1, 'Invalid number of pushed values!'
+        assert len(panel.changes) == 0, 'Panel changes were not consumed!'
+
+    def test_pull_versioned(self):
+        panel = BoundPanel()
+        transform = Transform()
+        bindings = BindingSet()
+        bindings.Bind(
+            panel,
+            'translation',
+            lambda: tuple(transform.GetTranslation()),
+            lambda value: transform.SetTranslation(*value),
+            lambda: transform.version
+        )
+        bindings.Sync()
+
+        # Idle syncs must not touch the transform
+        version = transform.version
+        for _ in range(3):
+            bindings.Sync()
+        assert transform.version == version, 'Idle sync invalidated the transform!'
+
+        transform.SetTranslation(1.0, 2.0, 3.0)
+        bindings.Sync()
+        assert panel.translation == [1.0, 2.0, 3.0], 'Changed transform was not pulled into the panel!'
+        assert bindings.num_pulled == 1, 'Invalid number of pulled values!'
+
+        panel.translation[1] = panel.Track('translation', (True, 5.0))
+        bindings.Sync()
+        assert tuple(transform.GetTranslation()) == (1.0, 5.0, 3.0), 'Edited translation was not pushed!'
+        assert bindings.num_pulled == 0, 'Pushed value should not be pulled back!'
+
+if __name__ == '__main__':
+    unittest.main()
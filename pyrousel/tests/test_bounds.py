@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.bounds import Bounds
+from pyrousel.model import ModelLoader, PrimitiveFactory
+
+class BoundsTest(unittest.TestCase):
+    def test_aabb(self):
+        model = BoundsTest.__LoadModel()
+        points = model.vertices.reshape(-1, 3)
+        aabb = model.GetAABB()
+
+        assert np.array_equal(aabb.minext, points.min(axis=0)), 'Invalid minimum extends!'
+        assert np.array_equal(aabb.maxext, points.max(axis=0)), 'Invalid maximum extends!'
+        assert model.GetAABB() is aabb, 'Bounds should be cached until vertex data changes!'
+
+    def test_bounds_reset(self):
+        # Extends of previously assigned vertex data should not leak into new bounds
+        model = PrimitiveFactory.CreateBox(10.0)
+        model.RecomputeBounds()
+        model.vertices = np.array([1.0, 1.0, 1.0, 2.0, 3.0, 4.0], dtype='f4')
+
+        assert np.allclose(model.minext, [1.0, 1.0, 1.0]), 'Stale minimum extends after vertex change!'
+        assert np.allclose(model.maxext, [2.0, 3.0, 4.0]), 'Stale maximum extends after vertex change!'
+
+    def test_sphere(self):
+        model = BoundsTest.__LoadModel()
+        sphere = model.GetBoundingSphere()
+        distances = np.linalg.norm(model.vertices.reshape(-1, 3) - sphere.center, axis=1)
+
+        assert distances.max() <= sphere.radius + 1e-5, 'Sphere does not enclose all vertices!'
+        assert sphere.radius <= np.linalg.norm(model.GetAABB().GetExtents()) + 1e-5, 'Sphere is not tight!'
+
+    def test_oriented_box(self):
+        # Rotated elongated box should be fitted with its own axes
+        model = PrimitiveFactory.CreateBox(2.0)
+        model.transform.Rotate(0.3, 0.7, 0.1)
+        model.transform.Scale(4.0, 1.0, 0.5)
+        matrix = np.asarray(model.transform.GetMatrix())
+        points = model.vertices.reshape(-1, 3) @ matrix[:3, :3]
+
+        obb = Bounds.ComputeOrientedBox(points)
+        local = (points - obb.center) @ obb.axes.T
+        assert np.all(np.abs(local) <= np.asarray(obb.extents) + 1e-5), 'Oriented box does not enclose vertices!'
+        assert np.allclose(np.sort(obb.extents), [0.5, 1.0, 4.0], atol=1e-4), 'Oriented box is not tight!'
+        assert np.allclose(obb.axes @ obb.axes.T, np.identity(3), atol=1e-5), 'Oriented box axes are not orthonormal!'
+
+    def test_world_bounds(self):
+        model = BoundsTest.__LoadModel()
+        model.transform.Translate(1.0, -2.0, 3.0)
+        model.transform.Rotate(0.5, 1.2, -0.4)
+        model.transform.Scale(2.0, 0.5, 1.5)
+
+        matrix = np.asarray(model.transform.GetMatrix(), dtype='f8')
+        points = model.vertices.reshape(-1, 3) @ matrix[:3, :3] + matrix[3, :3]
+
+        aabb = model.GetWorldAABB()
+        assert np.all(points >= np.asarray(aabb.minext) - 1e-4), 'World bounds do not enclose vertices!'
+        assert np.all(points <= np.asarray(aabb.maxext) + 1e-4), 'World bounds do not enclose vertices!'
+
+        sphere = model.GetWorldBoundingSphere()
+        distances = np.linalg.norm(points - sphere.center, axis=1)
+        assert distances.max() <= sphere.radius + 1e-4, 'World sphere does not enclose vertices!'
+
+    @staticmethod
+    def __LoadModel():
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        return ModelLoader.LoadModel(model_filepath)
+
+if __name__ == "__main__":
+    unittest.main()
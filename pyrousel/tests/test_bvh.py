@@ -0,0 +1,93 @@
+import os
+import sys
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.bvh import BVH
+from pyrousel.model import ModelLoader
+
+class BVHTest(unittest.TestCase):
+    def setUp(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        self.model = ModelLoader.LoadFromOBJ(model_filepath)
+        self.bvh = BVH.Build(self.model.vertices, self.model.indices)
+        self.corners = self.bvh.vertices[self.bvh.indices].astype('f8')
+
+    def test_build(self):
+        bvh = self.bvh
+        assert np.array_equal(np.sort(bvh.triangles), np.arange(len(self.corners))), 'Every triangle must be in exactly one leaf!'
+
+        leaves = np.flatnonzero(bvh.node_child < 0)
+        for leaf in leaves:
+            corners = self.corners[bvh.triangles[bvh.node_first[leaf]:bvh.node_first[leaf] + bvh.node_count[leaf]]]
+            assert np.all(corners.min(axis=(0, 1)) >= bvh.node_minext[leaf]), 'Leaf box does not enclose its triangles!'
+            assert np.all(corners.max(axis=(0, 1)) <= bvh.node_maxext[leaf]), 'Leaf box does not enclose its triangles!'
+
+        inner = np.flatnonzero(bvh.node_child >= 0)
+        for offset in range(2):
+            children = bvh.node_child[inner] + offset
+            assert np.all(children > inner), 'Children must follow their parents!'
+            assert np.all(bvh.node_minext[children] >= bvh.node_minext[inner]), 'Inner box does not enclose its children!'
+            assert np.all(bvh.node_maxext[children] <= bvh.node_maxext[inner]), 'Inner box does not enclose its children!'
+
+        empty = BVH.Build(np.zeros(0, dtype='f4'), np.zeros(0, dtype='i4'))
+        assert not empty.Intersect([0.0, 0.0, 5.0], [0.0, 0.0, -1.0]).found.any(), 'Empty hierarchy can not be hit!'
+
+    def test_intersect(self):
+        rng = np.random.default_rng(7)
+        minext, maxext = self.bvh.GetAABB()
+        origins = rng.normal(size=(32, 3)) * 2.0
+        origins += np.sign(origins) * np.linalg.norm(maxext - minext)
+        directions = minext + rng.random((32, 3)) * (maxext - minext) - origins
+        hits = self.bvh.Intersect(origins, directions)
+        assert hits.found.sum() > 0, 'Rays towards the mesh should hit it!'
+
+        num_triangles = len(self.corners)
+        for ray in range(len(origins)):
+            distances, _, _ = BVH.IntersectTriangles(
+                np.broadcast_to(origins[ray], (num_triangles, 3)),
+                np.broadcast_to(directions[ray], (num_triangles, 3)),
+                self.corners[:, 0],
+                self.corners[:, 1],
+                self.corners[:, 2]
+            )
+            assert np.isclose(distances.min(), hits.distances[ray]), 'Nearest hit differs from brute force!'
+
+        found = hits.found
+        points = (self.corners[hits.triangles[found]] * hits.barycentrics[found][:, :, np.newaxis]).sum(axis=1)
+        assert np.allclose(points, hits.points[found]), 'Barycentrics do not interpolate the hit point!'
+
+    def test_closest_points(self):
+        rng = np.random.default_rng(11)
+        points = rng.normal(size=(16, 3)) * 2.0
+        hits = self.bvh.ClosestPoints(points)
+        assert hits.found.all(), 'Unbounded query must always find the surface!'
+
+        num_triangles = len(self.corners)
+        for index, point in enumerate(points):
+            closest, _ = BVH.ClosestPointsOnTriangles(
+                np.broadcast_to(point, (num_triangles, 3)),
+                self.corners[:, 0],
+                self.corners[:, 1],
+                self.corners[:, 2]
+            )
+            distance = np.linalg.norm(closest - point, axis=1).min()
+            assert np.isclose(distance, hits.distances[index]), 'Closest point differs from brute force!'
+
+        bounded = self.bvh.ClosestPoints(points, max_distance=float(hits.distances.min()) * 1.01)
+        assert bounded.found.sum() >= 1 and not bounded.found.all(), 'Max distance should reject further surface!'
+
+    def test_refit(self):
+        vertices = self.bvh.vertices + np.array([0.0, 10.0, 0.0], dtype='f4')
+        self.bvh.Refit(vertices)
+        assert np.isclose(self.bvh.GetAABB()[0][1], vertices[:, 1].min()), 'Refit did not move node bounds!'
+
+        hits = self.bvh.Intersect([0.0, 10.0, 10.0], [0.0, 0.0, -1.0])
+        assert hits.found[0], 'Moved mesh is not hit after refit!'
+        assert np.isclose(hits.points[0][1], 10.0), 'Hit point ignores refit vertices!'
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.camera import Camera, ProjectionMode
+from pyrousel.bounds import Bounds
+
+class CameraTest(unittest.TestCase):
+    def test_cached_matrices(self):
+        camera = Camera()
+        view = camera.GetViewMatrix()
+        perspective = camera.GetPerspectiveMatrix()
+        version = camera.version
+        assert camera.GetViewMatrix() is view and camera.GetPerspectiveMatrix() is perspective, 'Matrices should be cached!'
+
+        camera.fov = camera.fov
+        assert camera.version == version, 'Setting unchanged value should not invalidate matrices!'
+
+        camera.transform.SetTranslation(0.0, 0.0, 5.0)
+        assert camera.version != version, 'Transform change should invalidate view!'
+        assert camera.GetPerspectiveMatrix() is perspective, 'Projection should stay cached!'
+        assert np.allclose(np.asarray(camera.GetViewMatrix())[3, :3], [0.0, 0.0, -5.0]), 'Invalid view matrix!'
+
+        version = camera.version
+        camera.aspect = 1.0
+        assert camera.version != version and camera.GetPerspectiveMatrix() is not perspective, 'Aspect change should invalidate projection!'
+
+    def test_reverse_z(self):
+        camera = Camera()
+        camera.near_clip = 0.5
+        camera.projection_mode = ProjectionMode.ReverseZInfinite
+        projection = np.asarray(camera.GetPerspectiveMatrix(), dtype='f8')
+
+        def Depth(distance: float) -> float:
+            clip = np.array([0.0, 0.0, -distance, 1.0]) @ projection
+            return clip[2] / clip[3]
+
+        assert np.isclose(Depth(0.5), 1.0), 'Near plane should map to depth 1!'
+        assert 0.0 < Depth(1e9) < 1e-6, 'Far distance should approach depth 0!'
+        assert Depth(10.0) > Depth(20.0), 'Depth should decrease with distance!'
+
+        planes = camera.GetFrustumPlanes()
+        inside = Bounds.IntersectFrustum(
+            np.array([[-1.0, -1.0, -1e6 - 1.0], [-1.0, -1.0, 1.0]]),
+            np.array([[1.0, 1.0, -1e6], [1.0, 1.0, 2.0]]),
+            planes
+        )
+        assert inside.tolist() == [True, False], 'Only boxes behind the camera should be culled!'
+
+    def test_ray(self):
+        camera = Camera()
+        camera.transform.SetTranslation(1.0, 2.0, 3.0)
+        for mode in ProjectionMode:
+            camera.projection_mode = mode
+            origin, direction = camera.GetRay(0.0, 0.0)
+            assert np.allclose(origin, [1.0, 2.0, 3.0]), 'Ray should start at the camera!'
+            assert np.allclose(direction, [0.0, 0.0, -1.0]), f'Center ray should look down negative z -> {mode}'
+
+            # Ray through the top right corner leans by the half field of view
+            _, direction = camera.GetRay(1.0, 1.0)
+            assert direction[0] > 0.0 and direction[1] > 0.0, 'Corner ray points to the wrong side!'
+            assert np.isclose(direction[1] / -direction[2], np.tan(np.radians(camera.fov) * 0.5)), 'Corner ray misses the frustum edge!'
+
+if __name__ == '__main__':
+    unittest.main()
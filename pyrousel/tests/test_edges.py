@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.edges import EdgeExtractor
+from pyrousel.model import PrimitiveFactory
+
+class EdgesTest(unittest.TestCase):
+    def test_unique_edges(self):
+        # Box faces have split normals, welded positions must not duplicate shared edges
+        model = PrimitiveFactory.CreateBox(1.0)
+        edges = EdgeExtractor.ExtractEdges(model.vertices, model.indices).reshape(-1, 2)
+        points = model.vertices.reshape(-1, 3)[edges]
+        keys = {tuple(sorted(map(tuple, pair.round(5).tolist()))) for pair in points}
+
+        assert len(edges) == 18, 'Box should have 12 outline and 6 diagonal edges!'
+        assert len(keys) == len(edges), 'Edges are not unique!'
+        assert edges.max() < len(model.vertices) // 3, 'Edge indices out of range!'
+
+    def test_crease_angle(self):
+        model = PrimitiveFactory.CreateBox(1.0)
+        edges = EdgeExtractor.ExtractEdges(model.vertices, model.indices, crease_angle=30.0)
+
+        assert len(edges) // 2 == 12, 'Coplanar face diagonals should be filtered!'
+
+    def test_boundary_edges(self):
+        # Open edges of a single quad are kept regardless of the crease angle
+        model = PrimitiveFactory.CreateRectangle(1.0)
+        edges = EdgeExtractor.ExtractEdges(model.vertices, model.indices, crease_angle=30.0)
+
+        assert len(edges) // 2 == 4, 'Boundary edges should always be kept!'
+        assert len(EdgeExtractor.ExtractEdges(model.vertices, np.zeros(0, dtype='i4'))) == 0, 'Empty mesh should have no edges!'
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,13 +3,18 @@ import sys
 import unittest
 import importlib.resources
 import glfw
+import numpy as np
 import moderngl as mgl
+from pyrr import Matrix44
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from pyrousel.gfx import GFX, MaterialSettings, RenderHints, WireframeMode
+from pyrousel.gfx import GFX, MaterialSettings, RenderHints, WireframeMode, VisualiserMode, VertexLayout
+from pyrousel.gfx import FRAME_DATA_BINDING, MATERIAL_DATA_BINDING
 from pyrousel.shader import ShaderSource
-from pyrousel.model import ModelLoader
+from pyrousel.model import ModelLoader, ModelGroup, PrimitiveFactory
+from pyrousel.scene import Scene
+from pyrousel.camera import Camera
 
 class GFXTest(unittest.TestCase):
     def test_glcontext(self):
@@ -136,6 +141,373 @@ class GFXTest(unittest.TestCase):
         # Dispose of the dummy OpenGL context
         self.__DestroyDummyContext()
 
+    def test_uniform_blocks(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        # Per frame & material state should be shared by all programs via uniform blocks
+        gfx = GFX(ctx)
+        for program in [gfx.def_shader, gfx.def_wire_shader]:
+            assert 'FrameData' in program, 'Program is missing FrameData uniform block!'
+            assert program['FrameData'].binding == FRAME_DATA_BINDING, 'Invalid FrameData binding!'
+            assert 'view_transform' not in program, 'View transform should not be standalone uniform!'
+
+        assert 'MaterialData' in gfx.def_shader, 'Program is missing MaterialData uniform block!'
+        assert gfx.def_shader['MaterialData'].binding == MATERIAL_DATA_BINDING, 'Invalid MaterialData binding!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_vertex_array_cache(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        # Load model source
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('cube-vc.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath)
+
+        # Vertex arrays for shaded and wireframe passes are built with the buffers
+        gfx = GFX(ctx)
+        gfx.GenModelBuffers(model)
+        assert len(model.vertex_arrays) == 2, 'Vertex arrays were not built with model buffers!'
+        cached = list(model.vertex_arrays.values())
+
+        hints = RenderHints()
+        hints.wireframe_mode = WireframeMode.WireframeShaded
+        for _ in range(3):
+            gfx.RenderModel(model, hints, MaterialSettings())
+        assert list(model.vertex_arrays.values()) == cached, 'Vertex arrays should be reused across frames!'
+
+        # Regenerated buffers invalidate cached vertex arrays
+        gfx.GenModelBuffers(model)
+        assert len(model.vertex_arrays) == 2, 'Stale vertex arrays were not released!'
+        assert all(vao not in cached for vao in model.vertex_arrays.values()), 'Vertex arrays were not rebuilt!'
+
+        gfx.ReleaseModelBuffers(model)
+        assert len(model.vertex_arrays) == 0, 'Vertex arrays were not released!'
+        assert model.vertex_buffer is None, 'Vertex buffer was not released!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_shader_variants(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        model_filepath = importlib.resources.files('resources.models.gltf').joinpath('cube-vc.glb')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath)
+
+        gfx = GFX(ctx)
+        gfx.GenModelBuffers(model)
+        defines = gfx.GetShaderDefines(model, VisualiserMode.ShowColor)
+        assert 'VISUALISE_COLORS' in defines, 'Visualiser mode define missing!'
+        assert 'HAS_COLORS' in defines, 'Vertex color attribute define missing!'
+
+        # Each visualiser mode is compiled once into its own program and reused afterwards
+        hints = RenderHints()
+        hints.wireframe_mode = WireframeMode.WireframeOff
+        programs = set()
+        for mode in VisualiserMode:
+            hints.visualiser_mode = mode
+            gfx.RenderModel(model, hints, MaterialSettings())
+            programs.add(gfx.GetModelProgram(model, mode).glo)
+        num_variants = len(gfx.shaded_variants)
+        for mode in VisualiserMode:
+            hints.visualiser_mode = mode
+            gfx.RenderModel(model, hints, MaterialSettings())
+        assert len(programs) == len(VisualiserMode), 'Visualiser modes should use distinct programs!'
+        assert len(gfx.shaded_variants) == num_variants, 'Program variants should be cached!'
+        assert 'visualise_normals' not in gfx.GetModelProgram(model, VisualiserMode.ShowDefault), 'Debug uniforms should be compiled out!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_lod_selection(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+        ctx.viewport = (0, 0, 512, 512)
+
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath, lod_ratios=(0.5, 0.25, 0.125))
+        assert len(model.lods) == 3, 'Detail levels were not generated!'
+
+        gfx = GFX(ctx)
+        gfx.GenModelBuffers(model)
+        gfx.SetPerspectiveMatrix(Matrix44.perspective_projection(30.0, 1.0, 0.1, 1000.0))
+        hints = RenderHints()
+        sphere = model.GetBoundingSphere()
+
+        def SelectAtSize(screen_size: float) -> int:
+            distance = sphere.radius * gfx.perspective_matrix[1, 1] * 512 / screen_size
+            gfx.SetViewMatrix(Matrix44.from_translation(-(np.asarray(sphere.center) + [0.0, 0.0, distance])))
+            return gfx.SelectLOD(model, hints)
+
+        # Level thresholds in pixels at 16 pixels per triangle -> 355, 251, 177
+        assert SelectAtSize(1000.0) == 0, 'Close model should use full detail!'
+        assert SelectAtSize(50.0) == 3, 'Distant model should use coarsest level!'
+        assert SelectAtSize(160.0) == 3, 'Coarsest level is still detailed enough!'
+        assert SelectAtSize(190.0) == 2, 'Model grew past coarsest level threshold!'
+
+        # Coarser level is only picked once the model shrinks past the hysteresis band
+        assert SelectAtSize(240.0) == 2, 'Level should not change within hysteresis band!'
+        assert SelectAtSize(170.0) == 2, 'Level should not change within hysteresis band!'
+        assert SelectAtSize(140.0) == 3, 'Model shrunk past hysteresis band!'
+
+        first, count = gfx.GetLODRange(model)
+        assert first == len(model.indices) + len(model.lods[0].indices) + len(model.lods[1].indices), 'Invalid level offset!'
+        assert count == len(model.lods[2].indices), 'Invalid level index count!'
+
+        hints.enable_lod = False
+        assert gfx.SelectLOD(model, hints) == 0, 'Disabled LOD should use full detail!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_streamed_upload(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        model_filepath = importlib.resources.files('resources.models.gltf').joinpath('monkey.glb')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath, lod_ratios=(0.5,))
+
+        for layout in VertexLayout:
+            gfx = GFX(ctx, layout)
+            gfx.GenModelBuffers(model)
+            expected = model.vertex_buffer.read(), model.index_buffer.read()
+            gfx.ReleaseModelBuffers(model)
+
+            # Chunks and budgets not aligned to vertex size split vertices across writes
+            upload = gfx.BeginModelUpload(model)
+            upload.chunk_size = 1000
+            while not upload.Step(777):
+                pass
+            assert upload.uploaded_bytes == upload.total_bytes, 'Not all data was uploaded!'
+            assert model.vertex_buffer.read() == expected[0], f'{layout.name} chunked vertex data does not match!'
+            assert model.index_buffer.read() == expected[1], f'{layout.name} chunked index data does not match!'
+            gfx.ReleaseModelBuffers(model)
+
+        if len(model.lods) > 0:
+            indices = np.frombuffer(expected[1], dtype=f'u{model.index_element_size}')
+            assert np.array_equal(indices[len(model.indices):], model.lods[0].indices), 'Level indices should follow full detail!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_regenerate_buffers(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        model = PrimitiveFactory.CreateBox(1.0)
+        GFX(ctx, VertexLayout.Separate).GenModelBuffers(model)
+        old_buffers = [model.vertex_buffer, model.index_buffer, model.normal_buffer]
+        old_format = list(model.vertex_format)
+
+        # Pending upload leaves the drawable model on its previous buffers and layout
+        gfx = GFX(ctx, VertexLayout.Packed)
+        upload = gfx.BeginModelUpload(model)
+        assert model.vertex_format == old_format and model.index_element_size == 4, 'Layout changed before upload completed!'
+        assert model.vertex_buffer is old_buffers[0], 'Buffers changed before upload completed!'
+
+        upload.Step(upload.total_bytes)
+        assert model.vertex_format != old_format and model.index_element_size == 2, 'Layout of the new buffers was not assigned!'
+        released = [type(buffer.mglo).__name__ == 'InvalidObject' for buffer in old_buffers]
+        assert all(released), f'Replaced buffers were not released -> {released}'
+        assert type(model.vertex_buffer.mglo).__name__ != 'InvalidObject', 'New buffers should stay alive!'
+
+        # Regenerating within the same layout releases the previous buffers too
+        previous = model.vertex_buffer
+        gfx.GenModelBuffers(model)
+        assert type(previous.mglo).__name__ == 'InvalidObject' and model.vertex_buffer is not previous, 'Regenerated buffers leaked!'
+        gfx.ReleaseModelBuffers(model)
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_instanced_render(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('cube-vc.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath)
+
+        transforms = np.tile(np.identity(4, dtype='f4'), (4, 1, 1))
+        transforms[:, 3, 0] = np.arange(4) * 3.0
+        model.SetInstances(transforms)
+
+        # All instances are drawn by instanced programs from single instance buffer
+        gfx = GFX(ctx)
+        gfx.GenModelBuffers(model)
+        assert model.instance_buffer is not None, 'Instance buffer was not created with model buffers!'
+        assert model.instance_dirty_range is None, 'Instance data was not uploaded!'
+        program = gfx.GetModelProgram(model, VisualiserMode.ShowDefault)
+        assert 'in_instance_transform' in program, 'Instanced model should use instanced program variant!'
+        assert (program.glo, 'shaded') in model.vertex_arrays, 'Instanced vertex array missing!'
+
+        hints = RenderHints()
+        hints.wireframe_mode = WireframeMode.WireframeShaded
+        gfx.RenderModel(model, hints, MaterialSettings())
+
+        # Growing instance count reallocates the buffer and rebuilds vertex arrays
+        model.SetInstances(np.tile(transforms, (4, 1, 1)))
+        gfx.RenderModel(model, hints, MaterialSettings())
+        assert model.instance_buffer.size >= model.instance_data.nbytes, 'Instance buffer did not grow!'
+
+        gfx.ReleaseModelBuffers(model)
+        assert model.instance_buffer is None, 'Instance buffer was not released!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_sorted_draws(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        gfx = GFX(ctx)
+        red, blue = MaterialSettings(), MaterialSettings()
+        red.base_color[:] = [1.0, 0.0, 0.0]
+        blue.base_color[:] = [0.0, 0.0, 1.0]
+
+        # Box geometry is shared by every other model, materials alternate in a different pattern
+        group = ModelGroup()
+        box = PrimitiveFactory.CreateBox(1.0)
+        rectangle = PrimitiveFactory.CreateRectangle(1.0)
+        for index in range(8):
+            if index % 2 == 0:
+                model = box if index == 0 else box.CreateShared()
+            else:
+                model = rectangle if index == 1 else rectangle.CreateShared()
+            model.material = red if index % 4 < 2 else blue
+            model.transform.SetTranslation(index * 2.0 - 7.0, 0.0, 0.0)
+            group.AddModel(model)
+
+        upload = gfx.BeginGroupUpload(group)
+        while not upload.Step(64):
+            pass
+        assert upload.uploaded_bytes == upload.total_bytes, 'Group upload is incomplete!'
+        shared = group.models[2]
+        assert shared.vertex_buffer is box.vertex_buffer and shared.index_buffer is box.index_buffer, 'Shared model did not take over buffers!'
+        assert len(shared.vertex_arrays) > 0 and shared.vertex_arrays is not box.vertex_arrays, 'Shared model needs its own vertex arrays!'
+
+        scene = Scene()
+        for model in group.models:
+            scene.AddModel(model)
+        camera = Camera()
+        camera.aspect = 1.0
+        camera.transform.SetTranslation(0.0, 0.0, 30.0)
+        gfx.SetCamera(camera)
+        hints = RenderHints()
+        hints.wireframe_mode = WireframeMode.WireframeOff
+
+        # Sorted scene switches geometry & material once per (geometry, material) pair
+        scene.Render(gfx, hints, MaterialSettings())
+        assert scene.stats.draw_calls == 8, f'Invalid draw call count -> {scene.stats.draw_calls}'
+        assert gfx.draw_stats.buffer_changes == 4 and gfx.draw_stats.material_changes <= 4, f'Draws were not sorted -> {gfx.draw_stats}'
+        sorted_changes = scene.stats.state_changes
+
+        gfx.ResetDrawStats()
+        for model in group.models:
+            gfx.RenderModel(model, hints, MaterialSettings())
+        assert gfx.draw_stats.buffer_changes == 8, 'Unsorted draws should switch buffers every draw!'
+        assert sorted_changes < gfx.draw_stats.state_changes, 'Sorting did not reduce state changes!'
+
+        # Shared buffers are released once, by their source
+        gfx.ReleaseGroupBuffers(group)
+        assert all(model.vertex_buffer is None for model in group.models), 'Group buffers were not released!'
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_occlusion_culling(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        gfx = GFX(ctx)
+        fbo = ctx.simple_framebuffer((128, 128))
+        fbo.use()
+        # Wall right in front of the camera hides the box behind it, the box to the side stays visible
+        wall, hidden, visible = PrimitiveFactory.CreateBox(2.0), PrimitiveFactory.CreateBox(1.0), PrimitiveFactory.CreateBox(1.0)
+        wall.transform.SetTranslation(0.0, 0.0, 2.0)
+        hidden.transform.SetTranslation(0.0, 0.0, -10.0)
+        visible.transform.SetTranslation(5.0, 0.0, -10.0)
+        scene = Scene()
+        scene.enable_occlusion_culling = True
+        scene.occlusion_min_triangles = 0
+        for model in [wall, hidden, visible]:
+            gfx.GenModelBuffers(model)
+            scene.AddModel(model)
+        camera = Camera()
+        camera.aspect = 1.0
+        camera.transform.SetTranslation(0.0, 0.0, 10.0)
+        gfx.SetCamera(camera)
+        hints = RenderHints()
+        hints.wireframe_mode = WireframeMode.WireframeOff
+
+        # Queries of the first frame are read by the second one, only once the GPU finished them
+        fbo.clear(depth=1.0)
+        scene.Render(gfx, hints, MaterialSettings())
+        assert scene.stats.occlusion_culled_objects == 0, 'Untested models should not be culled!'
+        ctx.finish()
+        fbo.clear(depth=1.0)
+        scene.Render(gfx, hints, MaterialSettings())
+        assert scene.stats.occlusion_culled_objects == 1, f'Hidden box was not culled -> {scene.stats}'
+        assert scene.stats.drawn_objects == 2, f'Visible models were culled -> {scene.stats}'
+
+        scene.ReleaseQueries()
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
+    def test_scaled_blit(self):
+        # Create dummy OpenGL context
+        ctx = self.__CreateDummyContext()
+        assert ctx is not None, 'Failed to create dummy OpenGL context!'
+
+        gfx = GFX(ctx)
+        source = gfx.CreateRenderTarget((64, 64), sampled=True)
+        pattern = np.zeros((64, 64, 4), dtype='u1')
+        pattern[::2, :, 0] = 255
+        pattern[:, ::2, 1] = 255
+        pattern[..., 3] = 255
+        source.color_attachments[0].write(pattern.tobytes())
+        destination = ctx.simple_framebuffer((64, 64))
+
+        # Unscaled region is copied exactly, with and without sharpening
+        for sharpness in [0.0, 0.5]:
+            destination.use()
+            destination.clear()
+            gfx.BlitScaled(source.color_attachments[0], (64, 64), sharpness)
+            result = np.frombuffer(destination.read(components=4), dtype='u1').reshape(64, 64, 4)
+            assert np.array_equal(result[..., :3], pattern[..., :3]), f'Unscaled blit is not exact with sharpness {sharpness}!'
+
+        # Only the lower left region is upscaled, flat color stays flat
+        pattern[:32, :32] = [64, 128, 192, 255]
+        source.color_attachments[0].write(pattern.tobytes())
+        for sharpness in [0.0, 1.0]:
+            destination.use()
+            gfx.BlitScaled(source.color_attachments[0], (32, 32), sharpness)
+            result = np.frombuffer(destination.read(components=4), dtype='u1').reshape(64, 64, 4)
+            assert np.all(np.abs(result[..., :3].astype(int) - [64, 128, 192]) <= 1), f'Upscaled region is not flat with sharpness {sharpness}!'
+
+        with self.assertRaises(Exception):
+            gfx.CreateRenderTarget((64, 64), samples=4, sampled=True)
+
+        # Dispose of the dummy OpenGL context
+        self.__DestroyDummyContext()
+
     def __CreateDummyContext(self):
         if not glfw.init():
             return None
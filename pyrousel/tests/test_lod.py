@@ -0,0 +1,68 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.lod import MeshSimplifier
+from pyrousel.meshcache import MeshCache
+from pyrousel.model import ModelLoader
+
+class MeshSimplifierTest(unittest.TestCase):
+    def test_lod_chain(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath)
+        num_triangles = len(model.indices) // 3
+
+        ratios = (0.5, 0.25, 0.125)
+        levels = MeshSimplifier.GenerateLODs(model.vertices, model.indices, ratios)
+        assert len(levels) == len(ratios), f'Expected {len(ratios)} detail levels -> {len(levels)}'
+        for level, ratio in zip(levels, ratios):
+            level_triangles = len(level) // 3
+            assert level_triangles <= num_triangles * ratio * 1.1, f'Level does not meet ratio {ratio} -> {level_triangles}'
+            assert level.min() >= 0 and level.max() < len(model.vertices) // 3, 'Level indices out of vertex range!'
+
+            # Simplified surface should keep the overall shape of the model
+            used = model.vertices.reshape(-1, 3)[np.unique(level)]
+            extents = np.asarray(model.maxext - model.minext)
+            error = np.abs(used.max(axis=0) - np.asarray(model.maxext)) + np.abs(used.min(axis=0) - np.asarray(model.minext))
+            assert np.all(error <= extents * 0.1), f'Simplified bounds drifted too far -> {error}'
+
+    def test_boundary_preserved(self):
+        # Flat grid, interior vertices can collapse but border has to stay in place
+        size = 8
+        x, y = np.meshgrid(np.arange(size + 1), np.arange(size + 1))
+        vertices = np.column_stack([x.ravel(), y.ravel(), np.zeros(x.size)]).astype('f4')
+        quads = (np.arange(size)[:, None] * (size + 1) + np.arange(size)[None, :]).ravel()
+        indices = np.concatenate([
+            np.column_stack([quads, quads + 1, quads + size + 2]),
+            np.column_stack([quads, quads + size + 2, quads + size + 1])
+        ]).astype('i4')
+
+        levels = MeshSimplifier.GenerateLODs(vertices.ravel(), indices.ravel(), (0.25,))
+        assert len(levels) == 1, 'Flat grid failed to simplify!'
+        corners = vertices[levels[0].reshape(-1, 3)]
+        area = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1).sum() * 0.5
+        assert np.isclose(area, size * size), f'Simplified grid area changed -> {area}'
+
+    def test_cached_lods(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            model_filepath = importlib.resources.files('resources.models.obj').joinpath('sphere.obj')
+            cache = MeshCache(cache_dir)
+            loaded = ModelLoader.LoadModel(model_filepath, cache, lod_ratios=(0.5, 0.25))
+            cached = ModelLoader.LoadModel(model_filepath, cache, lod_ratios=(0.5, 0.25))
+            assert cache.hits == 1, 'Detail levels were not cached!'
+            assert len(cached.lods) == len(loaded.lods) > 0, 'Cached detail levels do not match!'
+            for cached_lod, loaded_lod in zip(cached.lods, loaded.lods):
+                assert np.array_equal(cached_lod.indices, loaded_lod.indices), 'Cached level indices do not match!'
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.meshcache import MeshCache, MeshData
+from pyrousel.model import ModelLoader
+
+class MeshCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_cache_hit(self):
+        model_filepath = importlib.resources.files('resources.models.gltf').joinpath('monkey-vc.glb')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+
+        cache = MeshCache(self.cache_dir)
+        loaded = ModelLoader.LoadModel(model_filepath, cache)
+        cached = ModelLoader.LoadModel(model_filepath, cache)
+        assert cache.misses == 1 and cache.hits == 1, 'Second load should be served from the cache!'
+
+        for attrib in ['vertices', 'normals', 'texcoords', 'colors', 'indices']:
+            array = getattr(cached, attrib)
+            assert isinstance(array.base, np.memmap), f'Cached {attrib} are not memory mapped!'
+            assert array.dtype == getattr(loaded, attrib).dtype, f'Cached {attrib} type mismatch!'
+            assert np.array_equal(array, getattr(loaded, attrib)), f'Cached {attrib} do not match!'
+
+    def test_cache_key(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('cube-vc.obj')
+        copy_filepath = os.path.join(self.cache_dir, 'copy.obj')
+        shutil.copyfile(model_filepath, copy_filepath)
+
+        key = MeshCache.ComputeKey(model_filepath, {'process': False})
+        assert key == MeshCache.ComputeKey(copy_filepath, {'process': False}), 'Key should depend on content only!'
+        assert key != MeshCache.ComputeKey(copy_filepath, {'process': True}), 'Key should depend on options!'
+
+        with open(copy_filepath, 'a') as file:
+            file.write('\n# Modified\n')
+        assert key != MeshCache.ComputeKey(copy_filepath, {'process': False}), 'Key should depend on content!'
+
+    def test_invalid_entry(self):
+        cache = MeshCache(self.cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(cache.GetEntryPath('invalid'), 'wb') as file:
+            file.write(b'not a mesh')
+
+        assert cache.Get('invalid') is None, 'Invalid entry should be treated as cache miss!'
+        assert cache.Get('missing') is None, 'Missing entry should be treated as cache miss!'
+
+    def test_lru_eviction(self):
+        data = MeshCacheTest.__CreateMeshData(1024)
+        cache = MeshCache(self.cache_dir)
+        entry_size = os.path.getsize(cache.Put('probe', data))
+        cache.Clear()
+
+        cache.max_size = entry_size * 2
+        for i, key in enumerate(['a', 'b']):
+            os.utime(cache.Put(key, data), (i, i))
+
+        # Accessing 'a' makes 'b' the least recently used entry
+        assert cache.Get('a') is not None, 'Entry should be cached!'
+        cache.Put('c', data)
+
+        assert cache.GetSize() <= cache.max_size, 'Cache exceeds its size limit!'
+        assert cache.Get('b') is None, 'Least recently used entry was not evicted!'
+        assert cache.Get('a') is not None, 'Recently used entry was evicted!'
+        assert cache.Get('c') is not None, 'New entry was evicted!'
+
+    @staticmethod
+    def __CreateMeshData(num_vertices: int) -> MeshData:
+        return MeshData(
+            vertices=np.random.rand(num_vertices * 3).astype('f4'),
+            normals=np.random.rand(num_vertices * 3).astype('f4'),
+            texcoords=np.array([], dtype='f4'),
+            colors=np.array([], dtype='f4'),
+            indices=np.arange(num_vertices, dtype='i4')
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.meshopt import MeshOptimizer
+from pyrousel.meshcache import MeshCache, MeshData
+from pyrousel.model import ModelLoader
+
+class MeshOptimizerTest(unittest.TestCase):
+    def test_weld_and_degenerates(self):
+        # Two triangles of a quad with unshared corners and one degenerate triangle
+        vertices = np.array([
+            [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0],
+            [-0.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0],
+        ], dtype='f4')
+        normals = np.tile([0.0, 0.0, 1.0], (9, 1)).astype('f4')
+        indices = np.arange(9, dtype='i4').reshape(-1, 3)
+
+        indices, welded, attributes = MeshOptimizer.WeldVertices(indices, vertices, {'normals': normals})
+        assert len(welded) == 5, f'Duplicate vertices were not welded -> {len(welded)} vertices'
+        assert len(attributes['normals']) == 5, 'Attributes were not welded with vertices!'
+        assert np.array_equal(welded[indices[0]], vertices[:3]), 'Welded triangle does not match!'
+
+        indices = MeshOptimizer.RemoveDegenerates(indices, welded)
+        assert len(indices) == 2, 'Zero area triangle was not removed!'
+
+    def test_optimize(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath)
+        data = MeshData(model.vertices, model.normals, model.texcoords, model.colors, model.indices)
+
+        optimized, report = MeshOptimizer.Optimize(data)
+        stages = [stats.stage for stats in report]
+        assert stages == ['weld', 'degenerates', 'vertex cache', 'overdraw', 'vertex fetch'], 'Unexpected stages!'
+        assert report[-1].after.acmr < report[0].before.acmr, 'Optimization did not reduce ACMR!'
+        assert report[-1].after.acmr <= 1.0, f'ACMR too high after optimization -> {report[-1].after.acmr}'
+
+        # Same set of triangles must be rendered
+        def Triangles(data: MeshData) -> np.ndarray:
+            corners = data.vertices.reshape(-1, 3)[data.indices.reshape(-1, 3)].reshape(-1, 9)
+            return np.unique(corners, axis=0)
+        assert np.array_equal(Triangles(data), Triangles(optimized)), 'Optimized mesh geometry differs!'
+        assert len(optimized.normals) == len(optimized.vertices), 'Normals do not match optimized vertices!'
+
+        # Vertices are referenced in first use order
+        _, first = np.unique(optimized.indices, return_index=True)
+        assert np.all(np.diff(first) > 0), 'Vertices are not in first use order!'
+
+    def test_optimized_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            model_filepath = importlib.resources.files('resources.models.obj').joinpath('chess_pawn.obj')
+            cache = MeshCache(cache_dir)
+            optimized = ModelLoader.LoadModel(model_filepath, cache, optimize=True)
+            cached = ModelLoader.LoadModel(model_filepath, cache, optimize=True)
+            assert cache.misses == 1 and cache.hits == 1, 'Optimized mesh was not cached!'
+            assert np.array_equal(cached.indices, optimized.indices), 'Cached optimized indices do not match!'
+
+            ModelLoader.LoadModel(model_filepath, cache)
+            assert cache.misses == 2, 'Unoptimized mesh should not share cache entry with optimized one!'
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
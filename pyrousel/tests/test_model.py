@@ -1,12 +1,14 @@
 import os
 import sys
+import tempfile
 import unittest
 import importlib.resources
 import numpy as np
+import trimesh
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from pyrousel.model import Model, ModelLoader
+from pyrousel.model import Model, ModelLoader, PrimitiveFactory
 from pyrr import Vector3
 
 class ModelTest(unittest.TestCase):
@@ -29,6 +31,26 @@ class ModelTest(unittest.TestCase):
         model = ModelLoader.LoadModel(model_filepath)
         ModelTest.__ValidateModelContents(model)
 
+    def test_mesh_conversion(self):
+        model_filepath = importlib.resources.files('resources.models.gltf').joinpath('monkey-vc.glb')
+        scene = trimesh.load(model_filepath, process=False)
+        mesh, _ = ModelLoader.GetSceneMeshes(scene)[0]
+
+        data = ModelLoader.ConvertMeshes([(mesh, None)])
+        assert data.colors.dtype == np.uint8, 'Vertex colors should be kept as 8-bit!'
+        assert np.array_equal(data.colors.reshape(-1, 3), mesh.visual.vertex_colors[:, :3]), 'Vertex colors do not match!'
+        assert np.allclose(data.normals.reshape(-1, 3), mesh.vertex_normals, atol=1e-6), 'Supplied normals should be kept!'
+
+        # Instanced geometry is converted once per transform, indices offset past earlier copies
+        transform = trimesh.transformations.scale_and_translate(2.0, [1.0, 0.0, 0.0])
+        data = ModelLoader.ConvertMeshes([(mesh, None), (mesh, transform)])
+        vertices = data.vertices.reshape(2, -1, 3)
+        num_vertices = len(mesh.vertices)
+        assert np.allclose(vertices[1], vertices[0] * 2.0 + [1.0, 0.0, 0.0], atol=1e-5), 'Transform was not applied!'
+        assert np.allclose(data.normals.reshape(2, -1, 3)[1], mesh.vertex_normals, atol=1e-6), 'Uniform scale should not change normals!'
+        assert np.array_equal(data.indices.reshape(2, -1)[1], mesh.faces.reshape(-1) + num_vertices), 'Indices were not offset!'
+        self.assertRaises(Exception, ModelLoader.ConvertMeshes, [])
+
     def test_collada_loading(self):
         # Locate and validate model file
         model_filepath = importlib.resources.files('resources.models.collada').joinpath('monkey.dae')
@@ -38,6 +60,83 @@ class ModelTest(unittest.TestCase):
         model = ModelLoader.LoadModel(model_filepath)
         ModelTest.__ValidateModelContents(model)
 
+    def test_instances(self):
+        model = PrimitiveFactory.CreateBox(2.0)
+        assert not model.is_instanced and model.num_instances == 1, 'Models should not be instanced by default!'
+
+        transforms = np.tile(np.identity(4, dtype='f4'), (3, 1, 1))
+        transforms[:, 3, 0] = [-10.0, 0.0, 10.0]
+        model.SetInstances(transforms, colors=np.array([[1.0, 0.0, 0.0]] * 3))
+        assert model.num_instances == 3, 'Invalid instance count!'
+        assert model.instance_dirty_range == (0, 3), 'New instances should be uploaded in full!'
+        assert np.allclose(model.instance_data['color'][:, 3], 1.0), 'Tint alpha should default to opaque!'
+
+        aabb = model.GetInstancesAABB()
+        assert np.allclose(aabb.minext, [-11.0, -1.0, -1.0]), 'Instance bounds ignore instance transforms!'
+        assert np.allclose(aabb.maxext, [11.0, 1.0, 1.0]), 'Instance bounds ignore instance transforms!'
+        assert np.allclose(model.GetAABB().maxext, [1.0, 1.0, 1.0]), 'Mesh bounds should not include instances!'
+
+        # Partial updates extend the dirty range only as far as needed
+        model.instance_dirty_range = None
+        moved = transforms[2:].copy()
+        moved[:, 3, 0] = 20.0
+        model.SetInstanceTransforms(moved, first=2)
+        model.SetInstanceColors(np.array([[0.0, 1.0, 0.0, 0.5]]), first=1)
+        assert model.instance_dirty_range == (1, 3), f'Invalid dirty range -> {model.instance_dirty_range}'
+        assert np.isclose(model.GetInstancesAABB().maxext[0], 21.0), 'Instance bounds were not updated!'
+        assert np.allclose(model.instance_data['color'][1], [0.0, 1.0, 0.0, 0.5]), 'Instance color was not updated!'
+        self.assertRaises(Exception, model.SetInstanceTransforms, transforms, 1)
+
+        model.ClearInstances()
+        assert not model.is_instanced and model.GetInstancesAABB() is model.GetAABB(), 'Instances were not cleared!'
+
+    def test_scene_import(self):
+        box = trimesh.creation.box(extents=[1.0, 2.0, 3.0])
+        box.visual = trimesh.visual.TextureVisuals(material=trimesh.visual.material.PBRMaterial(
+            baseColorFactor=[255, 0, 0, 255], roughnessFactor=0.25, metallicFactor=0.0))
+        sphere = trimesh.creation.icosphere(subdivisions=1)
+        sphere.visual = trimesh.visual.TextureVisuals(material=trimesh.visual.material.PBRMaterial(
+            baseColorFactor=[0, 0, 255, 255], roughnessFactor=0.75))
+
+        # Box geometry is referenced by two nodes, one of them rotated
+        rotated = trimesh.transformations.rotation_matrix(np.pi * 0.5, [0.0, 0.0, 1.0])
+        rotated[:3, 3] = [4.0, 0.0, 0.0]
+        scene = trimesh.Scene()
+        scene.add_geometry(box, geom_name='box', node_name='box_a', transform=rotated)
+        scene.graph.update(frame_to='box_b', frame_from=scene.graph.base_frame, geometry='box',
+                           matrix=trimesh.transformations.translation_matrix([-4.0, 0.0, 0.0]))
+        scene.add_geometry(sphere, geom_name='sphere', node_name='sphere')
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'scene.glb')
+            scene.export(filepath)
+            group = ModelLoader.LoadScene(filepath)
+            flattened = ModelLoader.LoadModel(filepath)
+
+        assert len(group.models) == 3, 'Every scene node should become a model!'
+        boxes = [model for model in group.models if len(model.vertices) == len(box.vertices) * 3]
+        assert len(boxes) == 2, 'Invalid number of box models!'
+        assert sum(model.buffer_source is not None for model in boxes) == 1, 'Second box node should share the geometry!'
+        shared = next(model for model in boxes if model.buffer_source is not None)
+        assert shared.buffer_source in boxes and shared.vertices is shared.buffer_source.vertices, 'Shared geometry was copied!'
+        assert group.num_triangles * 3 == len(flattened.indices), 'Scene should hold same triangles as the flattened model!'
+
+        assert np.allclose(boxes[0].material.base_color, [1.0, 0.0, 0.0]) and boxes[0].material.roughness == 0.25, 'Invalid box material!'
+        sphere_model = next(model for model in group.models if model not in boxes)
+        assert np.allclose(sphere_model.material.base_color, [0.0, 0.0, 1.0]), 'Invalid sphere material!'
+
+        # Node transforms keep models placed as in the flattened mesh
+        centers = sorted(tuple(np.round(model.GetWorldAABB().GetCenter(), 4)) for model in group.models)
+        assert np.allclose(centers, [[-4.0, 0.0, 0.0], [0.0, 0.0, 0.0], [4.0, 0.0, 0.0]], atol=1e-4), f'Invalid node placement -> {centers}'
+        rotated_box = next(model for model in boxes if model.GetWorldAABB().GetCenter()[0] > 0.0).GetWorldAABB()
+        assert np.allclose(rotated_box.maxext - rotated_box.minext, [2.0, 1.0, 3.0], atol=1e-4), 'Node rotation was not applied!'
+        assert np.allclose(group.GetAABB().minext, flattened.minext, atol=1e-4), 'Group bounds do not match the flattened model!'
+        assert np.allclose(group.GetAABB().maxext, flattened.maxext, atol=1e-4), 'Group bounds do not match the flattened model!'
+
+        # Root transform moves the whole group
+        group.transform.SetTranslation(0.0, 10.0, 0.0)
+        assert np.isclose(sphere_model.GetWorldAABB().GetCenter()[1], 10.0), 'Models do not follow the group root!'
+
     @staticmethod
     def __ValidateModelContents( model: Model) -> None:
         assert model is not None, 'Model loading resulted in invalid model object!'
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import unittest
+import importlib.resources
+import numpy as np
+import trimesh
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.objparser import OBJParser
+from pyrousel.model import ModelLoader
+
+class OBJParserTest(unittest.TestCase):
+    def test_matches_trimesh(self):
+        for name in ['chess_pawn.obj', 'cube-vc.obj', 'elephant.obj', 'monkey.obj', 'teapot.obj']:
+            model_filepath = importlib.resources.files('resources.models.obj').joinpath(name)
+            assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+
+            data = OBJParser.Parse(model_filepath)
+            mesh = trimesh.load(model_filepath, force='mesh', process=False)
+            vertices = data.vertices.reshape(-1, 3)
+            triangles = data.indices.reshape(-1, 3)
+            faces = np.asarray(mesh.faces)
+
+            assert len(vertices) == len(mesh.vertices), f'Vertex count does not match trimesh -> {name}'
+            assert len(triangles) == len(faces), f'Triangle count does not match trimesh -> {name}'
+            assert np.array_equal(vertices[triangles], np.asarray(mesh.vertices, dtype='f4')[faces]), \
+                f'Triangle positions do not match trimesh -> {name}'
+            assert np.allclose(data.normals.reshape(-1, 3)[triangles], mesh.vertex_normals[faces], atol=1e-5), \
+                f'Triangle normals do not match trimesh -> {name}'
+
+            if getattr(mesh.visual, 'uv', None) is not None:
+                texcoords = data.texcoords.reshape(-1, 2)[triangles]
+                assert np.array_equal(texcoords, np.asarray(mesh.visual.uv, dtype='f4')[faces]), \
+                    f'Triangle texcoords do not match trimesh -> {name}'
+
+    def test_polygons(self):
+        source = (
+            '# Mixed polygon test\r\n'
+            'v 0 0 0\r\n'
+            'v 1.0 0 0 1.0 0.0 0.0\r\n'
+            'v 1 1e0 0\r\n'
+            '  v 0 1 0\r\n'
+            'v 2 0.5 -0.25\r\n'
+            'vt 0 0\r\n'
+            'vt 1 0\r\n'
+            'vn 0 0 1\r\n'
+            'f 1/1/1 2/2/1 3/2/1 4/1/1\r\n'
+            'f -4//-1 -3//-1 -1//-1\r\n'
+            'f 1 2 5 3 4\r\n'
+        )
+        data = OBJParser.Parse(OBJParserTest.__WriteTemp(source))
+        vertices = data.vertices.reshape(-1, 3)
+        triangles = data.indices.reshape(-1, 3)
+
+        # Quad -> 2, triangle -> 1, pentagon -> 3
+        assert len(triangles) == 6, 'Polygons were not triangulated!'
+        expected = np.array([[1, 0, 0], [1, 1, 0], [2, 0.5, -0.25]], dtype='f4')
+        assert np.array_equal(vertices[triangles[2]], expected), 'Relative indices were not resolved!'
+        assert len(data.colors) == 0, 'Partial vertex colors should be ignored!'
+
+        # Same position with different attributes is a different vertex
+        assert len(vertices) == 4 + 3 + 5, 'Face index triplets were not de-indexed!'
+        assert len(data.texcoords) == len(vertices) * 2, 'Invalid texcoord count!'
+        assert len(data.normals) == len(vertices) * 3, 'Invalid normal count!'
+
+    def test_decimals(self):
+        tokens = ['0', '-0.5', '.25', '5.', '-1234567', '1234567.8', '0.000001', '-123456789.125',
+                  '3.14159265358979', '1e-3', '-2.5E2', '+7']
+        source = ''.join(f'v {a} {b} {c}\n' for a, b, c in zip(tokens[0::3], tokens[1::3], tokens[2::3]))
+        source += 'f 1 2 3\nf 2 3 4\n'
+        data = OBJParser.Parse(OBJParserTest.__WriteTemp(source))
+
+        expected = np.array([float(token) for token in tokens], dtype='f4').reshape(-1, 3)
+        assert np.array_equal(data.vertices.reshape(-1, 3), expected[[0, 1, 2, 3]]), 'Decimal values were not parsed exactly!'
+
+    def test_parallel_chunks(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('monkey.obj')
+        serial = OBJParser.Parse(model_filepath, num_workers=1)
+        parallel = OBJParser.Parse(model_filepath, num_workers=2, chunk_size=64 * 1024)
+
+        for attrib in ['vertices', 'normals', 'texcoords', 'colors', 'indices']:
+            assert np.array_equal(getattr(serial, attrib), getattr(parallel, attrib)), \
+                f'Chunked parsing changed {attrib}!'
+
+    def test_invalid_faces(self):
+        filepath = OBJParserTest.__WriteTemp('v 0 0 0\nv 1 0 0\nf 1 2 3\n')
+        with self.assertRaises(Exception):
+            ModelLoader.LoadFromOBJ(filepath)
+
+    @staticmethod
+    def __WriteTemp(source: str) -> str:
+        file = tempfile.NamedTemporaryFile('w', suffix='.obj', delete=False)
+        with file:
+            file.write(source)
+        return file.name
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import moderngl as mgl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.profiler import Profiler, SampleRing, MemoryProfiler, GPUTimer, MAX_PENDING_GPU_FRAMES, _ElapsedQuery
+
+class ProfilerTest(unittest.TestCase):
+    def test_sample_ring(self):
+        ring = SampleRing(100)
+        assert np.allclose(ring.GetPercentiles(), 0.0), 'Empty ring should report zeros!'
+        for value in range(200):
+            ring.Add(float(value))
+
+        # Only the most recent samples are kept
+        assert len(ring) == 100, 'Ring should not grow past its size!'
+        assert ring.GetLast() == 199.0, 'Invalid last sample!'
+        p50, p95, p99 = ring.GetPercentiles((50, 95, 99))
+        assert np.isclose(p50, 149.5) and np.isclose(p95, 194.05) and np.isclose(p99, 198.01), 'Invalid percentiles!'
+
+    def test_memory_stages(self):
+        profiler = MemoryProfiler()
+        size = 16 * 1024 * 1024
+        with profiler.Stage('allocate'):
+            data = np.ones(size, dtype='u1')
+            del data
+        with profiler.Stage('idle'):
+            pass
+        with profiler.Stage('allocate'):
+            pass
+
+        stats = profiler.GetStats()
+        assert [stage.name for stage in stats] == ['allocate', 'idle'], 'Repeated stage should be merged!'
+        assert stats[0].traced_peak >= size, 'Freed allocation should count towards the stage peak!'
+        assert stats[1].traced_peak < size, 'Peak leaked into following stage!'
+        assert MemoryProfiler.NullStage('other') is MemoryProfiler.NullStage('idle'), 'Null stage should be shared no-op scope!'
+
+    def test_cpu_scopes(self):
+        profiler = Profiler()
+        assert profiler.Scope('idle') is profiler.Scope('other'), 'Disabled profiler should return shared no-op scope!'
+        profiler.BeginFrame()
+        with profiler.Scope('idle'):
+            pass
+        profiler.EndFrame()
+        assert len(profiler.GetStats()) == 0 and len(profiler.trace_events) == 0, 'Disabled profiler recorded scopes!'
+
+        profiler.SetEnabled(True)
+        for _ in range(3):
+            profiler.BeginFrame()
+            with profiler.Scope('update'):
+                with profiler.Scope('sleep'):
+                    time.sleep(0.002)
+                # Same scope repeated within a frame is summed
+                with profiler.Scope('sleep'):
+                    time.sleep(0.002)
+            profiler.EndFrame()
+
+        stats = {scope.name: scope for scope in profiler.GetStats()}
+        assert list(stats.keys()) == ['frame', 'update', 'sleep'], f'Unexpected scopes -> {list(stats.keys())}'
+        assert (stats['frame'].depth, stats['update'].depth, stats['sleep'].depth) == (0, 1, 2), 'Invalid scope depths!'
+        assert stats['sleep'].p50 >= 4.0, f'Repeated scope times were not summed -> {stats["sleep"].p50}'
+        assert stats['update'].p50 >= stats['sleep'].p50, 'Outer scope shorter than inner one!'
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(temp_dir, 'trace.json')
+            profiler.ExportChromeTrace(filepath)
+            with open(filepath, 'r') as file:
+                trace = json.load(file)
+            events = trace['traceEvents']
+            assert len(events) == 3 * 4, f'Unexpected number of trace events -> {len(events)}'
+            assert all(event['ph'] == 'X' and event['dur'] >= 0.0 for event in events), 'Invalid trace events!'
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_gpu_scopes(self):
+        try:
+            ctx = mgl.create_standalone_context(backend='egl')
+        except Exception:
+            self.skipTest('Headless OpenGL context not available')
+
+        profiler = Profiler(ctx, enabled=True)
+        fbo = ctx.simple_framebuffer((64, 64))
+        fbo.use()
+        for _ in range(4):
+            profiler.BeginFrame()
+            with profiler.GPUScope('clear'):
+                fbo.clear(1.0, 0.0, 0.0)
+                # Nested GPU scope is folded into the outer one
+                with profiler.GPUScope('nested'):
+                    fbo.clear(0.0, 1.0, 0.0)
+            profiler.EndFrame()
+
+        # Results lag behind by latency frames
+        gpu = [scope for scope in profiler.GetStats() if scope.category == 'gpu']
+        assert [scope.name for scope in gpu] == ['clear'], f'Unexpected GPU scopes -> {gpu}'
+        assert gpu[0].last >= 0.0, 'Invalid GPU time!'
+
+        profiler.SetEnabled(False)
+        ctx.release()
+
+    def test_gpu_pending_results(self):
+        try:
+            ctx = mgl.create_standalone_context(backend='egl')
+        except Exception:
+            self.skipTest('Headless OpenGL context not available')
+
+        profiler = Profiler(ctx, enabled=True)
+        fbo = ctx.simple_framebuffer((64, 64))
+        fbo.use()
+
+        def RunFrames(count: int) -> None:
+            for _ in range(count):
+                profiler.BeginFrame()
+                with profiler.GPUScope('clear'):
+                    fbo.clear(1.0, 0.0, 0.0)
+                profiler.EndFrame()
+
+        # Frames still running on the GPU are neither waited for nor read
+        def Unavailable(query):
+            raise AssertionError('Unavailable query result was read!')
+        with mock.patch.object(_ElapsedQuery, 'IsAvailable', lambda query: False), mock.patch.object(_ElapsedQuery, 'GetElapsed', Unavailable):
+            RunFrames(MAX_PENDING_GPU_FRAMES * 2)
+        assert not [scope for scope in profiler.GetStats() if scope.category == 'gpu'], 'Pending GPU results were reported!'
+
+        ctx.finish()
+        RunFrames(3)
+        gpu = [scope for scope in profiler.GetStats() if scope.category == 'gpu']
+        assert [scope.name for scope in gpu] == ['clear'], f'Available GPU results were not read -> {gpu}'
+
+        profiler.Release()
+        ctx.release()
+
+    def test_gpu_timer(self):
+        try:
+            ctx = mgl.create_standalone_context(backend='egl')
+        except Exception:
+            self.skipTest('Headless OpenGL context not available')
+
+        profiler = Profiler(ctx, enabled=True)
+        timer = GPUTimer(latency=2)
+        fbo = ctx.simple_framebuffer((64, 64))
+        fbo.use()
+        # Timestamps do not conflict with elapsed time scopes inside the timed frame
+        results = []
+        for _ in range(8):
+            profiler.BeginFrame()
+            results.append(timer.Begin())
+            with profiler.GPUScope('clear'):
+                fbo.clear(1.0, 0.0, 0.0)
+            timer.End()
+            profiler.EndFrame()
+            ctx.finish()
+
+        # Each result is returned once, latency frames after its measurement
+        assert results[:3] == [None] * 3, f'Results returned before being measured -> {results}'
+        assert all(result is not None for result in results[3:]), f'Finished results were not read -> {results}'
+        assert timer.last_time is not None and timer.last_time >= 0.0, f'Invalid GPU frame time -> {timer.last_time}'
+        assert [scope.name for scope in profiler.GetStats() if scope.category == 'gpu'] == ['clear'], 'GPU scope was not recorded!'
+
+        timer.Release()
+        profiler.SetEnabled(False)
+        ctx.release()
+
+if __name__ == "__main__":
+    unittest.main()
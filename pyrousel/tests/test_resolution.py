@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.resolution import ResolutionScaler
+
+class ResolutionTest(unittest.TestCase):
+    def test_converge(self):
+        # GPU time grows with shaded pixels, measurements arrive two frames late like timer queries
+        scaler = ResolutionScaler(target_time=12.0, min_scale=0.25)
+        scales = [scaler.scale] * 3
+        for _ in range(200):
+            scaler.Update(20.0 * scales[-3] ** 2)
+            scales.append(scaler.scale)
+
+        gpu_time = 20.0 * scaler.scale ** 2
+        assert abs(gpu_time / 12.0 - 1.0) <= scaler.tolerance * 1.5, f'GPU time did not settle at the target -> {gpu_time}'
+        assert len(set(scales[-50:])) == 1, 'Scale keeps oscillating!'
+
+        # Lighter load brings the resolution back up to the largest scale
+        for _ in range(200):
+            scaler.Update(5.0 * scales[-3] ** 2)
+            scales.append(scaler.scale)
+        assert scaler.scale == scaler.max_scale, f'Scale did not recover -> {scaler}'
+
+    def test_limits(self):
+        scaler = ResolutionScaler(target_time=10.0, min_scale=0.5)
+        for _ in range(100):
+            scaler.Update(1000.0)
+        assert scaler.scale == 0.5, f'Scale went below the minimum -> {scaler}'
+        assert scaler.GetSize((1280, 720)) == (640, 360), 'Invalid scaled size!'
+
+        # Measurements within tolerance keep the scale
+        scaler = ResolutionScaler(target_time=10.0)
+        scaler.Update(10.5)
+        assert scaler.scale == 1.0, 'Scale should not change within tolerance!'
+
+        # Disabled scaler still tracks GPU time but leaves the scale alone
+        scaler = ResolutionScaler(target_time=10.0, enabled=False)
+        scaler.scale = 0.75
+        scaler.Update(40.0)
+        assert scaler.scale == 0.75 and scaler.gpu_time == 40.0, 'Disabled scaler should only track GPU time!'
+        scaler.Reset()
+        assert scaler.scale == 1.0 and scaler.gpu_time is None, 'Reset did not restore the scaler!'
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import unittest
+import numpy as np
+from pyrr import Matrix44
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.bounds import Bounds
+from pyrousel.model import PrimitiveFactory
+from pyrousel.scene import Scene
+
+class SceneTest(unittest.TestCase):
+    def test_world_bounds(self):
+        scene = Scene()
+        for x in [-10.0, 0.0, 10.0]:
+            model = PrimitiveFactory.CreateBox(2.0)
+            model.transform.SetTranslation(x, 0.0, 0.0)
+            scene.AddModel(model)
+
+        minext, maxext = scene.GetWorldBounds()
+        assert minext.shape == (3, 3), 'Expected world bounds of every scene model!'
+        assert np.allclose((minext + maxext)[:, 0] * 0.5, [-10.0, 0.0, 10.0]), 'World bounds ignore model transforms!'
+
+        aabb = scene.GetWorldAABB()
+        assert np.isclose(aabb.maxext[0] - aabb.minext[0], 22.0), 'Scene box does not enclose all models!'
+
+        scene.RemoveModel(scene.models[0])
+        assert len(scene.GetWorldBounds()[0]) == 2, 'Removed model is still part of the scene bounds!'
+
+    def test_frustum_culling(self):
+        scene = Scene()
+        for z in [-10.0, 10.0]:
+            model = PrimitiveFactory.CreateBox(1.0)
+            model.transform.SetTranslation(0.0, 0.0, z)
+            scene.AddModel(model)
+
+        # Camera at origin looking down negative z only sees the first box
+        view = Matrix44.look_at((0.0, 0.0, 0.0), (0.0, 0.0, -1.0), (0.0, 1.0, 0.0))
+        persp = Matrix44.perspective_projection(60.0, 1.0, 0.1, 100.0)
+        planes = Bounds.ExtractFrustumPlanes(view @ persp)
+        assert np.allclose(np.linalg.norm(planes[:, :3], axis=1), 1.0), 'Frustum planes are not normalized!'
+
+        visible = scene.Cull(planes)
+        assert list(visible) == [True, False], f'Unexpected visibility -> {visible}'
+
+        # Box straddling the far plane is still visible
+        scene.models[1].transform.SetTranslation(0.0, 0.0, -100.0)
+        assert list(scene.Cull(planes)) == [True, True], 'Box intersecting frustum should be visible!'
+
+    def test_picking(self):
+        scene = Scene()
+        for x in [-3.0, 3.0]:
+            model = PrimitiveFactory.CreateBox(2.0)
+            model.transform.SetTranslation(x, 0.0, 0.0)
+            model.BuildBVH()
+            scene.AddModel(model)
+
+        result = scene.Pick([3.0, 0.5, 10.0], [0.0, 0.0, -1.0])
+        assert result is not None and result.model is scene.models[1], 'Ray should hit the second box!'
+        assert np.isclose(result.distance, 9.0), 'Ray should hit the front face of the box!'
+        assert np.allclose(result.point, [3.0, 0.5, 1.0]), 'Hit point is not in world space!'
+
+        # Moving the model only refits world bounds, its hierarchy stays in model space
+        scene.models[1].transform.SetTranslation(3.0, 5.0, 0.0)
+        assert scene.Pick([3.0, 0.5, 10.0], [0.0, 0.0, -1.0]) is None, 'Moved box should not be hit!'
+        assert scene.Pick([3.0, 5.5, 10.0], [0.0, 0.0, -1.0]).model is scene.models[1], 'Moved box should be hit!'
+
+        instanced = scene.models[0]
+        transforms = np.tile(np.identity(4, dtype='f4'), (2, 1, 1))
+        transforms[1, 3, 1] = -5.0
+        instanced.SetInstances(transforms)
+        scene.InvalidateBounds()
+        result = scene.Pick([-3.0, -5.0, 10.0], [0.0, 0.0, -1.0])
+        assert result is not None and result.instance == 1, 'Ray should hit the second instance!'
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@ import importlib.resources
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from pyrousel.shader import ShaderSource
+from pyrousel.shader import ShaderSource, ShaderVariantCache
 
 class ShaderTest(unittest.TestCase):
     def test_shader_loading(self):
@@ -18,5 +18,27 @@ class ShaderTest(unittest.TestCase):
         shader_src = ShaderSource.LoadFromFile(vertex, fragment)
         assert shader_src is not None, 'Failed to load shader source from disk!'
 
+    def test_shader_defines(self):
+        source = ShaderSource.InjectDefines('#version 330\nvoid main() {}', {'B': None, 'A': 2})
+        lines = source.split('\n')
+
+        assert lines[0] == '#version 330', 'Version directive has to stay first!'
+        assert lines[1:3] == ['#define A 2', '#define B'], 'Defines were not injected in sorted order!'
+        assert lines[3] == '#line 2', 'Line numbering should continue from the source!'
+        assert ShaderSource.InjectDefines(source, {}) == source, 'Empty define set should leave source intact!'
+
+    def test_variant_cache(self):
+        compiled = []
+        source = ShaderSource()
+        source.vertex_source = '#version 330\nvoid main() {}'
+        source.fragment_source = '#version 330\nvoid main() {}'
+        cache = ShaderVariantCache(source, lambda shader: compiled.append(shader) or len(compiled))
+
+        assert cache.GetProgram({'A': None, 'B': None}) == 1, 'Variant was not compiled!'
+        assert cache.GetProgram({'B': None, 'A': None}) == 1, 'Define order should not create new variant!'
+        assert cache.GetProgram() == 2, 'Default variant was not compiled!'
+        assert '#define A' in compiled[0].fragment_source, 'Defines missing from fragment stage!'
+        assert len(cache) == 2, 'Invalid number of cached variants!'
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -4,8 +4,9 @@ import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from pyrousel.transform import Transform
-from pyrr import Vector3
+import numpy as np
+from pyrousel.transform import Transform, TransformStore
+from pyrr import Matrix44, Vector3
 
 class TransformTest(unittest.TestCase):
     def test_position(self):
@@ -32,7 +33,75 @@ class TransformTest(unittest.TestCase):
 
         assert transform.GetScale() == scale
 
+    def test_rotation(self):
+        transform = Transform(TransformStore())
+        transform.SetRotation(0.3, -1.1, 2.0)
+        transform.Rotate(0.2, 0.1, 0.0)
+        assert np.allclose(transform.GetRotation(), [0.5, -1.0, 2.0]), 'Rotations should accumulate per axis!'
 
+        transform.SetTranslation(1.0, 2.0, 3.0)
+        transform.SetScale(2.0, 3.0, 4.0)
+        expected = Matrix44.from_translation(Vector3([1.0, 2.0, 3.0])) * (
+            Matrix44.from_z_rotation(2.0) * Matrix44.from_y_rotation(-1.0) * Matrix44.from_x_rotation(0.5)
+        ) * Matrix44.from_scale(Vector3([2.0, 3.0, 4.0]))
+        assert np.allclose(transform.GetMatrix(), expected, atol=1e-5), 'Invalid composite matrix!'
+
+    def test_matrix_copy(self):
+        transform = Transform(TransformStore(capacity=1))
+        transform.SetTranslation(1.0, 2.0, 3.0)
+        matrix = transform.GetMatrix()
+        view = transform.GetMatrixView()
+        assert isinstance(matrix, Matrix44) and np.array_equal(matrix, view), 'Matrix copy and view differ!'
+
+        # Kept matrices are copies, only the view follows the store
+        transform.Translate(1.0, 0.0, 0.0)
+        assert np.allclose(np.asarray(matrix)[3, :3], [1.0, 2.0, 3.0]), 'Returned matrix should not change with the transform!'
+        assert np.allclose(np.asarray(transform.GetMatrixView())[3, :3], [2.0, 2.0, 3.0]), 'Matrix view is not up to date!'
+        assert np.shares_memory(view, transform.store.world_matrices), 'Matrix view should not copy!'
+
+    def test_hierarchy(self):
+        store = TransformStore(capacity=2)
+        root = Transform(store)
+        child = Transform(store, parent=root)
+        grandchild = Transform(store, parent=child)
+        root.SetTranslation(1.0, 0.0, 0.0)
+        child.SetRotation(0.0, np.pi * 0.5, 0.0)
+        grandchild.SetTranslation(0.0, 0.0, 2.0)
+
+        expected = np.asarray(grandchild.GetLocalMatrix()) @ np.asarray(child.GetLocalMatrix()) @ np.asarray(root.GetLocalMatrix())
+        assert np.allclose(grandchild.GetMatrix(), expected, atol=1e-5), 'Parent transforms should apply after the local one!'
+        assert np.allclose(store.GetWorldMatrices()[grandchild.index], expected, atol=1e-5), 'Store view mismatch!'
+
+        # Moving the root moves all descendants
+        root.Translate(0.0, 5.0, 0.0)
+        assert np.allclose(np.asarray(grandchild.GetMatrix())[3, :3], expected[3, :3] + [0.0, 5.0, 0.0], atol=1e-5), 'Descendants not updated!'
+
+        with self.assertRaises(Exception):
+            root.SetParent(grandchild)
+
+        index = child.index
+        del child
+        assert store.parents[grandchild.index] == -1, 'Orphaned transforms should become roots!'
+        assert Transform(store).index == index, 'Freed slots should be reused!'
+
+    def test_matrix_decomposition(self):
+        rng = np.random.default_rng(7)
+        rotations = rng.normal(size=(64, 4))
+        rotations /= np.linalg.norm(rotations, axis=1, keepdims=True)
+        translations = rng.normal(size=(64, 3))
+        scales = rng.uniform(0.1, 4.0, size=(64, 3))
+        # Mirroring matrices end up with negative X scale
+        scales[::4, 1] *= -1.0
+        matrices = TransformStore.ComposeMatrices(translations, rotations, scales)
+
+        decomposed = TransformStore.DecomposeMatrices(matrices)
+        assert np.allclose(TransformStore.ComposeMatrices(*decomposed), matrices, atol=1e-5), 'Decomposed matrices do not compose back!'
+        assert np.allclose(np.abs(decomposed[2]), np.abs(scales)), 'Invalid scale magnitudes!'
+
+        transform = Transform(TransformStore())
+        transform.SetLocalMatrix(matrices[1])
+        assert np.allclose(transform.GetLocalMatrix(), matrices[1], atol=1e-5), 'Local matrix was not applied!'
+        assert np.allclose(transform.GetTranslation(), translations[1]), 'Invalid translation!'
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
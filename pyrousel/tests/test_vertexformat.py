@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+import importlib.resources
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrousel.vertexformat import VertexPacker, VertexStream, MAX_U16_VERTICES
+from pyrousel.model import ModelLoader
+
+class VertexPackerTest(unittest.TestCase):
+    def test_octahedral_normals(self):
+        normals = np.random.default_rng(7).normal(size=(10000, 3))
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        axes = np.vstack([np.identity(3), -np.identity(3)])
+        normals = np.vstack([normals, axes])
+
+        decoded = VertexPacker.DecodeOctahedral(VertexPacker.EncodeOctahedral(normals))
+        error = np.degrees(np.arccos(np.clip(np.sum(normals * decoded, axis=1), -1.0, 1.0)))
+        assert error.max() < 0.01, f'Octahedral normal error too large -> {error.max()} degrees'
+
+    def test_packed_model(self):
+        model_filepath = importlib.resources.files('resources.models.obj').joinpath('chess_pawn.obj')
+        assert os.path.isfile(model_filepath), f'Model file not on disk -> {model_filepath}'
+        model = ModelLoader.LoadModel(model_filepath)
+        aabb = model.GetAABB()
+
+        packed = VertexPacker.Pack(
+            model.vertices,
+            model.indices,
+            normals=model.normals,
+            texcoords=model.texcoords,
+            colors=model.colors,
+            minext=aabb.minext,
+            maxext=aabb.maxext
+        )
+
+        num_vertices = len(model.vertices) // 3
+        assert packed.attributes[0] == 'in_position', 'Positions should be first packed attribute!'
+        stride = len(packed.data) // num_vertices
+        assert stride <= 20, f'Packed vertex is too large -> {stride} bytes'
+        assert packed.data.nbytes < np.asarray(model.vertices, dtype='f4').nbytes * 2, 'Packing saves no memory!'
+
+        # Positions are quantized to 16 bits within the model bounds
+        positions = packed.data.reshape(num_vertices, stride)[:, :6].copy().view('<u2').astype('f4')
+        decoded = positions * np.asarray(packed.position_scale) + np.asarray(packed.position_offset)
+        tolerance = np.asarray(aabb.maxext - aabb.minext).max() / 65535.0
+        assert np.abs(decoded - model.vertices.reshape(-1, 3)).max() <= tolerance, 'Position quantization error too large!'
+
+        expected_type = np.uint16 if num_vertices <= MAX_U16_VERTICES else np.uint32
+        assert packed.indices.dtype == expected_type, 'Indices should use smallest fitting type!'
+        assert np.array_equal(packed.indices, model.indices), 'Packed indices do not match!'
+
+    def test_missing_attributes(self):
+        vertices = np.array([0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0], dtype='f4')
+        packed = VertexPacker.Pack(vertices, np.array([0, 1, 2], dtype='i4'))
+
+        assert packed.attributes == ['in_position'], 'Missing attributes should not be packed!'
+        assert packed.data.nbytes == 3 * 8, 'Position only vertex should take 8 bytes!'
+
+    def test_streamed_ranges(self):
+        model_filepath = importlib.resources.files('resources.models.gltf').joinpath('cube-vc.glb')
+        model = ModelLoader.LoadModel(model_filepath)
+        packed = VertexPacker.Pack(model.vertices, model.indices, model.normals, model.texcoords, model.colors)
+
+        # Ranges packed separately must match the whole model packed at once
+        stream = VertexStream(model.vertices, model.normals, model.texcoords, model.colors)
+        ranges = [stream.Pack(first, min(5, stream.num_vertices - first)) for first in range(0, stream.num_vertices, 5)]
+        streamed = np.concatenate(ranges).view('u1').reshape(-1)
+        assert np.array_equal(streamed, packed.data), 'Streamed ranges do not match packed vertices!'
+        assert stream.format == packed.format and stream.attributes == packed.attributes, 'Stream layout does not match!'
+
+if __name__ == "__main__":
+    unittest.main()
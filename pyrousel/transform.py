@@ -1,21 +1,404 @@
+import threading
 import numpy as np
 from pyrr import Matrix44, Matrix33, Vector3
 
+# Initial number of transforms a store has room for, grows by doubling
+DEFAULT_STORE_CAPACITY = 64
+# Parent index of transforms at the root of the hierarchy
+NO_PARENT = -1
+
+class TransformStore(object):
+    """
+    Structure of arrays storage of many transforms
+
+    Local translations, rotations (pyrr (x, y, z, w) quaternions) and scales are kept in
+    contiguous arrays indexed by transform slot. Modified slots are flagged dirty, Update
+    recomputes local & world matrices of all dirty slots and their descendants at once,
+    one vectorized step per hierarchy depth. World matrices are float32 so slices of
+    world_matrices can be uploaded without copies. Matrices follow pyrr convention,
+    scale is applied first followed by rotation around X, Y, Z and translation.
+    """
+    def __init__(self, capacity: int = DEFAULT_STORE_CAPACITY):
+        self.size = 0
+        self.translations = np.zeros((capacity, 3), dtype='f8')
+        self.rotations = np.tile(np.array([0.0, 0.0, 0.0, 1.0]), (capacity, 1))
+        self.scales = np.ones((capacity, 3), dtype='f8')
+        # Euler angles in radians matching rotations, kept for the Transform Euler API
+        self.euler_angles = np.zeros((capacity, 3), dtype='f8')
+        self.parents = np.full(capacity, NO_PARENT, dtype='i4')
+        # Incremented whenever local values of a slot change, lets dependants cache derived data
+        self.versions = np.zeros(capacity, dtype='u8')
+        self.local_matrices = np.tile(np.identity(4, dtype='f4'), (capacity, 1, 1))
+        self.world_matrices = np.tile(np.identity(4, dtype='f4'), (capacity, 1, 1))
+        self.__dirty = np.zeros(capacity, dtype=bool)
+        self.__alive = np.zeros(capacity, dtype=bool)
+        self.__any_dirty = False
+        self.__free: list = []
+        # Slot indices grouped by hierarchy depth, None when the hierarchy changed
+        self.__levels: list = None
+        # Transforms get allocated by loader threads while the main thread renders
+        self.__lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Returns number of allocated transforms"""
+        return self.size - len(self.__free)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.parents)
+
+    def Allocate(self, parent: int = NO_PARENT) -> int:
+        """Returns index of new identity transform slot"""
+        with self.__lock:
+            if self.__free:
+                index = self.__free.pop()
+            else:
+                if self.size == self.capacity:
+                    self.__Grow(self.capacity * 2)
+                index = self.size
+                self.size += 1
+
+            self.__alive[index] = True
+            self.__ResetSlot(index)
+            if parent != NO_PARENT:
+                self.SetParent(index, parent)
+            return index
+
+    def Free(self, index: int) -> None:
+        """Releases transform slot, children of the freed transform become roots"""
+        with self.__lock:
+            if not self.__alive[index]:
+                return
+            children = np.flatnonzero(self.parents[:self.size] == index)
+            self.parents[children] = NO_PARENT
+            self.MarkDirty(children)
+            self.__alive[index] = False
+            self.__ResetSlot(index)
+            self.__dirty[index] = False
+            self.__free.append(index)
+            self.__levels = None
+
+    def SetParent(self, index: int, parent: int = NO_PARENT) -> None:
+        """
+        Attaches transform under parent transform, world matrix of parent applies after the local one
+
+        Parameters
+        ----------
+        index : int
+            Transform slot to attach
+        parent : int
+            Parent transform slot or NO_PARENT to detach
+        """
+        with self.__lock:
+            ancestor = parent
+            while ancestor != NO_PARENT:
+                if ancestor == index or not self.__alive[ancestor]:
+                    raise Exception(f'Transform parent invalid! -> {parent}')
+                ancestor = self.parents[ancestor]
+
+            self.parents[index] = parent
+            self.MarkDirty(index)
+            self.__levels = None
+
+    def SetTranslations(self, indices: np.ndarray, translations: np.ndarray) -> None:
+        """Overrides local translations of given slots"""
+        with self.__lock:
+            self.translations[indices] = translations
+            self.MarkDirty(indices)
+
+    def SetRotations(self, indices: np.ndarray, quaternions: np.ndarray) -> None:
+        """Overrides local rotations of given slots with (x, y, z, w) quaternions"""
+        with self.__lock:
+            quaternions = np.asarray(quaternions, dtype='f8').reshape(-1, 4)
+            quaternions = quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+            self.rotations[indices] = quaternions
+            self.euler_angles[indices] = TransformStore.QuaternionsToEuler(quaternions)
+            self.MarkDirty(indices)
+
+    def SetEulerAngles(self, indices: np.ndarray, angles: np.ndarray) -> None:
+        """Overrides local rotations of given slots with X, Y, Z Euler angles in radians"""
+        with self.__lock:
+            angles = np.asarray(angles, dtype='f8').reshape(-1, 3)
+            # Keep angles within (-pi, pi] so accumulated rotations do not grow unbounded
+            angles = np.arctan2(np.sin(angles), np.cos(angles))
+            self.euler_angles[indices] = angles
+            self.rotations[indices] = TransformStore.EulerToQuaternions(angles)
+            self.MarkDirty(indices)
+
+    def SetScales(self, indices: np.ndarray, scales: np.ndarray) -> None:
+        """Overrides local scales of given slots"""
+        with self.__lock:
+            self.scales[indices] = scales
+            self.MarkDirty(indices)
+
+    def SetLocalMatrices(self, indices: np.ndarray, matrices: np.ndarray) -> None:
+        """Overrides local translations, rotations and scales of given slots with decomposed Nx4x4 matrices, see DecomposeMatrices"""
+        translations, rotations, scales = TransformStore.DecomposeMatrices(matrices)
+        with self.__lock:
+            self.translations[indices] = translations
+            self.scales[indices] = scales
+            self.SetRotations(indices, rotations)
+
+    def MarkDirty(self, indices: np.ndarray) -> None:
+        """Flags given slots for matrix recomputation, required after writing the arrays directly"""
+        self.__dirty[indices] = True
+        self.versions[indices] += 1
+        self.__any_dirty = True
+
+    def IsDirty(self) -> bool:
+        """Returns whether any world matrix is out of date"""
+        return self.__any_dirty
+
+    def Update(self) -> None:
+        """Recomputes local & world matrices of all dirty transforms and their descendants"""
+        if not self.__any_dirty:
+            return
+
+        with self.__lock:
+            levels = self.__GetLevels()
+            dirty = self.__dirty[:self.size] & self.__alive[:self.size]
+            # Children of modified transforms move along with them
+            for level in levels[1:]:
+                dirty[level] |= dirty[self.parents[level]]
+
+            indices = np.flatnonzero(dirty)
+            self.local_matrices[indices] = TransformStore.ComposeMatrices(
+                self.translations[indices],
+                self.rotations[indices],
+                self.scales[indices]
+            )
+
+            for level in levels:
+                nodes = level[dirty[level]]
+                if len(nodes) == 0:
+                    continue
+                parents = self.parents[nodes]
+                roots = parents == NO_PARENT
+                self.world_matrices[nodes[roots]] = self.local_matrices[nodes[roots]]
+                children = nodes[~roots]
+                self.world_matrices[children] = self.local_matrices[children] @ self.world_matrices[parents[~roots]]
+
+            self.__dirty[:] = False
+            self.__any_dirty = False
+
+    def GetWorldMatrices(self, indices: np.ndarray = None) -> np.ndarray:
+        """
+        Returns up to date world matrices
+
+        Parameters
+        ----------
+        indices : np.ndarray
+            Slots to return, all slots when None
+
+        Returns
+        -------
+        Nx4x4 float32 matrices, view into the store when indices is None or a slice
+        """
+        self.Update()
+        if indices is None:
+            return self.world_matrices[:self.size]
+        return self.world_matrices[indices]
+
+    def __GetLevels(self) -> list:
+        """Returns slot indices grouped by hierarchy depth, parents always precede their children"""
+        if self.__levels is not None:
+            return self.__levels
+
+        parents = self.parents[:self.size]
+        has_parent = parents != NO_PARENT
+        depths = np.zeros(self.size, dtype='i4')
+        # Depth of each slot settles after as many passes as the hierarchy is deep
+        while True:
+            new_depths = np.where(has_parent, depths[parents] + 1, 0)
+            if np.array_equal(new_depths, depths):
+                break
+            depths = new_depths
+
+        order = np.argsort(depths, kind='stable')
+        splits = np.flatnonzero(np.diff(depths[order])) + 1
+        self.__levels = np.split(order, splits) if self.size > 0 else []
+        return self.__levels
+
+    def __ResetSlot(self, index: int) -> None:
+        self.translations[index] = 0.0
+        self.rotations[index] = [0.0, 0.0, 0.0, 1.0]
+        self.scales[index] = 1.0
+        self.euler_angles[index] = 0.0
+        self.parents[index] = NO_PARENT
+        self.local_matrices[index] = np.identity(4)
+        self.world_matrices[index] = np.identity(4)
+        self.versions[index] += 1
+        self.__levels = None
+
+    def __Grow(self, capacity: int) -> None:
+        def Extend(array: np.ndarray, fill: np.ndarray) -> np.ndarray:
+            extended = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+            extended[:len(array)] = array
+            extended[len(array):] = fill
+            return extended
+
+        identity = np.identity(4, dtype='f4')
+        self.translations = Extend(self.translations, 0.0)
+        self.rotations = Extend(self.rotations, [0.0, 0.0, 0.0, 1.0])
+        self.scales = Extend(self.scales, 1.0)
+        self.euler_angles = Extend(self.euler_angles, 0.0)
+        self.parents = Extend(self.parents, NO_PARENT)
+        self.versions = Extend(self.versions, 0)
+        self.local_matrices = Extend(self.local_matrices, identity)
+        self.world_matrices = Extend(self.world_matrices, identity)
+        self.__dirty = Extend(self.__dirty, False)
+        self.__alive = Extend(self.__alive, False)
+
+    @staticmethod
+    def ComposeMatrices(translations: np.ndarray, rotations: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Returns Nx4x4 float32 matrices applying scale, rotation and translation in that order"""
+        x, y, z, w = rotations.T
+        matrices = np.zeros((len(translations), 4, 4), dtype='f4')
+        matrices[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+        matrices[:, 0, 1] = 2.0 * (x * y - z * w)
+        matrices[:, 0, 2] = 2.0 * (x * z + y * w)
+        matrices[:, 1, 0] = 2.0 * (x * y + z * w)
+        matrices[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+        matrices[:, 1, 2] = 2.0 * (y * z - x * w)
+        matrices[:, 2, 0] = 2.0 * (x * z - y * w)
+        matrices[:, 2, 1] = 2.0 * (y * z + x * w)
+        matrices[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+        matrices[:, :3, :3] *= scales[:, :, np.newaxis]
+        matrices[:, 3, :3] = translations
+        matrices[:, 3, 3] = 1.0
+        return matrices
+
+    @staticmethod
+    def DecomposeMatrices(matrices: np.ndarray) -> tuple:
+        """
+        Splits matrices into translations, rotations and scales, inverse of ComposeMatrices
+
+        Shear can not be represented and gets dropped, mirroring matrices get negative X scale.
+
+        Parameters
+        ----------
+        matrices : np.ndarray
+            Nx4x4 matrices, same convention as ComposeMatrices
+
+        Returns
+        -------
+        Tuple of Nx3 translations, Nx4 (x, y, z, w) quaternions and Nx3 scales
+        """
+        matrices = np.asarray(matrices, dtype='f8').reshape(-1, 4, 4)
+        translations = matrices[:, 3, :3].copy()
+        scales = np.linalg.norm(matrices[:, :3, :3], axis=2)
+        scales[:, 0] *= np.where(np.linalg.det(matrices[:, :3, :3]) < 0.0, -1.0, 1.0)
+        rot = matrices[:, :3, :3] / np.where(scales == 0.0, 1.0, scales)[:, :, np.newaxis]
+
+        # Build quaternion from its largest component to stay numerically stable
+        trace = rot[:, 0, 0] + rot[:, 1, 1] + rot[:, 2, 2]
+        candidates = np.stack([
+            1.0 + trace,
+            1.0 + rot[:, 0, 0] - rot[:, 1, 1] - rot[:, 2, 2],
+            1.0 - rot[:, 0, 0] + rot[:, 1, 1] - rot[:, 2, 2],
+            1.0 - rot[:, 0, 0] - rot[:, 1, 1] + rot[:, 2, 2],
+        ], axis=-1)
+        largest = np.argmax(candidates, axis=1)
+        xy, yx = rot[:, 0, 1], rot[:, 1, 0]
+        xz, zx = rot[:, 0, 2], rot[:, 2, 0]
+        yz, zy = rot[:, 1, 2], rot[:, 2, 1]
+        quaternions = np.choose(largest[:, np.newaxis], [
+            np.stack([zy - yz, xz - zx, yx - xy, candidates[:, 0]], axis=-1),
+            np.stack([candidates[:, 1], xy + yx, xz + zx, zy - yz], axis=-1),
+            np.stack([xy + yx, candidates[:, 2], yz + zy, xz - zx], axis=-1),
+            np.stack([xz + zx, yz + zy, candidates[:, 3], yx - xy], axis=-1),
+        ])
+        quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+        return translations, quaternions, scales
+
+    @staticmethod
+    def EulerToQuaternions(angles: np.ndarray) -> np.ndarray:
+        """Converts Nx3 X, Y, Z Euler angles into Nx4 quaternions, same as Transform.SetRotation composes them"""
+        half = np.asarray(angles, dtype='f8').reshape(-1, 3) * 0.5
+        cx, cy, cz = np.cos(half).T
+        sx, sy, sz = np.sin(half).T
+        return np.stack([
+            sx * cy * cz + cx * sy * sz,
+            cx * sy * cz - sx * cy * sz,
+            cx * cy * sz + sx * sy * cz,
+            cx * cy * cz - sx * sy * sz,
+        ], axis=-1)
+
+    @staticmethod
+    def QuaternionsToEuler(quaternions: np.ndarray) -> np.ndarray:
+        """Converts Nx4 quaternions into Nx3 X, Y, Z Euler angles in radians, inverse of EulerToQuaternions"""
+        rot_mats = TransformStore.ComposeMatrices(
+            np.zeros((len(quaternions), 3)),
+            np.asarray(quaternions, dtype='f8'),
+            np.ones((len(quaternions), 3))
+        ).astype('f8')
+        sy = np.clip(rot_mats[:, 0, 2], -1.0, 1.0)
+        singular = np.abs(sy) > 1.0 - 1e-6
+        xangle = np.where(singular, np.arctan2(rot_mats[:, 2, 1], rot_mats[:, 1, 1]), np.arctan2(-rot_mats[:, 1, 2], rot_mats[:, 2, 2]))
+        yangle = np.arcsin(sy)
+        zangle = np.where(singular, 0.0, np.arctan2(-rot_mats[:, 0, 1], rot_mats[:, 0, 0]))
+        return np.stack([xangle, yangle, zangle], axis=-1)
+
+_default_store: TransformStore = None
+_default_store_lock = threading.Lock()
+
+def GetDefaultTransformStore() -> TransformStore:
+    """Returns store shared by all transforms created without explicit store"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TransformStore()
+        return _default_store
+
 class Transform(object):
-    def __init__(self):
-        self.__tr: Matrix44 = Matrix44.identity()
-        self.__rot_x: Matrix44 = Matrix44.identity()
-        self.__rot_y: Matrix44 = Matrix44.identity()
-        self.__rot_z: Matrix44 = Matrix44.identity()
-        self.__scale: Matrix44 = Matrix44.identity()
-        self.__final: Matrix44 = Matrix44.identity()
-        self.__dirty: bool = False
-    
+    """
+    Handle of single transform within TransformStore
+    """
+    def __init__(self, store: TransformStore = None, parent: 'Transform' = None):
+        self.store: TransformStore = store if store is not None else GetDefaultTransformStore()
+        self.index: int = self.store.Allocate()
+        if parent is not None:
+            self.SetParent(parent)
+
+    def __del__(self):
+        try:
+            self.store.Free(self.index)
+        except Exception:
+            # Store may already be gone during interpreter shutdown
+            pass
+
+    @property
+    def version(self) -> int:
+        """Counter incremented by every modification of this transform"""
+        return int(self.store.versions[self.index])
+
+    def SetParent(self, parent: 'Transform' = None) -> None:
+        """Attaches transform under given parent from the same store, None detaches it"""
+        if parent is not None and parent.store is not self.store:
+            raise Exception('Transform parent store invalid!')
+        self.store.SetParent(self.index, parent.index if parent is not None else NO_PARENT)
+
     def GetMatrix(self) -> Matrix44:
-        """ Returns composite transform matrix """
-        if self.__dirty:
-            self.__RecomputeMatrix()
-        return self.__final.astype('float32')
+        """ Returns copy of composite world transform matrix """
+        return self.GetMatrixView().astype('float32')
+
+    def GetMatrixView(self) -> Matrix44:
+        """
+        Returns composite world transform matrix as view into the store, avoids the copy for uploads
+
+        View is only valid until the store is modified or grown, use GetMatrix to keep the matrix.
+        """
+        self.store.Update()
+        return self.store.world_matrices[self.index].view(Matrix44)
+
+    def GetLocalMatrix(self) -> Matrix44:
+        """ Returns copy of transform matrix relative to the parent """
+        self.store.Update()
+        return self.store.local_matrices[self.index].view(Matrix44).astype('float32')
+
+    def SetLocalMatrix(self, matrix: Matrix44) -> None:
+        """Overrides translation, rotation and scale with the ones of given matrix relative to the parent"""
+        self.store.SetLocalMatrices(self.index, matrix)
 
     def Translate(self, x: float, y: float, z: float) -> None:
         """
@@ -33,14 +416,11 @@ class Transform(object):
             Translation value along the Z axis
 
         """
-        tr_mat = Matrix44.from_translation(Vector3([x, y, z]))
-        self.__tr *= tr_mat
-        self.__dirty = True
+        self.store.SetTranslations(self.index, self.store.translations[self.index] + [x, y, z])
 
     def SetTranslation(self, x: float, y: float, z: float) -> None:
         """Overrides current transform translation"""
-        self.__tr = Matrix44.from_translation(Vector3([x, y, z]))
-        self.__dirty = True
+        self.store.SetTranslations(self.index, [x, y, z])
 
     def Rotate(self, x: float, y: float, z: float) -> None:
         """
@@ -58,14 +438,7 @@ class Transform(object):
             Rotation along the Z axis in radians
 
         """
-        x_mat = Matrix44.from_x_rotation(x)
-        y_mat = Matrix44.from_y_rotation(y)
-        z_mat = Matrix44.from_z_rotation(z)
-
-        self.__rot_x *= x_mat
-        self.__rot_y *= y_mat
-        self.__rot_z *= z_mat
-        self.__dirty = True
+        self.store.SetEulerAngles(self.index, self.store.euler_angles[self.index] + [x, y, z])
 
     def SetRotation(self, x: float, y: float, z: float):
         """
@@ -82,10 +455,7 @@ class Transform(object):
         z : float
             Rotation along the Z axis in radians
         """
-        self.__rot_x = Matrix44.from_x_rotation(x)
-        self.__rot_y = Matrix44.from_y_rotation(y)
-        self.__rot_z = Matrix44.from_z_rotation(z)
-        self.__dirty = True
+        self.store.SetEulerAngles(self.index, [x, y, z])
 
     def Scale(self, x: float, y: float, z: float) -> None:
         """
@@ -103,39 +473,23 @@ class Transform(object):
             Scale along the Z axis
 
         """
-        scale_mat = Matrix44.from_scale(Vector3([x, y, z]))
-        self.__scale *= scale_mat
-        self.__dirty = True
+        self.store.SetScales(self.index, self.store.scales[self.index] * [x, y, z])
 
     def SetScale(self, x: float, y: float, z: float) -> None:
         """Overrides current transform scale"""
-        self.__scale = Matrix44.from_scale(Vector3([x, y, z]))
-        self.__dirty = True
-
-    def __RecomputeMatrix(self) -> None:
-        """ Recalculates internal composite transform matrix """
-        rot_order = self.__rot_z * self.__rot_y * self.__rot_x
-        self.__final = self.__tr * rot_order * self.__scale
+        self.store.SetScales(self.index, [x, y, z])
 
     def GetTranslation(self) -> Vector3:
         """ Returns current translation """
-        x = self.__tr[3,0]
-        y = self.__tr[3,1]
-        z = self.__tr[3,2]
-
-        return Vector3([x, y, z])
+        return Vector3(self.store.translations[self.index])
 
     def GetRotation(self) -> Vector3:
-        """Returns current rotation"""
-        return Transform.GetEulerAngles(self.GetMatrix())
+        """Returns current rotation as Euler angles in radians"""
+        return Vector3(self.store.euler_angles[self.index])
 
     def GetScale(self) -> Vector3:
         """ Returns current scale """
-        x = self.__scale[0,0]
-        y = self.__scale[1,1]
-        z = self.__scale[2,2]
-
-        return Vector3([x, y, z])
+        return Vector3(self.store.scales[self.index])
 
     @staticmethod
     def GetEulerAngles(mat: Matrix44) -> Vector3:
@@ -153,4 +507,4 @@ class Transform(object):
             yangle = np.arctan2(-rot_mat[2, 0], sy)
             zangle = 0.0
 
-        return Vector3([xangle, yangle, zangle])
\ No newline at end of file
+        return Vector3([xangle, yangle, zangle])
@@ -0,0 +1,226 @@
+import numpy as np
+from dataclasses import dataclass, field
+from pyrr import Vector3
+
+# Largest vertex count addressable by 16-bit indices
+MAX_U16_VERTICES = 65536
+
+# Buffer formats and byte sizes of packed vertex attributes
+POSITION_FORMAT = '3u2 x2'
+NORMAL_FORMAT = '2i2'
+TEXCOORD_FORMAT = '2f2'
+COLOR_FORMAT = '3f1 x1'
+
+_QUANTIZE_MAX = 65535.0
+_SNORM_MAX = 32767.0
+
+@dataclass
+class PackedVertices:
+    # Interleaved vertex data as raw bytes
+    data: np.ndarray
+    indices: np.ndarray
+    # Buffer format string followed by attribute names it sources
+    format: str
+    attributes: list
+    # Format which only sources positions, used for position only passes
+    position_format: str
+    position_offset: Vector3 = field(default_factory=lambda: Vector3([0.0, 0.0, 0.0]))
+    position_scale: Vector3 = field(default_factory=lambda: Vector3([1.0, 1.0, 1.0]))
+
+class VertexPacker(object):
+    """
+    Packs flat model attribute arrays into single compact interleaved vertex buffer
+
+    Layout per vertex (attributes not present in the model are omitted):
+        -- Position: 3x u16 quantized within model bounds + 2 byte padding
+        -- Normal: 2x i16 octahedral encoded unit vector
+        -- Texcoord: 2x f16
+        -- Color: 3x u8 normalized + 1 byte padding
+    """
+    @staticmethod
+    def Pack(
+            vertices: np.ndarray,
+            indices: np.ndarray,
+            normals: np.ndarray = None,
+            texcoords: np.ndarray = None,
+            colors: np.ndarray = None,
+            minext: Vector3 = None,
+            maxext: Vector3 = None) -> PackedVertices:
+        """
+        Packs given vertex attributes
+
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat array of vertex positions
+        indices : np.ndarray
+            Flat array of triangle indices
+        normals : np.ndarray
+            Optional flat array of vertex normals
+        texcoords : np.ndarray
+            Optional flat array of texture coordinates
+        colors : np.ndarray
+            Optional flat array of normalized (0.0 - 1.0) or 8-bit RGB vertex colors
+        minext : Vector3
+            Minimum extends of the vertex positions, computed when omitted
+        maxext : Vector3
+            Maximum extends of the vertex positions, computed when omitted
+
+        Returns
+        -------
+        PackedVertices holding interleaved vertex bytes and smallest fitting index array
+        """
+        stream = VertexStream(vertices, normals, texcoords, colors, minext, maxext)
+        packed = stream.Pack(0, stream.num_vertices)
+        return PackedVertices(
+            data=packed.view('u1').reshape(-1),
+            indices=np.asarray(indices).astype(stream.index_type),
+            format=stream.format,
+            attributes=stream.attributes,
+            position_format=stream.position_format,
+            position_offset=stream.position_offset,
+            position_scale=stream.position_scale
+        )
+
+    @staticmethod
+    def QuantizePositions(positions: np.ndarray, minext, maxext, out: np.ndarray = None) -> tuple:
+        """
+        Quantizes Nx3 positions to 16-bit unsigned integers spanning given extends
+
+        Returns
+        -------
+        Tuple of (offset, scale) such that position = quantized * scale + offset
+        """
+        minext = np.asarray(minext, dtype='f8')
+        extent = np.asarray(maxext, dtype='f8') - minext
+        scale = extent / _QUANTIZE_MAX
+        inv_extent = np.divide(_QUANTIZE_MAX, extent, out=np.zeros(3), where=extent > 0.0)
+
+        quantized = np.rint((positions - minext) * inv_extent)
+        if out is None:
+            out = np.empty(positions.shape, dtype='u2')
+        out[:] = np.clip(quantized, 0.0, _QUANTIZE_MAX)
+        return minext.astype('f4'), scale.astype('f4')
+
+    @staticmethod
+    def EncodeOctahedral(normals: np.ndarray) -> np.ndarray:
+        """Encodes Nx3 unit vectors into Nx2 signed 16-bit octahedral representation"""
+        normals = normals.astype('f8')
+        length = np.abs(normals).sum(axis=1, keepdims=True)
+        projected = np.divide(normals[:, :2], length, out=np.zeros((len(normals), 2)), where=length > 0.0)
+
+        # Fold lower hemisphere over the diagonals
+        lower = normals[:, 2] < 0.0
+        signs = np.where(projected[lower] >= 0.0, 1.0, -1.0)
+        projected[lower] = (1.0 - np.abs(projected[lower][:, ::-1])) * signs
+
+        return np.rint(np.clip(projected, -1.0, 1.0) * _SNORM_MAX).astype('i2')
+
+    @staticmethod
+    def DecodeOctahedral(encoded: np.ndarray) -> np.ndarray:
+        """Decodes Nx2 signed 16-bit octahedral representation into Nx3 unit vectors"""
+        xy = encoded.astype('f8') / _SNORM_MAX
+        z = 1.0 - np.abs(xy).sum(axis=1)
+        fold = np.maximum(-z, 0.0)
+        xy = xy - np.where(xy >= 0.0, fold[:, None], -fold[:, None])
+        normals = np.column_stack([xy, z])
+        return normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+class VertexStream(object):
+    """
+    Packs vertex attributes in ranges of vertices, see VertexPacker for the layout
+
+    Source arrays are referenced rather than copied, each range is cast and packed on
+    request so whole model never has to exist in packed form at once.
+    """
+    def __init__(
+            self,
+            vertices: np.ndarray,
+            normals: np.ndarray = None,
+            texcoords: np.ndarray = None,
+            colors: np.ndarray = None,
+            minext: Vector3 = None,
+            maxext: Vector3 = None):
+        """
+        Parameters
+        ----------
+        vertices : np.ndarray
+            Flat array of vertex positions
+        normals : np.ndarray
+            Optional flat array of vertex normals
+        texcoords : np.ndarray
+            Optional flat array of texture coordinates
+        colors : np.ndarray
+            Optional flat array of normalized (0.0 - 1.0) or 8-bit RGB vertex colors
+        minext : Vector3
+            Minimum extends of the vertex positions, computed when omitted
+        maxext : Vector3
+            Maximum extends of the vertex positions, computed when omitted
+        """
+        self.__positions = np.asarray(vertices).reshape(-1, 3)
+        self.num_vertices = len(self.__positions)
+        if minext is None or maxext is None:
+            minext = self.__positions.min(axis=0) if self.num_vertices > 0 else np.zeros(3)
+            maxext = self.__positions.max(axis=0) if self.num_vertices > 0 else np.zeros(3)
+        self.__minext = minext
+        self.__maxext = maxext
+
+        fields = [('position', '<u2', 3), ('padding', '<u2')]
+        formats = [POSITION_FORMAT]
+        self.attributes = ['in_position']
+        self.__normals = None
+        self.__texcoords = None
+        self.__colors = None
+        if normals is not None and len(normals) > 0:
+            fields.append(('normal', '<i2', 2))
+            formats.append(NORMAL_FORMAT)
+            self.attributes.append('in_normal')
+            self.__normals = np.asarray(normals).reshape(-1, 3)
+        if texcoords is not None and len(texcoords) > 0:
+            fields.append(('texcoord', '<f2', 2))
+            formats.append(TEXCOORD_FORMAT)
+            self.attributes.append('in_texcoord')
+            self.__texcoords = np.asarray(texcoords).reshape(-1, 2)
+        if colors is not None and len(colors) > 0:
+            fields.append(('color', 'u1', 4))
+            formats.append(COLOR_FORMAT)
+            self.attributes.append('in_color')
+            self.__colors = np.asarray(colors).reshape(-1, 3)
+
+        self.dtype = np.dtype(fields)
+        self.format = ' '.join(formats)
+        stride = self.dtype.itemsize
+        self.position_format = f'{POSITION_FORMAT} x{stride - 8}' if stride > 8 else POSITION_FORMAT
+        self.index_type = 'u2' if self.num_vertices <= MAX_U16_VERTICES else 'u4'
+        # Quantization depends only on the extends, same for every range
+        offset, scale = VertexPacker.QuantizePositions(np.zeros((0, 3), dtype='f4'), minext, maxext)
+        self.position_offset = Vector3(offset)
+        self.position_scale = Vector3(scale)
+
+    def Pack(self, first: int, count: int) -> np.ndarray:
+        """
+        Returns structured array of packed vertices [first, first + count)
+
+        Parameters
+        ----------
+        first : int
+            Index of the first vertex to pack
+        count : int
+            Number of vertices to pack
+        """
+        end = first + count
+        packed = np.zeros(count, dtype=self.dtype)
+        positions = self.__positions[first:end].astype('f4', copy=False)
+        VertexPacker.QuantizePositions(positions, self.__minext, self.__maxext, packed['position'])
+        if self.__normals is not None:
+            packed['normal'] = VertexPacker.EncodeOctahedral(self.__normals[first:end].astype('f4', copy=False))
+        if self.__texcoords is not None:
+            packed['texcoord'] = self.__texcoords[first:end].astype('f4', copy=False)
+        if self.__colors is not None:
+            rgb = self.__colors[first:end]
+            if rgb.dtype == np.uint8:
+                packed['color'][:, :3] = rgb
+            else:
+                packed['color'][:, :3] = np.rint(np.clip(rgb.astype('f4', copy=False), 0.0, 1.0) * 255.0)
+            packed['color'][:, 3] = 255
+        return packed
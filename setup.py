@@ -12,6 +12,7 @@ setup(
     package_data={'pyrousel': [
         'resources/shaders/*.vs',
         'resources/shaders/*.fs',
+        'resources/shaders/*.gs',
         'resources/models/obj/*.obj',
         'resources/models/gltf/*.glb',
         'resources/models/collada/*.dae'